@@ -33,6 +33,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
 
+from app.utils.log_pipeline import configure_logging
+
 # Check for required dependencies
 try:
     import websockets
@@ -60,7 +62,7 @@ except ImportError:
     print("Optional: pip install python-dotenv")
 
 # Configure logging
-logging.basicConfig(
+configure_logging(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[
@@ -15,9 +15,10 @@ import time
 
 from app.core.config import settings
 from app.core.nexus import nexus
+from app.utils.log_pipeline import configure_logging
 
 # Configure logging
-logging.basicConfig(
+configure_logging(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[
@@ -18,6 +18,7 @@ from typing import Any, Dict, List, Optional
 
 # Re-exported from sub-modules for backward compatibility
 from app.adapters.infrastructure.ai_gateway_enums import GroqGear, LLMProvider  # noqa: F401
+from app.adapters.infrastructure.ai_gateway_response_cache import ResponseCache
 from app.adapters.infrastructure.ai_gateway_token_utils import (  # noqa: F401
     _get_tokenizer,
     count_tokens,
@@ -37,6 +38,7 @@ class AIGateway(NexusComponent):
       * Cannon Shot (Tiro de Canhão): Gemini-1.5-Pro (external fallback)
     - Automatically escalate to Gemini for large contexts (>10k tokens)
     - Auto-repair on critical errors (sends fixes to GitHub Actions)
+    - Response cache for repeated prompts (exact + optional near-duplicate)
     """
     
     # Token threshold for context-based escalation
@@ -65,6 +67,7 @@ class AIGateway(NexusComponent):
         github_adapter: Optional[Any] = None,
         # Backward compatibility parameters
         groq_model: Optional[str] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         """
         Initialize AI Gateway with multiple provider support and Gears system.
@@ -79,6 +82,8 @@ class AIGateway(NexusComponent):
             enable_auto_repair: Enable auto-repair on critical errors
             github_adapter: Optional GitHubAdapter instance for auto-repair
             groq_model: (Deprecated) Use groq_high_gear_model instead. For backward compatibility.
+            response_cache: Completion cache (defaults to ResponseCache.from_env(),
+                configured by the AI_GATEWAY_CACHE_* env vars)
         """
         # Handle backward compatibility: groq_model -> groq_high_gear_model
         if groq_model is not None:
@@ -107,6 +112,7 @@ class AIGateway(NexusComponent):
         self.default_provider = default_provider
         self.enable_auto_repair = enable_auto_repair
         self.github_adapter = github_adapter
+        self.response_cache = response_cache if response_cache is not None else ResponseCache.from_env()
         
         # Current Groq gear (starts at High Gear)
         self.current_groq_gear = GroqGear.HIGH_GEAR
@@ -133,7 +139,9 @@ class AIGateway(NexusComponent):
             f"  - Default provider: {self.default_provider.value}\n"
             f"  - Groq available: {self.groq_client is not None}\n"
             f"  - Gemini available: {self.gemini_client is not None}\n"
-            f"  - Auto-repair: {self.enable_auto_repair}"
+            f"  - Auto-repair: {self.enable_auto_repair}\n"
+            f"  - Response cache: ttl={self.response_cache.ttl_seconds}s, "
+            f"semantic={self.response_cache.semantic_enabled}"
         )
     
     @property
@@ -274,18 +282,31 @@ class AIGateway(NexusComponent):
         functions: Optional[List[Any]] = None,
         multimodal: bool = False,
         force_provider: Optional[LLMProvider] = None,
+        temperature: Optional[float] = None,
+        use_cache: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """
         Generate a completion using the most appropriate provider with Gears system.
         
+        Repeated requests can be answered from ``self.response_cache`` (exact
+        match on normalized messages + provider/model/gear + temperature, plus
+        an optional near-duplicate layer). The cache is opt-in: it is used when
+        ``use_cache`` is True, or when it is left as None and ``temperature`` is
+        0 (deterministic sampling). Requests with function declarations or
+        multimodal payloads always go to the provider.
+        
         Args:
             messages: List of message dicts with 'role' and 'content'
             functions: Optional function declarations for function calling
             multimodal: Whether the request requires multimodal analysis
             force_provider: Force a specific provider
+            temperature: Optional sampling temperature (provider default if None)
+            use_cache: True to use the response cache, False to skip it; None
+                (default) uses it only for ``temperature == 0``
             
         Returns:
-            Response dict with 'provider', 'response', and other metadata
+            Response dict with 'provider', 'response', and other metadata.
+            Cache hits carry an extra 'cache' key ("exact" or "semantic").
         """
         # Combine all message content for token counting
         payload = "\n".join([msg.get("content", "") for msg in messages if msg.get("content")])
@@ -297,11 +318,56 @@ class AIGateway(NexusComponent):
             force_provider=force_provider,
         )
         
+        if use_cache is None:
+            use_cache = temperature == 0
+        cache_request = None
+        if self.response_cache.enabled:
+            if use_cache and not functions and not multimodal:
+                if provider == LLMProvider.GROQ:
+                    model, gear = self._get_current_groq_model(), self.current_groq_gear.value
+                else:
+                    model, gear = self.gemini_model, None
+                cache_request = self.response_cache.build_request(
+                    messages, provider.value, model, gear, temperature
+                )
+                cached = self.response_cache.get(cache_request)
+                if cached is not None:
+                    layer, response = cached
+                    logger.debug(f"[AIGateway] Response cache hit ({layer}) for {provider.value}/{model}")
+                    response["cache"] = layer
+                    return response
+            else:
+                self.response_cache.record_bypass()
+        
+        result = await self._dispatch_completion(provider, messages, functions, temperature)
+        if cache_request is not None:
+            self.response_cache.put(cache_request, result)
+        return result
+    
+    async def _dispatch_completion(
+        self,
+        provider: LLMProvider,
+        messages: List[Dict[str, str]],
+        functions: Optional[List[Any]] = None,
+        temperature: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Send the request to the selected provider, handling gear shifts and fallbacks.
+        
+        Args:
+            provider: Provider chosen by select_provider
+            messages: List of message dicts
+            functions: Optional function declarations
+            temperature: Optional sampling temperature
+            
+        Returns:
+            Response dict
+        """
         try:
             if provider == LLMProvider.GROQ:
-                return await self._generate_with_groq(messages, functions)
+                return await self._generate_with_groq(messages, functions, temperature=temperature)
             else:
-                return await self._generate_with_gemini(messages, functions)
+                return await self._generate_with_gemini(messages, functions, temperature=temperature)
         except Exception as e:
             error_traceback = traceback.format_exc()
             
@@ -326,7 +392,7 @@ class AIGateway(NexusComponent):
                 # Try to fallback to Gemini if available
                 if provider == LLMProvider.GROQ and self.gemini_client:
                     logger.warning("Tentando fallback para Gemini devido a modelo descomissionado")
-                    return await self._handle_rate_limit_fallback(provider, messages, functions)
+                    return await self._handle_rate_limit_fallback(provider, messages, functions, temperature)
                 raise ValueError(error_msg) from e
             
             # Check if it's a rate limit error
@@ -336,7 +402,7 @@ class AIGateway(NexusComponent):
                 if provider == LLMProvider.GROQ and self.current_groq_gear == GroqGear.HIGH_GEAR:
                     self._shift_to_low_gear()
                     try:
-                        return await self._generate_with_groq(messages, functions)
+                        return await self._generate_with_groq(messages, functions, temperature=temperature)
                     except Exception as low_gear_error:
                         # Low gear also failed, check if it's also a rate limit
                         if self._is_rate_limit_error(low_gear_error):
@@ -344,7 +410,7 @@ class AIGateway(NexusComponent):
                             # Escalate to Gemini (Cannon Shot) if available
                             if self.gemini_client:
                                 logger.warning("🚀 Firing Cannon Shot (Tiro de Canhão): Gemini")
-                                return await self._handle_rate_limit_fallback(provider, messages, functions)
+                                return await self._handle_rate_limit_fallback(provider, messages, functions, temperature)
                             else:
                                 # No Gemini available, raise proper error
                                 raise ValueError(
@@ -355,7 +421,7 @@ class AIGateway(NexusComponent):
                             # Different error in Low Gear, re-raise
                             raise
                 else:
-                    return await self._handle_rate_limit_fallback(provider, messages, functions)
+                    return await self._handle_rate_limit_fallback(provider, messages, functions, temperature)
             
             # Other errors
             else:
@@ -437,6 +503,7 @@ class AIGateway(NexusComponent):
         self,
         messages: List[Dict[str, str]],
         functions: Optional[List[Any]] = None,
+        temperature: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Generate completion using Groq with Gears system.
@@ -444,6 +511,7 @@ class AIGateway(NexusComponent):
         Args:
             messages: List of message dicts
             functions: Optional function declarations
+            temperature: Optional sampling temperature
             
         Returns:
             Response dict
@@ -462,6 +530,8 @@ class AIGateway(NexusComponent):
             "model": current_model,
             "messages": messages,
         }
+        if temperature is not None:
+            request_params["temperature"] = temperature
         
         # Add tools if functions are provided
         if functions:
@@ -495,6 +565,7 @@ class AIGateway(NexusComponent):
         self,
         messages: List[Dict[str, str]],
         functions: Optional[List[Any]] = None,
+        temperature: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Generate completion using Gemini.
@@ -502,6 +573,7 @@ class AIGateway(NexusComponent):
         Args:
             messages: List of message dicts
             functions: Optional function declarations
+            temperature: Optional sampling temperature
             
         Returns:
             Response dict
@@ -527,6 +599,8 @@ class AIGateway(NexusComponent):
         config_params = {}
         if system_instruction:
             config_params["system_instruction"] = system_instruction
+        if temperature is not None:
+            config_params["temperature"] = temperature
         
         # Add tools if functions are provided
         if functions:
@@ -651,6 +725,7 @@ class AIGateway(NexusComponent):
         failed_provider: LLMProvider,
         messages: List[Dict[str, str]],
         functions: Optional[List[Any]] = None,
+        temperature: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Handle rate limit by falling back to alternative provider.
@@ -659,6 +734,7 @@ class AIGateway(NexusComponent):
             failed_provider: Provider that hit rate limit
             messages: Original messages
             functions: Optional function declarations
+            temperature: Optional sampling temperature
             
         Returns:
             Response from fallback provider
@@ -667,13 +743,13 @@ class AIGateway(NexusComponent):
         if failed_provider == LLMProvider.GROQ:
             if self.gemini_client:
                 logger.info("Groq rate limit reached, falling back to Gemini")
-                response = await self._generate_with_gemini(messages, functions)
+                response = await self._generate_with_gemini(messages, functions, temperature=temperature)
                 response["fallback_from"] = LLMProvider.GROQ.value
                 return response
         elif failed_provider == LLMProvider.GEMINI:
             if self.groq_client:
                 logger.info("Gemini rate limit reached, falling back to Groq")
-                response = await self._generate_with_groq(messages, functions)
+                response = await self._generate_with_groq(messages, functions, temperature=temperature)
                 response["fallback_from"] = LLMProvider.GEMINI.value
                 return response
         
@@ -726,6 +802,8 @@ class AIGateway(NexusComponent):
                 - ``preferred_provider`` (str): provider hint resolved externally by
                   :class:`~app.application.services.llm_router.LLMRouter`.
                   Takes precedence over automatic provider selection.
+                - ``use_cache`` (bool): True to answer repeated prompts from the
+                  response cache, False to bypass it (default: only at temperature 0)
 
         Returns:
             Evidence dict with ``success`` and provider metadata.
@@ -733,6 +811,7 @@ class AIGateway(NexusComponent):
         ctx = context or {}
         messages: List[Dict[str, str]] = ctx.get("messages", [])
         multimodal: bool = ctx.get("multimodal", False)
+        use_cache: Optional[bool] = ctx.get("use_cache")
         # ``preferred_provider`` is set externally by LLMRouter (selection policy);
         # ``force_provider`` is kept for direct callers / backward compatibility.
         force_provider_value: Optional[str] = ctx.get("preferred_provider") or ctx.get("force_provider")
@@ -749,14 +828,23 @@ class AIGateway(NexusComponent):
                 with concurrent.futures.ThreadPoolExecutor() as pool:
                     future = pool.submit(
                         asyncio.run,
-                        self.generate_completion(messages, multimodal=multimodal, force_provider=force_provider),
+                        self.generate_completion(
+                            messages, multimodal=multimodal, force_provider=force_provider, use_cache=use_cache
+                        ),
                     )
                     result = future.result()
             else:
                 result = loop.run_until_complete(
-                    self.generate_completion(messages, multimodal=multimodal, force_provider=force_provider)
+                    self.generate_completion(
+                        messages, multimodal=multimodal, force_provider=force_provider, use_cache=use_cache
+                    )
                 )
-            return {"success": True, "provider": result.get("provider"), "model": result.get("model")}
+            return {
+                "success": True,
+                "provider": result.get("provider"),
+                "model": result.get("model"),
+                "cache": result.get("cache"),
+            }
         except Exception as exc:
             return {"success": False, "error": str(exc)}
 
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""AI Gateway Response Cache - exact and near-duplicate completion cache.
+
+Two layers sit in front of provider dispatch:
+
+- Exact layer: key = sha256 of the normalized messages (role + content with
+  collapsed whitespace) plus provider, model, gear and temperature.
+- Semantic layer (optional): within the same scope (same provider/model/gear/
+  temperature and identical preceding messages), the final user message is
+  embedded and compared by cosine similarity against cached prompts. Enabled
+  only when a similarity threshold is configured.
+
+Both layers are bounded LRU maps with a TTL. Entries are only written for
+successful completions; the gateway never caches requests with function
+declarations or multimodal payloads, and only consults the cache when the
+caller opts in (``use_cache=True``) or asks for ``temperature == 0``.
+Responses are deep-copied on the way in and out, so callers can mutate what
+they get back without corrupting the cached entry.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Sequence[float]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_messages(messages: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    return [
+        (str(msg.get("role", "")), _WHITESPACE.sub(" ", str(msg.get("content") or "")).strip())
+        for msg in messages
+    ]
+
+
+def _digest(payload: Any) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _default_embedder() -> Embedder:
+    """Offline bag-of-hashed-words encoder shared with VectorMemoryAdapter."""
+    from app.adapters.infrastructure.vector_memory_adapter import _vectorize
+
+    return _vectorize
+
+
+@dataclass
+class CacheRequest:
+    """Lookup handle built once per ``generate_completion`` call."""
+
+    key: str
+    scope: str
+    probe: Optional[str]
+    embedding: Optional[Sequence[float]] = field(default=None, repr=False)
+
+
+@dataclass
+class _Entry:
+    response: Dict[str, Any]
+    expires_at: float
+    scope: str = ""
+    embedding: Optional[Sequence[float]] = None
+
+
+class ResponseCache:
+    """Bounded TTL cache for AIGateway completions.
+
+    Args:
+        ttl_seconds: Lifetime of exact entries (0 disables the cache).
+        max_entries: Maximum number of exact entries (LRU eviction).
+        semantic_threshold: Cosine similarity required for a near-duplicate
+            hit. ``None`` disables the semantic layer.
+        semantic_ttl_seconds: Lifetime of semantic entries (defaults to
+            ``ttl_seconds``).
+        max_semantic_entries: Maximum number of semantic entries.
+        embedder: ``text -> vector`` callable for the semantic layer
+            (defaults to the offline encoder of VectorMemoryAdapter).
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 512,
+        semantic_threshold: Optional[float] = None,
+        semantic_ttl_seconds: Optional[float] = None,
+        max_semantic_entries: int = 256,
+        embedder: Optional[Embedder] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(0, int(max_entries))
+        self.semantic_threshold = semantic_threshold
+        self.semantic_ttl_seconds = (
+            self.ttl_seconds if semantic_ttl_seconds is None else max(0.0, float(semantic_ttl_seconds))
+        )
+        self.max_semantic_entries = max(0, int(max_semantic_entries))
+        self._embedder = embedder
+        self._clock = clock
+        self._exact: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._semantic: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build from ``AI_GATEWAY_CACHE_*`` environment variables."""
+        threshold = os.getenv("AI_GATEWAY_SEMANTIC_CACHE_THRESHOLD")
+        semantic_ttl = os.getenv("AI_GATEWAY_SEMANTIC_CACHE_TTL")
+        return cls(
+            ttl_seconds=float(os.getenv("AI_GATEWAY_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("AI_GATEWAY_CACHE_MAX_ENTRIES", "512")),
+            semantic_threshold=float(threshold) if threshold else None,
+            semantic_ttl_seconds=float(semantic_ttl) if semantic_ttl else None,
+            max_semantic_entries=int(os.getenv("AI_GATEWAY_SEMANTIC_CACHE_MAX_ENTRIES", "256")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return (
+            self.semantic_threshold is not None
+            and self.semantic_ttl_seconds > 0
+            and self.max_semantic_entries > 0
+        )
+
+    def build_request(
+        self,
+        messages: List[Dict[str, Any]],
+        provider: str,
+        model: str,
+        gear: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ) -> CacheRequest:
+        """Compute the exact key and semantic scope for a request."""
+        normalized = _normalize_messages(messages)
+        params = [provider, model, gear, temperature]
+        probe: Optional[str] = None
+        if normalized and normalized[-1][0] == "user" and normalized[-1][1]:
+            probe = normalized[-1][1]
+        return CacheRequest(
+            key=_digest([params, normalized]),
+            scope=_digest([params, normalized[:-1] if probe else normalized]),
+            probe=probe,
+        )
+
+    def get(self, request: CacheRequest) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return ``(layer, response)`` on a hit, where layer is ``exact`` or ``semantic``."""
+        now = self._clock()
+        with self._lock:
+            entry = self._live(self._exact, request.key, now)
+            if entry is not None:
+                self._exact.move_to_end(request.key)
+                self._stats["hits"] += 1
+                return "exact", copy.deepcopy(entry.response)
+
+        if self.semantic_enabled and request.probe:
+            embedding = self._embed(request)
+            if embedding is not None:
+                with self._lock:
+                    best_key, best_score = None, -1.0
+                    for key in list(self._semantic):
+                        entry = self._live(self._semantic, key, now)
+                        if entry is None or entry.scope != request.scope:
+                            continue
+                        score = _cosine(embedding, entry.embedding)
+                        if score > best_score:
+                            best_key, best_score = key, score
+                    if best_key is not None and best_score >= self.semantic_threshold:
+                        self._semantic.move_to_end(best_key)
+                        self._stats["semantic_hits"] += 1
+                        return "semantic", copy.deepcopy(self._semantic[best_key].response)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, request: CacheRequest, response: Dict[str, Any]) -> None:
+        """Store a successful completion under both layers."""
+        if not self.enabled:
+            return
+        try:
+            response = copy.deepcopy(response)
+        except Exception as exc:
+            logger.debug("[AIGateway] Response not cacheable (copy failed): %s", exc)
+            return
+        now = self._clock()
+        with self._lock:
+            self._exact[request.key] = _Entry(response, now + self.ttl_seconds)
+            self._exact.move_to_end(request.key)
+            self._stats["stores"] += 1
+            self._evict(self._exact, self.max_entries)
+        if self.semantic_enabled and request.probe:
+            embedding = self._embed(request)
+            if embedding is None:
+                return
+            with self._lock:
+                self._semantic[request.key] = _Entry(
+                    response, now + self.semantic_ttl_seconds, request.scope, embedding
+                )
+                self._semantic.move_to_end(request.key)
+                self._evict(self._semantic, self.max_semantic_entries)
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._semantic.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current sizes and hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._exact)
+            stats["semantic_size"] = len(self._semantic)
+        lookups = stats["hits"] + stats["semantic_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["semantic_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _live(self, store: "OrderedDict[str, _Entry]", key: str, now: float) -> Optional[_Entry]:
+        entry = store.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del store[key]
+            self._stats["expirations"] += 1
+            return None
+        return entry
+
+    def _evict(self, store: "OrderedDict[str, _Entry]", limit: int) -> None:
+        while len(store) > limit:
+            store.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _embed(self, request: CacheRequest) -> Optional[Sequence[float]]:
+        if request.embedding is not None:
+            return request.embedding
+        try:
+            if self._embedder is None:
+                self._embedder = _default_embedder()
+            request.embedding = list(self._embedder(request.probe or ""))
+        except Exception as exc:
+            logger.warning("[AIGateway] Semantic cache disabled, embedder failed: %s", exc)
+            self.semantic_threshold = None
+            return None
+        return request.embedding
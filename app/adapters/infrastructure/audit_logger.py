@@ -1,9 +1,10 @@
 import datetime
-import json
 from app.core.nexus import NexusComponent
-from app.utils.document_store import document_store
+from app.utils.audit_writer import get_audit_writer
 
 class AuditLogger(NexusComponent):
+    log_path = "data/audit_log.json"
+
     def configure(self, log_path="data/audit_log.json"):
         self.log_path = log_path
 
@@ -16,8 +17,7 @@ class AuditLogger(NexusComponent):
             "success": "llm_response" in context["artifacts"] or "automation_log" in context["artifacts"]
         }
 
-        # Acrescenta linha ao log usando texto puro (compatível com qualquer extensão)
-        with open(self.log_path, 'a') as f:
-            f.write(json.dumps(log_entry) + "\n")
+        # Acrescenta linha ao log (texto puro, uma linha JSON) via group commit
+        get_audit_writer(self.log_path).append(log_entry)
 
         return context
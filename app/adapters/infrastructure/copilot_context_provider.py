@@ -12,6 +12,8 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+from app.adapters.infrastructure.source_index import get_source_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -85,6 +87,7 @@ class GitHubCopilotContextProvider(NexusComponent):
     def _analyze_folder_structure(self) -> Dict[str, str]:
         """Analyze folder structure"""
         structure = {}
+        index = get_source_index(self.repository_root)
         
         # Common important directories
         important_dirs = [
@@ -99,7 +102,7 @@ class GitHubCopilotContextProvider(NexusComponent):
             dir_path = self.repository_root / dir_name
             if dir_path.exists() and dir_path.is_dir():
                 # Count files and get brief description
-                file_count = sum(1 for _ in dir_path.rglob("*.py"))
+                file_count = len(index.files(f"{dir_name}/*.py"))
                 structure[dir_name] = f"{file_count} Python files"
         
         return structure
@@ -121,12 +124,10 @@ class GitHubCopilotContextProvider(NexusComponent):
         """Find architecture documentation"""
         arch_docs = []
         
-        docs_dir = self.repository_root / "docs"
-        if docs_dir.exists():
-            for doc_file in docs_dir.rglob("*.md"):
-                name_lower = doc_file.name.lower()
-                if any(keyword in name_lower for keyword in ["architecture", "design", "structure"]):
-                    arch_docs.append(str(doc_file.relative_to(self.repository_root)))
+        for doc_path in get_source_index(self.repository_root).files("docs/*.md"):
+            name_lower = doc_path.rsplit("/", 1)[-1].lower()
+            if any(keyword in name_lower for keyword in ["architecture", "design", "structure"]):
+                arch_docs.append(doc_path)
         
         return arch_docs
     
@@ -145,10 +146,8 @@ class GitHubCopilotContextProvider(NexusComponent):
         
         for pattern in patterns:
             if "*" in pattern:
-                # Use glob pattern
-                for file_path in self.repository_root.glob(pattern):
-                    if file_path.is_file():
-                        key_files.append(str(file_path.relative_to(self.repository_root)))
+                # Glob pattern answered by the source index
+                key_files.extend(get_source_index(self.repository_root).files(pattern))
             else:
                 file_path = self.repository_root / pattern
                 if file_path.exists():
@@ -11,16 +11,20 @@ SQLiteHistoryAdapter.
 Expõe:
     log(...)                → registra uma chamada
     get_cost_summary(days)  → custo total, por modelo e por task_type
+    get_median_cost(task)   → mediana por task_type (sketch P² em memória,
+                              semeado com uma leitura e mantido a cada log)
 """
 
 import json
 import logging
 import os
+import threading
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 from app.core.nexus import NexusComponent
+from app.utils.streaming_stats import P2Quantile
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +67,8 @@ class CostTrackerAdapter(NexusComponent):
         self._database_url = database_url or os.getenv("DATABASE_URL")
         self._engine: Any = None
         self._price_table: Dict[str, Dict[str, float]] = {}
+        self._median_sketches: Dict[str, P2Quantile] = {}
+        self._sketch_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # NexusComponent contract
@@ -125,6 +131,11 @@ class CostTrackerAdapter(NexusComponent):
                 conn.commit()
         except Exception as exc:
             logger.debug("[CostTracker] Falha ao registrar chamada: %s", exc)
+            return
+        with self._sketch_lock:
+            sketch = self._median_sketches.get(task_type)
+            if sketch is not None:
+                sketch.add(cost)
 
     def get_cost_summary(self, period_days: int = 7) -> Dict[str, Any]:
         """Retorna custo total, por modelo e por task_type no período."""
@@ -163,25 +174,39 @@ class CostTrackerAdapter(NexusComponent):
         }
 
     def get_median_cost(self, task_type: str) -> float:
-        """Retorna o custo mediano para o task_type no histórico completo."""
+        """Retorna o custo mediano para o task_type no histórico completo.
+
+        O histórico é lido uma única vez por task_type; depois disso a mediana
+        vem do sketch atualizado por ``log()``.
+        """
+        with self._sketch_lock:
+            sketch = self._median_sketches.get(task_type)
+            if sketch is None:
+                sketch = self._seed_median_sketch(task_type)
+                if sketch is None:
+                    return 0.0
+                self._median_sketches[task_type] = sketch
+            return sketch.value
+
+    def _seed_median_sketch(self, task_type: str) -> Optional[P2Quantile]:
         try:
             from sqlalchemy import text as sa_text  # lazy import
             engine = self._get_engine()
             if engine is None:
-                return 0.0
+                return None
             select_sql = sa_text(
                 "SELECT estimated_cost_usd FROM llm_cost_log WHERE task_type = :task_type"
             )
             with engine.connect() as conn:
-                rows = list(conn.execute(select_sql, {"task_type": task_type}))
-            costs = sorted(float(r[0]) for r in rows if r[0] is not None)
-            if not costs:
-                return 0.0
-            mid = len(costs) // 2
-            return costs[mid] if len(costs) % 2 else (costs[mid - 1] + costs[mid]) / 2
+                rows = conn.execute(select_sql, {"task_type": task_type})
+                sketch = P2Quantile(0.5)
+                for row in rows:
+                    if row[0] is not None:
+                        sketch.add(float(row[0]))
+            return sketch
         except Exception as exc:
             logger.debug("[CostTracker] Falha ao calcular mediana: %s", exc)
-            return 0.0
+            return None
 
     # ------------------------------------------------------------------
     # Internal helpers
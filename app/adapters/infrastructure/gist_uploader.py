@@ -5,9 +5,9 @@ CORREÇÃO: Mantido padrão original do CORE para compatibilidade com Nexus Disc
 import os
 import json
 import logging
-import requests
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 from app.core.nexus import NexusComponent
+from app.adapters.infrastructure.http_transport import get_http_transport
 
 logger = logging.getLogger(__name__)
 
@@ -66,7 +66,7 @@ class GistUploader(NexusComponent):
             
             # Update ou Create
             url = f"https://api.github.com/gists/{self.gist_id}"
-            response = requests.patch(url, headers=headers, json=payload, timeout=30)
+            response = get_http_transport().session().patch(url, headers=headers, json=payload)
             
             if response.status_code in [200, 201]:
                 logger.info("✅ [GIST] Backup enviado com sucesso!")
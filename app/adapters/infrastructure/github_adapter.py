@@ -8,6 +8,7 @@ import os
 import asyncio
 from typing import Any, Dict, Optional
 import httpx
+from app.adapters.infrastructure.http_transport import get_http_transport
 
 logger = logging.getLogger(__name__)
 
@@ -54,9 +55,10 @@ class GitHubAdapter:
         """Garante a existência do cliente de forma segura para concorrência."""
         async with self._lock:
             if self._client is None or self._client.is_closed:
-                self._client = httpx.AsyncClient(
+                self._client = get_http_transport().async_client(
+                    pool="github",
+                    read_timeout=30.0,
                     headers=self._get_headers(),
-                    timeout=30.0,
                     follow_redirects=True
                 )
             return self._client
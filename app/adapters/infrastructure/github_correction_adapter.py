@@ -15,6 +15,8 @@ from typing import Any, Dict, Optional
 
 import httpx
 
+from app.adapters.infrastructure.http_transport import get_http_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,7 +52,9 @@ class GitHubCorrectionAdapter(NexusComponent):
 
     async def _ensure_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(headers=self._get_headers(), timeout=30.0)
+            self._client = get_http_transport().async_client(
+                pool="github", read_timeout=30.0, headers=self._get_headers()
+            )
         return self._client
 
     async def close(self) -> None:
@@ -11,7 +11,7 @@ import logging
 import os
 from datetime import datetime
 
-import httpx
+from app.adapters.infrastructure.http_transport import get_http_transport
 
 logger = logging.getLogger(__name__)
 
@@ -84,7 +84,7 @@ Este é um erro de infraestrutura externa (Google Gemini API) e requer análise
 *Issue criada automaticamente pelo sistema de monitoramento de infraestrutura*
 """
 
-            async with httpx.AsyncClient() as client:
+            async with get_http_transport().async_client(pool="github") as client:
                 response = await client.post(
                     f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues",
                     headers={
@@ -172,7 +172,7 @@ Este é um erro de infraestrutura externa (Google Gemini API) e requer análise
 *Issue criada automaticamente pelo sistema de monitoramento de infraestrutura*
 """
 
-            with httpx.Client() as client:
+            with get_http_transport().client(pool="github") as client:
                 response = client.post(
                     f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues",
                     headers={
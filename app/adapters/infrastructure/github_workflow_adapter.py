@@ -8,6 +8,8 @@ from typing import Any, Dict, Optional
 
 import httpx
 
+from app.adapters.infrastructure.http_transport import get_http_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -83,9 +85,10 @@ class GitHubWorkflowAdapter(NexusComponent):
             Configured async HTTP client
         """
         if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(
+            self._client = get_http_transport().async_client(
+                pool="github",
+                read_timeout=30.0,
                 headers=self._get_headers(),
-                timeout=30.0,
             )
         return self._client
     
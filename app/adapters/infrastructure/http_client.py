@@ -3,12 +3,14 @@ import requests
 import logging
 import time
 
+from app.adapters.infrastructure.http_transport import get_http_transport
+
 logger = logging.getLogger("HttpClient")
 
 class HttpClient:
     def __init__(self, base_url: str = ""):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        self.session = get_http_transport().session()
 
     def request(self, method: str, endpoint: str, **kwargs):
         url = f"{self.base_url}{endpoint}" if endpoint.startswith('/') else f"{self.base_url}/{endpoint}"
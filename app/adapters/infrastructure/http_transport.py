@@ -0,0 +1,502 @@
+# -*- coding: utf-8 -*-
+"""
+HttpTransport — camada de transporte HTTP de saída compartilhada.
+Registrado no Nexus como: http_transport
+
+Os adapters de saída (Telegram, Supabase Storage, Gist, Ollama, GitHub)
+mantinham cada um sua ``requests.Session`` / ``httpx.Client`` — ou nem isso
+(``requests.post`` e ``urllib`` avulsos) — e pagavam um handshake TCP+TLS a
+cada chamada. Aqui ficam os pools, um por nome (``pool``), compartilhados
+pelo processo:
+
+- ``session()`` devolve uma ``requests.Session`` leve montada sobre o
+  ``PoolManager`` do pool (urllib3: um pool keep-alive por host, até
+  ``pool_size`` conexões por host e ``HTTP_POOL_HOSTS`` hosts);
+- ``client()`` / ``async_client()`` devolvem ``httpx.Client`` /
+  ``httpx.AsyncClient`` sobre o transporte do pool (HTTP/2 quando o pacote
+  ``h2`` está instalado; o assíncrono tem um transporte por event loop,
+  fechado com ``aclose()`` quando o loop encerra via ``shutdown_asyncgens``
+  — ``asyncio.run`` e uvicorn fazem isso);
+- fechar a sessão/cliente de um adapter não fecha o pool compartilhado —
+  headers, base_url e retry continuam por adapter;
+- timeouts padrão de conexão/leitura valem para toda requisição sem
+  ``timeout`` explícito;
+- ``stats()`` expõe, por host, requisições e conexões novas (handshakes) e,
+  por pool, conexões em uso/ociosas e a utilização.
+
+Processos forkados (workers da API) descartam os pools herdados.
+
+Configuração por ambiente: ``HTTP_CONNECT_TIMEOUT``, ``HTTP_READ_TIMEOUT``,
+``HTTP_POOL_SIZE``, ``HTTP_POOL_HOSTS`` e ``HTTP2`` (0 desliga).
+
+Uso::
+
+    from app.adapters.infrastructure.http_transport import get_http_transport
+
+    transport = get_http_transport()
+    session = transport.session()                    # requests
+    client = transport.client(pool="ollama", base_url="http://localhost:11434")
+    transport.stats()["hosts"]["https://api.telegram.org:443"]
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+import weakref
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from app.core.nexus import NexusComponent
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CONNECT_TIMEOUT = 5.0
+_DEFAULT_READ_TIMEOUT = 30.0
+_DEFAULT_POOL_SIZE = 10
+_DEFAULT_POOL_HOSTS = 16
+
+
+def _h2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _origin(scheme: str, host: str, port: Optional[int]) -> str:
+    if port is None:
+        port = 443 if scheme == "https" else 80
+    return f"{scheme}://{host}:{port}"
+
+
+class _Metrics:
+    """Contadores por host (requisições, conexões novas, handshakes TLS)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "connections_opened": 0, "tls_handshakes": 0}
+        )
+        # pool -> pools urllib3 vivos (para as métricas de utilização)
+        self.urllib3_pools: Dict[str, "weakref.WeakSet"] = defaultdict(weakref.WeakSet)
+
+    def count(self, origin: str, field: str) -> None:
+        with self._lock:
+            self.hosts[origin][field] += 1
+
+    def trace(self, origin: str, event: str) -> None:
+        if event == "connection.connect_tcp.complete":
+            self.count(origin, "connections_opened")
+        elif event == "connection.start_tls.complete":
+            self.count(origin, "tls_handshakes")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            hosts = {origin: dict(values) for origin, values in self.hosts.items()}
+        for values in hosts.values():
+            requests_ = values["requests"]
+            values["reuse_ratio"] = (
+                max(0, requests_ - values["connections_opened"]) / requests_ if requests_ else 0.0
+            )
+        return hosts
+
+
+def _counting_pool_classes(metrics: _Metrics, pool: str) -> Dict[str, type]:
+    """Pools urllib3 que contam conexões novas e requisições por host."""
+
+    def _make(base: type) -> type:
+        class _CountingPool(base):
+            def __init__(self, *args: Any, **kwargs: Any) -> None:
+                super().__init__(*args, **kwargs)
+                self._origin = _origin(self.scheme, self.host, self.port)
+                metrics.urllib3_pools[pool].add(self)
+
+            def _new_conn(self):
+                metrics.count(self._origin, "connections_opened")
+                if self.scheme == "https":
+                    metrics.count(self._origin, "tls_handshakes")
+                return super()._new_conn()
+
+            def urlopen(self, method, url, *args, **kwargs):
+                metrics.count(self._origin, "requests")
+                return super().urlopen(method, url, *args, **kwargs)
+
+        _CountingPool.__name__ = f"Counting{base.__name__}"
+        return _CountingPool
+
+    return {"http": _make(HTTPConnectionPool), "https": _make(HTTPSConnectionPool)}
+
+
+class _SharedHTTPAdapter(HTTPAdapter):
+    """``HTTPAdapter`` que usa o ``PoolManager`` do pool compartilhado.
+
+    ``close()`` (chamado por ``Session.close``) não derruba o pool; o retry
+    (``max_retries``) continua por sessão.
+    """
+
+    def __init__(self, owner: "HttpTransport", pool: str, **kwargs: Any) -> None:
+        self._owner = owner
+        self._pool_name = pool
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        pass  # o PoolManager pertence ao HttpTransport
+
+    @property
+    def poolmanager(self) -> PoolManager:
+        return self._owner._pool_manager(self._pool_name)
+
+    @poolmanager.setter
+    def poolmanager(self, value: Any) -> None:
+        pass
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if timeout is None:
+            timeout = self._owner.timeout
+        return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+    def close(self) -> None:
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+
+class HttpTransport(NexusComponent):
+    """Pools HTTP de saída compartilhados, com timeouts padrão e métricas.
+
+    Args:
+        connect_timeout: Timeout padrão de conexão (s).
+        read_timeout: Timeout padrão de leitura (s).
+        pool_size: Conexões keep-alive por host em cada pool.
+        pool_hosts: Hosts mantidos por pool urllib3 (LRU).
+        http2: Força/desliga HTTP/2 nos clientes httpx (padrão: se ``h2`` existir).
+        verify: Verificação TLS dos pools httpx (bool, CA bundle ou ``ssl.SSLContext``);
+            nas sessões ``requests`` continua valendo ``session.verify``.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+        pool_hosts: Optional[int] = None,
+        http2: Optional[bool] = None,
+        verify: Any = True,
+    ) -> None:
+        super().__init__()
+        self.connect_timeout = float(connect_timeout or os.getenv("HTTP_CONNECT_TIMEOUT", _DEFAULT_CONNECT_TIMEOUT))
+        self.read_timeout = float(read_timeout or os.getenv("HTTP_READ_TIMEOUT", _DEFAULT_READ_TIMEOUT))
+        self.pool_size = max(1, int(pool_size or os.getenv("HTTP_POOL_SIZE", _DEFAULT_POOL_SIZE)))
+        self.pool_hosts = max(1, int(pool_hosts or os.getenv("HTTP_POOL_HOSTS", _DEFAULT_POOL_HOSTS)))
+        if http2 is None:
+            http2 = os.getenv("HTTP2", "1") != "0" and _h2_available()
+        elif http2 and not _h2_available():
+            logger.warning("[HttpTransport] HTTP/2 pedido, mas o pacote 'h2' não está instalado; usando HTTP/1.1")
+            http2 = False
+        self.http2 = bool(http2)
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._metrics = _Metrics()
+        self._sizes: Dict[str, int] = {}
+        self._pool_managers: Dict[str, PoolManager] = {}
+        self._sync_transports: Dict[str, Any] = {}
+        # (pool, id(loop)) → (ref do loop, transporte, gerador que o fecha no shutdown do loop)
+        self._async_transports: Dict[Tuple[str, int], Tuple[Any, Any, Any]] = {}
+        _live_transports.add(self)
+
+    # ------------------------------------------------------------------
+    # NexusComponent
+    # ------------------------------------------------------------------
+
+    def can_execute(self, context: Optional[Dict[str, Any]] = None) -> bool:
+        return True
+
+    def execute(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        action = (context or {}).get("action", "stats")
+        if action == "stats":
+            return {"success": True, **self.stats()}
+        if action == "close":
+            self.close()
+            return {"success": True}
+        return {"success": False, "error": f"Ação desconhecida: {action}"}
+
+    # ------------------------------------------------------------------
+    # Clientes
+    # ------------------------------------------------------------------
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(conexão, leitura) no formato aceito pelo ``requests``."""
+        return (self.connect_timeout, self.read_timeout)
+
+    def session(
+        self,
+        pool: str = "default",
+        pool_size: Optional[int] = None,
+        retries: Any = 0,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Session:
+        """``requests.Session`` sobre o pool ``pool``.
+
+        Args:
+            pool_size: Conexões por host; vale na criação do pool.
+            retries: ``max_retries`` do ``HTTPAdapter`` (int ou ``urllib3.Retry``).
+            headers: Headers fixos desta sessão.
+        """
+        self._reserve(pool, pool_size)
+        adapter = _SharedHTTPAdapter(self, pool, max_retries=retries)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if headers:
+            session.headers.update(headers)
+        return session
+
+    def client(
+        self,
+        pool: str = "default",
+        pool_size: Optional[int] = None,
+        read_timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> httpx.Client:
+        """``httpx.Client`` sobre o pool ``pool`` (kwargs vão para o cliente)."""
+        self._reserve(pool, pool_size)
+        return httpx.Client(
+            transport=_SharedSyncTransport(self, pool),
+            timeout=self._httpx_timeout(read_timeout),
+            **kwargs,
+        )
+
+    def async_client(
+        self,
+        pool: str = "default",
+        pool_size: Optional[int] = None,
+        read_timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> httpx.AsyncClient:
+        """``httpx.AsyncClient`` sobre o pool ``pool`` do event loop corrente."""
+        self._reserve(pool, pool_size)
+        return httpx.AsyncClient(
+            transport=_SharedAsyncTransport(self, pool),
+            timeout=self._httpx_timeout(read_timeout),
+            **kwargs,
+        )
+
+    # ------------------------------------------------------------------
+    # Métricas e ciclo de vida
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores por host e utilização por pool."""
+        with self._lock:
+            sizes = dict(self._sizes)
+            httpx_pools: Dict[str, List[Any]] = defaultdict(list)
+            for name, transport in self._sync_transports.items():
+                httpx_pools[f"httpx:{name}"].append(transport)
+            for (name, _), (_, transport, _) in self._async_transports.items():
+                httpx_pools[f"httpx-async:{name}"].append(transport)  # um por event loop
+        pools: Dict[str, Dict[str, Any]] = {}
+        for name, live in list(self._metrics.urllib3_pools.items()):
+            max_size = in_use = idle = 0
+            for pool in list(live):
+                queue = getattr(pool, "pool", None)
+                if queue is None:  # pool de host fechado/descartado
+                    continue
+                max_size += queue.maxsize
+                in_use += queue.maxsize - queue.qsize()
+                idle += sum(1 for conn in list(queue.queue) if conn is not None)
+            pools[f"requests:{name}"] = self._gauge(max_size, in_use, idle)
+        for label, transports in httpx_pools.items():
+            name = label.split(":", 1)[1]
+            # httpcore não expõe o pool sem atributo privado; ausente, zera
+            connections = [c for t in transports for c in getattr(getattr(t, "_pool", None), "connections", [])]
+            idle = sum(1 for conn in connections if conn.is_idle())
+            max_size = sizes.get(name, self.pool_size) * self.pool_hosts * len(transports)
+            pools[label] = self._gauge(max_size, len(connections) - idle, idle)
+        return {
+            "http2": self.http2,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "hosts": self._metrics.snapshot(),
+            "pools": pools,
+        }
+
+    def close(self) -> None:
+        """Fecha todos os pools (recriados sob demanda)."""
+        with self._lock:
+            managers, self._pool_managers = self._pool_managers, {}
+            transports, self._sync_transports = self._sync_transports, {}
+            self._async_transports = {}  # pertencem aos seus event loops
+        for manager in managers.values():
+            manager.clear()
+        for transport in transports.values():
+            transport.close()
+
+    # ------------------------------------------------------------------
+    # Pools
+    # ------------------------------------------------------------------
+
+    def _reserve(self, pool: str, pool_size: Optional[int]) -> None:
+        with self._lock:
+            self._sizes.setdefault(pool, max(1, int(pool_size or self.pool_size)))
+
+    def _httpx_timeout(self, read_timeout: Optional[float]) -> httpx.Timeout:
+        return httpx.Timeout(read_timeout or self.read_timeout, connect=self.connect_timeout)
+
+    @staticmethod
+    def _gauge(max_size: int, in_use: int, idle: int) -> Dict[str, Any]:
+        return {
+            "max_size": max_size,
+            "in_use": in_use,
+            "idle": idle,
+            "utilization": in_use / max_size if max_size else 0.0,
+        }
+
+    def _pool_manager(self, pool: str) -> PoolManager:
+        manager = self._pool_managers.get(pool)
+        if manager is None:
+            with self._lock:
+                manager = self._pool_managers.get(pool)
+                if manager is None:
+                    manager = PoolManager(
+                        num_pools=self.pool_hosts,
+                        maxsize=self._sizes.get(pool, self.pool_size),
+                        block=False,
+                    )
+                    manager.pool_classes_by_scheme = _counting_pool_classes(self._metrics, pool)
+                    self._pool_managers[pool] = manager
+        return manager
+
+    def _limits(self, pool: str) -> httpx.Limits:
+        size = self._sizes.get(pool, self.pool_size)
+        return httpx.Limits(max_connections=size * self.pool_hosts, max_keepalive_connections=size * self.pool_hosts)
+
+    def _sync_transport(self, pool: str):
+        transport = self._sync_transports.get(pool)
+        if transport is None:
+            with self._lock:
+                transport = self._sync_transports.get(pool)
+                if transport is None:
+                    transport = httpx.HTTPTransport(http2=self.http2, limits=self._limits(pool), verify=self.verify)
+                    self._sync_transports[pool] = transport
+        return transport
+
+    async def _async_transport(self, pool: str):
+        loop = asyncio.get_running_loop()
+        key = (pool, id(loop))
+        entry = self._async_transports.get(key)
+        if entry is not None and entry[0]() is loop:
+            return entry[1]
+        with self._lock:
+            # Transportes de loops já encerrados não podem mais ser usados
+            for stale in [k for k, (ref, _, _) in self._async_transports.items() if ref() is None or ref().is_closed()]:
+                _, _, closer = self._async_transports.pop(stale)
+                if closer.ag_frame is not None:
+                    logger.debug("[HttpTransport] Loop encerrado sem shutdown_asyncgens; pool %s descartado", stale[0])
+            transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=self._limits(pool), verify=self.verify)
+            closer = _close_with_loop(transport)
+            self._async_transports[key] = (weakref.ref(loop), transport, closer)
+        # O primeiro passo registra o gerador no loop: shutdown_asyncgens o
+        # finaliza e o transporte é fechado enquanto o loop ainda roda
+        await closer.__anext__()
+        return transport
+
+    def _reset_in_child(self) -> None:
+        # Sockets herdados pertencem ao processo pai: descarta sem fechar
+        self._lock = threading.Lock()
+        self._metrics._lock = threading.Lock()
+        self._pool_managers = {}
+        self._sync_transports = {}
+        # Os geradores de fechamento ficam vivos: finalizá-los agendaria o
+        # aclose() no loop do pai (cuja self-pipe o filho compartilha)
+        self._inherited_async = list(self._async_transports.values())
+        self._async_transports = {}
+
+
+async def _close_with_loop(transport: httpx.AsyncHTTPTransport):
+    try:
+        yield
+    finally:
+        try:
+            await transport.aclose()
+        except Exception as e:
+            logger.debug(f"[HttpTransport] Falha ao fechar pool assíncrono: {e}")
+
+
+def _install_trace(owner: HttpTransport, request: httpx.Request, is_async: bool) -> None:
+    url = request.url
+    origin = _origin(url.scheme, url.host, url.port)
+    owner._metrics.count(origin, "requests")
+    if "trace" not in request.extensions:
+        if is_async:
+            async def trace(event: str, info: Dict[str, Any]) -> None:
+                owner._metrics.trace(origin, event)
+        else:
+            def trace(event: str, info: Dict[str, Any]) -> None:
+                owner._metrics.trace(origin, event)
+        request.extensions["trace"] = trace
+
+
+class _SharedSyncTransport(httpx.BaseTransport):
+    """Transporte do cliente de um adapter; fechar não fecha o pool."""
+
+    def __init__(self, owner: HttpTransport, pool: str) -> None:
+        self._owner = owner
+        self._pool_name = pool
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _install_trace(self._owner, request, is_async=False)
+        return self._owner._sync_transport(self._pool_name).handle_request(request)
+
+    def close(self) -> None:
+        pass
+
+
+class _SharedAsyncTransport(httpx.AsyncBaseTransport):
+    """Transporte assíncrono; o pool real é o do event loop corrente."""
+
+    def __init__(self, owner: HttpTransport, pool: str) -> None:
+        self._owner = owner
+        self._pool_name = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _install_trace(self._owner, request, is_async=True)
+        transport = await self._owner._async_transport(self._pool_name)
+        return await transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+_live_transports: "weakref.WeakSet[HttpTransport]" = weakref.WeakSet()
+_shared: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_http_transport() -> HttpTransport:
+    """Instância do processo: a do Nexus (``http_transport``) ou uma local."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                candidate = None
+                try:
+                    from app.core.nexus import nexus
+
+                    candidate = nexus.resolve("http_transport")
+                except Exception as e:
+                    logger.debug(f"[HttpTransport] Nexus indisponível: {e}")
+                _shared = candidate if isinstance(candidate, HttpTransport) else HttpTransport()
+    return _shared
+
+
+def _after_fork_in_child() -> None:
+    for transport in list(_live_transports):
+        transport._reset_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -3,16 +3,28 @@
 JRVS Cloud Storage Adapter — Supabase Storage backend for .jrvs snapshots.
 Responsabilidade: sincronizar arquivos .jrvs entre local e cloud (Supabase).
 Registrado no Nexus como: jrvs_cloud_storage
+
+Todas as requisições passam por uma única ``requests.Session`` sobre o pool
+``supabase`` do ``http_transport`` (keep-alive, ``max_workers`` conexões por
+host) e retry com backoff
+exponencial para 429/5xx. A sincronização incremental (manifesto de hashes e
+ETags, transferências concorrentes) fica em ``jrvs_delta_sync``.
+
+Objetos são nomeados pelo caminho relativo em POSIX (``data/x.jrvs``, ver
+``object_key``) em todas as ações. Objetos no layout antigo achatado
+(``data-x.jrvs``) são migrados uma vez por processo e bucket.
 """
 import logging
 import os
+import threading
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Tuple, Optional, Dict, Any, Union
 
 import requests
+from urllib3.util.retry import Retry
+
 from app.core.nexus import NexusComponent
-from app.utils.document_store import document_store
+from app.adapters.infrastructure.http_transport import get_http_transport
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +32,47 @@ logger = logging.getLogger(__name__)
 _DEFAULT_BUCKET = "jrvs-snapshots"
 _DEFAULT_SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 _DEFAULT_SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
+_DEFAULT_MAX_WORKERS = int(os.getenv("JRVS_SYNC_MAX_WORKERS", "4"))
+_DEFAULT_TIMEOUT = 30.0
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.5
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+_LIST_PAGE_SIZE = 1000
+
+
+def object_key(path: Union[str, Path]) -> str:
+    """Chave remota de um arquivo local: o caminho relativo em POSIX (``data/x.jrvs``)."""
+    return Path(path).as_posix().lstrip("/")
+
+
+def legacy_object_key(name: str, root: Path = Path(".")) -> Optional[str]:
+    """Chave atual de um objeto no layout antigo achatado (``data-sub-x.jrvs``).
+
+    O primeiro ``-`` sempre foi separador de diretório; os demais só viram
+    ``/`` enquanto o diretório correspondente existe sob ``root`` (hífens em
+    nomes de arquivo são preservados). None se ``name`` não é um nome antigo.
+    """
+    if "/" in name or "-" not in name or not name.endswith(".jrvs"):
+        return None
+    head, rest = name.split("-", 1)
+    parts = [head]
+    pieces = rest.split("-")
+    base = Path(root) / head
+    while len(pieces) > 1 and (base / pieces[0]).is_dir():
+        base = base / pieces[0]
+        parts.append(pieces.pop(0))
+    parts.append("-".join(pieces))
+    return "/".join(parts)
+
+
+def normalize_etag(value: Optional[str]) -> Optional[str]:
+    """Remove aspas e prefixo fraco (``W/``) de um ETag; None se vazio."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    return value.strip('"') or None
 
 
 class JrvsCloudStorage(NexusComponent):
@@ -28,12 +81,19 @@ class JrvsCloudStorage(NexusComponent):
     Implementa sincronização bidirecional com Supabase Storage.
     """
 
-    def __init__(self, bucket: str = _DEFAULT_BUCKET):
+    def __init__(self, bucket: str = _DEFAULT_BUCKET, max_workers: int = _DEFAULT_MAX_WORKERS):
         super().__init__()
         self.bucket = bucket
         self.supabase_url = _DEFAULT_SUPABASE_URL
         self.supabase_key = _DEFAULT_SUPABASE_KEY
+        self.max_workers = max(1, max_workers)
+        self.timeout = _DEFAULT_TIMEOUT
         self._enabled = bool(self.supabase_url and self.supabase_key)
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        # (bucket, diretório) já verificados quanto ao layout antigo
+        self._legacy_checked: set = set()
+        self._legacy_lock = threading.Lock()
 
         if not self._enabled:
             logger.warning("[JrvsCloudStorage] Credenciais Supabase não configuradas. Modo disabled.")
@@ -43,7 +103,11 @@ class JrvsCloudStorage(NexusComponent):
         self.bucket = config.get("bucket", self.bucket)
         self.supabase_url = config.get("supabase_url", self.supabase_url)
         self.supabase_key = config.get("supabase_key", self.supabase_key)
+        self.max_workers = max(1, int(config.get("max_workers", self.max_workers)))
+        self.timeout = float(config.get("timeout", self.timeout))
         self._enabled = bool(self.supabase_url and self.supabase_key)
+        self._legacy_checked = set()
+        self.close()
         logger.info(f"[JrvsCloudStorage] Configurado: bucket={self.bucket}, enabled={self._enabled}")
 
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -57,6 +121,7 @@ class JrvsCloudStorage(NexusComponent):
         data_dir = context.get("data_dir", "data")
 
         try:
+            self.migrate_legacy_objects(self.bucket, Path(data_dir))
             if action == "upload":
                 files = self._upload_file(context.get("path"))
                 return {"success": True, "uploaded": files}
@@ -75,6 +140,38 @@ class JrvsCloudStorage(NexusComponent):
             logger.error(f"[JrvsCloudStorage] Erro na execução: {e}")
             return {"success": False, "error": str(e)}
 
+    # ------------------------------------------------------------------
+    # Sessão HTTP
+    # ------------------------------------------------------------------
+
+    def _get_client(self) -> Optional[requests.Session]:
+        """Sessão HTTP compartilhada (keep-alive + retry), ou None se desabilitado."""
+        if not self._enabled:
+            return None
+        with self._session_lock:
+            if self._session is None:
+                retry = Retry(
+                    total=_RETRY_TOTAL,
+                    backoff_factor=_RETRY_BACKOFF,
+                    status_forcelist=_RETRY_STATUS,
+                    allowed_methods=frozenset({"GET", "HEAD", "PUT", "POST", "DELETE"}),
+                    raise_on_status=False,
+                )
+                self._session = get_http_transport().session(
+                    pool="supabase",
+                    pool_size=self.max_workers,
+                    retries=retry,
+                    headers=self._get_headers(),
+                )
+            return self._session
+
+    def close(self) -> None:
+        """Descarta a sessão HTTP (o pool compartilhado continua aberto)."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
     def _get_headers(self) -> Dict[str, str]:
         """Retorna headers de autenticação para Supabase."""
         return {
@@ -83,6 +180,174 @@ class JrvsCloudStorage(NexusComponent):
             "Content-Type": "application/json"
         }
 
+    def _object_url(self, bucket: str, path: str) -> str:
+        return f"{self.supabase_url}/storage/v1/object/{bucket}/{path.lstrip('/')}"
+
+    # ------------------------------------------------------------------
+    # API de objetos (usada pelo JrvsTranslator e pelo JrvsDeltaSync)
+    # ------------------------------------------------------------------
+
+    def put_object(self, bucket: str, path: str, data: bytes) -> Optional[str]:
+        """Envia ``data`` para ``bucket/path`` (upsert).
+
+        Returns:
+            ETag remoto normalizado ("" se o servidor não devolver um), ou None
+            em caso de falha.
+        """
+        session = self._get_client()
+        if session is None:
+            return None
+        try:
+            response = session.post(
+                self._object_url(bucket, path),
+                data=data,
+                headers={"Content-Type": "application/octet-stream", "x-upsert": "true"},
+                timeout=self.timeout,
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f" [JrvsCloudStorage] Erro na requisição upload {path}: {e}")
+            return None
+        if response.status_code not in (200, 201):
+            logger.error(f" [JrvsCloudStorage] Upload falhou {path}: {response.status_code}")
+            return None
+        return normalize_etag(response.headers.get("ETag")) or ""
+
+    def get_object(self, bucket: str, path: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """Baixa ``bucket/path``; retorna ``(conteúdo, etag)`` ou None."""
+        session = self._get_client()
+        if session is None:
+            return None
+        try:
+            response = session.get(self._object_url(bucket, path), timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error(f" [JrvsCloudStorage] Erro na requisição download {path}: {e}")
+            return None
+        if response.status_code != 200:
+            logger.warning(f" [JrvsCloudStorage] Download falhou {path}: {response.status_code}")
+            return None
+        return response.content, normalize_etag(response.headers.get("ETag"))
+
+    def list_objects(
+        self, bucket: str, prefix: str = "", recursive: bool = True
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Lista objetos sob ``prefix`` (paginado; ``recursive`` desce nas pastas).
+
+        Returns:
+            Lista de ``{"name", "etag", "size"}`` com ``name`` relativo à raiz
+            do bucket, ou None se a listagem falhar.
+        """
+        session = self._get_client()
+        if session is None:
+            return None
+        url = f"{self.supabase_url}/storage/v1/object/list/{bucket}"
+        objects: List[Dict[str, Any]] = []
+        pending = [prefix.strip("/")]
+        try:
+            while pending:
+                folder = pending.pop()
+                offset = 0
+                while True:
+                    response = session.post(
+                        url,
+                        json={"prefix": folder, "limit": _LIST_PAGE_SIZE, "offset": offset},
+                        timeout=self.timeout,
+                    )
+                    if response.status_code != 200:
+                        logger.error(f" [JrvsCloudStorage] List falhou: {response.status_code}")
+                        return None
+                    page = response.json() or []
+                    for item in page:
+                        name = item.get("name", "")
+                        full = f"{folder}/{name}" if folder else name
+                        metadata = item.get("metadata")
+                        if item.get("id") is None and not metadata:
+                            if recursive:
+                                pending.append(full)  # "pasta" virtual
+                            continue
+                        metadata = metadata or {}
+                        objects.append({
+                            "name": full,
+                            "etag": normalize_etag(metadata.get("eTag")),
+                            "size": metadata.get("size"),
+                        })
+                    if len(page) < _LIST_PAGE_SIZE:
+                        break
+                    offset += _LIST_PAGE_SIZE
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f" [JrvsCloudStorage] Erro ao listar arquivos: {e}")
+            return None
+        return objects
+
+    def upload(self, bucket: str, path: str, data: bytes) -> Optional[str]:
+        """Envia um objeto; retorna ``path`` em caso de sucesso, senão None."""
+        return path if self.put_object(bucket, path, data) is not None else None
+
+    def download(self, bucket: str, path: str) -> Optional[bytes]:
+        """Baixa um objeto; retorna o conteúdo ou None."""
+        result = self.get_object(bucket, path)
+        return result[0] if result else None
+
+    def list(self, bucket: str, prefix: str = "") -> List[str]:
+        """Nomes dos objetos ``.jrvs`` sob ``prefix``."""
+        objects = self.list_objects(bucket, prefix) or []
+        return [o["name"] for o in objects if o["name"].endswith(".jrvs")]
+
+    def delete(self, bucket: str, path: str) -> bool:
+        """Remove um objeto do bucket."""
+        session = self._get_client()
+        if session is None:
+            return False
+        try:
+            response = session.delete(self._object_url(bucket, path), timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error(f" [JrvsCloudStorage] Erro ao remover {path}: {e}")
+            return False
+        return response.status_code in (200, 204)
+
+    def migrate_legacy_objects(self, bucket: str, scan_dir: Path) -> List[str]:
+        """Move objetos ``<dir>-x.jrvs`` (layout antigo) para ``<dir>/x.jrvs``.
+
+        Roda uma vez por processo para cada ``(bucket, dir)``: uma listagem da
+        raiz do bucket; só havendo nomes antigos o prefixo atual é listado e
+        cada objeto é copiado (se ainda não existir no layout novo) e removido.
+
+        Returns:
+            Chaves novas dos objetos migrados.
+        """
+        scan_dir = Path(scan_dir)
+        marker = (bucket, scan_dir.name)
+        with self._legacy_lock:
+            if marker in self._legacy_checked:
+                return []
+            root_objects = self.list_objects(bucket, "", recursive=False)
+            if root_objects is None:
+                return []  # tenta de novo na próxima ação
+            legacy = [
+                o["name"] for o in root_objects
+                if o["name"].startswith(f"{scan_dir.name}-") and o["name"].endswith(".jrvs")
+            ]
+            migrated: List[str] = []
+            current = {o["name"] for o in self.list_objects(bucket, scan_dir.name) or []} if legacy else set()
+            for name in legacy:
+                key = legacy_object_key(name, scan_dir.parent)
+                if key is None:
+                    continue
+                if key not in current:
+                    data = self.download(bucket, name)
+                    if data is None or self.upload(bucket, key, data) is None:
+                        logger.warning(f" [JrvsCloudStorage] Migração falhou: {name}")
+                        continue
+                if self.delete(bucket, name):
+                    migrated.append(key)
+            if migrated:
+                logger.info(f" [JrvsCloudStorage] {len(migrated)} objetos migrados do layout achatado")
+            self._legacy_checked.add(marker)
+            return migrated
+
+    # ------------------------------------------------------------------
+    # Ações do execute()
+    # ------------------------------------------------------------------
+
     def _upload_file(self, file_path: Optional[str] = None) -> List[str]:
         """
         Faz upload de um arquivo .jrvs específico ou de todos no diretório data.
@@ -96,31 +361,11 @@ class JrvsCloudStorage(NexusComponent):
             paths = list(data_dir.rglob("*.jrvs"))
 
         for path in paths:
-            try:
-                relative_path = path.as_posix()
-                cloud_path = relative_path.replace("/", "-")  # Normaliza para cloud
-
-                with open(path, "rb") as f:
-                    file_content = f.read()
-
-                # Supabase Storage API (upload)
-                url = f"{self.supabase_url}/storage/v1/object/{self.bucket}/{cloud_path}"
-                headers = self._get_headers()
-                headers["Content-Type"] = "application/octet-stream"
-
-                response = requests.put(url, headers=headers, data=file_content)
-
-                if response.status_code in (200, 201, 409):  # 409 = já existe
-                    uploaded.append(relative_path)
-                    logger.info(f" [JrvsCloudStorage] Upload: {relative_path}")
-                else:
-                    logger.error(f" [JrvsCloudStorage] Upload falhou {relative_path}: {response.status_code}")
-                    response.raise_for_status()
-
-            except requests.exceptions.RequestException as e:
-                if not (hasattr(e, 'response') and e.response is not None and e.response.status_code == 409):
-                    logger.error(f" [JrvsCloudStorage] Erro na requisição upload: {e}")
-                raise e
+            relative_path = object_key(path)
+            if self.upload(self.bucket, relative_path, path.read_bytes()) is None:
+                raise RuntimeError(f"Upload falhou: {relative_path}")
+            uploaded.append(relative_path)
+            logger.info(f" [JrvsCloudStorage] Upload: {relative_path}")
 
         return uploaded
 
@@ -131,75 +376,47 @@ class JrvsCloudStorage(NexusComponent):
         downloaded = []
 
         if file_path:
-            cloud_paths = [file_path.replace("/", "-")]
+            cloud_paths = [object_key(file_path)]
         else:
             # Lista todos os arquivos do bucket
             cloud_paths = self._list_files()
 
         for cloud_path in cloud_paths:
-            try:
-                # Converte de volta para path local
-                local_path = Path(cloud_path.replace("-", "/"))
-
-                url = f"{self.supabase_url}/storage/v1/object/{self.bucket}/{cloud_path}"
-                headers = self._get_headers()
-
-                response = requests.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    local_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(local_path, "wb") as f:
-                        f.write(response.content)
-                    downloaded.append(cloud_path)
-                    logger.info(f" [JrvsCloudStorage] Download: {cloud_path}")
-                else:
-                    logger.warning(f" [JrvsCloudStorage] Download falhou {cloud_path}: {response.status_code}")
-
-            except requests.exceptions.RequestException as e:
-                if not (hasattr(e, 'response') and e.response is not None and e.response.status_code == 404):
-                    logger.error(f" [JrvsCloudStorage] Erro na requisição download: {e}")
-                raise e
+            local_path = Path(cloud_path)
+            content = self.download(self.bucket, cloud_path)
+            if content is None:
+                continue
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            local_path.write_bytes(content)
+            downloaded.append(cloud_path)
+            logger.info(f" [JrvsCloudStorage] Download: {cloud_path}")
 
         return downloaded
 
     def _sync_all(self, data_dir: str = "data") -> Tuple[List[str], List[str]]:
         """
-        Sincronização bidirecional completa.
-        - Upload de arquivos locais que não existem na cloud
-        - Download de arquivos da cloud que não existem localmente
+        Sincronização bidirecional incremental de ``data_dir``.
+        - Upload apenas de arquivos cujo hash mudou desde a última sync
+        - Download de arquivos ausentes localmente ou alterados na cloud
         """
-        logger.info(f" [JrvsCloudStorage] Iniciando sync_all em {data_dir}")
-
-        # Upload phase
-        uploaded = self._upload_file()
+        from app.adapters.infrastructure.jrvs_delta_sync import JrvsDeltaSync
 
-        # Download phase
-        downloaded = self._download_file()
-
-        logger.info(f" [JrvsCloudStorage] Sync completo: {len(uploaded)} uploads, {len(downloaded)} downloads")
-        return uploaded, downloaded
+        logger.info(f" [JrvsCloudStorage] Iniciando sync_all em {data_dir}")
+        report = JrvsDeltaSync(self, self.bucket, max_workers=self.max_workers).sync(Path(data_dir))
+        if report.errors:
+            raise RuntimeError("; ".join(report.errors))
+        logger.info(
+            f" [JrvsCloudStorage] Sync completo: {len(report.uploaded)} uploads, "
+            f"{len(report.downloaded)} downloads, {report.unchanged} inalterados"
+        )
+        return report.uploaded, report.downloaded
 
     def _list_files(self) -> List[str]:
         """
         Lista todos os arquivos .jrvs no bucket cloud.
         """
-        try:
-            url = f"{self.supabase_url}/storage/v1/object/list/{self.bucket}"
-            headers = self._get_headers()
-            headers["Content-Type"] = "application/json"
-
-            response = requests.post(url, headers=headers, json={"limit": 1000})
-
-            if response.status_code == 200:
-                files = response.json()
-                return [f.get("name", "") for f in files if f.get("name", "").endswith(".jrvs")]
-            else:
-                logger.error(f" [JrvsCloudStorage] List falhou: {response.status_code}")
-                return []
-        except requests.exceptions.RequestException as e:
-            logger.error(f" [JrvsCloudStorage] Erro ao listar arquivos: {e}")
-            return []
+        return self.list(self.bucket)
 
     def is_available(self) -> bool:
         """Verifica se o armazenamento em nuvem está disponível."""
-        return self._enabled
\ No newline at end of file
+        return self._enabled
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Sincronização incremental de snapshots .jrvs com o Supabase Storage.
+
+Um manifesto persistido (``<dir>/.jrvs_sync_manifest``, codificado em JRVS)
+guarda, por caminho remoto, ``sha256``/``size``/``mtime_ns`` da última versão
+sincronizada e o ETag remoto correspondente. A cada sync:
+
+- arquivos locais com ``size``/``mtime_ns`` iguais ao manifesto não são nem
+  lidos; os demais são hasheados e só sobem se o hash mudou;
+- uma única listagem remota revela objetos ausentes localmente, alterados
+  por outra máquina (ETag diferente) ou removidos da cloud;
+- as transferências rodam num pool limitado de threads que compartilha a
+  sessão keep-alive do :class:`JrvsCloudStorage`.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.adapters.infrastructure.jrvs_cloud_storage import object_key
+from app.utils.jrvs_codec import JrvsDecodeError, read_file as jrvs_read, write_file as jrvs_write
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".jrvs_sync_manifest"
+_MANIFEST_VERSION = 1
+
+
+@dataclass
+class SyncReport:
+    """Resultado de uma sincronização incremental."""
+
+    uploaded: List[str] = field(default_factory=list)
+    downloaded: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    bytes_uploaded: int = 0
+    bytes_downloaded: int = 0
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class SyncManifest:
+    """Manifesto ``caminho remoto → {sha256, size, mtime_ns, etag}``."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = jrvs_read(self.path)
+        except (OSError, JrvsDecodeError) as exc:
+            logger.warning("[JrvsDeltaSync] Manifesto inválido (%s): %s — sync completa", self.path, exc)
+            return
+        if isinstance(payload, dict) and payload.get("version") == _MANIFEST_VERSION:
+            self.entries = dict(payload.get("entries") or {})
+
+    def get(self, remote: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(remote)
+
+    def update(self, remote: str, **fields: Any) -> None:
+        with self._lock:
+            entry = self.entries.setdefault(remote, {})
+            entry.update(fields)
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        with self._lock:
+            jrvs_write(self.path, {"version": _MANIFEST_VERSION, "entries": self.entries})
+            self._dirty = False
+
+
+class JrvsDeltaSync:
+    """Sincroniza um diretório de .jrvs transferindo apenas o que mudou.
+
+    Args:
+        cloud: Instância de ``JrvsCloudStorage`` (ou compatível com
+            ``put_object``/``get_object``/``list_objects``).
+        bucket: Bucket do Supabase Storage.
+        max_workers: Transferências simultâneas.
+        manifest_path: Caminho do manifesto (padrão: ``<dir>/.jrvs_sync_manifest``).
+    """
+
+    def __init__(
+        self,
+        cloud: Any,
+        bucket: str,
+        max_workers: int = 4,
+        manifest_path: Optional[Path] = None,
+    ) -> None:
+        self.cloud = cloud
+        self.bucket = bucket
+        self.max_workers = max(1, max_workers)
+        self.manifest_path = manifest_path
+
+    def sync(self, scan_dir: Path) -> SyncReport:
+        """Executa uma sincronização incremental de ``scan_dir``."""
+        scan_dir = Path(scan_dir)
+        report = SyncReport()
+        manifest = SyncManifest(self.manifest_path or scan_dir / MANIFEST_NAME)
+        prefix = scan_dir.name
+
+        migrate = getattr(self.cloud, "migrate_legacy_objects", None)
+        if migrate is not None:
+            migrate(self.bucket, scan_dir)
+
+        local: Dict[str, Path] = {}
+        if scan_dir.exists():
+            for jrvs_file in scan_dir.rglob("*.jrvs"):
+                local[object_key(jrvs_file.relative_to(scan_dir.parent))] = jrvs_file
+
+        to_upload: List[Tuple[str, Path, Optional[bytes]]] = []
+        unchanged: Dict[str, Path] = {}
+        for remote, path in sorted(local.items()):
+            try:
+                changed, raw = self._local_change(manifest, remote, path)
+            except OSError as exc:
+                report.errors.append(f"↑ {path}: {exc}")
+                continue
+            if changed:
+                to_upload.append((remote, path, raw))
+            else:
+                unchanged[remote] = path
+
+        to_download: List[Tuple[str, Path]] = []
+        remote_objects = self.cloud.list_objects(self.bucket, prefix)
+        if remote_objects is not None:
+            seen = set()
+            for obj in remote_objects:
+                remote = obj["name"]
+                if not remote.endswith(".jrvs"):
+                    continue
+                seen.add(remote)
+                entry = manifest.get(remote) or {}
+                etag = obj.get("etag")
+                if remote not in local:
+                    to_download.append((remote, scan_dir.parent / remote))
+                elif remote in unchanged and etag:
+                    if not entry.get("etag"):
+                        # Upload anterior sem ETag na resposta: adota o da listagem
+                        manifest.update(remote, etag=etag)
+                    elif entry["etag"] != etag:
+                        to_download.append((remote, unchanged.pop(remote)))
+            # Removidos da cloud (ou nunca enviados): reenvia
+            for remote in [r for r in unchanged if r not in seen]:
+                to_upload.append((remote, unchanged.pop(remote), None))
+        report.unchanged = len(unchanged)
+
+        if to_upload or to_download:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="jrvs-sync") as pool:
+                futures = [pool.submit(self._upload, manifest, r, p, raw) for r, p, raw in to_upload]
+                futures += [pool.submit(self._download, manifest, r, p) for r, p in to_download]
+                for future in futures:
+                    direction, name, size, error = future.result()
+                    if error:
+                        report.errors.append(f"{direction} {name}{error}")
+                    elif direction == "↑":
+                        report.uploaded.append(name)
+                        report.bytes_uploaded += size
+                    else:
+                        report.downloaded.append(name)
+                        report.bytes_downloaded += size
+
+        try:
+            manifest.save()
+        except OSError as exc:
+            logger.warning("[JrvsDeltaSync] Falha ao salvar manifesto: %s", exc)
+        logger.info(
+            "☁️  [JrvsDeltaSync] %s: %d↑ %d↓ %d inalterados, %d erros",
+            scan_dir, len(report.uploaded), len(report.downloaded), report.unchanged, len(report.errors),
+        )
+        return report
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _local_change(
+        manifest: SyncManifest, remote: str, path: Path
+    ) -> Tuple[bool, Optional[bytes]]:
+        """(mudou?, conteúdo lido) — sem ler o arquivo se stat bate com o manifesto."""
+        st = path.stat()
+        entry = manifest.get(remote)
+        if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            return False, None
+        raw = path.read_bytes()
+        digest = _sha256(raw)
+        if entry and entry.get("sha256") == digest:
+            manifest.update(remote, size=st.st_size, mtime_ns=st.st_mtime_ns)
+            return False, None
+        return True, raw
+
+    def _upload(
+        self, manifest: SyncManifest, remote: str, path: Path, raw: Optional[bytes]
+    ) -> Tuple[str, str, int, Optional[str]]:
+        try:
+            if raw is None:
+                raw = path.read_bytes()
+            st = path.stat()
+            etag = self.cloud.put_object(self.bucket, remote, raw)
+        except Exception as exc:
+            return "↑", str(path), 0, f": {exc}"
+        if etag is None:
+            return "↑", str(path), 0, " (upload falhou)"
+        manifest.update(
+            remote, sha256=_sha256(raw), size=st.st_size, mtime_ns=st.st_mtime_ns,
+            etag=etag or None, synced_at=time.time(),
+        )
+        logger.debug("☁️  [JrvsDeltaSync] Uploaded %s", remote)
+        return "↑", remote, len(raw), None
+
+    def _download(
+        self, manifest: SyncManifest, remote: str, local_path: Path
+    ) -> Tuple[str, str, int, Optional[str]]:
+        try:
+            result = self.cloud.get_object(self.bucket, remote)
+            if result is None:
+                return "↓", remote, 0, " (download falhou)"
+            raw, etag = result
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = local_path.with_name(local_path.name + ".tmp")
+            tmp.write_bytes(raw)
+            os.replace(tmp, local_path)
+            st = local_path.stat()
+        except Exception as exc:
+            return "↓", remote, 0, f": {exc}"
+        manifest.update(
+            remote, sha256=_sha256(raw), size=st.st_size, mtime_ns=st.st_mtime_ns,
+            etag=etag, synced_at=time.time(),
+        )
+        logger.info("☁️  [JrvsDeltaSync] Restored %s from cloud", remote)
+        return "↓", remote, len(raw), None
@@ -12,16 +12,29 @@ Architecture notes:
     - The adapter is intentionally side-effect free when ``dry_run=True``
       (the default in tests) to avoid requiring a real broker in CI.
     - Implements ``NexusComponent`` so it can be resolved via Nexus DI.
+    - Publishing is pipelined: ``publish_async`` returns a completion future
+      and up to ``max_in_flight`` messages await broker acknowledgement at
+      once, so a scene toggling N entities costs about one round-trip rather
+      than N.  ``publish`` keeps its blocking contract on top of it.
+    - The audit history is a ring buffer of the last ``audit_size`` messages.
 """
 
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
 from app.core.nexus import NexusComponent
 
 logger = logging.getLogger(__name__)
 
+# Expired mids remembered so their late acks can be dropped
+_EXPIRED_MIDS_LIMIT = 1024
+
 # ---------------------------------------------------------------------------
 # Optional paho-mqtt import
 # ---------------------------------------------------------------------------
@@ -60,6 +73,13 @@ class MqttHomeAdapter(NexusComponent):
         client_id: MQTT client identifier (default: ``"jarvis_c2"``).
         dry_run: When ``True`` (default when paho-mqtt is absent), commands
             are logged but not published.
+        max_in_flight: Messages allowed to await broker acknowledgement at
+            once; further publishes wait for a free slot.
+        audit_size: Number of published messages kept in the audit history.
+        publish_timeout: Seconds a message may stay unacknowledged before it
+            is reported as failed and its slot is reclaimed.
+        client: Pre-built paho-compatible client (e.g. a fake broker client
+            in tests).  Overrides ``dry_run``.
     """
 
     def __init__(
@@ -70,21 +90,42 @@ class MqttHomeAdapter(NexusComponent):
         password: Optional[str] = None,
         client_id: str = "jarvis_c2",
         dry_run: bool = False,
+        max_in_flight: int = 16,
+        audit_size: int = 1000,
+        publish_timeout: float = 10.0,
+        client: Any = None,
     ) -> None:
         self._host = host
         self._port = port
         self._client_id = client_id
-        self._dry_run = dry_run or not _MQTT_AVAILABLE
-        self._client: Any = None
+        self._dry_run = client is None and (dry_run or not _MQTT_AVAILABLE)
+        self._client: Any = client
         self._connected = False
-        self._published: List[Dict[str, Any]] = []  # audit log
+        self._published: Deque[Dict[str, Any]] = deque(maxlen=max(1, audit_size))  # audit log
+        self._max_in_flight = max(1, max_in_flight)
+        self._publish_timeout = publish_timeout
+        self._slots = threading.BoundedSemaphore(self._max_in_flight)
+        # Never held across client calls: paho fires on_publish while holding
+        # its own message mutex, which client.publish() also takes
+        self._lock = threading.Lock()
+        # mid -> (future, audit entry, deadline)
+        self._in_flight: Dict[int, Tuple[Future, Dict[str, Any], float]] = {}
+        # Acks that arrive while client.publish() calls are running, before
+        # the returned mid is registered; cleared once no publish is running
+        self._publishing = 0
+        self._early_acks: set = set()
+        # Mids failed by _expire_stale; a late ack for one of them is ignored
+        self._expired_mids: "OrderedDict[int, None]" = OrderedDict()
+        self._counters = {"published": 0, "failed": 0, "expired": 0, "late_acks": 0}
 
         if not self._dry_run:
-            self._client = mqtt.Client(client_id=client_id)
-            if username:
-                self._client.username_pw_set(username, password)
+            if self._client is None:
+                self._client = mqtt.Client(client_id=client_id)
+                if username:
+                    self._client.username_pw_set(username, password)
             self._client.on_connect = self._on_connect
             self._client.on_disconnect = self._on_disconnect
+            self._client.on_publish = self._on_publish
 
     # ------------------------------------------------------------------
     # NexusComponent interface
@@ -153,7 +194,7 @@ class MqttHomeAdapter(NexusComponent):
         retain: bool = False,
     ) -> Dict[str, Any]:
         """
-        Publish a message to an MQTT topic.
+        Publish a message to an MQTT topic and wait for the broker.
 
         Args:
             topic: MQTT topic string.
@@ -164,23 +205,100 @@ class MqttHomeAdapter(NexusComponent):
         Returns:
             Result dict with ``success``, ``topic``, and ``payload``.
         """
-        encoded = json.dumps(payload) if isinstance(payload, dict) else str(payload)
-        audit_entry = {"topic": topic, "payload": encoded, "qos": qos}
+        future = self.publish_async(topic, payload, qos=qos, retain=retain)
+        return self._result(future, self._audit_entry(topic, payload, qos))
+
+    def publish_async(
+        self,
+        topic: str,
+        payload: Any,
+        qos: int = 0,
+        retain: bool = False,
+    ) -> "Future[Dict[str, Any]]":
+        """
+        Publish without waiting for the broker acknowledgement.
+
+        Blocks only while ``max_in_flight`` messages are already pending.
+
+        Returns:
+            Future resolving to the same result dict as ``publish``.
+        """
+        audit_entry = self._audit_entry(topic, payload, qos)
+        future: Future = Future()
 
         if self._dry_run:
-            logger.info("📤 [MqttHome] dry-run PUBLISH → %s : %s", topic, encoded)
+            logger.info("📤 [MqttHome] dry-run PUBLISH → %s : %s", topic, audit_entry["payload"])
             self._published.append(audit_entry)
-            return {"success": True, "dry_run": True, **audit_entry}
+            future.set_result({"success": True, "dry_run": True, **audit_entry})
+            return future
 
+        if not self._acquire_slot():
+            return self._fail(future, audit_entry, "in-flight window full (broker not acknowledging)")
+        with self._lock:
+            self._publishing += 1
         try:
-            result = self._client.publish(topic, encoded, qos=qos, retain=retain)
-            result.wait_for_publish()
-            self._published.append(audit_entry)
-            logger.debug("📤 [MqttHome] PUBLISH → %s : %s (rc=%d)", topic, encoded, result.rc)
-            return {"success": result.rc == 0, **audit_entry, "rc": result.rc}
+            result = self._client.publish(topic, audit_entry["payload"], qos=qos, retain=retain)
         except Exception as exc:
+            self._end_publish()
+            self._slots.release()
             logger.error("❌ [MqttHome] Falha ao publicar em '%s': %s", topic, exc)
-            return {"success": False, "error": str(exc), **audit_entry}
+            return self._fail(future, audit_entry, str(exc))
+        if result.rc != 0:
+            self._end_publish()
+            self._slots.release()
+            return self._fail(future, audit_entry, f"publish rc={result.rc}", rc=result.rc)
+        with self._lock:
+            self._expired_mids.pop(result.mid, None)  # paho recycled the mid
+            self._in_flight[result.mid] = (future, audit_entry, time.monotonic() + self._publish_timeout)
+            acked = result.mid in self._early_acks
+            self._early_acks.discard(result.mid)
+            self._end_publish_locked()
+        if acked:
+            self._complete(result.mid)
+        return future
+
+    def publish_many(
+        self,
+        messages: Iterable[Union[Tuple[str, Any], Mapping[str, Any]]],
+        qos: int = 0,
+        retain: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Publish several messages pipelined through the in-flight window.
+
+        Args:
+            messages: ``(topic, payload)`` tuples or dicts with ``topic``,
+                ``payload`` and optional ``qos``/``retain``.
+
+        Returns:
+            One result dict per message, in input order.
+        """
+        pending = []
+        for message in messages:
+            if isinstance(message, Mapping):
+                topic, payload = message["topic"], message.get("payload", "")
+                msg_qos, msg_retain = int(message.get("qos", qos)), bool(message.get("retain", retain))
+            else:
+                (topic, payload), msg_qos, msg_retain = message, qos, retain
+            entry = self._audit_entry(topic, payload, msg_qos)
+            pending.append((self.publish_async(topic, payload, qos=msg_qos, retain=msg_retain), entry))
+        return [self._result(future, entry) for future, entry in pending]
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every in-flight message is acknowledged (or expired)."""
+        deadline = time.monotonic() + (self._publish_timeout if timeout is None else timeout)
+        while True:
+            with self._lock:
+                futures = [future for future, _, _ in self._in_flight.values()]
+            if not futures:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                futures[0].result(timeout=min(remaining, 0.1))
+            except FutureTimeoutError:
+                self._expire_stale()
 
     def subscribe(self, topic: str, callback: Any, qos: int = 0) -> bool:
         """
@@ -240,6 +358,34 @@ class MqttHomeAdapter(NexusComponent):
         topic = f"homeassistant/{domain}/{entity_id}/set"
         return self.publish(topic, command)
 
+    def ha_switch_many(self, states: Mapping[str, str]) -> List[Dict[str, Any]]:
+        """
+        Toggle several Home Assistant switches in one pipelined batch.
+
+        Args:
+            states: ``{entity_id: "ON" | "OFF"}``.
+
+        Returns:
+            One ``publish`` result per entity, in mapping order.
+        """
+        return self.publish_many(
+            (f"homeassistant/switch/{entity_id}/set", state.upper()) for entity_id, state in states.items()
+        )
+
+    def ha_scene(self, commands: Sequence[Tuple[str, str, str]]) -> Dict[str, Any]:
+        """
+        Apply a scene: many ``(domain, entity_id, command)`` in one batch.
+
+        Returns:
+            ``success`` (all acknowledged), per-entity ``results`` and the
+            list of ``failed`` topics.
+        """
+        results = self.publish_many(
+            (f"homeassistant/{domain}/{entity_id}/set", command) for domain, entity_id, command in commands
+        )
+        failed = [r["topic"] for r in results if not r.get("success")]
+        return {"success": not failed, "results": results, "failed": failed}
+
     # ------------------------------------------------------------------
     # Audit / diagnostics
     # ------------------------------------------------------------------
@@ -254,6 +400,97 @@ class MqttHomeAdapter(NexusComponent):
         """Return True if the adapter is connected to a broker."""
         return self._connected
 
+    def stats(self) -> Dict[str, Any]:
+        """Publishing counters and the current in-flight window usage."""
+        with self._lock:
+            in_flight = len(self._in_flight)
+        return {
+            **self._counters,
+            "in_flight": in_flight,
+            "max_in_flight": self._max_in_flight,
+            "audit_size": len(self._published),
+        }
+
+    # ------------------------------------------------------------------
+    # In-flight window
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _audit_entry(topic: str, payload: Any, qos: int) -> Dict[str, Any]:
+        encoded = json.dumps(payload) if isinstance(payload, dict) else str(payload)
+        return {"topic": topic, "payload": encoded, "qos": qos}
+
+    def _result(self, future: Future, audit_entry: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return future.result(timeout=self._publish_timeout)
+        except FutureTimeoutError:
+            self._expire_stale()
+            if future.done():
+                return future.result()
+            return {"success": False, "error": "publish not acknowledged in time", **audit_entry}
+
+    def _acquire_slot(self) -> bool:
+        deadline = time.monotonic() + self._publish_timeout
+        while not self._slots.acquire(timeout=min(0.5, self._publish_timeout)):
+            # Messages unacknowledged past their deadline give their slots back
+            self._expire_stale()
+            if time.monotonic() >= deadline:
+                return False
+        return True
+
+    def _fail(self, future: Future, audit_entry: Dict[str, Any], error: str, **extra: Any) -> Future:
+        with self._lock:
+            self._counters["failed"] += 1
+        logger.error("❌ [MqttHome] Falha ao publicar em '%s': %s", audit_entry["topic"], error)
+        future.set_result({"success": False, "error": error, **audit_entry, **extra})
+        return future
+
+    def _end_publish(self) -> None:
+        with self._lock:
+            self._end_publish_locked()
+
+    def _end_publish_locked(self) -> None:
+        self._publishing -= 1
+        if not self._publishing:
+            # Every mid returned by publish() is registered by now
+            self._early_acks.clear()
+
+    def _complete(self, mid: int) -> None:
+        with self._lock:
+            pending = self._in_flight.pop(mid, None)
+            if pending is None:
+                if mid in self._expired_mids:
+                    del self._expired_mids[mid]
+                    self._counters["late_acks"] += 1
+                    logger.debug("📤 [MqttHome] Ack tardio ignorado (mid=%d já expirado).", mid)
+                elif self._publishing:
+                    # Ack that beat publish() back to its caller (synchronous
+                    # clients, or paho's network thread); claimed on registration
+                    self._early_acks.add(mid)
+                else:
+                    logger.debug("📤 [MqttHome] Ack para mid desconhecido ignorado (mid=%d).", mid)
+                return
+            self._counters["published"] += 1
+            self._published.append(pending[1])
+        self._slots.release()
+        future, audit_entry, _ = pending
+        logger.debug("📤 [MqttHome] PUBLISH → %s : %s (mid=%d)", audit_entry["topic"], audit_entry["payload"], mid)
+        future.set_result({"success": True, **audit_entry, "rc": 0, "mid": mid})
+
+    def _expire_stale(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [mid for mid, (_, _, deadline) in self._in_flight.items() if deadline <= now]
+            entries = [self._in_flight.pop(mid) for mid in expired]
+            self._counters["expired"] += len(entries)
+            for mid in expired:
+                self._expired_mids[mid] = None
+            while len(self._expired_mids) > _EXPIRED_MIDS_LIMIT:
+                self._expired_mids.popitem(last=False)
+        for future, audit_entry, _ in entries:
+            self._slots.release()
+            future.set_result({"success": False, "error": "publish not acknowledged in time", **audit_entry})
+
     # ------------------------------------------------------------------
     # Internal callbacks
     # ------------------------------------------------------------------
@@ -265,6 +502,10 @@ class MqttHomeAdapter(NexusComponent):
         else:
             logger.warning("⚠️ [MqttHome] Conexão recusada pelo broker (rc=%d).", rc)
 
+    def _on_publish(self, client: Any, userdata: Any, mid: int, *args: Any) -> None:
+        # paho v1: (client, userdata, mid); v2 adds reason_code and properties
+        self._complete(mid)
+
     def _on_disconnect(self, client: Any, userdata: Any, rc: int) -> None:
         self._connected = False
         if rc != 0:
@@ -4,19 +4,44 @@
 Implementa a mesma interface do GeminiAdapter e GroqAdapter.
 Conecta-se ao endpoint local do Ollama (padrão: http://localhost:11434).
 Configurável via variável de ambiente OLLAMA_BASE_URL.
+
+As gerações usam um ``httpx.Client`` sobre o pool ``ollama`` do
+``http_transport`` (keep-alive, tamanho via OLLAMA_POOL_SIZE). ``stream_generate`` entrega os
+tokens à medida que chegam (NDJSON do /api/generate) e mede tempo até o
+primeiro token e tokens/s; interromper a iteração fecha a conexão, o que
+cancela a geração no servidor.
 """
 import json
 import logging
 import os
-import urllib.request
-from typing import Any, Optional
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Iterator, Optional
 
 from app.core.nexus import NexusComponent
+from app.adapters.infrastructure.http_transport import get_http_transport
 
 logger = logging.getLogger(__name__)
 
 _DEFAULT_BASE_URL = "http://localhost:11434"
 _DEFAULT_MODEL = "qwen2.5-coder:14b"
+_DEFAULT_POOL_SIZE = 4
+_READ_TIMEOUT = 120.0
+
+
+@dataclass
+class GenerationStats:
+    """Métricas de uma geração (tempos em segundos)."""
+
+    model: str
+    time_to_first_token: Optional[float] = None
+    total_time: float = 0.0
+    tokens: int = 0
+    tokens_per_second: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    done: bool = False
+    cancelled: bool = False
 
 
 class OllamaAdapter(NexusComponent):
@@ -24,8 +49,12 @@ class OllamaAdapter(NexusComponent):
 
     Métodos principais:
         execute(context) — interface NexusComponent padrão.
+        stream_generate(prompt) — itera os tokens conforme são gerados.
         is_available()   — verifica se o modelo configurado está disponível.
         list_local_models() — retorna lista de modelos instalados.
+        close()          — encerra o pool de conexões.
+
+    ``last_stats`` guarda as :class:`GenerationStats` da última geração.
     """
 
     def __init__(
@@ -34,12 +63,17 @@ class OllamaAdapter(NexusComponent):
         base_url: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 2048,
+        pool_size: Optional[int] = None,
     ) -> None:
         self.model = model
         self.base_url = (base_url or os.getenv("OLLAMA_BASE_URL") or _DEFAULT_BASE_URL).rstrip("/")
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.pool_size = max(1, pool_size or int(os.getenv("OLLAMA_POOL_SIZE", str(_DEFAULT_POOL_SIZE))))
         self._available: Optional[bool] = None
+        self._client: Any = None
+        self._client_lock = threading.Lock()
+        self.last_stats: Optional[GenerationStats] = None
 
     def configure(self, config: dict) -> None:
         """Suporte ao ciclo configure() do NexusComponent."""
@@ -48,6 +82,7 @@ class OllamaAdapter(NexusComponent):
         self.max_tokens = int(config.get("max_tokens", self.max_tokens))
         if "base_url" in config:
             self.base_url = config["base_url"].rstrip("/")
+            self.close()  # o pool aponta para o endereço antigo
         self._available = None  # reset cache
 
     def execute(self, context: dict) -> dict:
@@ -68,6 +103,7 @@ class OllamaAdapter(NexusComponent):
         model = context.get("model", self.model)
         temperature = float(context.get("temperature", self.temperature))
         max_tokens = int(context.get("max_tokens", self.max_tokens))
+        self.last_stats = None
         try:
             response = self._generate(
                 prompt,
@@ -77,11 +113,74 @@ class OllamaAdapter(NexusComponent):
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
-            return {"success": True, "response": response, "provider": "ollama", "model": model}
+            result = {"success": True, "response": response, "provider": "ollama", "model": model}
+            if self.last_stats is not None:
+                result["stats"] = asdict(self.last_stats)
+            return result
         except Exception as exc:
             logger.warning("OllamaAdapter falhou: %s", exc)
             return {"success": False, "error": str(exc), "provider": "ollama"}
 
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    def stream_generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        json_mode: bool = False,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Gera texto via /api/generate com stream=true, produzindo cada token.
+
+        Parar de iterar (``break`` ou ``close()`` no gerador) fecha a resposta
+        HTTP e a conexão — o Ollama aborta a geração ao perceber o cliente
+        desconectado. As métricas ficam em ``self.last_stats`` ao final.
+        """
+        payload = self._payload(
+            prompt,
+            model=model or self.model,
+            stream=True,
+            json_mode=json_mode,
+            system=system,
+            temperature=self.temperature if temperature is None else temperature,
+            max_tokens=self.max_tokens if max_tokens is None else max_tokens,
+        )
+        stats = GenerationStats(model=payload["model"])
+        self.last_stats = stats
+        start = time.perf_counter()
+        first: Optional[float] = None
+        final: dict[str, Any] = {}
+        try:
+            with self._get_client().stream("POST", "/api/generate", json=payload) as resp:
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(f"Ollama: {chunk['error']}")
+                    token = chunk.get("response", "")
+                    if token:
+                        if first is None:
+                            first = time.perf_counter()
+                            stats.time_to_first_token = first - start
+                        stats.tokens += 1
+                        yield token
+                    if chunk.get("done"):
+                        # Sem break: consumir até o fim devolve a conexão ao pool
+                        final = chunk
+                        stats.done = True
+        except GeneratorExit:
+            stats.cancelled = True
+            logger.debug("[OllamaAdapter] Stream cancelado pelo consumidor após %d tokens", stats.tokens)
+            raise
+        finally:
+            self._finish_stats(stats, start, first, final)
+
     # ------------------------------------------------------------------
     # Availability check
     # ------------------------------------------------------------------
@@ -113,11 +212,41 @@ class OllamaAdapter(NexusComponent):
         temperature: float = 0.7,
         max_tokens: int = 2048,
     ) -> str:
-        """Chama /api/generate com stream=false."""
+        """Chama /api/generate com stream=false pelo cliente keep-alive."""
+        payload = self._payload(
+            prompt,
+            model=model,
+            stream=False,
+            json_mode=json_mode,
+            system=system,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        stats = GenerationStats(model=model)
+        self.last_stats = stats
+        start = time.perf_counter()
+        resp = self._get_client().post("/api/generate", json=payload)
+        resp.raise_for_status()
+        result = resp.json()
+        text = result.get("response", "")
+        stats.done = bool(result.get("done", True))
+        self._finish_stats(stats, start, None, result)
+        return text
+
+    @staticmethod
+    def _payload(
+        prompt: str,
+        model: str,
+        stream: bool,
+        json_mode: bool,
+        system: Optional[str],
+        temperature: float,
+        max_tokens: int,
+    ) -> dict[str, Any]:
         payload: dict[str, Any] = {
             "model": model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens,
@@ -127,17 +256,44 @@ class OllamaAdapter(NexusComponent):
             payload["system"] = system
         if json_mode:
             payload["format"] = "json"
+        return payload
 
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            f"{self.base_url}/api/generate",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
-        return result.get("response", "")
+    @staticmethod
+    def _finish_stats(
+        stats: GenerationStats, start: float, first: Optional[float], final: dict[str, Any]
+    ) -> None:
+        """Fecha as métricas; prefere contadores do servidor (eval_count/eval_duration)."""
+        end = time.perf_counter()
+        stats.total_time = end - start
+        if final.get("eval_count"):
+            stats.tokens = int(final["eval_count"])
+        if final.get("prompt_eval_count") is not None:
+            stats.prompt_tokens = int(final["prompt_eval_count"])
+        if final.get("eval_count") and final.get("eval_duration"):
+            stats.tokens_per_second = final["eval_count"] / (final["eval_duration"] / 1e9)
+        elif first is not None and stats.tokens > 1 and end > first:
+            # Intervalo entre o primeiro e o último token
+            stats.tokens_per_second = (stats.tokens - 1) / (end - first)
+
+    def _get_client(self) -> Any:
+        """``httpx.Client`` do adapter sobre o pool ``ollama`` (até ``pool_size`` conexões)."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = get_http_transport().client(
+                        pool="ollama",
+                        pool_size=self.pool_size,
+                        read_timeout=_READ_TIMEOUT,
+                        base_url=self.base_url,
+                    )
+        return self._client
+
+    def close(self) -> None:
+        """Descarta o cliente (recriado sob demanda; o pool compartilhado continua)."""
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
 
     # Backward-compatible alias used by existing code / tests
     def _chat(
@@ -158,7 +314,8 @@ class OllamaAdapter(NexusComponent):
     def list_local_models(self) -> list[str]:
         """Retorna os nomes dos modelos instalados no Ollama."""
         try:
-            with urllib.request.urlopen(f"{self.base_url}/api/tags", timeout=5) as resp:
-                return [m["name"] for m in json.loads(resp.read())["models"]]
+            resp = self._get_client().get("/api/tags", timeout=5)
+            resp.raise_for_status()
+            return [m["name"] for m in resp.json()["models"]]
         except Exception:
             return []
@@ -24,6 +24,7 @@ from typing import Any, Dict, Optional
 
 import httpx
 
+from app.adapters.infrastructure.http_transport import get_http_transport
 from app.application.ports.osint_provider import OsintProvider
 from app.application.privacy.pii_redactor import PiiRedactor
 from app.application.security.capability_authorizer import CapabilityAuthorizer
@@ -152,7 +153,7 @@ class EagleOsintAdapter(OsintProvider, NexusComponent):
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
         try:
-            with httpx.Client(timeout=30) as client:
+            with get_http_transport().client(pool="eagle", read_timeout=30) as client:
                 response = client.post(
                     f"{_EAGLE_BASE_URL}/search",
                     headers=headers,
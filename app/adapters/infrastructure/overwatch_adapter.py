@@ -10,6 +10,7 @@ import subprocess
 from typing import Optional, Set, Any, Dict
 
 from app.core.nexus import nexus, NexusComponent
+from app.utils.daemon_lease import claim_daemon
 from .overwatch_resource_monitor import ResourceMonitor
 from .overwatch_perimeter import PerimeterMonitor
 from .overwatch_inactivity import InactivityMonitor
@@ -69,6 +70,9 @@ class OverwatchDaemon(ResourceMonitor, PerimeterMonitor, NexusComponent):
     def start(self) -> None:
         if self._running:
             return
+        if not claim_daemon("overwatch"):
+            logger.info("[Overwatch] Daemon ativo em outro worker.")
+            return
         self._running = True
         self._thread = threading.Thread(
             target=self._run_loop, daemon=True, name="OverwatchDaemon"
@@ -5,6 +5,7 @@ import threading
 import time
 from typing import Optional
 from app.core.nexus import nexus, NexusComponent
+from app.utils.daemon_lease import claim_daemon
 from app.adapters.infrastructure.overwatch_resource_monitor import ResourceMonitor
 from app.adapters.infrastructure.overwatch_perimeter import PerimeterMonitor
 from app.adapters.infrastructure.overwatch_context import ContextMonitor
@@ -25,6 +26,9 @@ class OverwatchDaemon(NexusComponent, ResourceMonitor, PerimeterMonitor, Context
         """Inicia daemon em thread separada."""
         if self._running:
             return
+        if not claim_daemon("overwatch"):
+            logger.info("[Overwatch] Daemon ativo em outro worker.")
+            return
         self._running = True
         self._thread = threading.Thread(
             target=self._run_loop, daemon=True, name="OverwatchDaemon"
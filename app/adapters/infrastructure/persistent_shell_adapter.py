@@ -1,137 +1,378 @@
 # -*- coding: utf-8 -*-
 """PersistentShellAdapter — Terminal persistente com PTY (Devin-style).
 
-Usa pseudo-terminal para manter bash vivo durante a sessão.
-Detecta fim da execução via token de sincronia.
+Mantém um pool de N shells bash vivos, cada um em seu próprio pseudo-terminal.
+Cada chamada faz checkout de uma sessão, executa e devolve ao pool, de modo que
+chamadores concorrentes não serializam numa única shell.
+Detecta fim da execução via token de sincronia único por comando.
 """
+import codecs
 import subprocess
 import os
+import queue
 import select
+import threading
 import time
+import uuid
 import logging
-from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Generator, Iterator, Optional
 from app.core.nexus import NexusComponent
 
 logger = logging.getLogger(__name__)
 
+try:
+    import termios
+except ImportError:  # Windows
+    termios = None
+
+_READ_SIZE = 65536
+_SELECT_INTERVAL = 0.1
+
+
+def _read_proc_cpu(pid: int) -> Optional[float]:
+    """CPU acumulado (user+sys) da shell e dos filhos já colhidos, em segundos.
+
+    Lê /proc/<pid>/stat (Linux). Retorna None quando indisponível.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            raw = f.read().decode(errors="ignore")
+        fields = raw[raw.rindex(")") + 2:].split()
+        # utime, stime, cutime, cstime → campos 14..17 (índices 11..14 após o comm)
+        ticks = sum(int(v) for v in fields[11:15])
+        return ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _PtySession:
+    """Uma shell bash isolada ligada a um PTY."""
+
+    def __init__(self, env: Optional[Dict[str, str]] = None):
+        self.master_fd, slave_fd = os.openpty()
+        if termios is not None:
+            # Sem eco: o comando digitado não reaparece no output
+            attrs = termios.tcgetattr(slave_fd)
+            attrs[3] &= ~termios.ECHO
+            termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+        self.process = subprocess.Popen(
+            ['/bin/bash', '--noediting'],
+            stdin=slave_fd,
+            stdout=slave_fd,
+            stderr=slave_fd,
+            preexec_fn=os.setsid,
+            env=env if env is not None else os.environ,
+        )
+        os.close(slave_fd)
+        # Os chunks são cortados em fronteiras arbitrárias de bytes: o decoder
+        # incremental guarda um caractere UTF-8 incompleto até o próximo chunk
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        # Sem readline (--noediting) e com PS1/PS2 vazios não há prompts no
+        # output; o que o rc imprimir é drenado aqui, não no primeiro comando
+        try:
+            for _ in self.run("export PS1='' PS2='' PROMPT_COMMAND=''", timeout=10):
+                pass
+        except Exception:
+            self.close()
+            raise
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self) -> None:
+        try:
+            os.killpg(os.getpgid(self.process.pid), 9)
+        except (OSError, ProcessLookupError):
+            pass
+        try:
+            os.close(self.master_fd)
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except Exception:
+            pass
+
+    def run(self, command: str, timeout: float) -> Generator[str, None, Dict[str, Any]]:
+        """Executa ``command`` e emite chunks de output à medida que chegam.
+
+        O valor de retorno do gerador (``StopIteration.value``) é o dict de
+        resultado com returncode, wall_time e cpu_time.
+        """
+        token = uuid.uuid4().hex
+        marker = f"__JARVIS_{token}__".encode()
+        # As aspas partem o marcador no texto digitado; só o echo o reconstitui
+        full_command = (
+            f"{command}\n"
+            f"__jarvis_rc=$?; echo \"\"; echo \"__JARVIS_\"\"{token}__:$__jarvis_rc\"\n"
+        )
+
+        self._decoder.reset()
+        cpu_before = _read_proc_cpu(self.process.pid)
+        start = time.monotonic()
+        os.write(self.master_fd, full_command.encode())
+
+        buf = bytearray()
+        emitted = 0      # bytes de buf já entregues ao chamador
+        scan_from = 0    # onde a próxima busca pelo marcador começa
+        marker_at = -1
+        keep = len(marker) - 1
+
+        while True:
+            remaining = timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                raise TimeoutError(f"Timeout após {timeout}s")
+            r, _, _ = select.select([self.master_fd], [], [], min(_SELECT_INTERVAL, remaining))
+            if not r:
+                if not self.is_alive():
+                    raise OSError("Shell encerrou durante a execução")
+                continue
+            data = os.read(self.master_fd, _READ_SIZE)
+            if not data:
+                raise OSError("PTY fechado")
+            buf += data
+
+            if marker_at < 0:
+                marker_at = buf.find(marker, scan_from)
+                if marker_at < 0:
+                    scan_from = max(0, len(buf) - keep)
+                    # Entrega tudo que não pode ser prefixo do marcador
+                    safe = scan_from
+                    if safe > emitted:
+                        text = self._decoder.decode(bytes(buf[emitted:safe]))
+                        if text:
+                            yield text
+                        emitted = safe
+                    continue
+            # Marcador visto: aguarda a linha completa com o exit code
+            eol = buf.find(b"\n", marker_at)
+            if eol >= 0:
+                break
+
+        # O "echo" vazio antes do marcador garante que ele comece numa linha nova
+        body_end = marker_at
+        if buf[:body_end].endswith(b"\r\n"):
+            body_end -= 2
+        elif buf[:body_end].endswith(b"\n"):
+            body_end -= 1
+        text = self._decoder.decode(bytes(buf[emitted:body_end]) if body_end > emitted else b"", final=True)
+        if text:
+            yield text
+
+        tail = buf[marker_at + len(marker):eol].decode(errors="ignore").strip()
+        try:
+            returncode = int(tail.lstrip(":"))
+        except ValueError:
+            returncode = None
+
+        wall_time = time.monotonic() - start
+        cpu_after = _read_proc_cpu(self.process.pid)
+        cpu_time = (
+            cpu_after - cpu_before
+            if cpu_before is not None and cpu_after is not None else None
+        )
+        output = buf[:body_end].decode(errors="replace").replace("\r\n", "\n").strip()
+        return {
+            "success": returncode == 0,
+            "output": output,
+            "command": command,
+            "returncode": returncode,
+            "wall_time": round(wall_time, 4),
+            "cpu_time": round(cpu_time, 4) if cpu_time is not None else None,
+        }
+
+
+class _ShellPool:
+    """Pool de sessões PTY com checkout/retorno.
+
+    Sessões são criadas sob demanda até ``size``. Sessões que falham ou
+    estouram o timeout são descartadas (ainda podem ter um comando rodando)
+    e substituídas no próximo checkout.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle: "queue.LifoQueue[_PtySession]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self, timeout: float) -> _PtySession:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return _PtySession()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Nenhuma shell livre após {timeout}s")
+
+    def _discard(self, session: _PtySession) -> None:
+        session.close()
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def checkout(self, timeout: float) -> Iterator[_PtySession]:
+        session = self._acquire(timeout)
+        if not session.is_alive():
+            self._discard(session)
+            session = self._acquire(timeout)
+        healthy = False
+        try:
+            yield session
+            healthy = session.is_alive()
+        finally:
+            if healthy:
+                self._idle.put(session)
+            else:
+                self._discard(session)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize()}
+
 
 class PersistentShellAdapter(NexusComponent):
-    """Adapter para terminal persistente com PTY."""
-    
+    """Adapter para terminal persistente com pool de PTYs."""
+
     def __init__(self):
         super().__init__()
-        self._master_fd = None
-        self._process = None
-        self._delimiter = "---JARVIS_CMD_FINISH---"
         self._initialized = False
         self._timeout = int(os.getenv("SHELL_TIMEOUT", "30"))
-    
+        self._pool_size = int(os.getenv("SHELL_POOL_SIZE", "4"))
+        self._pool: Optional[_ShellPool] = None
+
     def configure(self, config: Optional[Dict[str, Any]] = None) -> None:
-        """Configura timeout via Pipeline YAML."""
+        """Configura timeout e tamanho do pool via Pipeline YAML."""
         if config:
             self._timeout = config.get("timeout", self._timeout)
-    
+            pool_size = config.get("pool_size")
+            if pool_size and self._pool is None:
+                self._pool_size = int(pool_size)
+
     def _initialize_shell(self) -> bool:
-        """Inicia bash persistente com PTY."""
+        """Prepara o pool de shells (as sessões nascem sob demanda)."""
         if self._initialized:
             return True
-        
+
         try:
             # Linux/Mac: usa PTY
             if os.name != "nt":
-                self._master_fd, slave_fd = os.openpty()
-                self._process = subprocess.Popen(
-                    ['/bin/bash'],
-                    stdin=slave_fd,
-                    stdout=slave_fd,
-                    stderr=slave_fd,
-                    preexec_fn=os.setsid,
-                    env=os.environ
-                )
-                os.close(slave_fd)
+                self._pool = _ShellPool(self._pool_size)
                 self._initialized = True
-                logger.info("[PersistentShell] Bash iniciado com PTY")
+                logger.info(f"[PersistentShell] Pool PTY pronto (até {self._pool_size} shells)")
                 return True
             else:
                 # Windows: fallback para subprocess normal
                 logger.warning("[PersistentShell] Windows detectado — usando subprocess")
                 self._initialized = True
                 return True
-                
+
         except Exception as e:
             logger.error(f"[PersistentShell] Erro ao inicializar: {e}")
             return False
-    
+
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """NexusComponent entry-point."""
+        """NexusComponent entry-point.
+
+        Aceita ``on_chunk`` (callable) no contexto para receber o output
+        incrementalmente enquanto o comando roda.
+        """
         config = context.get("current_config", {}) or context.get("config", {})
         command = config.get("command") or context.get("command", "")
         timeout = config.get("timeout", self._timeout)
-        
+        on_chunk = context.get("on_chunk")
+
         if not command:
             return {"success": False, "error": "Nenhum comando fornecido"}
-        
+
         if not self._initialized:
             if not self._initialize_shell():
                 return {"success": False, "error": "Falha ao inicializar shell"}
-        
+
         # Windows fallback
         if os.name == "nt":
             return self._execute_windows(command, timeout)
-        
+
         # Linux/Mac com PTY
-        return self._execute_pty(command, timeout)
-    
-    def _execute_pty(self, command: str, timeout: int) -> Dict[str, Any]:
-        """Executa comando via PTY com delimiter."""
-        full_command = f"{command}; echo '{self._delimiter}'\n"
-        
+        return self._execute_pty(command, timeout, on_chunk)
+
+    def stream(self, command: str, timeout: Optional[float] = None) -> Generator[str, None, Dict[str, Any]]:
+        """Executa ``command`` emitindo chunks de output conforme chegam.
+
+        O dict de resultado (o mesmo de ``execute``) é o valor de retorno do
+        gerador, acessível via ``result = yield from adapter.stream(cmd)``.
+        """
+        timeout = timeout or self._timeout
+        if not self._initialized and not self._initialize_shell():
+            return {"success": False, "error": "Falha ao inicializar shell"}
+        if os.name == "nt":
+            result = self._execute_windows(command, timeout)
+            if result.get("output"):
+                yield result["output"]
+            return result
+
+        start = time.monotonic()
         try:
-            os.write(self._master_fd, full_command.encode())
-        except Exception as e:
-            # Shell morreu — reinicializa
-            logger.warning("[PersistentShell] Shell morto — reinicializando")
-            self._initialized = False
-            self._initialize_shell()
-            return {"success": False, "error": f"Shell reinicializado: {e}"}
-        
-        output = ""
-        start_time = time.time()
-        
-        while True:
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
-                logger.warning(f"[PersistentShell] Timeout após {timeout}s")
-                return {
-                    "success": False,
-                    "output": output,
-                    "error": f"Timeout após {timeout}s",
-                    "timeout": True
-                }
-            
-            try:
-                r, _, _ = select.select([self._master_fd], [], [], 0.1)
-                if self._master_fd in r:
-                    data = os.read(self._master_fd, 4096).decode(errors='ignore')
-                    output += data
-                    
-                    if self._delimiter in output:
-                        # Limpa output
-                        clean = output.replace(full_command.strip(), "")
-                        clean = clean.replace(self._delimiter, "").strip()
-                        logger.info(f"[PersistentShell] Comando executado: {command[:50]}...")
-                        
-                        return {"success": True, "output": clean, "command": command}
-            except OSError as e:
-                logger.error(f"[PersistentShell] Erro de leitura: {e}")
-                return {"success": False, "error": str(e)}
-            
-            time.sleep(0.05)
-        
-        return {"success": False, "error": "Loop encerrou sem output"}
-    
+            with self._pool.checkout(timeout) as session:
+                result = yield from session.run(command, timeout)
+        except TimeoutError as e:
+            logger.warning(f"[PersistentShell] {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "timeout": True,
+                "command": command,
+                "wall_time": round(time.monotonic() - start, 4),
+            }
+        except OSError as e:
+            # Shell morreu — o pool descarta a sessão e cria outra no próximo checkout
+            logger.warning(f"[PersistentShell] Shell morto — será substituído: {e}")
+            return {"success": False, "error": f"Shell reinicializado: {e}", "command": command}
+        logger.info(
+            f"[PersistentShell] Comando executado em {result['wall_time']}s: {command[:50]}..."
+        )
+        return result
+
+    def _execute_pty(
+        self, command: str, timeout: int, on_chunk: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Executa comando numa sessão do pool e agrega o output."""
+        gen = self.stream(command, timeout)
+        chunks = []
+        try:
+            while True:
+                chunk = next(gen)
+                chunks.append(chunk)
+                if on_chunk is not None:
+                    on_chunk(chunk)
+        except StopIteration as stop:
+            result = stop.value or {"success": False, "error": "Loop encerrou sem output"}
+        if "output" not in result and chunks:
+            result["output"] = "".join(chunks).replace("\r\n", "\n")
+        return result
+
     def _execute_windows(self, command: str, timeout: int) -> Dict[str, Any]:
         """Fallback para Windows (sem PTY)."""
+        start = time.monotonic()
         try:
             result = subprocess.run(
                 command,
@@ -147,13 +388,26 @@ class PersistentShellAdapter(NexusComponent):
                 "success": result.returncode == 0,
                 "output": output,
                 "command": command,
-                "returncode": result.returncode
+                "returncode": result.returncode,
+                "wall_time": round(time.monotonic() - start, 4),
+                "cpu_time": None,
             }
         except subprocess.TimeoutExpired:
             return {"success": False, "error": f"Timeout após {timeout}s", "timeout": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
-    
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Ocupação atual do pool de shells."""
+        if self._pool is None:
+            return {"size": self._pool_size, "created": 0, "idle": 0}
+        return self._pool.stats()
+
+    def shutdown(self) -> None:
+        """Encerra todas as shells ociosas do pool."""
+        if self._pool is not None:
+            self._pool.close()
+
     def can_execute(self, context: Optional[Dict[str, Any]] = None) -> bool:
         """Verifica pré-condições."""
         return True
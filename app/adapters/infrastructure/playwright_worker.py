@@ -1,39 +1,213 @@
-from app.core.nexus import NexusComponent
+# -*- coding: utf-8 -*-
+"""PlaywrightWorker — navegação headless com browser quente.
 
+Mantém um único Chromium vivo; cada job recebe um ``BrowserContext`` novo
+(cookies, localStorage, sessionStorage, permissões e pages isolados), fechado
+ao final. Criar um context num browser quente custa milissegundos, bem menos
+que lançar o browser. A navegação acontece num event loop dedicado (thread
+própria), permitindo até ``max_concurrency`` jobs simultâneos. Esperas usam
+load state ou seletores em vez de sleeps fixos, e cada job reporta seus tempos.
+"""
+import asyncio
+import logging
 import os
-import sys
+import threading
 import time
-from playwright.sync_api import sync_playwright
-from app.adapters.infrastructure.base_worker import BaseWorker
+from typing import Any, Dict, List, Optional
+
+from app.core.nexus import NexusComponent
+
+logger = logging.getLogger(__name__)
+
+_VALID_WAIT_STATES = ("load", "domcontentloaded", "networkidle", "commit")
+
+
+class PlaywrightWorker(NexusComponent):
+    """Worker Playwright com browser persistente e um context isolado por job."""
 
-class PlaywrightWorker(NexusComponent, BaseWorker):
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None, headless: bool = True):
         super().__init__()
+        self.max_concurrency = max(1, int(max_concurrency or os.getenv("PLAYWRIGHT_MAX_CONCURRENCY", "4")))
+        self.headless = headless
+        self.default_timeout_ms = int(os.getenv("PLAYWRIGHT_TIMEOUT_MS", "30000"))
         self.playwright = None
+        self._browser = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._contexts: set = set()
+        self._start_lock = threading.Lock()
+
+    def configure(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """Configura concorrência e timeout via Pipeline YAML."""
+        if config:
+            if "max_concurrency" in config and self._loop is None:
+                self.max_concurrency = max(1, int(config["max_concurrency"]))
+            self.default_timeout_ms = int(config.get("timeout_ms", self.default_timeout_ms))
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Sobe o event loop dedicado e lança o browser (idempotente)."""
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="playwright-worker", daemon=True)
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._async_start(), loop).result()
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join(timeout=5)
+                loop.close()
+                raise
+            self._loop, self._thread = loop, thread
+            logger.info(f"[Playwright] Browser pronto (concorrência={self.max_concurrency})")
+
+    async def _async_start(self) -> None:
+        from playwright.async_api import async_playwright
+
+        self.playwright = await async_playwright().start()
+        self._browser = await self.playwright.chromium.launch(headless=self.headless)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    def stop(self) -> None:
+        """Fecha pages, contexts, browser e o event loop."""
+        with self._start_lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._async_stop(), self._loop).result(timeout=30)
+            except Exception as e:
+                logger.warning(f"[Playwright] Erro ao encerrar browser: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = self._thread = None
 
-    def start(self):
-        self.playwright = sync_playwright().start()
+    async def _async_stop(self) -> None:
+        for context in list(self._contexts):
+            await self._close_context(context)
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
 
-    def stop(self):
-        if self.playwright:
-            self.playwright.stop()
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
 
-    def execute(self, url):
-        browser = self.playwright.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-        page.goto(url)
-        time.sleep(5)  # aguarde 5 segundos
-        browser.close()
+    async def _close_context(self, context) -> None:
+        self._contexts.discard(context)
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"[Playwright] Erro ao fechar context: {e}")
+
+    async def _visit(self, url: str, wait_until: str, selector: Optional[str], timeout_ms: int) -> Dict[str, Any]:
+        queued_at = time.perf_counter()
+        async with self._slots:
+            started_at = time.perf_counter()
+            result: Dict[str, Any] = {"url": url}
+            context = None
+            try:
+                # Context novo por job: nenhum estado do job anterior vaza
+                context = await self._browser.new_context()
+                self._contexts.add(context)
+                page = await context.new_page()
+                response = await page.goto(url, wait_until=wait_until, timeout=timeout_ms)
+                navigated_at = time.perf_counter()
+                if selector:
+                    await page.wait_for_selector(selector, timeout=timeout_ms)
+                finished_at = time.perf_counter()
+                result.update({
+                    "success": True,
+                    "status": response.status if response is not None else None,
+                    "title": await page.title(),
+                    "final_url": page.url,
+                })
+            except Exception as e:
+                finished_at = navigated_at = time.perf_counter()
+                result.update({"success": False, "error": str(e)})
+            finally:
+                if context is not None:
+                    await self._close_context(context)
+
+        result["timings"] = {
+            "queue_ms": round((started_at - queued_at) * 1000, 2),
+            "navigate_ms": round((navigated_at - started_at) * 1000, 2),
+            "wait_ms": round((finished_at - navigated_at) * 1000, 2),
+            "total_ms": round((finished_at - queued_at) * 1000, 2),
+        }
+        return result
+
+    async def _visit_many(self, urls: List[str], wait_until: str, selector: Optional[str], timeout_ms: int):
+        return await asyncio.gather(*(self._visit(u, wait_until, selector, timeout_ms) for u in urls))
+
+    def fetch_many(
+        self,
+        urls: List[str],
+        wait_until: str = "load",
+        wait_for_selector: Optional[str] = None,
+        timeout_ms: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Visita ``urls`` em paralelo (até ``max_concurrency``) e devolve um resultado por URL."""
+        if wait_until not in _VALID_WAIT_STATES:
+            raise ValueError(f"wait_until inválido: {wait_until!r}")
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(
+            self._visit_many(list(urls), wait_until, wait_for_selector, timeout_ms or self.default_timeout_ms),
+            self._loop,
+        )
+        return future.result()
+
+    def execute(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """NexusComponent entry-point.
+
+        Aceita ``url`` ou ``urls`` e, opcionalmente, ``wait_until``,
+        ``wait_for_selector`` e ``timeout_ms``. Uma string é tratada como URL.
+        """
+        if isinstance(context, str):
+            context = {"url": context}
+        context = context or {}
+        urls = context.get("urls") or ([context["url"]] if context.get("url") else [])
+        if not urls:
+            return {"success": False, "error": "Nenhuma URL fornecida"}
+
+        started = time.perf_counter()
+        try:
+            results = self.fetch_many(
+                urls,
+                wait_until=context.get("wait_until", "load"),
+                wait_for_selector=context.get("wait_for_selector"),
+                timeout_ms=context.get("timeout_ms"),
+            )
+        except Exception as e:
+            logger.error(f"[Playwright] Falha: {e}")
+            return {"success": False, "error": str(e)}
+
+        elapsed = time.perf_counter() - started
+        return {
+            "success": all(r["success"] for r in results),
+            "results": results,
+            "elapsed_s": round(elapsed, 3),
+            "jobs_per_minute": round(len(results) / elapsed * 60, 1) if elapsed > 0 else None,
+        }
 
     def run(self, url):
         try:
-            self.start()
-            self.execute(url)
+            result = self.execute({"url": url})
             self.stop()
+            return result
         except Exception as e:
             print(f'Erro: {e}')
 
+
 if __name__ == '__main__':
     worker = PlaywrightWorker()
-    worker.run('https://www.example.com')
+    print(worker.run('https://www.example.com'))
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""PreforkServer — Vários processos servindo um socket aberto pelo mestre.
+
+O modo padrão da API roda um único ``uvicorn`` numa thread: todas as
+requisições, inclusive o trabalho síncrono de ``process_command``, dividem um
+processo e um GIL. Aqui o processo mestre:
+
+1. resolve e aquece os componentes (``before_fork``) — o grafo do Nexus,
+   índices e políticas ficam na memória do mestre e são herdados pelos
+   workers via copy-on-write; ``gc.freeze()`` tira esses objetos do alcance
+   do coletor, que do contrário tocaria cada página e forçaria a cópia;
+2. abre o socket de escuta uma vez e faz ``fork`` de N workers, que chamam
+   ``serve(sock, index)`` (o kernel distribui as conexões entre eles);
+3. supervisiona: worker que morre é substituído (com espera crescente se
+   morrer logo após nascer) e ``SIGTERM``/``SIGINT`` encerram todos.
+
+Em cada worker ``JARVIS_WORKER_INDEX`` indica sua posição; ``after_fork``
+refaz o estado que não sobrevive ao fork (conexões de banco, executores).
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WORKER_INDEX_ENV = "JARVIS_WORKER_INDEX"
+_FAST_CRASH_SECONDS = 2.0
+_MAX_BACKOFF = 30.0
+
+
+class PreforkServer:
+    """Mestre que faz fork de ``workers`` processos sobre um socket compartilhado.
+
+    Args:
+        serve: ``serve(sock, index)`` — roda o servidor no worker até o fim.
+        host: Endereço de escuta.
+        port: Porta de escuta (0 escolhe uma livre; veja ``address``).
+        workers: Número de processos.
+        before_fork: Chamado uma vez no mestre, antes do primeiro fork.
+        after_fork: ``after_fork(index)`` no worker, antes de ``serve``.
+        backlog: Backlog do ``listen``.
+    """
+
+    def __init__(
+        self,
+        serve: Callable[[socket.socket, int], None],
+        host: str = "0.0.0.0",
+        port: int = 10000,
+        workers: int = 2,
+        before_fork: Optional[Callable[[], None]] = None,
+        after_fork: Optional[Callable[[int], None]] = None,
+        backlog: int = 2048,
+    ) -> None:
+        if not hasattr(os, "fork"):
+            raise RuntimeError("PreforkServer requer os.fork (POSIX)")
+        self.serve = serve
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.before_fork = before_fork
+        self.after_fork = after_fork
+        self.backlog = backlog
+        self.sock: Optional[socket.socket] = None
+        self._pids: Dict[int, int] = {}  # pid -> índice
+        self._born: Dict[int, float] = {}  # índice -> instante do fork
+        self._backoff: Dict[int, float] = {}
+        self._stopping = False
+        self.restarts = 0
+
+    @property
+    def address(self):
+        return self.sock.getsockname() if self.sock else (self.host, self.port)
+
+    @property
+    def worker_pids(self) -> List[int]:
+        return sorted(self._pids)
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Abre o socket, prepara o mestre e cria todos os workers."""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(self.backlog)
+        self.sock.set_inheritable(True)
+
+        if self.before_fork:
+            self.before_fork()
+        # Objetos do aquecimento viram permanentes: o GC dos workers não os
+        # percorre (nem suja as páginas compartilhadas)
+        gc.collect()
+        gc.freeze()
+
+        for index in range(self.workers):
+            self._spawn(index)
+        logger.info(
+            "[PreforkServer] %d workers em %s:%d (mestre pid %d)",
+            self.workers, *self.address[:2], os.getpid(),
+        )
+
+    def run(self) -> None:
+        """Inicia e supervisiona até ``SIGTERM``/``SIGINT`` (thread principal)."""
+        if self.sock is None:
+            self.start()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._on_signal)
+        try:
+            while not self._stopping:
+                self.reap()
+                time.sleep(0.2)
+        finally:
+            self.stop()
+
+    def reap(self) -> List[int]:
+        """Recolhe workers mortos e cria substitutos; retorna os novos pids."""
+        spawned = []
+        for pid in list(self._pids):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if not done:
+                continue
+            index = self._pids.pop(pid)
+            logger.warning(
+                "[PreforkServer] Worker %d (pid %d) saiu com código %s",
+                index, pid, os.waitstatus_to_exitcode(status),
+            )
+            if self._stopping:
+                continue
+            # Morte logo após o fork: espera crescente para não entrar em laço
+            if time.monotonic() - self._born.get(index, 0.0) < _FAST_CRASH_SECONDS:
+                delay = min(_MAX_BACKOFF, self._backoff.get(index, 0.5) * 2)
+                self._backoff[index] = delay
+                time.sleep(delay)
+            else:
+                self._backoff.pop(index, None)
+            spawned.append(self._spawn(index))
+            self.restarts += 1
+        return spawned
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Pede o fim dos workers (``SIGTERM``) e força após ``timeout``."""
+        self._stopping = True
+        for pid in list(self._pids):
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while self._pids and time.monotonic() < deadline:
+            for pid in list(self._pids):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    self._pids.pop(pid, None)
+            time.sleep(0.05)
+        for pid in list(self._pids):
+            self._signal(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self._pids.pop(pid, None)
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        gc.unfreeze()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _spawn(self, index: int) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for sig in (signal.SIGTERM, signal.SIGINT):
+                    signal.signal(sig, signal.SIG_DFL)
+                os.environ[WORKER_INDEX_ENV] = str(index)
+                if self.after_fork:
+                    self.after_fork(index)
+                self.serve(self.sock, index)
+            except SystemExit as exc:
+                code = exc.code if isinstance(exc.code, int) else 0
+            except BaseException:
+                logger.exception("[PreforkServer] Worker %d falhou", index)
+                code = 1
+            finally:
+                for stream in (sys.stdout, sys.stderr):
+                    try:
+                        stream.flush()
+                    except Exception:
+                        pass
+                os._exit(code)
+        self._pids[pid] = index
+        self._born[index] = time.monotonic()
+        return pid
+
+    def _on_signal(self, signum, frame) -> None:
+        logger.info("[PreforkServer] Sinal %d recebido, encerrando workers", signum)
+        self._stopping = True
+
+    @staticmethod
+    def _signal(pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
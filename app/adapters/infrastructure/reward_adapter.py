@@ -1,16 +1,27 @@
 from app.core.nexus import NexusComponent
 # -*- coding: utf-8 -*-
-"""Reward Adapter - Database implementation of RewardProvider port"""
+"""Reward Adapter - Database implementation of RewardProvider port
+
+Statistics, totals and efficiency scores are served from incrementally
+maintained rollups (see ``reward_rollups``) that ``log_reward`` updates on
+write. The table is scanned to seed them, when a query window starts before
+the rollup retention, or when a cheap ``max(id)`` check (at most once per
+``freshness_interval``) shows rows written by another process.
+"""
 
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
-from sqlalchemy import func
+from sqlalchemy import case, func
 from sqlmodel import Session, select
 
+from app.adapters.infrastructure.reward_rollups import Rollup, RewardRollups
 from app.application.ports.reward_provider import RewardProvider
 from app.domain.models.evolution_reward import EvolutionReward
+from app.utils.streaming_stats import RunningStats
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +38,29 @@ class RewardAdapter(RewardProvider):
     configured via the SQLAlchemy engine.
     """
 
-    def __init__(self, engine):
+    def __init__(
+        self,
+        engine,
+        rollups: Optional[RewardRollups] = None,
+        freshness_interval: float = 1.0,
+    ):
         """
         Initialize the reward adapter.
         
         Args:
             engine: SQLAlchemy engine instance
+            rollups: Optional pre-configured rollups (bucket size/retention)
+            freshness_interval: Minimum seconds between checks for rows
+                written by other processes
         """
         self.engine = engine
+        self._rollups = rollups or RewardRollups()
+        self._rollups_ready = False
+        self._rollups_lock = threading.Lock()
+        # Highest row id reflected in the rollups
+        self._rollups_max_id = 0
+        self._freshness_interval = freshness_interval
+        self._checked_at = 0.0
         self._ensure_table_exists()
 
     def _ensure_table_exists(self):
@@ -66,11 +92,13 @@ class RewardAdapter(RewardProvider):
             ID of the logged reward
         """
         # Adjust reward based on cost efficiency (INTEGRAÇÃO 2)
-        reward_value, cost_factor = self._apply_cost_factor(reward_value, action_type)
+        reward_value, cost_factor = self._apply_cost_factor(reward_value, action_type, context_data)
         if metadata is None:
             metadata = {}
         metadata["cost_factor_applied"] = cost_factor
 
+        # Seed before inserting so the new row is counted exactly once
+        self._ensure_rollups()
         with Session(self.engine) as session:
             reward = EvolutionReward(
                 action_type=action_type,
@@ -82,6 +110,13 @@ class RewardAdapter(RewardProvider):
             session.add(reward)
             session.commit()
             session.refresh(reward)
+            with self._rollups_lock:
+                if reward.id == self._rollups_max_id + 1:
+                    self._rollups.add(action_type, reward.reward_value, reward.created_at)
+                    self._rollups_max_id = reward.id
+                elif reward.id > self._rollups_max_id:
+                    # Another process inserted in between: re-seed on next read
+                    self._rollups_ready = False
             
             logger.info(
                 f"Logged reward: {action_type} = {reward_value:+.2f} points "
@@ -89,55 +124,48 @@ class RewardAdapter(RewardProvider):
             )
             return reward.id
 
-    def _apply_cost_factor(self, reward_value: float, task_type: str) -> tuple:
+    def _apply_cost_factor(
+        self, reward_value: float, task_type: str, context_data: Optional[Dict[str, Any]] = None
+    ) -> tuple:
         """Adjust reward based on cost efficiency from CostTrackerAdapter.
 
+        Compares ``context_data["current_cost_usd"]`` with the streaming median
+        cost of the same task type (O(1) on the tracker side).
+
         Returns (adjusted_reward, factor_applied).
         """
         factor = 1.0
         try:
-            from app.core.nexus import nexus  # lazy import
-            cost_tracker = nexus.resolve("cost_tracker_adapter")
-            if cost_tracker is None or not hasattr(cost_tracker, "get_cost_summary"):
+            current_cost = float((context_data or {}).get("current_cost_usd", 0.0))
+            if current_cost <= 0.0:
                 return reward_value, factor
 
-            summary = cost_tracker.get_cost_summary(period_days=1)
-            by_task = summary.get("by_task_type", {})
-            if not by_task:
+            from app.core.nexus import nexus  # lazy import
+            cost_tracker = nexus.resolve("cost_tracker_adapter")
+            if cost_tracker is None or not hasattr(cost_tracker, "get_median_cost"):
                 return reward_value, factor
 
-            # Use median cost for the same task_type from the last 24h
-            task_costs = by_task.get(task_type, 0.0)
-            # Approximate per-call cost using total cost if we had counts
-            # Fall back to get_median_cost if available
-            if hasattr(cost_tracker, "get_median_cost"):
-                median = cost_tracker.get_median_cost(task_type)
-            else:
-                median = task_costs
-
+            median = cost_tracker.get_median_cost(task_type)
             if median <= 0.0:
                 return reward_value, factor
 
-            # Get current call cost from context_data if provided by caller
-            current_cost = float((context_data or {}).get("current_cost_usd", 0.0))
-
-            if current_cost > 0.0:
-                ratio = current_cost / median
-                if ratio > 1.5:
-                    factor = 0.85
-                    logger.info(
-                        "[RewardAdapter] Custo alto (ratio=%.2f), fator de penalização=%.2f", ratio, factor
-                    )
-                elif ratio < 0.7:
-                    factor = 1.10
-                    logger.info(
-                        "[RewardAdapter] Custo eficiente (ratio=%.2f), fator de bônus=%.2f", ratio, factor
-                    )
+            ratio = current_cost / median
+            if ratio > 1.5:
+                factor = 0.85
+                logger.info(
+                    "[RewardAdapter] Custo alto (ratio=%.2f), fator de penalização=%.2f", ratio, factor
+                )
+            elif ratio < 0.7:
+                factor = 1.10
+                logger.info(
+                    "[RewardAdapter] Custo eficiente (ratio=%.2f), fator de bônus=%.2f", ratio, factor
+                )
 
         except Exception as exc:
             logger.debug("[RewardAdapter] Falha ao calcular cost_factor: %s", exc)
 
-        adjusted = max(reward_value * factor, 0.01)
+        # Penalties keep their sign; only positive rewards are floored
+        adjusted = max(reward_value * factor, 0.01) if reward_value > 0 else reward_value * factor
         return adjusted, factor
 
     def get_rewards(
@@ -202,6 +230,12 @@ class RewardAdapter(RewardProvider):
         Returns:
             Sum of reward values
         """
+        rollup = self._window(since)
+        if rollup is not None:
+            if action_type:
+                return rollup[action_type].total if action_type in rollup else 0.0
+            return sum(stats.total for stats in rollup.values())
+
         with Session(self.engine) as session:
             statement = select(func.sum(EvolutionReward.reward_value))
             
@@ -227,6 +261,13 @@ class RewardAdapter(RewardProvider):
         Returns:
             Dictionary with statistics
         """
+        rollup = self._window(since)
+        if rollup is not None:
+            return self._statistics_from_rollup(rollup)
+        return self._query_statistics(since)
+
+    def _query_statistics(self, since: Optional[datetime]) -> Dict[str, Any]:
+        """Full aggregate scan; used only for windows older than the rollups."""
         with Session(self.engine) as session:
             # Get total counts and values
             statement = select(
@@ -292,20 +333,21 @@ class RewardAdapter(RewardProvider):
         # Get current period stats
         current_stats = self.get_reward_statistics(since=since)
         
-        # Get previous period stats (same duration, but before 'since')
+        # Previous period: same duration, ending where the current begins
         duration = datetime.now() - since
         previous_since = since - duration
-        previous_stats = self.get_reward_statistics(since=previous_since)
-        previous_until = since  # Previous period ends where current begins
-        
-        # Calculate previous period total with proper filtering
-        with Session(self.engine) as session:
-            statement = select(func.sum(EvolutionReward.reward_value)).where(
-                EvolutionReward.created_at >= previous_since,
-                EvolutionReward.created_at < previous_until
-            )
-            previous_total = session.exec(statement).first()
-            previous_total = float(previous_total) if previous_total else 0.0
+        previous_until = since
+        previous = self._window(previous_since, previous_until)
+        if previous is not None:
+            previous_total = sum(stats.total for stats in previous.values())
+        else:
+            with Session(self.engine) as session:
+                statement = select(func.sum(EvolutionReward.reward_value)).where(
+                    EvolutionReward.created_at >= previous_since,
+                    EvolutionReward.created_at < previous_until
+                )
+                previous_total = session.exec(statement).first()
+                previous_total = float(previous_total) if previous_total else 0.0
         
         # Calculate improvement
         current_total = current_stats['total_reward']
@@ -336,6 +378,117 @@ class RewardAdapter(RewardProvider):
             'previous_period_total': previous_total
         }
 
+    def refresh_rollups(self) -> None:
+        """Drop the in-memory rollups; the next read re-seeds them from the table.
+
+        Rows inserted by other processes are picked up without it; it is
+        needed only after rows are updated or deleted elsewhere.
+        """
+        with self._rollups_lock:
+            self._rollups.clear()
+            self._rollups_ready = False
+
+    def _window(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Optional[Rollup]:
+        """Rollup for ``[since, until)`` or None when the table must be queried."""
+        if not self._ensure_rollups():
+            return None
+        return self._rollups.window(since, until)
+
+    def _ensure_rollups(self) -> bool:
+        """Seed the rollups, re-seeding when other processes added rows."""
+        if self._rollups_ready and not self._rollups_stale():
+            return True
+        with self._rollups_lock:
+            if self._rollups_ready:
+                return True
+            try:
+                with Session(self.engine) as session:
+                    # Rows above max_id are left for the next freshness check
+                    max_id = session.exec(select(func.max(EvolutionReward.id))).first() or 0
+                    totals = session.exec(
+                        select(
+                            EvolutionReward.action_type,
+                            func.count(EvolutionReward.id),
+                            func.sum(EvolutionReward.reward_value),
+                            func.sum(EvolutionReward.reward_value * EvolutionReward.reward_value),
+                            func.min(EvolutionReward.reward_value),
+                            func.max(EvolutionReward.reward_value),
+                            func.sum(case((EvolutionReward.reward_value > 0, 1), else_=0)),
+                        )
+                        .where(EvolutionReward.id <= max_id)
+                        .group_by(EvolutionReward.action_type)
+                    ).all()
+                    recent = session.exec(
+                        select(
+                            EvolutionReward.action_type,
+                            EvolutionReward.reward_value,
+                            EvolutionReward.created_at,
+                        ).where(
+                            EvolutionReward.created_at >= self._rollups.horizon_datetime(),
+                            EvolutionReward.id <= max_id,
+                        )
+                    ).all()
+            except Exception as e:
+                logger.warning(f"[RewardAdapter] Falha ao carregar rollups, usando consultas diretas: {e}")
+                return False
+
+            self._rollups.clear()
+            for action_type, count, total, sum_sq, min_val, max_val, positive in totals:
+                stats = RunningStats()
+                stats.count = int(count or 0)
+                stats.total = float(total or 0.0)
+                stats.sum_sq = float(sum_sq or 0.0)
+                stats.min = float(min_val) if min_val is not None else None
+                stats.max = float(max_val) if max_val is not None else None
+                stats.positive = int(positive or 0)
+                self._rollups.set_totals(action_type, stats)
+            for action_type, value, created_at in recent:
+                self._rollups.add(action_type, value, created_at, totals=False)
+            self._rollups_max_id = int(max_id)
+            self._checked_at = time.monotonic()
+            self._rollups_ready = True
+            return True
+
+    def _rollups_stale(self) -> bool:
+        """Whether rows were inserted since the rollups last caught up."""
+        now = time.monotonic()
+        if now - self._checked_at < self._freshness_interval:
+            return False
+        self._checked_at = now
+        try:
+            with Session(self.engine) as session:
+                max_id = session.exec(select(func.max(EvolutionReward.id))).first() or 0
+        except Exception as e:
+            logger.debug(f"[RewardAdapter] Verificação de rollups falhou: {e}")
+            return False
+        with self._rollups_lock:
+            if max_id > self._rollups_max_id:
+                self._rollups_ready = False
+            return not self._rollups_ready
+
+    @staticmethod
+    def _statistics_from_rollup(rollup: Rollup) -> Dict[str, Any]:
+        overall = RunningStats()
+        for stats in rollup.values():
+            overall.merge(stats)
+        return {
+            'total_count': overall.count,
+            'total_reward': overall.total,
+            'average_reward': overall.mean,
+            'max_reward': overall.max if overall.max is not None else 0.0,
+            'min_reward': overall.min if overall.min is not None else 0.0,
+            'std_dev': overall.std_dev,
+            'by_action_type': {
+                action_type: {
+                    'count': stats.count,
+                    'total_reward': stats.total,
+                    'average_reward': stats.mean,
+                    'std_dev': stats.std_dev,
+                }
+                for action_type, stats in rollup.items()
+            }
+        }
+
     def update_capability_reliability(self, capability_id: str, success: bool) -> bool:
         """Atualiza o reliability_score de uma capability via CapabilityIndexService (MELHORIA 4).
 
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Rollups incrementais de recompensas para o RewardAdapter.
+
+Em vez de reagregar ``evolution_rewards`` a cada leitura, o adapter alimenta
+estes agregados no momento do ``log_reward``:
+
+- ``totals``: ``RunningStats`` por action_type desde sempre;
+- ``buckets``: ``RunningStats`` por action_type em buckets de tempo
+  (1 hora por padrão), mantidos por ``retention_days``.
+
+Consultas com ``since``/``until`` somam os buckets da janela — o custo
+depende do tamanho da janela, não do histórico. Os limites são arredondados
+para o início do bucket, o que mantém janelas adjacentes disjuntas. Janelas
+que começam antes da retenção retornam ``None`` e o chamador volta ao SQL.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from app.utils.streaming_stats import RunningStats
+
+Rollup = Dict[str, RunningStats]
+
+
+class RewardRollups:
+    """Agregados por action_type, globais e por janela de tempo."""
+
+    def __init__(
+        self,
+        bucket_seconds: int = 3600,
+        retention_days: int = 30,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = max(1, retention_days * 86400 // bucket_seconds)
+        self._clock = clock
+        self._totals: Rollup = {}
+        self._buckets: Dict[int, Rollup] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def add(self, action_type: str, value: float, created_at: datetime, totals: bool = True) -> None:
+        """Registra uma recompensa (``totals=False`` só alimenta os buckets)."""
+        idx = self._index(created_at)
+        with self._lock:
+            if totals:
+                self._totals.setdefault(action_type, RunningStats()).add(value)
+            if idx < self.horizon():
+                return
+            bucket = self._buckets.get(idx)
+            if bucket is None:
+                bucket = self._buckets[idx] = {}
+                self._prune_locked()
+            bucket.setdefault(action_type, RunningStats()).add(value)
+
+    def set_totals(self, action_type: str, stats: RunningStats) -> None:
+        """Carga inicial dos totais (agregado vindo do banco)."""
+        with self._lock:
+            self._totals[action_type] = stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._totals.clear()
+            self._buckets.clear()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def horizon(self) -> int:
+        """Índice do bucket mais antigo mantido."""
+        return int(self._clock() // self.bucket_seconds) - self.retention_buckets
+
+    def horizon_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.horizon() * self.bucket_seconds)
+
+    def window(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Optional[Rollup]:
+        """Agregado por action_type em ``[since, until)``; None fora da retenção."""
+        with self._lock:
+            if since is None and until is None:
+                return {action: RunningStats().merge(s) for action, s in self._totals.items()}
+            start = self._index(since) if since is not None else None
+            if start is None or start < self.horizon():
+                return None
+            end = self._index(until) if until is not None else None
+            merged: Rollup = {}
+            for idx, bucket in self._buckets.items():
+                if idx < start or (end is not None and idx >= end):
+                    continue
+                for action, stats in bucket.items():
+                    merged.setdefault(action, RunningStats()).merge(stats)
+            return merged
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _index(self, moment: datetime) -> int:
+        return int(moment.timestamp() // self.bucket_seconds)
+
+    def _prune_locked(self) -> None:
+        horizon = self.horizon()
+        for idx in [i for i in self._buckets if i < horizon]:
+            del self._buckets[idx]
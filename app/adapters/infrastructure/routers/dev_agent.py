@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """Dev Agent router: POST /v1/dev-agent/run, GET /v1/dev-agent/jobs"""
 
-import json
 import logging
 import uuid
 from pathlib import Path
@@ -9,6 +8,8 @@ from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
 
+from app.utils.journal_store import get_journal_store
+
 logger = logging.getLogger(__name__)
 
 # Mutex simples de escopo de módulo — evita execuções paralelas do JarvisDevAgent
@@ -48,36 +49,28 @@ def create_dev_agent_router() -> APIRouter:
         """Retorna as últimas ``limit`` entradas do log de auditoria de jobs.
 
         Ordenadas por ``started_at`` descendente.  Não requer autenticação.
+        Lê apenas as linhas dos ``limit`` jobs mais recentes (índice de offsets
+        do :class:`JournalStore`), não o arquivo inteiro.
         """
-        if not _JOBS_FILE.exists():
-            return []
         try:
-            lines = _JOBS_FILE.read_text(encoding="utf-8").splitlines()
+            jobs = get_journal_store(_JOBS_FILE, key_field="job_id", ts_field="started_at")
+            job_ids = jobs.latest_keys(limit)
+            per_job = [jobs.get(jid) for jid in job_ids]
         except Exception as exc:
             logger.warning("[DevAgentRouter] Falha ao ler jobs file: %s", exc)
             return []
 
-        entries: List[Dict[str, Any]] = []
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entries.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
-
         # Dedup: prefer the most recent entry for each job_id (update wins over initial)
-        seen: Dict[str, Dict[str, Any]] = {}
-        for entry in entries:
-            jid = entry.get("job_id", "")
-            # Later entries (updates) overwrite earlier (start) for same job_id
-            if jid not in seen or entry.get("finished_at") is not None:
-                seen[jid] = entry
-
-        deduped = list(seen.values())
+        deduped: List[Dict[str, Any]] = []
+        for entries in per_job:
+            chosen = entries[0]
+            for entry in entries[1:]:
+                if entry.get("finished_at") is not None:
+                    chosen = entry
+            deduped.append(chosen)
+
         deduped.sort(key=lambda e: e.get("started_at") or "", reverse=True)
-        return deduped[:limit]
+        return deduped
 
     return router
 
@@ -195,28 +195,14 @@ def create_health_router(db_adapter, get_current_user=None) -> APIRouter:
 
         # Gatekeeper section --------------------------------------------------
         try:
-            from pathlib import Path as _Path
-            import json as _json
-
-            rejections_file = _Path("data/gatekeeper_rejections.jsonl")
-            total_rejections = 0
-            rejections_7d = 0
-            if rejections_file.exists():
-                from datetime import datetime as _dt, timezone as _tz, timedelta as _td
-
-                cutoff = (_dt.now(tz=_tz.utc) - _td(days=7)).timestamp()
-                for line in rejections_file.read_text(encoding="utf-8").splitlines():
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = _json.loads(line)
-                        total_rejections += 1
-                        ts = entry.get("timestamp")
-                        if ts is not None and float(ts) >= cutoff:
-                            rejections_7d += 1
-                    except Exception:
-                        pass
+            from datetime import datetime as _dt, timezone as _tz, timedelta as _td
+            from app.utils.journal_store import get_journal_store
+
+            # Contagens vêm do índice do journal — sem reler o arquivo inteiro
+            rejections = get_journal_store("data/gatekeeper_rejections.jsonl", ts_field="timestamp")
+            cutoff = (_dt.now(tz=_tz.utc) - _td(days=7)).timestamp()
+            total_rejections = rejections.count()
+            rejections_7d = rejections.count_since(cutoff)
             result["gatekeeper"] = {
                 "available": True,
                 "total_rejections": total_rejections,
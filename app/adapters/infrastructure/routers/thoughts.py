@@ -68,6 +68,7 @@ def create_thoughts_router(db_adapter, get_current_user) -> APIRouter:
                 success=request.success,
                 error_message=request.error_message,
                 context_data=request.context_data,
+                wait=True,
             )
             if thought:
                 return _thought_to_response(thought)
@@ -0,0 +1,567 @@
+# -*- coding: utf-8 -*-
+"""SourceIndex — índice invertido persistente sobre o código do repositório.
+
+Substitui as varreduras ``rglob`` + leitura completa de arquivos feitas por
+detectores e provedores de contexto. Mantém:
+
+- um índice de tokens (identificadores, quebrados em snake_case/camelCase)
+  para consultas por palavra-chave ranqueadas por TF-IDF;
+- um índice de trigramas para consultas por substring (candidatos por
+  interseção de trigramas, confirmados no conteúdo);
+- ``mtime``/tamanho por arquivo, de modo que ``refresh()`` só reindexa o que
+  mudou.
+
+Só arquivos de texto/código (``_TEXT_SUFFIXES``) entram no índice; diretórios
+de runtime na raiz (``data/``, ``logs/``, ``backups/``) não são varridos.
+
+O índice é persistido em formato ``.jrvs`` (ver :mod:`app.utils.jrvs_codec`):
+um snapshot completo seguido de contêineres delta com apenas os arquivos
+alterados/removidos em cada ``save()``. Quando os deltas passam do tamanho do
+snapshot o arquivo é compactado. Na próxima execução o índice é recarregado e
+segue-se um refresh incremental.
+"""
+
+import fnmatch
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.nexus import NexusComponent
+from app.utils import jrvs_codec
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VERSION = 2
+_DEFAULT_INDEX_FILE = os.getenv("JARVIS_SOURCE_INDEX_PATH", "data/source_index.jrvs")
+_TEXT_SUFFIXES = frozenset({
+    ".py", ".md", ".txt", ".rst", ".yml", ".yaml", ".toml", ".json", ".cfg", ".ini", ".js", ".ts", ".sh",
+})
+_EXCLUDED_DIRS = frozenset({
+    ".git", "__pycache__", "node_modules", ".venv", "venv", ".mypy_cache", ".pytest_cache",
+    ".ruff_cache", ".tox", "htmlcov", ".backups",
+})
+# Diretórios de runtime ignorados apenas na raiz (``app/data`` continua indexado)
+_EXCLUDED_ROOT_DIRS = frozenset({"data", "logs", "backups"})
+_MAX_INDEXED_BYTES = 512 * 1024
+_CONTENT_CACHE_SIZE = 256
+_MIN_COMPACT_BYTES = 64 * 1024
+
+_IDENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> Counter:
+    """Conta tokens de ``text``: identificadores inteiros e suas partes.
+
+    ``LLMCapabilityDetector`` gera ``llmcapabilitydetector``, ``llm``,
+    ``capability`` e ``detector``; ``search_files_by_keywords`` gera também
+    ``search``, ``files``, ``by`` e ``keywords``.
+    """
+    counts: Counter = Counter()
+    for ident, n in Counter(_IDENT_RE.findall(text)).items():
+        counts[ident.lower()] += n
+        parts = [p for seg in ident.split("_") for p in _CAMEL_RE.findall(seg)]
+        if len(parts) > 1:
+            for part in parts:
+                if len(part) > 1:
+                    counts[part.lower()] += n
+    return counts
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SourceIndex(NexusComponent):
+    """Índice invertido de tokens e trigramas sobre a árvore de código.
+
+    Args:
+        root: Raiz do repositório (padrão: diretório atual).
+        index_path: Onde persistir o índice; relativo a ``root``. ``None``
+            desativa a persistência.
+        refresh_interval: Intervalo mínimo (s) entre varreduras de ``mtime``
+            disparadas automaticamente pelas consultas.
+        source_roots: Diretórios de primeiro nível a varrer (ex.: ``("app",
+            "scripts")``); os arquivos da raiz são sempre incluídos. ``None``
+            varre a árvore inteira.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        index_path: Optional[str] = _DEFAULT_INDEX_FILE,
+        refresh_interval: float = 5.0,
+        source_roots: Optional[Tuple[str, ...]] = None,
+    ) -> None:
+        self.root = Path(root or Path.cwd()).resolve()
+        self.index_path = (self.root / index_path) if index_path else None
+        self.refresh_interval = refresh_interval
+        self.source_roots = frozenset(source_roots) if source_roots is not None else None
+
+        # Índice direto: path → (mtime_ns, size, tokens, trigrams)
+        self._files: Dict[str, Tuple[int, int, Dict[str, int], Set[str]]] = {}
+        # Índices invertidos
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._trigram_postings: Dict[str, Set[str]] = {}
+        # Todos os arquivos de texto vistos (inclusive os grandes demais para
+        # indexar por conteúdo)
+        self._all_paths: Set[str] = set()
+        # LRU do conteúdo em minúsculas dos candidatos recentes de substring
+        self._lowered: "OrderedDict[str, str]" = OrderedDict()
+
+        self._content_cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._loaded = False
+        self._pins = 0
+        # Persistência incremental: o que mudou desde o último save()
+        self._changed: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._rewrite = True
+        self._snapshot_bytes = 0
+        self._delta_bytes = 0
+
+    # ------------------------------------------------------------------
+    # NexusComponent interface
+    # ------------------------------------------------------------------
+
+    def execute(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Consulta o índice.
+
+        Contexto: ``query`` (obrigatório), ``mode`` (``keyword`` | ``substring``),
+        ``limit`` (padrão 10).
+        """
+        ctx = context or {}
+        query = ctx.get("query", "")
+        if not query:
+            return {"success": False, "error": "query obrigatória"}
+        limit = int(ctx.get("limit", 10))
+        if ctx.get("mode") == "substring":
+            hits = self.search_substring(query, limit=limit)
+        else:
+            hits = self.search(query, limit=limit)
+        return {"success": True, "hits": hits}
+
+    # ------------------------------------------------------------------
+    # Manutenção do índice
+    # ------------------------------------------------------------------
+
+    def ensure_fresh(self) -> None:
+        """Carrega o índice persistido (1ª vez) e faz refresh se o intervalo expirou."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+                self.refresh()
+            elif self._pins == 0 and time.monotonic() - self._last_refresh >= self.refresh_interval:
+                self.refresh()
+
+    def refresh_snapshot(self) -> None:
+        """Carrega o índice persistido (1ª vez) ou faz refresh imediatamente."""
+        with self._lock:
+            if self._loaded:
+                self.refresh()
+            else:
+                self.ensure_fresh()
+
+    @contextmanager
+    def pinned(self, refresh: bool = True) -> Iterator["SourceIndex"]:
+        """Atualiza o índice uma vez e suspende os refreshes automáticos no bloco.
+
+        Usado por varreduras em lote (ex.: scan de capabilities) para que todas
+        as consultas do lote usem o mesmo snapshot sem revarrer a árvore.
+        Código assíncrono passa ``refresh=False`` depois de rodar
+        ``refresh_snapshot`` numa thread, pois o refresh percorre a árvore.
+        """
+        with self._lock:
+            if refresh:
+                self.refresh_snapshot()
+            self._pins += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._pins -= 1
+
+    def refresh(self) -> Dict[str, int]:
+        """Reindexa apenas arquivos novos/alterados e remove os apagados.
+
+        Returns:
+            Contadores ``added``, ``updated``, ``removed`` e ``total``.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        with self._lock:
+            seen: Set[str] = set()
+            for rel, st in self._walk():
+                seen.add(rel)
+                if st.st_size > _MAX_INDEXED_BYTES:
+                    continue
+                entry = self._files.get(rel)
+                if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                    continue
+                if self._index_file(rel, st):
+                    stats["updated" if entry is not None else "added"] += 1
+                    self._changed.add(rel)
+                    self._removed.discard(rel)
+            for rel in list(self._files):
+                if rel not in seen:
+                    self._remove_file(rel)
+                    stats["removed"] += 1
+                    self._removed.add(rel)
+                    self._changed.discard(rel)
+            self._all_paths = seen
+            self._last_refresh = time.monotonic()
+            self.save()
+            stats["total"] = len(self._files)
+        return stats
+
+    def _walk(self) -> Iterable[Tuple[str, os.stat_result]]:
+        stack = [str(self.root)]
+        root_len = len(str(self.root)) + 1
+        while stack:
+            current = stack.pop()
+            at_root = len(current) < root_len
+            try:
+                entries = list(os.scandir(current))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in _EXCLUDED_DIRS:
+                            continue
+                        if at_root and (
+                            entry.name in _EXCLUDED_ROOT_DIRS
+                            or (self.source_roots is not None and entry.name not in self.source_roots)
+                        ):
+                            continue
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if os.path.splitext(entry.name)[1] not in _TEXT_SUFFIXES:
+                            continue
+                        rel = entry.path[root_len:].replace(os.sep, "/")
+                        yield rel, entry.stat()
+                except OSError:
+                    continue
+
+    def _index_file(self, rel: str, st: os.stat_result) -> bool:
+        try:
+            text = (self.root / rel).read_text(encoding="utf-8", errors="replace")
+        except OSError as exc:
+            logger.debug("[SourceIndex] Ignorando %s: %s", rel, exc)
+            return False
+        self._remove_file(rel)
+        tokens = dict(tokenize(text))
+        trigrams = _trigrams(text.lower())
+        self._files[rel] = (st.st_mtime_ns, st.st_size, tokens, trigrams)
+        for tok, n in tokens.items():
+            self._postings.setdefault(tok, {})[rel] = n
+        for tri in trigrams:
+            self._trigram_postings.setdefault(tri, set()).add(rel)
+        return True
+
+    def _remove_file(self, rel: str) -> None:
+        entry = self._files.pop(rel, None)
+        self._lowered.pop(rel, None)
+        if entry is None:
+            return
+        for tok in entry[2]:
+            posting = self._postings.get(tok)
+            if posting is not None:
+                posting.pop(rel, None)
+                if not posting:
+                    del self._postings[tok]
+        for tri in entry[3]:
+            posting = self._trigram_postings.get(tri)
+            if posting is not None:
+                posting.discard(rel)
+                if not posting:
+                    del self._trigram_postings[tri]
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Grava no disco apenas os arquivos alterados/removidos desde o último save.
+
+        As mudanças são anexadas como um contêiner delta; o arquivo só é
+        reescrito por inteiro na primeira gravação, após um índice persistido
+        inválido ou quando os deltas acumulados passam do tamanho do snapshot.
+        """
+        if self.index_path is None:
+            return
+        with self._lock:
+            if not (self._rewrite or self._changed or self._removed):
+                return
+            try:
+                if self._rewrite or self._delta_bytes > max(self._snapshot_bytes, _MIN_COMPACT_BYTES):
+                    self._write_snapshot()
+                else:
+                    self._append_delta()
+                self._changed.clear()
+                self._removed.clear()
+            except OSError as exc:
+                logger.warning("[SourceIndex] Falha ao persistir índice: %s", exc)
+
+    @staticmethod
+    def _serialize(entry: Tuple[int, int, Dict[str, int], Set[str]]) -> List[Any]:
+        mtime, size, tokens, tris = entry
+        return [mtime, size, tokens, sorted(tris)]
+
+    def _write_snapshot(self) -> None:
+        raw = jrvs_codec.encode({
+            "version": _INDEX_VERSION,
+            "files": {rel: self._serialize(entry) for rel, entry in self._files.items()},
+        })
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, self.index_path)
+        self._snapshot_bytes = len(raw)
+        self._delta_bytes = 0
+        self._rewrite = False
+
+    def _append_delta(self) -> None:
+        raw = jrvs_codec.encode({
+            "files": {rel: self._serialize(self._files[rel]) for rel in self._changed if rel in self._files},
+            "removed": sorted(self._removed),
+        })
+        with open(self.index_path, "ab") as fh:
+            fh.write(raw)
+        self._delta_bytes += len(raw)
+
+    def _load(self) -> None:
+        if self.index_path is None or not self.index_path.exists():
+            return
+        try:
+            raw = self.index_path.read_bytes()
+            payload, pos = jrvs_codec.decode_frame(raw)
+        except (OSError, jrvs_codec.JrvsDecodeError, ValueError) as exc:
+            logger.warning("[SourceIndex] Índice persistido inválido, reconstruindo: %s", exc)
+            return
+        if payload.get("version") != _INDEX_VERSION:
+            return
+        files = payload.get("files", {})
+        self._snapshot_bytes = pos
+        while pos < len(raw):
+            try:
+                delta, nxt = jrvs_codec.decode_frame(raw, pos)
+            except (jrvs_codec.JrvsDecodeError, ValueError) as exc:
+                # Delta truncado (queda no meio de um append): reescreve no próximo save
+                logger.warning("[SourceIndex] Delta inválido em %d, compactando: %s", pos, exc)
+                self._rewrite = True
+                break
+            for rel in delta.get("removed", ()):
+                files.pop(rel, None)
+            files.update(delta.get("files", {}))
+            pos = nxt
+        else:
+            self._rewrite = False
+        self._delta_bytes = pos - self._snapshot_bytes
+        for rel, (mtime, size, tokens, tris) in files.items():
+            tri_set = set(tris)
+            self._files[rel] = (mtime, size, tokens, tri_set)
+            for tok, n in tokens.items():
+                self._postings.setdefault(tok, {})[rel] = n
+            for tri in tri_set:
+                self._trigram_postings.setdefault(tri, set()).add(rel)
+        logger.debug("[SourceIndex] %d arquivos carregados de %s", len(self._files), self.index_path)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        snippets: int = 2,
+        path_prefixes: Optional[Tuple[str, ...]] = None,
+        suffix: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Busca por palavras-chave (OR), ranqueada por TF-IDF."""
+        self.ensure_fresh()
+        terms = [t for t in tokenize(query) if len(t) > 1]
+        with self._lock:
+            n_docs = max(1, len(self._files))
+            scores: Dict[str, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + n_docs / len(posting))
+                for rel, tf in posting.items():
+                    if self._accepts(rel, path_prefixes, suffix):
+                        scores[rel] = scores.get(rel, 0.0) + (1 + math.log(tf)) * idf
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [self._hit(rel, score, terms, snippets) for rel, score in ranked]
+
+    def search_substring(
+        self,
+        text: str,
+        limit: int = 10,
+        snippets: int = 2,
+        path_prefixes: Optional[Tuple[str, ...]] = None,
+        suffix: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Busca por substring (case-insensitive), ranqueada por nº de ocorrências."""
+        self.ensure_fresh()
+        needle = text.lower()
+        scores = {
+            rel: float(count)
+            for rel, count in self._substring_counts(needle, path_prefixes, suffix).items()
+        }
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [self._hit(rel, score, [needle], snippets) for rel, score in ranked]
+
+    def search_any(
+        self,
+        keywords: List[str],
+        limit: int = 10,
+        snippets: int = 0,
+        path_prefixes: Optional[Tuple[str, ...]] = None,
+        suffix: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Arquivos que contêm qualquer uma das substrings em ``keywords``.
+
+        Ranqueia primeiro pelo número de keywords distintas presentes e depois
+        pelo total de ocorrências.
+        """
+        self.ensure_fresh()
+        matched: Dict[str, List[int]] = {}
+        needles = [k.lower() for k in keywords if k]
+        for needle in needles:
+            for rel, count in self._substring_counts(needle, path_prefixes, suffix).items():
+                acc = matched.setdefault(rel, [0, 0])
+                acc[0] += 1
+                acc[1] += count
+        ranked = heapq.nsmallest(limit, matched.items(), key=lambda kv: (-kv[1][0], -kv[1][1], kv[0]))
+        return [self._hit(rel, float(k * 1000 + c), needles, snippets) for rel, (k, c) in ranked]
+
+    def files(self, pattern: str = "*") -> List[str]:
+        """Caminhos relativos de arquivos de texto/código que casam com o glob ``pattern``."""
+        self.ensure_fresh()
+        with self._lock:
+            return sorted(p for p in self._all_paths if fnmatch.fnmatchcase(p, pattern))
+
+    def read(self, rel: str) -> Optional[str]:
+        """Conteúdo de um arquivo indexado (com cache LRU por mtime)."""
+        with self._lock:
+            entry = self._files.get(rel)
+        mtime = entry[0] if entry else -1
+        key = (rel, mtime)
+        with self._lock:
+            cached = self._content_cache.get(key)
+            if cached is not None:
+                self._content_cache.move_to_end(key)
+                return cached
+        try:
+            content = (self.root / rel).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return None
+        with self._lock:
+            self._content_cache[key] = content
+            while len(self._content_cache) > _CONTENT_CACHE_SIZE:
+                self._content_cache.popitem(last=False)
+        return content
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _accepts(rel: str, prefixes: Optional[Tuple[str, ...]], suffix: Optional[str]) -> bool:
+        if prefixes and not rel.startswith(prefixes):
+            return False
+        return not suffix or rel.endswith(suffix)
+
+    def _substring_counts(
+        self, needle: str, prefixes: Optional[Tuple[str, ...]], suffix: Optional[str]
+    ) -> Dict[str, int]:
+        with self._lock:
+            if len(needle) >= 3:
+                candidates: Optional[Set[str]] = None
+                for tri in sorted(_trigrams(needle), key=lambda t: len(self._trigram_postings.get(t, ()))):
+                    posting = self._trigram_postings.get(tri)
+                    if not posting:
+                        return {}
+                    candidates = set(posting) if candidates is None else candidates & posting
+                    if not candidates:
+                        return {}
+            else:
+                candidates = set(self._files)
+            candidates = {rel for rel in candidates if self._accepts(rel, prefixes, suffix)}
+        counts: Dict[str, int] = {}
+        for rel in candidates:
+            lowered = self._read_lowered(rel)
+            if lowered is None:
+                continue
+            n = lowered.count(needle)
+            if n:
+                counts[rel] = n
+        return counts
+
+    def _read_lowered(self, rel: str) -> Optional[str]:
+        with self._lock:
+            lowered = self._lowered.get(rel)
+            if lowered is not None:
+                self._lowered.move_to_end(rel)
+                return lowered
+        content = self.read(rel)
+        if content is None:
+            return None
+        lowered = content.lower()
+        with self._lock:
+            if rel in self._files:
+                self._lowered[rel] = lowered
+                while len(self._lowered) > _CONTENT_CACHE_SIZE:
+                    self._lowered.popitem(last=False)
+        return lowered
+
+    def _hit(self, rel: str, score: float, terms: List[str], max_snippets: int) -> Dict[str, Any]:
+        hit: Dict[str, Any] = {"path": rel, "score": round(score, 4)}
+        if max_snippets <= 0:
+            return hit
+        found: List[Dict[str, Any]] = []
+        content = self.read(rel) or ""
+        for lineno, line in enumerate(content.splitlines(), start=1):
+            low = line.lower()
+            if any(t in low for t in terms):
+                found.append({"line": lineno, "text": line.strip()[:200]})
+                if len(found) >= max_snippets:
+                    break
+        hit["snippets"] = found
+        return hit
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "paths": len(self._all_paths),
+                "tokens": len(self._postings),
+                "trigrams": len(self._trigram_postings),
+            }
+
+
+_shared_indexes: Dict[Path, SourceIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def get_source_index(root: Optional[Path] = None) -> SourceIndex:
+    """Instância compartilhada do índice por raiz de repositório."""
+    key = Path(root or Path.cwd()).resolve()
+    with _shared_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = SourceIndex(root=key)
+            _shared_indexes[key] = index
+        return index
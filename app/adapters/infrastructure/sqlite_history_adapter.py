@@ -105,25 +105,39 @@ class SQLiteHistoryAdapter(HistoryProvider):
         """
         from sqlalchemy import text, inspect
 
-        migrations = [
-            # column_name, DDL to add it (SQLite + PostgreSQL compatible)
-            ("channel", "ALTER TABLE interactions ADD COLUMN channel VARCHAR NOT NULL DEFAULT 'api'"),
-        ]
+        migrations = {
+            # table -> [(column_name, DDL to add it)] (SQLite + PostgreSQL compatible)
+            "interactions": [
+                ("channel", "ALTER TABLE interactions ADD COLUMN channel VARCHAR NOT NULL DEFAULT 'api'"),
+            ],
+            "thought_logs": [
+                ("agent_id", "ALTER TABLE thought_logs ADD COLUMN agent_id VARCHAR NOT NULL DEFAULT ''"),
+            ],
+        }
 
         try:
             inspector = inspect(self.engine)
-            if "interactions" not in inspector.get_table_names():
-                return  # Fresh database; create_all already handled it
-
-            existing_columns = {col["name"] for col in inspector.get_columns("interactions")}
+            tables = set(inspector.get_table_names())
             with self.engine.begin() as conn:
-                for column_name, ddl in migrations:
-                    if column_name not in existing_columns:
+                for table, columns in migrations.items():
+                    if table not in tables:
+                        continue  # Fresh database; create_all already handled it
+                    existing_columns = {col["name"] for col in inspector.get_columns(table)}
+                    for column_name, ddl in columns:
+                        if column_name not in existing_columns:
+                            try:
+                                conn.execute(text(ddl))
+                                logger.info(f"Schema migration applied: added column '{column_name}' to {table}")
+                            except Exception as col_err:
+                                logger.warning(f"Could not add column '{column_name}': {col_err}")
+
+                # create_all skips existing tables entirely, including their new indexes
+                if "thought_logs" in tables:
+                    for index in ThoughtLog.__table__.indexes:
                         try:
-                            conn.execute(text(ddl))
-                            logger.info(f"Schema migration applied: added column '{column_name}' to interactions")
-                        except Exception as col_err:
-                            logger.warning(f"Could not add column '{column_name}': {col_err}")
+                            index.create(conn, checkfirst=True)
+                        except Exception as idx_err:
+                            logger.warning(f"Could not create index '{index.name}': {idx_err}")
         except Exception as e:
             logger.debug(f"Schema migration check skipped: {e}")
 
@@ -1,12 +1,20 @@
 # -*- coding: utf-8 -*-
 """Telegram Adapter — Notificações e backup via Telegram.
 CORREÇÃO: Mantido padrão original do CORE para compatibilidade com Nexus Discovery.
+
+Mensagens passam por uma fila de saída em background (:class:`TelegramOutbox`)
+com pacing por chat e coalescência de rajadas; todas as chamadas HTTP usam uma
+``requests.Session`` sobre o pool keep-alive do ``http_transport``.
 """
 import os
 import logging
+import threading
 import requests
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 from app.core.nexus import NexusComponent
+from app.adapters.infrastructure.http_transport import get_http_transport
+from app.adapters.infrastructure.telegram_outbox import TelegramOutbox
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +22,15 @@ logger = logging.getLogger(__name__)
 class TelegramAdapter(NexusComponent):
     """Adapter para envio de mensagens e arquivos via Telegram."""
     
-    def __init__(self):
+    def __init__(self, outbox_path: Optional[Path] = None):
         super().__init__()
         self._token = os.getenv("TELEGRAM_TOKEN")
         self._chat_id = os.getenv("TELEGRAM_CHAT_ID")
         self._base_url = "https://api.telegram.org/bot"
+        self._outbox_path = outbox_path or Path(os.getenv("TELEGRAM_OUTBOX_PATH", "data/telegram_outbox.jrvs"))
+        self._session: Optional[requests.Session] = None
+        self._outbox: Optional[TelegramOutbox] = None
+        self._lock = threading.Lock()
     
     def can_execute(self, context: Optional[Dict[str, Any]] = None) -> bool:
         """NexusComponent contract."""
@@ -38,18 +50,65 @@ class TelegramAdapter(NexusComponent):
         
         return {"success": False, "error": f"Ação desconhecida: {action}"}
     
-    def send_message(self, chat_id: str, message: str) -> Dict[str, Any]:
-        """Envia mensagem de texto."""
-        url = f"{self._base_url}{self._token}/sendMessage"
+    def send_message(self, chat_id: str, message: str, queued: bool = True) -> Dict[str, Any]:
+        """Envia mensagem de texto.
+
+        Por padrão apenas enfileira (não bloqueia o chamador); ``queued=False``
+        envia na hora e retorna o resultado real.
+        """
+        if queued:
+            accepted = self.outbox.enqueue(chat_id, message, parse_mode="HTML")
+            return {"success": accepted, "queued": accepted}
+        ok, _ = self._deliver(chat_id, message, "HTML")
+        return {"success": ok}
+    
+    @property
+    def outbox(self) -> TelegramOutbox:
+        """Fila de saída (criada sob demanda; restaura pendências do spill)."""
+        if self._outbox is None:
+            with self._lock:
+                if self._outbox is None:
+                    self._outbox = TelegramOutbox(self._deliver, spill_path=self._outbox_path)
+        return self._outbox
+    
+    def _get_session(self) -> requests.Session:
+        """Sessão keep-alive compartilhada entre a fila e as ações diretas."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = get_http_transport().session()
+        return self._session
+    
+    def _deliver(self, chat_id: str, text: str, parse_mode: Optional[str]) -> Tuple[bool, Optional[float]]:
+        """Envia de fato; retorna (ok, retry_after) — usado pela fila de saída."""
+        payload: Dict[str, Any] = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
         try:
-            response = requests.post(
-                url,
-                json={"chat_id": chat_id, "text": message, "parse_mode": "HTML"},
-                timeout=30
+            response = self._get_session().post(
+                f"{self._base_url}{self._token}/sendMessage", json=payload
             )
-            return {"success": response.status_code == 200}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        except requests.RequestException as e:
+            logger.warning(f"[TELEGRAM] Erro de rede no envio: {e}")
+            return False, None
+        if response.status_code == 200:
+            return True, None
+        retry_after = None
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.json().get("parameters", {}).get("retry_after", 1))
+            except (ValueError, AttributeError):
+                retry_after = 1.0
+        logger.warning(f"[TELEGRAM] sendMessage retornou {response.status_code}")
+        return False, retry_after
+    
+    def close(self, timeout: float = 5.0) -> None:
+        """Drena a fila (gravando o restante no spill) e fecha a sessão."""
+        if self._outbox is not None:
+            self._outbox.close(timeout)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
     
     def _action_send_message(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Ação: enviar mensagem."""
@@ -57,7 +116,7 @@ class TelegramAdapter(NexusComponent):
         message = ctx.get("message", "")
         if not chat_id or not message:
             return {"success": False, "error": "chat_id e message obrigatórios"}
-        return self.send_message(chat_id, message)
+        return self.send_message(chat_id, message, queued=ctx.get("queued", True))
     
     def _action_send_document(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Ação: enviar documento."""
@@ -76,7 +135,7 @@ class TelegramAdapter(NexusComponent):
             with open(file_path, 'rb') as f:
                 files = {"document": f}
                 data = {"chat_id": chat_id, "caption": caption}
-                response = requests.post(url, files=files, data=data, timeout=60)
+                response = self._get_session().post(url, files=files, data=data, timeout=60)
             return {"success": response.status_code == 200}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""Fila de saída do TelegramAdapter — envio em background com pacing por chat.
+
+- ``enqueue`` nunca bloqueia o componente emissor (Overwatch, evolução...).
+- Cada chat tem um token bucket (Telegram: ~1 msg/s por chat) e há um bucket
+  global; mensagens que chegam enquanto o chat está sem token acumulam e são
+  enviadas juntas num único digest (até o limite de 4096 caracteres).
+- Mensagens maiores que o limite são quebradas em linhas já no ``enqueue``;
+  em HTML, tags abertas são fechadas no fim de cada parte e reabertas na
+  seguinte, então nenhuma parte corta uma tag ou entidade ao meio.
+- Respostas 429 respeitam ``retry_after`` e devolvem o lote à frente da fila.
+- As pendências são espelhadas em ``data/telegram_outbox.jrvs`` (gravação
+  atômica) e recarregadas na próxima inicialização.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.utils.jrvs_codec import JrvsDecodeError, read_file as jrvs_read, write_file as jrvs_write
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_SPILL_PATH = Path("data/telegram_outbox.jrvs")
+_SPILL_VERSION = 1
+MAX_MESSAGE_CHARS = 4096
+_DIGEST_SEPARATOR = "\n\n"
+_MAX_ATTEMPTS = 5
+_TAG_RE = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^>]*>")
+
+# send_fn(chat_id, text, parse_mode) -> (ok, retry_after_segundos)
+SendFn = Callable[[str, str, Optional[str]], Tuple[bool, Optional[float]]]
+
+
+def _safe_cut(text: str, limit: int, html: bool) -> int:
+    """Posição <= ``limit`` para cortar ``text`` sem partir tag ou entidade HTML."""
+    cut = limit
+    space = text.rfind(" ", limit // 2, cut)
+    if space > 0:
+        cut = space + 1
+    if html:
+        for opener, closer in (("<", ">"), ("&", ";")):
+            start = text.rfind(opener, 0, cut)
+            if start > 0 and text.find(closer, start, cut) < 0:
+                cut = start
+    return max(cut, 1)
+
+
+def split_message(text: str, parse_mode: Optional[str] = "HTML", limit: int = MAX_MESSAGE_CHARS) -> List[str]:
+    """Quebra ``text`` em partes de até ``limit`` caracteres, de preferência em fim de linha.
+
+    Com ``parse_mode="HTML"`` as tags abertas no fim de uma parte são fechadas
+    e reabertas no início da próxima, para que cada parte seja HTML válido.
+    """
+    if len(text) <= limit:
+        return [text]
+    html = (parse_mode or "").upper() == "HTML"
+    # Folga para as tags fechadas/reabertas nas bordas de cada parte
+    piece_limit = max(1, limit // 2) if html else limit
+    pieces: List[str] = []
+    for line in text.splitlines(keepends=True):
+        while len(line) > piece_limit:
+            cut = _safe_cut(line, piece_limit, html)
+            pieces.append(line[:cut])
+            line = line[cut:]
+        if line:
+            pieces.append(line)
+
+    def _closers(stack: List[Tuple[str, str]]) -> str:
+        return "".join(f"</{name}>" for name, _ in reversed(stack))
+
+    parts: List[str] = []
+    stack: List[Tuple[str, str]] = []  # (nome, tag de abertura original)
+    current, filled = "", False
+    for piece in pieces:
+        after = list(stack)
+        if html:
+            for match in _TAG_RE.finditer(piece):
+                name = match.group(2).lower()
+                if not match.group(1):
+                    after.append((name, match.group(0)))
+                elif any(n == name for n, _ in after):
+                    while after and after.pop()[0] != name:
+                        pass
+        if filled and len(current) + len(piece) + len(_closers(after)) > limit:
+            parts.append(current + _closers(stack))
+            current, filled = "".join(tag for _, tag in stack), False
+        current += piece
+        filled = filled or bool(piece.strip())
+        stack = after
+    if filled:
+        parts.append(current + _closers(stack))
+    return parts
+
+
+class TokenBucket:
+    """Token bucket simples: ``rate`` tokens/s, capacidade ``burst``."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Segundos até haver um token (0 se já há)."""
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self._tokens -= 1
+
+    def block_for(self, seconds: float) -> None:
+        """Zera o bucket por ``seconds`` (usado com ``retry_after``)."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class TelegramOutbox:
+    """Fila de notificações com coalescência e rate shaping.
+
+    Args:
+        send_fn: Função que efetivamente envia (ver ``SendFn``).
+        spill_path: Arquivo de persistência das pendências (None desativa).
+        per_chat_rate: Mensagens/s por chat.
+        per_chat_burst: Rajada máxima por chat.
+        global_rate: Mensagens/s somando todos os chats.
+        linger: Espera (s) após a primeira mensagem de um chat ocioso antes de
+            enviar, para agrupar rajadas já no primeiro envio.
+        max_pending: Limite de mensagens pendentes por chat (as mais antigas
+            são descartadas).
+    """
+
+    def __init__(
+        self,
+        send_fn: SendFn,
+        spill_path: Optional[Path] = _DEFAULT_SPILL_PATH,
+        per_chat_rate: float = 1.0,
+        per_chat_burst: float = 1.0,
+        global_rate: float = 25.0,
+        linger: float = 0.0,
+        max_pending: int = 500,
+    ) -> None:
+        self._send_fn = send_fn
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.linger = linger
+        self.max_pending = max_pending
+        self._global = TokenBucket(global_rate, max(1.0, global_rate))
+        self._buckets: Dict[str, TokenBucket] = {}
+        # chat_id → deque de {"text", "parse_mode", "ts", "attempts"}
+        self._pending: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._dirty = False
+        self._in_flight = 0
+        # Gravação do spill fora de ``_cond``; ``_spill_seq`` evita que um
+        # snapshot antigo sobrescreva um mais novo
+        self._spill_lock = threading.Lock()
+        self._spill_seq = self._spill_written = 0
+        self.stats = {"enqueued": 0, "sent": 0, "digests": 0, "coalesced": 0, "retries": 0, "dropped": 0}
+        self._load_spill()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def enqueue(self, chat_id: str, text: str, parse_mode: Optional[str] = "HTML") -> bool:
+        """Agenda o envio e retorna imediatamente."""
+        if not chat_id or not text:
+            return False
+        parts = split_message(text, parse_mode)
+        with self._cond:
+            queue = self._pending.setdefault(str(chat_id), deque())
+            now = time.time()
+            for part in parts:
+                queue.append({"text": part, "parse_mode": parse_mode, "ts": now, "attempts": 0})
+                if len(queue) > self.max_pending:
+                    queue.popleft()
+                    self.stats["dropped"] += 1
+            self.stats["enqueued"] += len(parts)
+            self._dirty = True
+            self._ensure_worker()
+            self._cond.notify_all()
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(len(q) for q in self._pending.values())
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Aguarda a fila esvaziar; True se esvaziou dentro do prazo."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._ensure_worker()
+            self._cond.notify_all()
+            while any(self._pending.values()) or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Tenta drenar, para o worker e grava o que sobrou no spill."""
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            self._thread = None
+            self._stopping = False
+            snapshot = self._spill_snapshot_locked(force=True)
+        self._write_spill(snapshot)
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="telegram-outbox", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                snapshot = self._spill_snapshot_locked()
+            self._write_spill(snapshot)
+            with self._cond:
+                batch, wait = self._next_batch_locked()
+                if batch is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait(wait)
+                    continue
+                self._in_flight += 1
+            chat_id, messages = batch
+            ok, retry_after = self._send_digest(chat_id, messages)
+            with self._cond:
+                self._in_flight -= 1
+                self._after_send_locked(chat_id, messages, ok, retry_after)
+                self._cond.notify_all()
+
+    def _next_batch_locked(self) -> Tuple[Optional[Tuple[str, List[Dict[str, Any]]]], Optional[float]]:
+        """Escolhe o próximo chat pronto; devolve (lote, None) ou (None, espera)."""
+        wait: Optional[float] = None
+        now = time.time()
+        for chat_id in list(self._pending):
+            queue = self._pending[chat_id]
+            if not queue:
+                del self._pending[chat_id]
+                continue
+            bucket = self._bucket(chat_id)
+            delay = bucket.wait_time()
+            if self.linger and delay == 0:
+                delay = max(0.0, queue[0]["ts"] + self.linger - now)
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            global_delay = self._global.wait_time()
+            if global_delay > 0:
+                return None, global_delay
+            bucket.take()
+            self._global.take()
+            # Round-robin: o chat atendido vai para o fim
+            self._pending.move_to_end(chat_id)
+            return (chat_id, self._take_digest_locked(queue)), None
+        return None, wait
+
+    @staticmethod
+    def _take_digest_locked(queue: Deque[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Retira da fila as mensagens que cabem num único envio."""
+        batch = [queue.popleft()]
+        size = len(batch[0]["text"])
+        while queue and queue[0]["parse_mode"] == batch[0]["parse_mode"]:
+            extra = len(_DIGEST_SEPARATOR) + len(queue[0]["text"])
+            if size + extra + 64 > MAX_MESSAGE_CHARS:
+                break
+            size += extra
+            batch.append(queue.popleft())
+        return batch
+
+    def _send_digest(self, chat_id: str, messages: List[Dict[str, Any]]) -> Tuple[bool, Optional[float]]:
+        if len(messages) == 1:
+            text = messages[0]["text"]
+        else:
+            header = f"📬 {len(messages)} notificações"
+            text = header + _DIGEST_SEPARATOR + _DIGEST_SEPARATOR.join(m["text"] for m in messages)
+        try:
+            return self._send_fn(chat_id, text, messages[0]["parse_mode"])
+        except Exception as exc:
+            logger.warning("[TELEGRAM] Falha no envio para %s: %s", chat_id, exc)
+            return False, None
+
+    def _after_send_locked(
+        self, chat_id: str, messages: List[Dict[str, Any]], ok: bool, retry_after: Optional[float]
+    ) -> None:
+        if ok:
+            self.stats["sent"] += 1
+            if len(messages) > 1:
+                self.stats["digests"] += 1
+                self.stats["coalesced"] += len(messages)
+            self._dirty = True
+            return
+        keep = []
+        for msg in messages:
+            msg["attempts"] += 1
+            if msg["attempts"] < _MAX_ATTEMPTS:
+                keep.append(msg)
+            else:
+                self.stats["dropped"] += 1
+        if keep:
+            self.stats["retries"] += 1
+            self._pending.setdefault(chat_id, deque()).extendleft(reversed(keep))
+        # Sem retry_after: backoff exponencial pelo número de tentativas
+        attempts = max((m["attempts"] for m in messages), default=1)
+        self._bucket(chat_id).block_for(retry_after if retry_after is not None else min(30.0, 2 ** attempts))
+        self._dirty = True
+
+    def _bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+        return bucket
+
+    # ------------------------------------------------------------------
+    # Spill
+    # ------------------------------------------------------------------
+
+    def _load_spill(self) -> None:
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        try:
+            payload = jrvs_read(self.spill_path)
+        except (OSError, JrvsDecodeError) as exc:
+            logger.warning("[TELEGRAM] Spill da fila inválido (%s): %s", self.spill_path, exc)
+            return
+        if not isinstance(payload, dict) or payload.get("version") != _SPILL_VERSION:
+            return
+        restored = 0
+        for chat_id, messages in (payload.get("pending") or {}).items():
+            queue: Deque[Dict[str, Any]] = deque()
+            for msg in messages or ():
+                # Spills antigos podem ter mensagens acima do limite
+                for part in split_message(msg["text"], msg.get("parse_mode")):
+                    queue.append({**msg, "text": part})
+            if queue:
+                self._pending[chat_id] = queue
+                restored += len(queue)
+        if restored:
+            logger.info("[TELEGRAM] %d notificações pendentes restauradas do spill", restored)
+
+    def _spill_snapshot_locked(self, force: bool = False) -> Optional[Tuple[int, Dict[str, List[Dict[str, Any]]]]]:
+        """Copia as pendências sob ``_cond``; a gravação fica para ``_write_spill``."""
+        if self.spill_path is None or not (self._dirty or force):
+            return None
+        self._dirty = False
+        self._spill_seq += 1
+        return self._spill_seq, {chat: [dict(m) for m in q] for chat, q in self._pending.items() if q}
+
+    def _write_spill(self, snapshot: Optional[Tuple[int, Dict[str, List[Dict[str, Any]]]]]) -> None:
+        if snapshot is None:
+            return
+        seq, pending = snapshot
+        with self._spill_lock:
+            if seq <= self._spill_written:
+                return
+            self._spill_written = seq
+            try:
+                if not pending:
+                    if self.spill_path.exists():
+                        self.spill_path.unlink()
+                    return
+                tmp = self.spill_path.with_name(self.spill_path.name + ".tmp")
+                jrvs_write(tmp, {"version": _SPILL_VERSION, "pending": pending})
+                os.replace(tmp, self.spill_path)
+            except OSError as exc:
+                logger.warning("[TELEGRAM] Falha ao gravar spill da fila: %s", exc)
@@ -10,9 +10,14 @@ Implements :class:`app.core.nexuscomponent.NexusComponent`.
 
 import logging
 import os
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
+from app.adapters.infrastructure.vision_preprocess import (
+    VisionAnalysisCache,
+    preprocess_image,
+)
 from app.core.nexus import NexusComponent
 
 logger = logging.getLogger(__name__)
@@ -34,8 +39,10 @@ class VisionAdapter(NexusComponent):
 
     On :meth:`capture_and_analyze`, the adapter:
     1. Takes a silent screenshot (or webcam frame if ``use_webcam=True``).
-    2. Sends the image to Gemini 1.5 Flash with a short description prompt.
-    3. Returns the one-sentence description.
+    2. Crops/downscales/re-encodes it (see :mod:`vision_preprocess`).
+    3. Reuses a cached answer if a near-identical frame was analyzed recently
+       with the same prompt; otherwise sends it to Gemini 1.5 Flash.
+    4. Returns the one-sentence description.
 
     Args:
         api_key: Google Gemini API key (defaults to ``GEMINI_API_KEY`` env var).
@@ -45,6 +52,12 @@ class VisionAdapter(NexusComponent):
             Defaults to ``False``; must be set ``True`` **and** ``user_consent``
             must also be ``True`` before any image is sent externally.
         user_consent: Explicit per-session user consent for image uploads.
+        max_dimension: Longest side of the uploaded frame (``None`` = no resize).
+        image_format: Upload encoding: ``"JPEG"``, ``"WEBP"`` or ``"PNG"``.
+        image_quality: Encoder quality for lossy formats.
+        roi: Optional ``(left, top, right, bottom)`` crop box in pixels.
+        cache_ttl: Seconds a cached analysis stays valid (``0`` disables the cache).
+        hash_threshold: Max dHash Hamming distance for frames to share an analysis.
     """
 
     def __init__(
@@ -54,13 +67,60 @@ class VisionAdapter(NexusComponent):
         vision_model: str = _VISION_MODEL,
         allow_external_vision: bool = False,
         user_consent: bool = False,
+        max_dimension: Optional[int] = 1280,
+        image_format: str = "JPEG",
+        image_quality: int = 80,
+        roi: Optional[Tuple[int, int, int, int]] = None,
+        cache_ttl: float = 30.0,
+        hash_threshold: int = 5,
     ) -> None:
         self._api_key = api_key or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         self._use_webcam = use_webcam
         self._vision_model = vision_model
-        self.allow_external_vision: bool = allow_external_vision
-        self.user_consent: bool = user_consent
+        self._cache = VisionAnalysisCache(ttl=cache_ttl, threshold=hash_threshold) if cache_ttl > 0 else None
+        self.allow_external_vision = allow_external_vision
+        self.user_consent = user_consent
         self._audit_log: list = []
+        self.max_dimension = max_dimension
+        self.image_format = image_format
+        self.image_quality = image_quality
+        self.roi = roi
+        self._stats: Dict[str, Any] = {
+            "calls": 0,
+            "cache_hits": 0,
+            "bytes_captured": 0,
+            "bytes_uploaded": 0,
+            "last_latency_ms": None,
+        }
+
+    # ------------------------------------------------------------------
+    # Consent flags
+    # ------------------------------------------------------------------
+
+    @property
+    def allow_external_vision(self) -> bool:
+        return self._allow_external_vision
+
+    @allow_external_vision.setter
+    def allow_external_vision(self, value: bool) -> None:
+        self._allow_external_vision = bool(value)
+        if not value:
+            self._forget_external_results()
+
+    @property
+    def user_consent(self) -> bool:
+        return self._user_consent
+
+    @user_consent.setter
+    def user_consent(self, value: bool) -> None:
+        self._user_consent = bool(value)
+        if not value:
+            self._forget_external_results()
+
+    def _forget_external_results(self) -> None:
+        """Drop cached Gemini answers once uploads are no longer permitted."""
+        if self._cache is not None:
+            self._cache.clear()
 
     # ------------------------------------------------------------------
     # NexusComponent interface
@@ -84,18 +144,56 @@ class VisionAdapter(NexusComponent):
 
         Returns:
             A one-sentence description of the visual context, or ``None`` on failure.
+
+        Raises:
+            ExternalVisionNotAllowedError: When external upload is not permitted
+                (checked before the cache, so revoked consent also blocks
+                previously cached Gemini answers).
         """
+        started = time.perf_counter()
         image_bytes = self._capture_image()
         if image_bytes is None:
             logger.warning("🙈 [VisionAdapter] Nenhuma imagem capturada. Análise abortada.")
             return None
 
-        return self._analyze_with_gemini(image_bytes, prompt)
+        image = preprocess_image(
+            image_bytes,
+            max_dimension=self.max_dimension,
+            image_format=self.image_format,
+            quality=self.image_quality,
+            roi=self.roi,
+        )
+        self._stats["calls"] += 1
+        self._stats["bytes_captured"] += image.original_size
+        self._check_external_upload_consent(self._image_source())
+
+        if self._cache is not None:
+            cached = self._cache.get(prompt, image)
+            if cached is not None:
+                self._stats["cache_hits"] += 1
+                self._stats["last_latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                logger.debug("👁️ [VisionAdapter] Frame similar em cache — upload evitado.")
+                return cached
+
+        description = self._analyze_with_gemini(
+            image.data, prompt, mime_type=image.mime_type, check_consent=False
+        )
+        if description is not None and self._cache is not None:
+            self._cache.put(prompt, image, description)
+        self._stats["last_latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return description
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return upload/cache counters for the current session."""
+        return dict(self._stats)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _image_source(self) -> str:
+        return "webcam" if self._use_webcam else "screenshot"
+
     def _capture_image(self) -> Optional[bytes]:
         """Capture a screenshot or webcam frame and return raw PNG bytes."""
         if self._use_webcam:
@@ -188,9 +286,19 @@ class VisionAdapter(NexusComponent):
             entry["timestamp"],
         )
 
-    def _analyze_with_gemini(self, image_bytes: bytes, prompt: str) -> Optional[str]:
+    def _analyze_with_gemini(
+        self,
+        image_bytes: bytes,
+        prompt: str,
+        mime_type: str = "image/png",
+        check_consent: bool = True,
+    ) -> Optional[str]:
         """Send *image_bytes* to Gemini and return the text response.
 
+        Args:
+            check_consent: Set to ``False`` only when the caller has already
+                run :meth:`_check_external_upload_consent` for this frame.
+
         Raises:
             ExternalVisionNotAllowedError: When external upload is not permitted.
         """
@@ -198,21 +306,22 @@ class VisionAdapter(NexusComponent):
             logger.error("❌ [VisionAdapter] GEMINI_API_KEY não configurada.")
             return None
 
-        image_source = "webcam" if self._use_webcam else "screenshot"
-        self._check_external_upload_consent(image_source)
+        if check_consent:
+            self._check_external_upload_consent(self._image_source())
 
         try:
             from google import genai
             from google.genai import types
 
             client = genai.Client(api_key=self._api_key)
+            self._stats["bytes_uploaded"] += len(image_bytes)
             response = client.models.generate_content(
                 model=self._vision_model,
                 contents=[
                     types.Content(
                         role="user",
                         parts=[
-                            types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
+                            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
                             types.Part.from_text(text=prompt),
                         ],
                     )
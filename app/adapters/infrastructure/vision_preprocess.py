@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Vision preprocessing and perceptual-hash analysis cache.
+
+Module-level utilities used by :class:`VisionAdapter` to shrink captured
+frames before upload (downscale, region-of-interest crop, JPEG/WebP
+re-encoding) and to reuse previous analyses for near-identical frames via a
+difference hash (dHash) keyed cache with TTL.
+
+Pillow is optional: without it frames are sent unchanged and the cache falls
+back to exact byte matching.
+"""
+
+import hashlib
+import io
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Formats Pillow can re-encode to, mapped to their MIME type
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+# Size of the dHash grid (HASH_SIZE x HASH_SIZE bits)
+_HASH_SIZE = 8
+
+
+@dataclass
+class PreprocessedImage:
+    """Result of :func:`preprocess_image`.
+
+    Attributes:
+        data: Encoded image bytes ready for upload.
+        mime_type: MIME type matching ``data``.
+        phash: 64-bit dHash of the (cropped) frame, or ``None`` if Pillow is
+            unavailable or the frame could not be decoded.
+        digest: Exact content digest, used when ``phash`` is ``None``.
+        original_size: Size in bytes of the captured frame.
+    """
+
+    data: bytes
+    mime_type: str
+    phash: Optional[int]
+    digest: str
+    original_size: int
+
+
+def dhash(image, hash_size: int = _HASH_SIZE) -> int:
+    """Compute the difference hash of a Pillow image.
+
+    The frame is reduced to a ``(hash_size + 1) x hash_size`` grayscale grid and
+    each bit records whether a pixel is brighter than its right neighbour.
+    """
+    from PIL import Image
+
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+def preprocess_image(
+    image_bytes: bytes,
+    max_dimension: Optional[int] = 1280,
+    image_format: str = "JPEG",
+    quality: int = 80,
+    roi: Optional[Tuple[int, int, int, int]] = None,
+) -> PreprocessedImage:
+    """Crop, downscale and re-encode a captured frame.
+
+    Args:
+        image_bytes: Raw captured image (PNG from the capture helpers).
+        max_dimension: Longest side after resizing; ``None`` keeps the size.
+        image_format: ``"JPEG"``, ``"WEBP"`` or ``"PNG"``.
+        quality: Encoder quality for lossy formats.
+        roi: Optional ``(left, top, right, bottom)`` crop box in pixels.
+
+    Returns:
+        A :class:`PreprocessedImage`. When Pillow is missing or the bytes cannot
+        be decoded, the original bytes are returned as PNG with ``phash=None``.
+    """
+    digest = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+    fmt = image_format.upper()
+    if fmt not in _MIME_TYPES:
+        raise ValueError(f"Unsupported image format: {image_format}")
+
+    try:
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(image_bytes))
+        img.load()
+    except Exception as e:
+        logger.debug("🖼️ [VisionPreprocess] Pré-processamento indisponível: %s", e)
+        return PreprocessedImage(image_bytes, "image/png", None, digest, len(image_bytes))
+
+    if roi is not None:
+        img = img.crop(roi)
+    if max_dimension and max(img.size) > max_dimension:
+        img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    phash = dhash(img)
+    buf = io.BytesIO()
+    save_kwargs = {"optimize": True} if fmt == "PNG" else {"quality": quality}
+    img.save(buf, format=fmt, **save_kwargs)
+    data = buf.getvalue()
+    return PreprocessedImage(data, _MIME_TYPES[fmt], phash, digest, len(image_bytes))
+
+
+class VisionAnalysisCache:
+    """TTL cache of ``prompt + frame → analysis`` tolerant to small visual changes.
+
+    Entries are matched by prompt and by a dHash within ``threshold`` bits of
+    the stored frame (or by exact digest when no hash is available). The
+    cache is bounded and evicts least-recently-used entries.
+
+    Args:
+        ttl: Seconds an analysis stays valid.
+        threshold: Maximum Hamming distance for two frames to be "the same".
+        max_entries: Upper bound on stored analyses.
+    """
+
+    def __init__(self, ttl: float = 30.0, threshold: int = 5, max_entries: int = 128) -> None:
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[str, Optional[int], str, str, float]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def get(self, prompt: str, image: PreprocessedImage) -> Optional[str]:
+        """Return a cached analysis for a similar frame, or ``None``."""
+        now = time.monotonic()
+        with self._lock:
+            expired: List[int] = []
+            hit = None
+            for key, (p, phash, digest, answer, stored_at) in self._entries.items():
+                if now - stored_at > self.ttl:
+                    expired.append(key)
+                    continue
+                if p != prompt:
+                    continue
+                if image.phash is not None and phash is not None:
+                    if hamming_distance(image.phash, phash) <= self.threshold:
+                        hit = (key, answer)
+                        break
+                elif digest == image.digest:
+                    hit = (key, answer)
+                    break
+            for key in expired:
+                del self._entries[key]
+            if hit is None:
+                return None
+            self._entries.move_to_end(hit[0])
+            return hit[1]
+
+    def put(self, prompt: str, image: PreprocessedImage, answer: str) -> None:
+        """Store ``answer`` for ``prompt`` and this frame."""
+        with self._lock:
+            self._entries[self._next_id] = (prompt, image.phash, image.digest, answer, time.monotonic())
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
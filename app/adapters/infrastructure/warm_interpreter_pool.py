@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+"""WarmInterpreterPool — Interpretadores Python pré-aquecidos para ferramentas do agente.
+
+Rodar ``pytest`` ou uma função isolada num subprocesso novo paga, a cada
+ação, a partida do interpretador e o import do pacote ``app``. Este pool
+mantém N processos "zygote" que já importaram os módulos de ``preload`` e,
+para cada tarefa, fazem ``fork`` de um filho limpo:
+
+- o filho roda em sua própria sessão (``setsid``), com stdin em /dev/null e
+  stdout/stderr num arquivo temporário; ao fim, o grupo inteiro é morto;
+- o zygote aplica o timeout (``SIGKILL`` no grupo) e devolve o exit code;
+- a saída é limitada a ``max_output`` bytes (metade inicial + metade final,
+  onde fica o resumo do pytest);
+- antes de cada fork o zygote confere o mtime dos arquivos do projeto que
+  importou; se algum mudou (ex.: o agente editou um módulo), ele se recusa a
+  rodar e é substituído por um zygote novo, sem código defasado.
+
+Sem ``os.fork`` (Windows) ``available`` é False e o chamador mantém o
+caminho via subprocesso.
+
+Configuração por ambiente: ``DEV_AGENT_WARM_POOL`` (0 desliga),
+``DEV_AGENT_WARM_POOL_SIZE`` e ``DEV_AGENT_WARM_PRELOAD`` (módulos separados
+por vírgula).
+"""
+import atexit
+import importlib
+import json
+import logging
+import os
+import queue
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Além de ``pytest``, seus plugins internos (importados só dentro de pytest.main)
+_DEFAULT_PRELOAD = (
+    "app.core.nexus",
+    "app.domain.models",
+    "pytest",
+    "_pytest.python",
+    "_pytest.fixtures",
+    "_pytest.terminal",
+    "pytest_asyncio",
+)
+_DEFAULT_MAX_OUTPUT = 4000
+_SPAWN_TIMEOUT = 60.0
+_REPLY_GRACE = 10.0
+_POLL_INTERVAL = 0.005
+
+
+class TaskResult(NamedTuple):
+    """Resultado de uma tarefa executada num filho do pool."""
+
+    exit_code: int
+    output: str
+    timed_out: bool
+    truncated: bool
+    elapsed_ms: float
+
+
+# ----------------------------------------------------------------------
+# Lado do zygote (processo filho do pool)
+# ----------------------------------------------------------------------
+
+
+def _send(fd: int, payload: Dict[str, Any]) -> None:
+    os.write(fd, (json.dumps(payload) + "\n").encode("utf-8"))
+
+
+def _source_mtimes(root: str) -> Dict[str, float]:
+    """mtime dos arquivos do projeto já importados (para detectar edição)."""
+    tracked = {}
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if not path:
+            continue
+        path = os.path.abspath(path)
+        if path.startswith(root):
+            try:
+                tracked[path] = os.stat(path).st_mtime
+            except OSError:
+                pass
+    return tracked
+
+
+def _is_stale(tracked: Dict[str, float]) -> bool:
+    for path, mtime in tracked.items():
+        try:
+            if os.stat(path).st_mtime != mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def _run_request(request: Dict[str, Any]) -> int:
+    """Executa a tarefa no filho já isolado; retorna o exit code."""
+    kind = request.get("kind")
+    if kind == "pytest":
+        import pytest
+
+        return int(pytest.main(list(request.get("args", []))))
+    if kind == "call":
+        module_name, _, attr = str(request["target"]).partition(":")
+        func = getattr(importlib.import_module(module_name), attr)
+        result = func(**(request.get("kwargs") or {}))
+        if result is not None:
+            print(result)
+        return 0
+    raise ValueError(f"Tipo de tarefa desconhecido: {kind}")
+
+
+def _fork_task(request: Dict[str, Any], private_fds: Sequence[int]) -> Dict[str, Any]:
+    # Nada do buffer do zygote deve vazar para a saída do filho
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.setsid()
+            for fd in private_fds:
+                os.close(fd)
+            out = os.open(request["output"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.dup2(out, 1)
+            os.dup2(out, 2)
+            os.close(out)
+            if request.get("cwd"):
+                os.chdir(request["cwd"])
+            code = _run_request(request)
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(code)
+
+    deadline = time.monotonic() + float(request.get("timeout", 60.0))
+    timed_out = False
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            _, status = os.waitpid(pid, 0)
+            break
+        time.sleep(_POLL_INTERVAL)
+    # Netos que ficaram para trás (ex.: processos em background)
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    return {"exit": os.waitstatus_to_exitcode(status), "timed_out": timed_out}
+
+
+def _zygote_main(preload: Sequence[str]) -> None:
+    """Laço do zygote: importa ``preload`` e atende um pedido (JSON por linha) por vez."""
+    # Canal privado: prints de módulos importados não corrompem o protocolo
+    req_fd, rep_fd = os.dup(0), os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1):
+        os.dup2(devnull, fd)
+
+    loaded: List[str] = []
+    failed: List[str] = []
+    for name in preload:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except BaseException as exc:  # noqa: BLE001 - preload é melhor esforço
+            failed.append(f"{name}: {exc}")
+    tracked = _source_mtimes(os.getcwd())
+    _send(rep_fd, {"ready": True, "pid": os.getpid(), "loaded": loaded, "failed": failed})
+
+    with os.fdopen(req_fd, "r", encoding="utf-8") as requests:
+        for line in requests:
+            if not line.strip():
+                continue
+            if _is_stale(tracked):
+                _send(rep_fd, {"stale": True})
+                return
+            _send(rep_fd, _fork_task(json.loads(line), (req_fd, rep_fd, devnull)))
+
+
+# ----------------------------------------------------------------------
+# Lado do chamador
+# ----------------------------------------------------------------------
+
+
+class _Zygote:
+    """Um processo zygote e seu canal de pedidos/respostas."""
+
+    def __init__(self, preload: Sequence[str], cwd: str) -> None:
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", __name__, *preload],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd,
+            bufsize=0,
+            start_new_session=True,
+        )
+        self.healthy = True
+        ready = self.read_reply(_SPAWN_TIMEOUT)
+        if not ready or not ready.get("ready"):
+            self.close()
+            raise RuntimeError("Zygote não ficou pronto")
+        if ready.get("failed"):
+            logger.warning("[WarmInterpreterPool] Preload parcial: %s", "; ".join(ready["failed"]))
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, payload: Dict[str, Any], timeout: float) -> Optional[Dict[str, Any]]:
+        self.process.stdin.write((json.dumps(payload) + "\n").encode("utf-8"))
+        return self.read_reply(timeout)
+
+    def read_reply(self, timeout: float) -> Optional[Dict[str, Any]]:
+        line = b""
+        deadline = time.monotonic() + timeout
+        while not line.endswith(b"\n"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ready, _, _ = select.select([self.process.stdout], [], [], remaining)
+            if not ready:
+                return None
+            chunk = self.process.stdout.read(1)
+            if not chunk:
+                return None
+            line += chunk
+        return json.loads(line)
+
+    def close(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class WarmInterpreterPool:
+    """Pool de zygotes pré-aquecidos; cada tarefa roda num filho recém-forkado.
+
+    Zygotes são criados sob demanda até ``size``. Zygotes que morrem, estouram
+    o prazo ou detectam código-fonte alterado são descartados e substituídos
+    no próximo checkout.
+
+    Args:
+        size: Tarefas simultâneas (um zygote por tarefa em curso).
+        preload: Módulos importados uma vez em cada zygote.
+        cwd: Raiz do projeto (diretório de trabalho dos zygotes).
+        max_output: Limite padrão de bytes de saída por tarefa.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        preload: Sequence[str] = _DEFAULT_PRELOAD,
+        cwd: Optional[str] = None,
+        max_output: int = _DEFAULT_MAX_OUTPUT,
+    ) -> None:
+        self.size = max(1, size)
+        self.preload = tuple(preload)
+        self.cwd = os.path.abspath(cwd or os.getcwd())
+        self.max_output = max_output
+        self._idle: "queue.LifoQueue[_Zygote]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._counters = {"tasks": 0, "spawned": 0, "stale_restarts": 0, "timeouts": 0, "failures": 0}
+
+    @classmethod
+    def from_env(cls) -> "WarmInterpreterPool":
+        preload = os.getenv("DEV_AGENT_WARM_PRELOAD")
+        return cls(
+            size=int(os.getenv("DEV_AGENT_WARM_POOL_SIZE", "2")),
+            preload=[m.strip() for m in preload.split(",") if m.strip()] if preload else _DEFAULT_PRELOAD,
+        )
+
+    @property
+    def available(self) -> bool:
+        return hasattr(os, "fork") and os.name == "posix"
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def run_pytest(self, args: Sequence[str], timeout: float = 120.0, cwd: Optional[str] = None,
+                   max_output: Optional[int] = None) -> TaskResult:
+        """Roda ``pytest.main(args)`` num filho do pool."""
+        return self.run({"kind": "pytest", "args": list(args)}, timeout, cwd, max_output)
+
+    def call(self, target: str, kwargs: Optional[Dict[str, Any]] = None, timeout: float = 60.0,
+             cwd: Optional[str] = None, max_output: Optional[int] = None) -> TaskResult:
+        """Chama ``"pacote.modulo:funcao"(**kwargs)`` num filho; a saída inclui o retorno impresso."""
+        return self.run({"kind": "call", "target": target, "kwargs": kwargs or {}}, timeout, cwd, max_output)
+
+    def run(self, request: Dict[str, Any], timeout: float, cwd: Optional[str] = None,
+            max_output: Optional[int] = None) -> TaskResult:
+        if not self.available:
+            raise RuntimeError("WarmInterpreterPool requer os.fork (POSIX)")
+        start = time.perf_counter()
+        fd, output_path = tempfile.mkstemp(prefix="warm_pool_", suffix=".out")
+        os.close(fd)
+        payload = dict(request, timeout=timeout, cwd=os.path.abspath(cwd or self.cwd), output=output_path)
+        try:
+            reply = self._dispatch(payload, timeout)
+            output, truncated = self._read_output(output_path, max_output or self.max_output)
+        finally:
+            try:
+                os.unlink(output_path)
+            except OSError:
+                pass
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._counters["tasks"] += 1
+            if reply is None:
+                self._counters["failures"] += 1
+            elif reply.get("timed_out"):
+                self._counters["timeouts"] += 1
+        if reply is None:
+            return TaskResult(-1, output or "ERRO: worker do pool morreu ou não respondeu", False, truncated, elapsed_ms)
+        return TaskResult(int(reply.get("exit", -1)), output, bool(reply.get("timed_out")), truncated, elapsed_ms)
+
+    def warm(self) -> None:
+        """Cria todos os zygotes agora (em vez de no primeiro uso)."""
+        zygotes = []
+        try:
+            for _ in range(self.size):
+                zygotes.append(self._acquire(_SPAWN_TIMEOUT))
+        finally:
+            for zygote in zygotes:
+                self._idle.put(zygote)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "size": self.size, "created": self._created, "idle": self._idle.qsize()}
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _dispatch(self, payload: Dict[str, Any], timeout: float) -> Optional[Dict[str, Any]]:
+        # Uma nova tentativa quando o zygote estava defasado ou morto
+        for _ in range(2):
+            with self._checkout(timeout) as zygote:
+                try:
+                    reply = zygote.request(payload, timeout + _REPLY_GRACE)
+                except OSError:
+                    reply = None
+                if reply is None:
+                    zygote.healthy = False
+                    continue
+                if reply.get("stale"):
+                    zygote.healthy = False
+                    with self._lock:
+                        self._counters["stale_restarts"] += 1
+                    continue
+                return reply
+        return None
+
+    def _acquire(self, timeout: float) -> _Zygote:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                zygote = _Zygote(self.preload, self.cwd)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            with self._lock:
+                self._counters["spawned"] += 1
+            return zygote
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Nenhum interpretador livre após {timeout}s")
+
+    def _discard(self, zygote: _Zygote) -> None:
+        zygote.close()
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def _checkout(self, timeout: float) -> Iterator[_Zygote]:
+        zygote = self._acquire(timeout)
+        if not zygote.is_alive():
+            self._discard(zygote)
+            zygote = self._acquire(timeout)
+        zygote.healthy = True
+        try:
+            yield zygote
+        finally:
+            if zygote.healthy and zygote.is_alive():
+                self._idle.put(zygote)
+            else:
+                self._discard(zygote)
+
+    @staticmethod
+    def _read_output(path: str, limit: int) -> Tuple[str, bool]:
+        try:
+            size = os.path.getsize(path)
+            with open(path, "rb") as fh:
+                if size <= limit:
+                    return fh.read().decode("utf-8", errors="replace"), False
+                half = limit // 2
+                head = fh.read(half)
+                fh.seek(size - half)
+                tail = fh.read()
+        except OSError:
+            return "", False
+        omitted = size - len(head) - len(tail)
+        text = (
+            head.decode("utf-8", errors="replace")
+            + f"\n... [{omitted} bytes omitidos] ...\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+        return text, True
+
+
+_pool: Optional[WarmInterpreterPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_warm_pool() -> Optional[WarmInterpreterPool]:
+    """Pool compartilhado (configurado via ambiente); None se desligado ou indisponível."""
+    global _pool
+    if os.getenv("DEV_AGENT_WARM_POOL", "1") == "0":
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = WarmInterpreterPool.from_env()
+        return _pool if _pool.available else None
+
+
+@atexit.register
+def _close_pool() -> None:
+    if _pool is not None:
+        _pool.close()
+
+
+if __name__ == "__main__":
+    _zygote_main(sys.argv[1:])
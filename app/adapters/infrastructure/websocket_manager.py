@@ -3,128 +3,368 @@
 """WebSocket Manager — Conexões em tempo real para HUD e notificações.
 
 Integrado com FineTuneDatasetCollector para coleta automática de dados.
+
+Cada conexão tem uma fila de envio limitada drenada por uma task escritora
+própria: ``broadcast_to_user`` apenas enfileira, então um cliente lento não
+atrasa os demais nem quem disparou o broadcast. Quando a fila enche, a
+política de consumidor lento (``WS_SLOW_CONSUMER_POLICY``) descarta a
+mensagem mais antiga (``drop_oldest``) ou desconecta o cliente
+(``disconnect``). A coleta para fine-tuning roda num executor, fora do
+caminho do broadcast.
 """
+import asyncio
+import functools
 import logging
-from typing import Dict, Set, Optional, Any
-from fastapi import WebSocket
+import os
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Set
+
 from app.core.nexus import NexusComponent, nexus
 
+if TYPE_CHECKING:  # pragma: no cover
+    from fastapi import WebSocket
+
 logger = logging.getLogger(__name__)
 
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DISCONNECT = "disconnect"
+_DEFAULT_QUEUE_SIZE = 256
+_DEFAULT_SEND_TIMEOUT = 10.0
+_LATENCY_ALPHA = 0.2  # peso da amostra nova na média móvel
+
+
+class _Connection:
+    """Uma conexão WebSocket com fila de envio e task escritora."""
+
+    def __init__(self, user_id: str, websocket: "WebSocket", max_queue: int) -> None:
+        self.user_id = user_id
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.queue: Deque[Dict[str, Any]] = deque()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.closed = False
+        self.sending = False
+        self.sent = 0
+        self.dropped = 0
+        self.latency_avg_ms = 0.0
+        self.latency_max_ms = 0.0
+
+    def record_latency(self, ms: float) -> None:
+        self.latency_avg_ms = ms if self.sent == 0 else (
+            _LATENCY_ALPHA * ms + (1 - _LATENCY_ALPHA) * self.latency_avg_ms
+        )
+        self.latency_max_ms = max(self.latency_max_ms, ms)
+        self.sent += 1
+
+
 class WebSocketManager(NexusComponent):
-    """Gerencia conexões WebSocket ativas."""
-    
-    def __init__(self):
+    """Gerencia conexões WebSocket ativas.
+
+    Args:
+        max_queue: Mensagens pendentes por conexão (``WS_SEND_QUEUE_SIZE``).
+        slow_consumer_policy: ``drop_oldest`` ou ``disconnect``
+            (``WS_SLOW_CONSUMER_POLICY``).
+        send_timeout: Tempo máximo (s) de um ``send_json``; estourado, a
+            conexão é encerrada.
+    """
+
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        send_timeout: float = _DEFAULT_SEND_TIMEOUT,
+    ):
         super().__init__()
-        self._connections: Dict[str, Set[WebSocket]] = {}
+        self._connections: Dict[str, Dict["WebSocket", _Connection]] = {}
         self._finetune_collector = None
-    
+        self.max_queue = max(1, max_queue or int(os.getenv("WS_SEND_QUEUE_SIZE", str(_DEFAULT_QUEUE_SIZE))))
+        policy = slow_consumer_policy or os.getenv("WS_SLOW_CONSUMER_POLICY", POLICY_DROP_OLDEST)
+        if policy not in (POLICY_DROP_OLDEST, POLICY_DISCONNECT):
+            logger.warning("[WebSocket] Política desconhecida '%s'; usando %s", policy, POLICY_DROP_OLDEST)
+            policy = POLICY_DROP_OLDEST
+        self.slow_consumer_policy = policy
+        self.send_timeout = send_timeout
+        self._lock = threading.Lock()
+        self._capture_tasks: Set["asyncio.Future[Any]"] = set()
+        self._slow_disconnects = 0
+
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """NexusComponent entry-point.
-        
+
         Args:
             context: Dict com ações suportadas:
                 - "connect": {user_id, websocket}
                 - "disconnect": {user_id, websocket}
                 - "broadcast": {user_id, message}
                 - "list_users": {}
-                
+                - "metrics": {}
+
         Returns:
             Dict com resultado da operação.
         """
         action = context.get("action", "")
-        
+
         if action == "connect":
             user_id = context.get("user_id")
             websocket = context.get("websocket")
             if user_id and websocket:
-                self._connections.setdefault(user_id, set()).add(websocket)
+                self._register(user_id, websocket)
                 self._finetune_collector = nexus.resolve("finetune_dataset_collector")
                 return {"success": True, "connected": user_id}
             return {"success": False, "error": "user_id ou websocket ausente"}
-            
+
         elif action == "disconnect":
             user_id = context.get("user_id")
             websocket = context.get("websocket")
             if user_id and user_id in self._connections:
-                self._connections[user_id].discard(websocket)
-                if not self._connections[user_id]:
-                    del self._connections[user_id]
+                self.disconnect(user_id, websocket)
                 return {"success": True, "disconnected": user_id}
             return {"success": False, "error": "Conexão não encontrada"}
-            
+
         elif action == "broadcast":
             user_id = context.get("user_id")
             message = context.get("message")
             if user_id in self._connections and message:
-                for ws in list(self._connections[user_id]):
-                    try:
-                        # Nota: envio real requer loop assíncrono externo
-                        pass
-                    except Exception:
-                        self._connections[user_id].discard(ws)
-                return {"success": True, "broadcasted_to": user_id}
+                queued = self._enqueue_for_user(user_id, message)
+                return {"success": True, "broadcasted_to": user_id, "queued": queued}
             return {"success": False, "error": "Usuário ou mensagem inválida"}
-            
+
         elif action == "list_users":
             return {"success": True, "users": list(self._connections.keys())}
-            
+
+        elif action == "metrics":
+            return {"success": True, **self.metrics()}
+
         return {"success": False, "error": f"Ação desconhecida: {action}"}
-    
-    async def connect(self, user_id: str, websocket: WebSocket):
-        """Registra nova conexão WebSocket."""
+
+    async def connect(self, user_id: str, websocket: "WebSocket"):
+        """Registra nova conexão WebSocket e inicia sua task escritora."""
         await websocket.accept()
-        if user_id not in self._connections:
-            self._connections[user_id] = set()
-        self._connections[user_id].add(websocket)
+        self._register(user_id, websocket)
         self._finetune_collector = nexus.resolve("finetune_dataset_collector")
         logger.info("[WebSocket] Usuário %s conectado. Total: %d", user_id, len(self._connections[user_id]))
-    
-    async def disconnect(self, user_id: str, websocket: WebSocket):
-        """Remove conexão WebSocket."""
-        if user_id in self._connections:
-            self._connections[user_id].discard(websocket)
-            if not self._connections[user_id]:
+
+    def disconnect(self, user_id: str, websocket: Optional["WebSocket"] = None):
+        """Remove uma conexão (ou todas do usuário, se ``websocket`` for None)."""
+        with self._lock:
+            conns = self._connections.get(user_id)
+            if not conns:
+                return
+            targets = list(conns.values()) if websocket is None else [c for c in [conns.get(websocket)] if c]
+            for conn in targets:
+                del conns[conn.websocket]
+            if not conns:
                 del self._connections[user_id]
+        for conn in targets:
+            self._stop(conn)
         logger.info("[WebSocket] Usuário %s desconectado.", user_id)
-    
-    async def broadcast_to_user(self, user_id: str, message: dict):
-        """Envia mensagem para usuário específico via WebSocket."""
-        if user_id not in self._connections:
-            return
-        
-        disconnected = set()
-        for websocket in self._connections[user_id]:
-            try:
-                await websocket.send_json(message)
-                
-                # ADIÇÃO: Registra interação para fine-tuning se for resposta de comando
-                if message.get("type") == "command_response" and self._finetune_collector:
-                    self._finetune_collector.collect_from_interaction(
-                        user_id=user_id,
-                        prompt=message.get("original_prompt", ""),
-                        completion=message.get("response", ""),
-                        outcome="executed" if message.get("success", False) else "clarified",
-                        source="hud",
-                        feedback=None
-                    )
-                    
-            except Exception as e:
-                logger.warning("[WebSocket] Erro ao enviar para %s: %s", user_id, e)
-                disconnected.add(websocket)
-        
-        for ws in disconnected:
-            self._connections[user_id].discard(ws)
-    
-    async def broadcast_to_all(self, message: dict):
+
+    async def broadcast_to_user(self, user_id: str, message: dict) -> int:
+        """Enfileira mensagem para todas as conexões do usuário.
+
+        Retorna imediatamente; o envio ocorre nas tasks escritoras.
+
+        Returns:
+            Número de conexões que receberam a mensagem na fila.
+        """
+        queued = self._enqueue_for_user(user_id, message)
+        # Registra interação para fine-tuning se for resposta de comando
+        # (uma vez por broadcast, fora do caminho de envio)
+        if queued and message.get("type") == "command_response" and self._finetune_collector:
+            self._schedule_capture(user_id, message)
+        return queued
+
+    async def broadcast_to_all(self, message: dict) -> int:
         """Envia mensagem para todos os usuários conectados."""
+        total = 0
         for user_id in list(self._connections.keys()):
-            await self.broadcast_to_user(user_id, message)
-    
+            total += await self.broadcast_to_user(user_id, message)
+        return total
+
+    async def drain(self, timeout: float = 5.0) -> bool:
+        """Aguarda as filas esvaziarem; True se esvaziaram no prazo."""
+        deadline = time.monotonic() + timeout
+        while any(conn.queue or conn.sending for conn in self._all_connections()):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.005)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Profundidade das filas e latência de envio, por conexão e agregadas."""
+        conns = self._all_connections()
+        per_connection: List[Dict[str, Any]] = [
+            {
+                "user_id": c.user_id,
+                "queue_depth": len(c.queue),
+                "sent": c.sent,
+                "dropped": c.dropped,
+                "send_latency_avg_ms": round(c.latency_avg_ms, 3),
+                "send_latency_max_ms": round(c.latency_max_ms, 3),
+            }
+            for c in conns
+        ]
+        return {
+            "connections": len(conns),
+            "queue_depth_total": sum(m["queue_depth"] for m in per_connection),
+            "queue_depth_max": max((m["queue_depth"] for m in per_connection), default=0),
+            "sent_total": sum(m["sent"] for m in per_connection),
+            "dropped_total": sum(m["dropped"] for m in per_connection),
+            "slow_consumer_disconnects": self._slow_disconnects,
+            "send_latency_max_ms": max((m["send_latency_max_ms"] for m in per_connection), default=0.0),
+            "per_connection": per_connection,
+        }
+
+    def is_connected(self, user_id: str) -> bool:
+        """True se o usuário tem ao menos uma conexão ativa."""
+        return bool(self._connections.get(user_id))
+
+    def connection_count(self, user_id: Optional[str] = None) -> int:
+        """Conexões ativas do usuário (ou de todos, se ``user_id`` for None)."""
+        if user_id is not None:
+            return len(self._connections.get(user_id, {}))
+        return self.get_connection_count()
+
+    def connected_users(self) -> list:
+        """Alias de :meth:`get_connected_users`."""
+        return self.get_connected_users()
+
     def get_connected_users(self) -> list:
         """Retorna lista de usuários conectados."""
         return list(self._connections.keys())
-    
+
     def get_connection_count(self) -> int:
         """Retorna total de conexões ativas."""
-        return sum(len(conns) for conns in self._connections.values())
\ No newline at end of file
+        return sum(len(conns) for conns in self._connections.values())
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _all_connections(self) -> List[_Connection]:
+        with self._lock:
+            return [c for conns in self._connections.values() for c in conns.values()]
+
+    def _register(self, user_id: str, websocket: "WebSocket") -> _Connection:
+        with self._lock:
+            conns = self._connections.setdefault(user_id, {})
+            conn = conns.get(websocket)
+            if conn is None:
+                conn = conns[websocket] = _Connection(user_id, websocket, self.max_queue)
+        self._ensure_writer(conn)
+        return conn
+
+    def _ensure_writer(self, conn: _Connection) -> None:
+        """Inicia a task escritora no loop corrente (se houver um rodando)."""
+        if conn.task is not None and not conn.task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # sem loop: a task é criada no próximo broadcast assíncrono
+        conn.loop = loop
+        conn.wakeup = asyncio.Event()
+        if conn.queue:
+            conn.wakeup.set()
+        conn.task = loop.create_task(self._writer(conn))
+
+    def _enqueue_for_user(self, user_id: str, message: dict) -> int:
+        with self._lock:
+            conns = list(self._connections.get(user_id, {}).values())
+        queued = 0
+        for conn in conns:
+            if self._enqueue(conn, message):
+                queued += 1
+        return queued
+
+    def _enqueue(self, conn: _Connection, message: dict) -> bool:
+        if conn.closed:
+            return False
+        if len(conn.queue) >= conn.max_queue:
+            if self.slow_consumer_policy == POLICY_DISCONNECT:
+                logger.warning(
+                    "[WebSocket] Consumidor lento (%s, fila=%d) — desconectando", conn.user_id, len(conn.queue)
+                )
+                self._slow_disconnects += 1
+                self.disconnect(conn.user_id, conn.websocket)
+                return False
+            conn.queue.popleft()
+            conn.dropped += 1
+        conn.queue.append(message)
+        self._ensure_writer(conn)
+        self._wake(conn)
+        return True
+
+    @staticmethod
+    def _wake(conn: _Connection) -> None:
+        if conn.wakeup is None or conn.loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is conn.loop:
+            conn.wakeup.set()
+        elif not conn.loop.is_closed():
+            conn.loop.call_soon_threadsafe(conn.wakeup.set)
+
+    async def _writer(self, conn: _Connection) -> None:
+        """Drena a fila da conexão; falha/timeout de envio encerra a conexão."""
+        while not conn.closed:
+            if not conn.queue:
+                conn.wakeup.clear()
+                await conn.wakeup.wait()
+                continue
+            message = conn.queue.popleft()
+            conn.sending = True
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(conn.websocket.send_json(message), self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("[WebSocket] Erro ao enviar para %s: %s", conn.user_id, e)
+                self.disconnect(conn.user_id, conn.websocket)
+                return
+            finally:
+                conn.sending = False
+            conn.record_latency((time.perf_counter() - started) * 1000)
+
+    def _stop(self, conn: _Connection) -> None:
+        conn.closed = True
+        conn.queue.clear()
+        task = conn.task
+        if task is None or task.done():
+            return
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        if task is current:
+            return  # a própria escritora encerrando: o loop sai sozinho
+        if conn.loop is not None and not conn.loop.is_closed():
+            conn.loop.call_soon_threadsafe(task.cancel)
+
+    def _schedule_capture(self, user_id: str, message: dict) -> None:
+        collector = self._finetune_collector
+        capture = functools.partial(
+            collector.collect_from_interaction,
+            user_id=user_id,
+            prompt=message.get("original_prompt", ""),
+            completion=message.get("response", ""),
+            outcome="executed" if message.get("success", False) else "clarified",
+            source="hud",
+            feedback=None,
+        )
+        future = asyncio.get_running_loop().run_in_executor(None, capture)
+        self._capture_tasks.add(future)
+        future.add_done_callback(self._capture_done)
+
+    def _capture_done(self, future: "asyncio.Future[Any]") -> None:
+        self._capture_tasks.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning("[WebSocket] Falha na coleta de fine-tuning: %s", future.exception())
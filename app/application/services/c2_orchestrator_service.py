@@ -22,6 +22,7 @@ from typing import Any, Dict, List, Optional
 from app.application.ports.tactical_command_port import TacticalCommandPort
 from app.application.services.device_orchestrator_service import DeviceOrchestratorService
 from app.domain.models.soldier import SoldierStatus
+from app.utils.daemon_lease import claim_daemon
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +72,9 @@ class KeepAliveProvider:
         """Start the KeepAlive loop in a daemon thread (non-blocking)."""
         if self._running:
             return
+        if not claim_daemon("c2_keepalive"):
+            logger.info("💓 [C2-KeepAlive] Heartbeat ativo em outro worker.")
+            return
         self._running = True
         self._thread = threading.Thread(
             target=self._loop, daemon=True, name="C2-KeepAlive"
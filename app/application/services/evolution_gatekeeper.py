@@ -16,15 +16,15 @@ Método principal::
     gatekeeper.approve_evolution(proposed_change) → (True, "approved") | (False, reason)
 """
 
-import json
 import logging
 import subprocess
-import sys
 import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.application.services.evolution_test_impact import PytestInventory, parse_test_count as _parse_test_count
 from app.core.nexus import NexusComponent, nexus
+from app.utils.journal_store import get_journal_store
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +57,7 @@ class EvolutionGatekeeper(NexusComponent):
         self.min_test_count = min_test_count
         self.rollback_lookback = rollback_lookback
         self._last_test_count: Optional[int] = None
+        self._test_inventory = PytestInventory()
 
     def configure(self, config: Dict[str, Any]) -> None:
         """Configura o gatekeeper via dicionário."""
@@ -150,14 +151,8 @@ class EvolutionGatekeeper(NexusComponent):
     def _check_test_count(self) -> Tuple[bool, str]:
         """(a) Verifica se o número de testes coletados não regrediu."""
         try:
-            result = subprocess.run(
-                [sys.executable, "-m", "pytest", "--co", "-q", "--tb=no"],
-                capture_output=True,
-                text=True,
-                timeout=60,
-            )
-            output = result.stdout + result.stderr
-            count = _parse_test_count(output)
+            # Só recoleta (pytest --co) quando a árvore tests/ mudou
+            count = self._test_inventory.count()
             logger.info("[EvolutionGatekeeper] Testes coletados: %d", count)
 
             if self._last_test_count is None:
@@ -250,7 +245,9 @@ class EvolutionGatekeeper(NexusComponent):
             if sandbox is None:
                 logger.debug("[EvolutionGatekeeper] EvolutionSandbox indisponível — verificação pulada.")
                 return True, "ok"
-            result = sandbox.test_proposal(proposed_code, target_file)
+            result = sandbox.test_proposal(
+                proposed_code, target_file, proposed_change.get("files_modified") or None
+            )
             if result.get("passed", False):
                 return True, "ok"
             errors = "; ".join(result.get("errors", []))
@@ -296,10 +293,7 @@ class EvolutionGatekeeper(NexusComponent):
             "files_modified": proposed_change.get("files_modified", []),
         }
         try:
-            _rejections_file = Path("data/gatekeeper_rejections.jsonl")
-            _rejections_file.parent.mkdir(parents=True, exist_ok=True)
-            with _rejections_file.open("a", encoding="utf-8") as fh:
-                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            get_journal_store(Path("data/gatekeeper_rejections.jsonl"), ts_field="timestamp").append(entry)
         except Exception as exc:
             logger.debug("[EvolutionGatekeeper] Falha ao persistir rejeição: %s", exc)
 
@@ -334,23 +328,3 @@ class EvolutionGatekeeper(NexusComponent):
         except Exception as exc:
             logger.debug("[EvolutionGatekeeper] Falha ao calcular reward: %s", exc)
 
-
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
-
-def _parse_test_count(output: str) -> int:
-    """Extrai número de testes coletados da saída do pytest --co -q.
-
-    Formatos suportados:
-        "123 tests collected"
-        "1 test collected"
-        "collected 42 items"
-        "<no tests ran>"  → retorna 0
-    """
-    import re
-    # Busca qualquer número seguido de "test" ou "item"
-    match = re.search(r"(\d+)\s+(?:test|item)", output)
-    if match:
-        return int(match.group(1))
-    return 0
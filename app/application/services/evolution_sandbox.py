@@ -7,29 +7,34 @@ Fluxo do ``test_proposal``:
     (a) Cria diretório temporário em ``data/sandbox/<timestamp>/``.
     (b) Copia o arquivo-alvo para o diretório temporário.
     (c) Aplica o ``proposal_code`` ao arquivo copiado.
-    (d) Executa ``pytest tests/ -v --tb=short -x`` via subprocess.
+    (d) Seleciona os testes afetados pelos arquivos tocados (mapa de imports
+        incremental, ver ``evolution_test_impact``) e os executa com
+        ``pytest --tb=short -x`` em ``workers`` processos paralelos; sem
+        nenhum teste mapeado, roda a suíte completa.
     (e) Captura stdout/stderr.
     (f) Apaga o diretório temporário (``try/finally``).
 
 Configuração:
     SANDBOX_ENABLED (env, padrão "true"): permite desabilitar o sandbox.
+    SANDBOX_TEST_WORKERS (env, padrão min(4, CPUs)): shards pytest simultâneos.
 """
 
 import logging
 import os
 import shutil
 import subprocess
-import sys
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from app.application.services.evolution_test_impact import ImportImpactMap, plan_shards, run_shards
 from app.core.nexus import NexusComponent
 
 logger = logging.getLogger(__name__)
 
 _SANDBOX_BASE = Path("data/sandbox")
+_DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
 
 
 class EvolutionSandbox(NexusComponent):
@@ -39,12 +44,18 @@ class EvolutionSandbox(NexusComponent):
         enabled (bool): sobrescreve a variável de ambiente SANDBOX_ENABLED.
         sandbox_base (str): diretório base para sandboxes (padrão ``data/sandbox``).
         timeout (int): timeout em segundos para a execução do pytest (padrão 120).
+        workers (int): processos pytest simultâneos (padrão ``SANDBOX_TEST_WORKERS``
+            ou até 4).
+        impact_selection (bool): roda só os testes afetados (padrão True).
     """
 
     def __init__(self) -> None:
         self._enabled: Optional[bool] = None  # None = usa env var
         self.sandbox_base: Path = _SANDBOX_BASE
         self.timeout: int = 120
+        self.workers: int = int(os.getenv("SANDBOX_TEST_WORKERS", str(_DEFAULT_WORKERS)))
+        self.impact_selection: bool = True
+        self._impact_map: Optional[ImportImpactMap] = None
 
     @property
     def enabled(self) -> bool:
@@ -65,6 +76,10 @@ class EvolutionSandbox(NexusComponent):
             self.sandbox_base = Path(config["sandbox_base"])
         if "timeout" in config:
             self.timeout = int(config["timeout"])
+        if "workers" in config:
+            self.workers = max(1, int(config["workers"]))
+        if "impact_selection" in config:
+            self.impact_selection = bool(config["impact_selection"])
 
     def can_execute(self, context: Optional[Dict[str, Any]] = None) -> bool:
         """Retorna True se o sandbox está habilitado."""
@@ -76,6 +91,7 @@ class EvolutionSandbox(NexusComponent):
         Campos aceitos em *context*:
             proposal_code (str): código da proposta a testar.
             target_file (str):   caminho do arquivo-alvo (pode ser vazio).
+            files_modified (list): arquivos tocados (opcional; guia a seleção de testes).
 
         Returns:
             Resultado de ``test_proposal``.
@@ -83,18 +99,29 @@ class EvolutionSandbox(NexusComponent):
         ctx = context or {}
         proposal_code = ctx.get("proposal_code", "")
         target_file = ctx.get("target_file", "")
-        result = self.test_proposal(proposal_code, target_file)
+        result = self.test_proposal(proposal_code, target_file, ctx.get("files_modified"))
         return {**result, "success": result.get("passed", False)}
 
-    def test_proposal(self, proposal_code: str, target_file: str = "") -> Dict[str, Any]:
+    def test_proposal(
+        self,
+        proposal_code: str,
+        target_file: str = "",
+        changed_files: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
         """Testa uma proposta de código em ambiente isolado.
 
+        Só os testes que importam (direta ou transitivamente) os arquivos
+        tocados pela proposta são executados, divididos em ``workers``
+        processos pytest. Sem arquivos conhecidos, roda a suíte completa.
+
         Args:
             proposal_code: Código Python da proposta.
             target_file:   Caminho relativo do arquivo-alvo (pode ser vazio).
+            changed_files: Arquivos tocados pela proposta (padrão: ``[target_file]``).
 
         Returns:
-            ``{"passed": bool, "test_output": str, "errors": list}``
+            ``{"passed": bool, "test_output": str, "errors": list,
+            "selected_tests": list | None}`` (None = suíte completa)
         """
         if not self.enabled:
             logger.info("[EvolutionSandbox] Sandbox desabilitado (SANDBOX_ENABLED=false).")
@@ -105,6 +132,8 @@ class EvolutionSandbox(NexusComponent):
         errors: List[str] = []
         test_output = ""
         passed = False
+        selection: Optional[List[str]] = None
+        shards: List[List[str]] = []
 
         try:
             sandbox_dir.mkdir(parents=True, exist_ok=True)
@@ -132,27 +161,18 @@ class EvolutionSandbox(NexusComponent):
                 errors.append(f"Erro de sintaxe: {syntax_error}")
                 return {"passed": False, "test_output": "", "errors": errors}
 
-            # (d) Executa pytest
-            cmd = [
-                sys.executable, "-m", "pytest",
-                "tests/",
-                "--tb=short", "-x",
-                "--no-header",
-                "-q",
-            ]
+            # (d) Seleciona testes afetados e executa pytest em shards
+            changed = [f for f in (changed_files or ([target_file] if target_file else [])) if f]
+            selection = self._select_tests(changed)
+            if selection is not None and not selection:
+                # Código sem testes mapeados não é aprovado sem rodar nada
+                logger.info("[EvolutionSandbox] Nenhum teste mapeado para %s; rodando a suíte completa.", changed)
+                selection = None
+            test_files = selection if selection is not None else self._all_test_files()
+            shards = plan_shards(test_files, self.workers) if test_files else [["tests/"]]
             try:
-                proc = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=self.timeout,
-                    cwd=str(Path.cwd()),  # roda na raiz do projeto
-                )
-                # (e) Captura saída
-                test_output = proc.stdout + proc.stderr
-                passed = proc.returncode == 0
-                if not passed:
-                    errors.append(f"pytest retornou código {proc.returncode}")
+                passed, test_output, shard_errors = run_shards(shards, timeout=self.timeout, cwd=Path.cwd())
+                errors.extend(shard_errors)
             except subprocess.TimeoutExpired:
                 errors.append(f"Timeout após {self.timeout}s")
                 test_output = "TIMEOUT"
@@ -167,11 +187,38 @@ class EvolutionSandbox(NexusComponent):
                 logger.debug("[EvolutionSandbox] Falha ao remover sandbox: %s", exc)
 
         logger.info(
-            "[EvolutionSandbox] Resultado: passed=%s erros=%d",
+            "[EvolutionSandbox] Resultado: passed=%s erros=%d testes=%s shards=%d",
             passed,
             len(errors),
+            "todos" if selection is None else len(selection),
+            len(shards),
         )
-        return {"passed": passed, "test_output": test_output, "errors": errors}
+        return {
+            "passed": passed,
+            "test_output": test_output,
+            "errors": errors,
+            "selected_tests": selection,
+        }
+
+    # ------------------------------------------------------------------
+    # Seleção de testes
+    # ------------------------------------------------------------------
+
+    def _select_tests(self, changed_files: List[str]) -> Optional[List[str]]:
+        """Arquivos de teste afetados por ``changed_files``; None = suíte completa."""
+        if not self.impact_selection or not changed_files:
+            return None
+        try:
+            if self._impact_map is None:
+                self._impact_map = ImportImpactMap(Path.cwd())
+            return self._impact_map.affected_tests(changed_files)
+        except Exception as exc:
+            logger.warning("[EvolutionSandbox] Falha na seleção por impacto: %s — suíte completa", exc)
+            return None
+
+    @staticmethod
+    def _all_test_files() -> List[str]:
+        return sorted(p.as_posix() for p in Path("tests").rglob("test_*.py"))
 
 
 def _check_syntax(code: str) -> Optional[str]:
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""Seleção de testes por impacto e execução em shards para o EvolutionSandbox.
+
+Três peças, usadas pelo sandbox e pelo gatekeeper:
+
+- :class:`ImportImpactMap` — grafo de imports (análise estática via ``ast``)
+  entre os módulos de ``app/`` e os arquivos de ``tests/``. É construído uma
+  vez, persistido em ``data/test_impact_map.jrvs`` e atualizado
+  incrementalmente (só arquivos com ``mtime``/``size`` diferentes são
+  reanalisados). ``affected_tests(arquivos)`` devolve os arquivos de teste
+  que importam — direta ou transitivamente — algum dos arquivos alterados.
+- :class:`PytestInventory` — contagem de testes coletados (``pytest --co``)
+  em cache, chaveada pelo hash da árvore ``tests/``.
+- :func:`plan_shards` / :func:`run_shards` — distribuem arquivos de teste em
+  N processos pytest simultâneos.
+"""
+
+import ast
+import hashlib
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.utils.jrvs_codec import JrvsDecodeError, read_file as jrvs_read, write_file as jrvs_write
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAP_PATH = Path("data/test_impact_map.jrvs")
+_MAP_VERSION = 1
+_SOURCE_DIRS = ("app", "tests")
+_TESTS_DIR = "tests"
+_SKIP_DIRS = {"__pycache__", ".git", ".venv", "venv", "node_modules"}
+# Subprocessos pytest ignoram o ``addopts`` do pytest.ini (``--cov``/``--cov-report=html``):
+# shards paralelos disputariam o mesmo ``.coverage``/``htmlcov`` e pagariam o custo da cobertura
+_ISOLATED_PYTEST_ARGS = ("-p", "no:cacheprovider", "-o", "addopts=")
+
+
+def _iter_py_files(root: Path, dirs: Iterable[str]) -> Iterable[Path]:
+    for d in dirs:
+        base = root / d
+        if not base.exists():
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = [n for n in dirnames if n not in _SKIP_DIRS]
+            for name in filenames:
+                if name.endswith(".py"):
+                    yield Path(dirpath) / name
+
+
+def tests_tree_hash(root: Path = Path("."), tests_dir: str = _TESTS_DIR) -> str:
+    """Hash de (caminho, tamanho, mtime) de todos os ``.py`` em ``tests/``."""
+    digest = hashlib.sha1()
+    for path in sorted(_iter_py_files(Path(root), (tests_dir,))):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        digest.update(f"{path.as_posix()}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def parse_test_count(output: str) -> int:
+    """Extrai número de testes coletados da saída do pytest --co -q.
+
+    Formatos suportados:
+        "123 tests collected"
+        "1 test collected"
+        "collected 42 items"
+        "<no tests ran>"  → retorna 0
+    """
+    # Busca qualquer número seguido de "test" ou "item"
+    match = re.search(r"(\d+)\s+(?:test|item)", output)
+    if match:
+        return int(match.group(1))
+    return 0
+
+
+def _module_name(rel: str) -> str:
+    parts = rel[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _parse_imports(source: str, module: str, is_package: bool) -> List[str]:
+    """Nomes absolutos importados por um módulo (inclui ``pacote.nome`` de ``from``)."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    package = module if is_package else module.rpartition(".")[0]
+    names: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base_parts = package.split(".") if package else []
+                if node.level > 1:
+                    base_parts = base_parts[: len(base_parts) - (node.level - 1)]
+                base = ".".join(base_parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if not base:
+                continue
+            names.append(base)
+            names.extend(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+    return names
+
+
+class ImportImpactMap:
+    """Mapa incremental ``arquivo → arquivos de teste afetados``.
+
+    Args:
+        root: Raiz do projeto.
+        cache_path: Onde persistir o mapa (relativo a ``root``); None desativa.
+    """
+
+    def __init__(self, root: Path = Path("."), cache_path: Optional[Path] = _DEFAULT_MAP_PATH) -> None:
+        self.root = Path(root)
+        self.cache_path = (self.root / cache_path) if cache_path else None
+        # rel → {"mtime_ns", "size", "imports"}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._reverse: Optional[Dict[str, Set[str]]] = None
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def refresh(self) -> Dict[str, int]:
+        """Reanalisa apenas arquivos novos/alterados; remove os apagados."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            seen: Set[str] = set()
+            parsed = removed = 0
+            for path in _iter_py_files(self.root, _SOURCE_DIRS):
+                rel = path.relative_to(self.root).as_posix()
+                seen.add(rel)
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entry = self._files.get(rel)
+                if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                    continue
+                try:
+                    source = path.read_text(encoding="utf-8", errors="replace")
+                except OSError:
+                    continue
+                module = _module_name(rel)
+                self._files[rel] = {
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "imports": _parse_imports(source, module, rel.endswith("__init__.py")),
+                }
+                parsed += 1
+            for rel in [r for r in self._files if r not in seen]:
+                del self._files[rel]
+                removed += 1
+            if parsed or removed:
+                self._reverse = None
+                self._save()
+            return {"parsed": parsed, "removed": removed, "total": len(self._files)}
+
+    def affected_tests(self, changed_files: Iterable[str]) -> Optional[List[str]]:
+        """Arquivos de teste afetados por ``changed_files``.
+
+        Returns:
+            Lista ordenada de caminhos relativos de testes, ou None quando a
+            seleção não é confiável e a suíte inteira deve rodar (arquivo fora
+            do grafo, ``conftest.py`` ou arquivo não-Python alterado).
+        """
+        self.refresh()
+        with self._lock:
+            reverse = self._reverse_graph()
+            selected: Set[str] = set()
+            frontier: List[str] = []
+            for raw in changed_files:
+                rel = self._normalize(raw)
+                if rel is None or rel not in self._files or Path(rel).name == "conftest.py":
+                    logger.info("[TestImpact] %s fora do grafo de imports — suíte completa", raw)
+                    return None
+                frontier.append(rel)
+            visited: Set[str] = set(frontier)
+            while frontier:
+                rel = frontier.pop()
+                if self._is_test_file(rel):
+                    selected.add(rel)
+                for dependent in reverse.get(rel, ()):
+                    if dependent not in visited:
+                        visited.add(dependent)
+                        frontier.append(dependent)
+        return sorted(selected)
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _normalize(self, raw: str) -> Optional[str]:
+        path = Path(raw)
+        if path.is_absolute():
+            try:
+                path = path.resolve().relative_to(self.root.resolve())
+            except ValueError:
+                return None
+        rel = path.as_posix()
+        if rel.startswith("./"):
+            rel = rel[2:]
+        if rel.startswith("../") or not rel.endswith(".py"):
+            return None
+        return rel
+
+    @staticmethod
+    def _is_test_file(rel: str) -> bool:
+        return rel.startswith(f"{_TESTS_DIR}/") and Path(rel).name.startswith("test_")
+
+    def _reverse_graph(self) -> Dict[str, Set[str]]:
+        if self._reverse is not None:
+            return self._reverse
+        modules: Dict[str, str] = {_module_name(rel): rel for rel in self._files}
+        reverse: Dict[str, Set[str]] = {}
+        for rel, entry in self._files.items():
+            targets: Set[str] = set()
+            for name in entry["imports"]:
+                parts = name.split(".")
+                # Importar a.b.c executa a/__init__, a/b/__init__ e a/b/c
+                for i in range(1, len(parts) + 1):
+                    target = modules.get(".".join(parts[:i]))
+                    if target and target != rel:
+                        targets.add(target)
+            for target in targets:
+                reverse.setdefault(target, set()).add(rel)
+        self._reverse = reverse
+        return reverse
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            payload = jrvs_read(self.cache_path)
+        except (OSError, JrvsDecodeError) as exc:
+            logger.warning("[TestImpact] Mapa inválido (%s): %s — reconstruindo", self.cache_path, exc)
+            return
+        if isinstance(payload, dict) and payload.get("version") == _MAP_VERSION:
+            self._files = dict(payload.get("files") or {})
+
+    def _save(self) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            jrvs_write(self.cache_path, {"version": _MAP_VERSION, "files": self._files})
+        except OSError as exc:
+            logger.debug("[TestImpact] Falha ao salvar mapa: %s", exc)
+
+
+class PytestInventory:
+    """Contagem de testes coletados, em cache pelo hash da árvore de testes.
+
+    Exceções do subprocess (``TimeoutExpired``, ``FileNotFoundError``) são
+    propagadas para que o chamador decida a política.
+    """
+
+    def __init__(self, root: Path = Path("."), timeout: int = 60) -> None:
+        self.root = Path(root)
+        self.timeout = timeout
+        self._cached: Optional[Tuple[str, int]] = None
+
+    def count(self) -> int:
+        tree_hash = tests_tree_hash(self.root)
+        if self._cached is not None and self._cached[0] == tree_hash:
+            return self._cached[1]
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", *_ISOLATED_PYTEST_ARGS, "--co", "-q", "--tb=no"],
+            capture_output=True,
+            text=True,
+            timeout=self.timeout,
+        )
+        count = parse_test_count(result.stdout + result.stderr)
+        self._cached = (tree_hash, count)
+        return count
+
+    def invalidate(self) -> None:
+        self._cached = None
+
+
+def plan_shards(test_files: List[str], shards: int, root: Path = Path(".")) -> List[List[str]]:
+    """Divide ``test_files`` em até ``shards`` grupos balanceados por tamanho (LPT)."""
+    shards = max(1, min(shards, len(test_files)))
+    sized = []
+    for rel in test_files:
+        try:
+            size = (Path(root) / rel).stat().st_size
+        except OSError:
+            size = 0
+        sized.append((size, rel))
+    groups: List[List[str]] = [[] for _ in range(shards)]
+    loads = [0] * shards
+    for size, rel in sorted(sized, reverse=True):
+        i = loads.index(min(loads))
+        groups[i].append(rel)
+        loads[i] += max(size, 1)
+    return [sorted(g) for g in groups if g]
+
+
+def run_shards(
+    shards: List[List[str]],
+    timeout: int,
+    extra_args: Tuple[str, ...] = ("--tb=short", "-x", "--no-header", "-q"),
+    cwd: Optional[Path] = None,
+) -> Tuple[bool, str, List[str]]:
+    """Roda cada shard num processo pytest próprio, em paralelo (sem cobertura nem cache).
+
+    Returns:
+        ``(passou, saída concatenada, erros)``.
+    """
+    def _run(files: List[str]) -> Tuple[int, str]:
+        proc = subprocess.run(
+            [sys.executable, "-m", "pytest", *_ISOLATED_PYTEST_ARGS, *files, *extra_args],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            cwd=str(cwd or Path.cwd()),
+        )
+        return proc.returncode, proc.stdout + proc.stderr
+
+    outputs: List[str] = []
+    errors: List[str] = []
+    with ThreadPoolExecutor(max_workers=max(1, len(shards)), thread_name_prefix="sandbox-shard") as pool:
+        results = list(pool.map(_run, shards))
+    for i, (returncode, output) in enumerate(results):
+        outputs.append(f"--- shard {i + 1}/{len(shards)} ---\n{output}" if len(shards) > 1 else output)
+        if returncode != 0:
+            errors.append(f"pytest retornou código {returncode}" + (f" (shard {i + 1})" if len(shards) > 1 else ""))
+    return not errors, "\n".join(outputs), errors
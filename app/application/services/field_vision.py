@@ -9,6 +9,7 @@ import urllib.request
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from app.application.services.log_tailer import ErrorFingerprintRegistry, LogTailer
 from app.core.nexus import nexus, NexusComponent
 
 logger = logging.getLogger(__name__)
@@ -51,6 +52,8 @@ class FieldVision(NexusComponent):
         github_repo: Optional[str] = None,
     ) -> None:
         self._log_file = Path(log_file)
+        self._tailer = LogTailer(self._log_file, initial_lines=_TAIL_LINES)
+        self._fingerprints = ErrorFingerprintRegistry()
         self._token = github_token or os.getenv("GITHUB_TOKEN")
         self._repo = github_repo or os.getenv("GITHUB_REPO")
 
@@ -68,12 +71,15 @@ class FieldVision(NexusComponent):
 
     def scan_vitals(self) -> Dict[str, Any]:
         """
-        👁️ Lê as últimas linhas do log do sistema e avalia a saúde do JARVIS.
+        👁️ Lê as linhas novas do log do sistema e avalia a saúde do JARVIS.
 
         Fluxo:
-          1. Lê as últimas ``_TAIL_LINES`` linhas do arquivo de log.
-          2. Se detectar ERROR/CRITICAL, consulta a memória semântica.
-          3. Se o erro não for resolvido pela memória, dispara o workflow de cura.
+          1. Lê apenas o que foi escrito desde a última varredura (na primeira,
+             as últimas ``_TAIL_LINES`` linhas).
+          2. Normaliza as linhas ERROR/CRITICAL em fingerprints; incidentes já
+             conhecidos só atualizam contadores.
+          3. Para fingerprints inéditos, consulta a memória semântica.
+          4. Se o erro não for resolvido pela memória, dispara o workflow de cura.
 
         Returns:
             Dicionário com status da varredura e ações tomadas.
@@ -88,8 +94,25 @@ class FieldVision(NexusComponent):
             logger.info("👁️ [FieldVision] Sinais vitais normais. Nenhuma anomalia detectada.")
             return {"success": True, "errors_detected": False, "action": "none"}
 
+        new_fps, known_fps = self._fingerprints.record(errors)
+        if not new_fps:
+            logger.info(
+                f"👁️ [FieldVision] {len(errors)} linha(s) crítica(s) de incidente(s) "
+                f"já conhecido(s) ({len(known_fps)}). Sem nova ação."
+            )
+            return {
+                "success": True,
+                "errors_detected": True,
+                "action": "known_incident",
+                "fingerprints": sorted(known_fps),
+            }
+
+        errors = [line for lines in new_fps.values() for line in lines]
         error_log = "\n".join(errors)
-        logger.warning(f"👁️ [FieldVision] {len(errors)} linha(s) crítica(s) detectada(s).")
+        logger.warning(
+            f"👁️ [FieldVision] {len(errors)} linha(s) crítica(s) detectada(s) "
+            f"({len(new_fps)} fingerprint(s) inédito(s))."
+        )
 
         # 🧠 Consulta a memória semântica por soluções anteriores
         known_solution = self._query_memory(error_log)
@@ -103,6 +126,7 @@ class FieldVision(NexusComponent):
                 "errors_detected": True,
                 "action": "memory_resolved",
                 "known_solutions": len(known_solution),
+                "new_fingerprints": sorted(new_fps),
             }
 
         # 🔧 Tenta reparo local antes de disparar CI (~90s de latência)
@@ -130,6 +154,7 @@ class FieldVision(NexusComponent):
             "errors_detected": True,
             "action": "workflow_dispatched" if dispatched else "dispatch_failed",
             "error_snippet": error_log[:500],
+            "new_fingerprints": sorted(new_fps),
         }
 
     # ------------------------------------------------------------------
@@ -137,16 +162,17 @@ class FieldVision(NexusComponent):
     # ------------------------------------------------------------------
 
     def _read_log_tail(self) -> List[str]:
-        """Retorna as últimas _TAIL_LINES linhas do arquivo de log."""
-        if not self._log_file.exists():
-            return []
+        """Retorna as linhas novas do log (na primeira leitura, as últimas _TAIL_LINES)."""
         try:
-            lines = self._log_file.read_text(encoding="utf-8", errors="replace").splitlines()
-            return lines[-_TAIL_LINES:]
+            return self._tailer.read_new_lines()
         except OSError as exc:
             logger.error(f"❌ [FieldVision] Erro ao ler log '{self._log_file}': {exc}")
             return []
 
+    def get_error_fingerprints(self) -> Dict[str, Dict[str, Any]]:
+        """Contagem e primeira/última ocorrência de cada fingerprint visto."""
+        return self._fingerprints.snapshot()
+
     def _extract_errors(self, lines: List[str]) -> List[str]:
         """Filtra linhas que contêm palavras-chave de erro."""
         return [ln for ln in lines if any(kw in ln for kw in _ERROR_KEYWORDS)]
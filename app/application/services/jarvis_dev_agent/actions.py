@@ -6,18 +6,34 @@ import subprocess
 import time
 from pathlib import Path
 from typing import Any, Dict, Optional
+from app.adapters.infrastructure.warm_interpreter_pool import get_warm_pool
 from app.core.nexus import nexus
 from app.domain.models.agent import AgentAction, AgentObservation, ActionType
 
 logger = logging.getLogger(__name__)
 
 
+def run_component(name: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """Executa um componente do Nexus; alvo de ``_run_function`` isolado no pool."""
+    component = nexus.resolve(name)
+    if not component or getattr(component, "__is_cloud_mock__", False) or not hasattr(component, "execute"):
+        raise LookupError(f"Função não encontrada: {name}")
+    return str(component.execute(context or {}))
+
+
 class ActionExecutor:
     """Executa ações decididas pelo agente."""
     
     def __init__(self):
         self._shell_adapter = None
         self._code_discovery = None
+        self._warm_pool = None
+    
+    def _get_warm_pool(self):
+        """Lazy loading do WarmInterpreterPool (None se desligado/indisponível)."""
+        if self._warm_pool is None:
+            self._warm_pool = get_warm_pool()
+        return self._warm_pool
     
     def _get_shell_adapter(self):
         """Lazy loading do PersistentShellAdapter."""
@@ -78,6 +94,11 @@ class ActionExecutor:
         if not function_name:
             return "ERRO: function_name não fornecido"
         
+        if params.get("isolated"):
+            pool = self._get_warm_pool()
+            if pool is not None:
+                return self._run_function_isolated(pool, function_name, params)
+        
         try:
             component = nexus.resolve(function_name)
             if component and not getattr(component, "__is_cloud_mock__", False):
@@ -88,6 +109,22 @@ class ActionExecutor:
         except Exception as e:
             return f"❌ Erro: {e}"
     
+    def _run_function_isolated(self, pool, function_name: str, params: Dict[str, Any]) -> str:
+        """Executa a função num filho do pool (falhas e travamentos não afetam o agente)."""
+        try:
+            result = pool.call(
+                f"{__name__}:run_component",
+                {"name": function_name, "context": params.get("kwargs", {})},
+                timeout=float(params.get("timeout", 60)),
+            )
+        except Exception as e:
+            return f"❌ Erro: {e}"
+        if result.timed_out:
+            return f"❌ Timeout: {function_name}\n{result.output[-500:]}"
+        if result.exit_code != 0:
+            return f"❌ Erro: {function_name}\n{result.output[-500:]}"
+        return f"✅ {function_name} executada\n{result.output[:500]}"
+    
     def _run_shell(self, params: Dict[str, Any]) -> str:
         """Executa comando shell."""
         command = params.get("command", "")
@@ -108,6 +145,14 @@ class ActionExecutor:
     def _run_tests(self, params: Dict[str, Any]) -> str:
         """Executa testes."""
         test_path = params.get("test_path", "tests/")
+        pool = self._get_warm_pool()
+        if pool is not None:
+            try:
+                result = pool.run_pytest([test_path, "-v", "--tb=short"], timeout=120)
+                note = "\n⏱️ Timeout após 120s" if result.timed_out else ""
+                return result.output + note
+            except Exception as e:
+                logger.warning("[ActionExecutor] Pool de interpretadores falhou, usando subprocess: %s", e)
         try:
             result = subprocess.run(
                 ["pytest", test_path, "-v", "--tb=short"],
@@ -7,15 +7,35 @@ import re
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional, Tuple
 
+from app.adapters.infrastructure.ai_gateway_token_utils import count_tokens
 from app.core.nexus import NexusComponent, nexus
+from app.domain.models.agent import (
+    ActionType,
+    AgentAction,
+    AgentObservation,
+    AgentTask,
+    TaskPriority,
+    TaskSource,
+)
+
+from .trajectory import AgentTrajectory
 
 logger = logging.getLogger(__name__)
 
 _JOBS_FILE = Path("data/dev_agent_jobs.jsonl")
 _MAX_ITERATIONS = int(os.getenv("DEV_AGENT_MAX_ITERATIONS", "12"))
 
+# Ações do loop → ActionType da trajetória (INSTALL_DEPS roda no shell)
+_ACTION_TYPES = {
+    "RUN_SHELL": ActionType.RUN_SHELL,
+    "EDIT_FILE": ActionType.EDIT_FILE,
+    "READ_FILE": ActionType.READ_FILE,
+    "INSTALL_DEPS": ActionType.RUN_SHELL,
+    "FINISH": ActionType.FINISH,
+}
+
 
 class JarvisDevAgent(NexusComponent):
     """Agente autônomo com Thought Stream."""
@@ -64,6 +84,7 @@ class JarvisDevAgent(NexusComponent):
             thought_log.execute({
                 "action": "create_thought",
                 "mission_id": task_id,
+                "agent_id": "jarvis_dev_agent",
                 "session_id": f"session_{datetime.now().strftime('%Y%m%d%H%M%S')}",
                 "thought_process": f"Iniciando missão: {description}",
                 "problem_description": description,
@@ -106,6 +127,12 @@ class JarvisDevAgent(NexusComponent):
         
         iteration = 0
         history = []
+        trajectory = AgentTrajectory(AgentTask(
+            task_id=task_id,
+            source=TaskSource.USER_REQUEST,
+            priority=TaskPriority.MEDIUM,
+            description=description,
+        ))
         
         while iteration < self.max_iterations:
             iteration += 1
@@ -116,14 +143,17 @@ class JarvisDevAgent(NexusComponent):
             if thought_log:
                 thought_log.stream_planning("LLM decidindo...")
             
-            prompt = self._build_prompt(description, history[-5:], structure.get('output', ''))
+            prompt = self._build_prompt(description, trajectory, structure.get('output', ''))
+            trajectory.record_prompt_tokens(count_tokens(prompt))
+            logger.debug(f"[JarvisDevAgent] iteração {iteration}: prompt com {trajectory.prompt_tokens[-1]} tokens")
             decision = llm.execute({"prompt": prompt, "require_json": True})
             
             action_data = self._extract_json(decision.get('result', ''))
             if not action_data:
                 if thought_log:
                     thought_log.stream_error("LLM não retornou ação válida")
-                return {"success": False, "error": "LLM inválido", "iteration": iteration}
+                return {"success": False, "error": "LLM inválido", "iteration": iteration,
+                        "prompt_tokens": trajectory.prompt_tokens}
             
             action_type = action_data.get("action", "FINISH")
             params = action_data.get("params", {})
@@ -131,42 +161,59 @@ class JarvisDevAgent(NexusComponent):
             if thought_log:
                 thought_log.stream_action(f"{action_type}")
             
-            observation = self._execute_action(action_type, params, shell, editor)
+            observation, ok = self._dispatch_action(action_type, params, shell, editor)
             
             if thought_log:
                 obs_preview = observation[:200] + "..." if len(observation) > 200 else observation
                 thought_log.stream_observation(f"{obs_preview}")
             
             history.append({"iteration": iteration, "action": action_type, "observation": observation})
+            action = AgentAction(
+                action_type=_ACTION_TYPES.get(action_type, ActionType.RUN_FUNCTION),
+                parameters=params if isinstance(params, dict) else {},
+                reasoning=str(action_data.get("reasoning", "")),
+                step_number=iteration,
+            )
+            trajectory.add_step(action, AgentObservation(action=action, output=observation, success=ok))
             
             if action_type == "FINISH":
                 if thought_log:
                     thought_log.stream_success(f"Finalizado")
-                return {"success": True, "task_id": task_id, "iterations": iteration, "history": history}
+                return {"success": True, "task_id": task_id, "iterations": iteration, "history": history,
+                        "prompt_tokens": trajectory.prompt_tokens}
         
         if thought_log:
             thought_log.stream_error(f"Limite de iterações")
         
-        return {"success": False, "task_id": task_id, "error": f"Limite de {self.max_iterations} iterações", "iterations": iteration}    
+        return {"success": False, "task_id": task_id, "error": f"Limite de {self.max_iterations} iterações", "iterations": iteration,
+                "prompt_tokens": trajectory.prompt_tokens}
         
-    def _build_prompt(self, description: str, history: List[Dict], structure: str) -> str:
+    def _build_prompt(self, description: str, trajectory: AgentTrajectory, structure: str) -> str:
         """Constrói prompt para LLM."""
-        history_text = "\n".join([f"Iter {h['iteration']}: {h['action']} → {h['observation'][:100]}" for h in history]) or "(Nenhuma)"
+        history_text = trajectory.get_working_memory() if trajectory.actions else "(Nenhuma)"
         return f"Tarefa: {description}\nEstrutura: {structure[:1000]}\nHistórico: {history_text}\n\nAções: RUN_SHELL, EDIT_FILE, READ_FILE, INSTALL_DEPS, FINISH\nRetorne JSON: {{'action': '...', 'params': {{}}}}"
     
     def _execute_action(self, action_type: str, params: Dict, shell, editor) -> str:
         """Executa ação."""
+        return self._dispatch_action(action_type, params, shell, editor)[0]
+    
+    def _dispatch_action(self, action_type: str, params: Dict, shell, editor) -> Tuple[str, bool]:
+        """Executa ação e retorna (observação, sucesso)."""
         if action_type == "RUN_SHELL":
-            return shell.execute({"command": params.get("cmd", "")}).get("output", "")[:1000]
+            result = shell.execute({"command": params.get("cmd", "")})
+            return (result.get("output") or result.get("error") or "")[:1000], bool(result.get("success", True))
         elif action_type == "EDIT_FILE":
-            return editor.execute({"file_path": params.get("path"), "search_block": params.get("search"), "replace_block": params.get("replace")}).get("action", "")
+            result = editor.execute({"file_path": params.get("path"), "search_block": params.get("search"), "replace_block": params.get("replace")})
+            return result.get("action") or result.get("error") or "", bool(result.get("success", True))
         elif action_type == "READ_FILE":
-            return editor.execute({"file_path": params.get("path")}).get("content", "")[:1000]
+            result = editor.execute({"file_path": params.get("path")})
+            return (result.get("content") or result.get("error") or "")[:1000], bool(result.get("success", True))
         elif action_type == "INSTALL_DEPS":
-            return shell.execute({"command": f"pip install {' '.join(params.get('packages', []))}"}).get("output", "")
+            result = shell.execute({"command": f"pip install {' '.join(params.get('packages', []))}"})
+            return result.get("output") or result.get("error") or "", bool(result.get("success", True))
         elif action_type == "FINISH":
-            return params.get("summary", "Finalizado")
-        return f"Ação desconhecida: {action_type}"
+            return params.get("summary", "Finalizado"), True
+        return f"Ação desconhecida: {action_type}", False
     
     def _extract_json(self, text: str) -> Optional[Dict]:
         """Extrai JSON de resposta."""
@@ -1,14 +1,59 @@
 # -*- coding: utf-8 -*-
-"""Trajectory — Gerencia histórico de ações do agente."""
+"""Trajectory — Gerencia histórico de ações do agente.
+
+A memória de trabalho enviada ao LLM é compactada: os últimos
+``keep_last`` passos aparecem na íntegra e os anteriores são dobrados, um a
+um e uma única vez, num resumo corrente limitado a ``token_budget`` tokens.
+Quando o resumo excede o orçamento, a fidelidade cai primeiro nos passos
+bem-sucedidos comuns, depois nos que tocaram arquivos e por último nas
+falhas.
+
+Configuração por ambiente: ``DEV_AGENT_TRAJECTORY_KEEP_LAST``,
+``DEV_AGENT_TRAJECTORY_TOKEN_BUDGET`` e ``DEV_AGENT_TRAJECTORY_PREVIEW_CHARS``.
+"""
+import os
+from collections import Counter
 from datetime import datetime, timezone
-from typing import List, Optional
-from app.domain.models.agent import AgentAction, AgentObservation, AgentTask
+from typing import Any, Dict, List, Optional
+from app.adapters.infrastructure.ai_gateway_token_utils import count_tokens
+from app.domain.models.agent import ActionType, AgentAction, AgentObservation, AgentTask
+
+# Padrões dimensionados para que o prompt do JarvisDevAgent não passe do
+# antigo (últimos 5 passos com 100 caracteres de saída cada)
+_KEEP_LAST = int(os.getenv("DEV_AGENT_TRAJECTORY_KEEP_LAST", "1"))
+_TOKEN_BUDGET = int(os.getenv("DEV_AGENT_TRAJECTORY_TOKEN_BUDGET", "40"))
+_PREVIEW_CHARS = int(os.getenv("DEV_AGENT_TRAJECTORY_PREVIEW_CHARS", "100"))
+
+# Ações que tocam arquivos: resumidas com caminho e mantidas com mais fidelidade
+_FILE_ACTIONS = {
+    ActionType.READ_FILE,
+    ActionType.EDIT_FILE,
+    ActionType.CREATE_PIPELINE,
+    ActionType.CREATE_ADAPTER,
+}
+_PATH_KEYS = ("path", "file_path", "filename", "pipeline_path", "adapter_path")
+
+# Níveis de fidelidade no resumo
+_TIER_ROUTINE, _TIER_FILE, _TIER_FAILURE = 0, 1, 2
 
 
 class AgentTrajectory:
-    """Histórico completo de uma sessão de agente."""
-    
-    def __init__(self, task: AgentTask):
+    """Histórico completo de uma sessão de agente.
+
+    Args:
+        task: Tarefa da sessão.
+        keep_last: Passos mais recentes mostrados na íntegra.
+        token_budget: Teto de tokens do resumo dos passos anteriores.
+        preview_chars: Caracteres da saída (e no máximo 100 da razão) nos passos na íntegra.
+    """
+
+    def __init__(
+        self,
+        task: AgentTask,
+        keep_last: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        preview_chars: Optional[int] = None,
+    ):
         self.task = task
         self.actions: List[AgentAction] = []
         self.observations: List[AgentObservation] = []
@@ -16,24 +61,124 @@ class AgentTrajectory:
         self.final_result: str = ""
         self.started_at: datetime = datetime.now(timezone.utc)
         self.completed_at: Optional[datetime] = None
-    
+        self.keep_last = max(0, _KEEP_LAST if keep_last is None else keep_last)
+        self.token_budget = max(0, _TOKEN_BUDGET if token_budget is None else token_budget)
+        self.preview_chars = max(0, _PREVIEW_CHARS if preview_chars is None else preview_chars)
+        self.prompt_tokens: List[int] = []
+        # Resumo corrente: um digest por passo já dobrado
+        self._digests: List[Dict[str, Any]] = []
+
     def add_step(self, action: AgentAction, observation: AgentObservation) -> None:
         """Adiciona par ação-observação à trajetória."""
         self.actions.append(action)
         self.observations.append(observation)
-    
+
+    def record_prompt_tokens(self, tokens: int) -> None:
+        """Registra o tamanho (tokens) do prompt de uma iteração."""
+        self.prompt_tokens.append(int(tokens))
+
     def get_working_memory(self) -> str:
-        """Gera representação em texto para prompt."""
+        """Gera representação em texto para prompt (compactada)."""
+        total = len(self.actions)
+        verbatim_from = max(0, total - self.keep_last)
+        while len(self._digests) < verbatim_from:
+            idx = len(self._digests)
+            self._digests.append(self._digest(idx + 1, self.actions[idx], self.observations[idx]))
+
         lines = ["=== HISTÓRICO DE AÇÕES ==="]
-        for i, (action, obs) in enumerate(zip(self.actions, self.observations), 1):
-            lines.append(f"\n--- Passo {i} ---")
+        if verbatim_from:
+            lines.append(f"\n--- Resumo dos passos 1–{verbatim_from} ---")
+            lines.extend(self._render_summary(self._digests[:verbatim_from]))
+        for i in range(verbatim_from, total):
+            action, obs = self.actions[i], self.observations[i]
+            lines.append(f"\n--- Passo {i + 1} ---")
             lines.append(f"Ação: {action.action_type.value}")
-            lines.append(f"Razão: {action.reasoning[:100]}")
+            lines.append(f"Razão: {action.reasoning[:min(100, self.preview_chars)]}")
             lines.append(f"Resultado: {'✅' if obs.success else '❌'}")
-            output_preview = obs.output[:300] + "..." if len(obs.output) > 300 else obs.output
+            limit = self.preview_chars
+            output_preview = obs.output[:limit] + "..." if len(obs.output) > limit else obs.output
             lines.append(f"Saída: {output_preview}")
         return "\n".join(lines)
-    
+
+    # ------------------------------------------------------------------
+    # Compactação
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _digest(step: int, action: AgentAction, obs: AgentObservation) -> Dict[str, Any]:
+        """Resumo de um passo em duas fidelidades (``full`` e ``short``)."""
+        name = action.action_type.value
+        path = next((str(action.parameters[k]) for k in _PATH_KEYS if action.parameters.get(k)), "")
+        mark = "✅" if obs.success else "❌"
+        head = f"Passo {step}: {name}{' ' + path if path else ''} {mark}"
+        if not obs.success:
+            tier = _TIER_FAILURE
+            detail = " ".join((obs.error or obs.output or "").split())
+            full = f"{head} — {action.reasoning[:80]} | erro: {detail[:200]}"
+            short = f"{head} | erro: {detail[:60]}"
+        elif action.action_type in _FILE_ACTIONS:
+            tier = _TIER_FILE
+            full = f"{head} — {action.reasoning[:80]}"
+            short = head
+        else:
+            tier = _TIER_ROUTINE
+            full = short = head
+        return {
+            "step": step, "tier": tier, "action": name, "path": path,
+            "full": full, "short": short,
+            "full_tokens": count_tokens(full), "short_tokens": count_tokens(short),
+        }
+
+    def _render_summary(self, digests: List[Dict[str, Any]]) -> List[str]:
+        """Linhas do resumo, degradando a fidelidade até caber no orçamento."""
+        form = {d["step"]: "full" for d in digests}
+        routine: Counter = Counter()
+        files: List[str] = []
+        omitted_failures = 0
+
+        def _aggregate() -> List[str]:
+            extra = []
+            if routine:
+                extra.append("Passos sem falha: " + ", ".join(f"{a}×{n}" for a, n in sorted(routine.items())))
+            if files:
+                extra.append("Arquivos tocados: " + ", ".join(files[-10:]))
+            if omitted_failures:
+                extra.append(f"Falhas antigas omitidas: {omitted_failures}")
+            return extra
+
+        def _cost() -> int:
+            kept = sum(d[f"{form[d['step']]}_tokens"] for d in digests if d["step"] in form)
+            return kept + sum(count_tokens(line) for line in _aggregate())
+
+        # Degradação em ordem: rotina → agregada; arquivos → curtos → agregados;
+        # falhas → curtas → mais antigas omitidas (a mais recente fica sempre)
+        if _cost() > self.token_budget:
+            for d in digests:
+                if d["tier"] == _TIER_ROUTINE:
+                    routine[d["action"]] += 1
+                    del form[d["step"]]
+        for tier in (_TIER_FILE, _TIER_FAILURE):
+            if _cost() > self.token_budget:
+                for d in digests:
+                    if d["tier"] == tier:
+                        form[d["step"]] = "short"
+        if _cost() > self.token_budget:
+            for d in digests:
+                if d["tier"] == _TIER_FILE:
+                    if d["path"] and d["path"] not in files:
+                        files.append(d["path"])
+                    elif not d["path"]:
+                        routine[d["action"]] += 1
+                    del form[d["step"]]
+        failures = [d for d in digests if d["tier"] == _TIER_FAILURE]
+        for d in failures[:-1]:
+            if _cost() <= self.token_budget:
+                break
+            del form[d["step"]]
+            omitted_failures += 1
+
+        return _aggregate() + [d[form[d["step"]]] for d in digests if d["step"] in form]
+
     def to_dict(self) -> dict:
         """Serializa para dicionário."""
         return {
@@ -45,4 +190,5 @@ class AgentTrajectory:
             "started_at": self.started_at.isoformat(),
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "total_steps": len(self.actions),
-        }
\ No newline at end of file
+            "prompt_tokens": self.prompt_tokens,
+        }
@@ -101,62 +101,44 @@ class JrvsTranslator(NexusComponent):
     # ------------------------------------------------------------------
 
     def sync_all(
-        self, data_dir: Optional[Path] = None, bucket: str = "jrvs-snapshots"
+        self,
+        data_dir: Optional[Path] = None,
+        bucket: str = "jrvs-snapshots",
+        cloud: Optional[Any] = None,
     ) -> Tuple[List[str], List[str]]:
         """Synchronize all .jrvs files under *data_dir* with Supabase Storage.
 
-        For each ``.jrvs`` file found locally:
-        - Uploads the local file to the cloud (overwriting if it already exists).
+        Only changed snapshots are transferred: a manifest of content hashes
+        and remote ETags (``<data_dir>/.jrvs_sync_manifest``) is compared with
+        the local files and a single remote listing.
 
-        For each ``.jrvs`` file present in the cloud but missing locally:
-        - Downloads and saves it locally (restoring from backup).
+        - Local files whose hash changed (or that are missing remotely) are uploaded.
+        - Remote files missing locally, or changed remotely since the last
+          sync, are downloaded.
+
+        Transfers run concurrently over the cloud adapter's keep-alive session.
 
         Args:
             data_dir: Local directory to scan.  Defaults to ``self._data_dir``.
             bucket:   Supabase Storage bucket name (default: ``"jrvs-snapshots"``).
+            cloud:    Cloud storage adapter; defaults to ``jrvs_cloud_storage`` from the Nexus.
 
         Returns:
             Tuple (synced_paths, error_paths).
         """
-        from app.core.nexus import nexus
-
-        cloud = nexus.resolve("jrvs_cloud_storage")
-        scan_dir = data_dir or self._data_dir
+        from app.adapters.infrastructure.jrvs_delta_sync import JrvsDeltaSync
 
-        synced: List[str] = []
-        errors: List[str] = []
+        if cloud is None:
+            from app.core.nexus import nexus
 
-        # --- Upload local → cloud ---
-        if scan_dir.exists():
-            for jrvs_file in scan_dir.rglob("*.jrvs"):
-                try:
-                    raw = jrvs_file.read_bytes()
-                    remote_path = str(jrvs_file.relative_to(scan_dir.parent))
-                    result = cloud.upload(bucket, remote_path, raw)
-                    if result:
-                        synced.append(f"↑ {remote_path}")
-                        logger.debug("☁️  [JrvsTranslator] Uploaded %s", remote_path)
-                    else:
-                        errors.append(f"↑ {jrvs_file} (upload falhou)")
-                except Exception as exc:
-                    errors.append(f"↑ {jrvs_file}: {exc}")
-
-        # --- Download cloud → local (restore missing files) ---
-        try:
-            remote_files = cloud.list(bucket, str(scan_dir.name))
-            for remote_name in remote_files:
-                local_path = scan_dir.parent / remote_name
-                if not local_path.exists():
-                    raw = cloud.download(bucket, remote_name)
-                    if raw:
-                        local_path.parent.mkdir(parents=True, exist_ok=True)
-                        local_path.write_bytes(raw)
-                        synced.append(f"↓ {remote_name}")
-                        logger.info("☁️  [JrvsTranslator] Restored %s from cloud", remote_name)
-        except Exception as exc:
-            logger.debug("[JrvsTranslator] sync_all download phase: %s", exc)
+            cloud = nexus.resolve("jrvs_cloud_storage")
+        scan_dir = Path(data_dir or self._data_dir)
 
-        return synced, errors
+        report = JrvsDeltaSync(
+            cloud, bucket, max_workers=getattr(cloud, "max_workers", 4)
+        ).sync(scan_dir)
+        synced = [f"↑ {p}" for p in report.uploaded] + [f"↓ {p}" for p in report.downloaded]
+        return synced, report.errors
 
     # ------------------------------------------------------------------
     # Varredura de diretório
@@ -8,16 +8,31 @@ providing more accurate capability detection by analyzing code semantics rather
 just looking for keywords.
 """
 
+import asyncio
+import atexit
+import hashlib
 import json
 import logging
+import threading
+import weakref
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
 from app.adapters.infrastructure.ai_gateway import LLMProvider
+from app.adapters.infrastructure.source_index import get_source_index
 from app.core.llm_config import LLMConfig
+from app.utils.jrvs_codec import JrvsDecodeError, read_file as jrvs_read, write_file as jrvs_write
 
 logger = logging.getLogger(__name__)
 
+# Veredictos do LLM por capability, chaveados pelo hash do conteúdo analisado
+_VERDICT_CACHE_FILE = "data/capability_verdicts.jrvs"
+_VERDICT_CACHE_MAX = 2000
+# Novos veredictos são gravados juntos, numa thread, após este atraso (s)
+_VERDICT_FLUSH_DELAY = 2.0
+_FALLBACK_EVIDENCE = "LLM analysis not available, using fallback"
+
 
 class LLMCapabilityDetector(NexusComponent):
     def execute(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:  # type: ignore[override]
@@ -114,6 +129,15 @@ class LLMCapabilityDetector(NexusComponent):
         self.ai_gateway = ai_gateway
         self.repository_root = repository_root or Path.cwd()
         self._forced_provider = self._resolve_provider(LLMConfig.capability_llm_provider())
+        self._verdict_path = self.repository_root / _VERDICT_CACHE_FILE
+        self._verdicts: Optional["OrderedDict[str, Dict[str, Any]]"] = None
+        self._verdict_lock = threading.Lock()
+        self._verdict_write_lock = threading.Lock()
+        self._verdict_seq = 0
+        self._verdict_written = 0
+        self._verdict_timer: Optional[threading.Timer] = None
+        self.verdict_cache_hits = 0
+        _live_detectors.add(self)
         
         if not self.ai_gateway:
             logger.warning("No AI Gateway provided for LLM capability detection")
@@ -153,6 +177,14 @@ class LLMCapabilityDetector(NexusComponent):
                 related_files
             )
             
+            # Unchanged capability + unchanged matched files: reuse last verdict
+            key = self._verdict_key(capability_id, capability_name, capability_description, code_context)
+            cached = self._get_verdict(key)
+            if cached is not None:
+                self.verdict_cache_hits += 1
+                logger.debug(f"Capability '{capability_name}' unchanged; reusing cached LLM verdict")
+                return cached
+            
             # Ask LLM to analyze if capability is implemented
             analysis = await self._llm_analyze_capability(
                 capability_id,
@@ -161,6 +193,8 @@ class LLMCapabilityDetector(NexusComponent):
                 code_context
             )
             
+            if not self._is_fallback(analysis):
+                self._put_verdict(key, analysis)
             return analysis
             
         except Exception as e:
@@ -223,6 +257,9 @@ class LLMCapabilityDetector(NexusComponent):
         """
         Search repository for files containing keywords
         
+        Uses the shared :class:`SourceIndex`, so only files that changed since
+        the last query are re-read. Files matching more keywords rank first.
+        
         Args:
             keywords: List of keywords to search for
             max_files: Maximum number of files to return
@@ -232,32 +269,18 @@ class LLMCapabilityDetector(NexusComponent):
         """
         code_context = {}
         
-        # Search in common Python directories
-        search_dirs = [
-            self.repository_root / "app",
-            self.repository_root / "scripts",
-        ]
-        
-        for search_dir in search_dirs:
-            if not search_dir.exists():
-                continue
-            
-            for py_file in search_dir.rglob("*.py"):
-                if len(code_context) >= max_files:
-                    break
-                
-                try:
-                    with open(py_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        
-                    # Check if any keyword appears in the file
-                    content_lower = content.lower()
-                    if any(keyword in content_lower for keyword in keywords):
-                        rel_path = str(py_file.relative_to(self.repository_root))
-                        code_context[rel_path] = content
-                        
-                except Exception as e:
-                    logger.debug(f"Skipping {py_file}: {e}")
+        # Query the shared source index instead of walking app/ and scripts/
+        index = get_source_index(self.repository_root)
+        hits = index.search_any(
+            keywords,
+            limit=max_files,
+            path_prefixes=("app/", "scripts/"),
+            suffix=".py",
+        )
+        for hit in hits:
+            content = index.read(hit["path"])
+            if content is not None:
+                code_context[hit["path"]] = content
         
         return code_context
     
@@ -432,11 +455,87 @@ Be conservative - only mark as "complete" if you see clear, working implementati
         return {
             "status": "nonexistent",
             "confidence": 0.3,
-            "evidence": ["LLM analysis not available, using fallback"],
+            "evidence": [_FALLBACK_EVIDENCE],
             "files_found": [],
             "recommendations": ["Enable AI Gateway for accurate capability detection"]
         }
 
+    @staticmethod
+    def _is_fallback(analysis: Dict[str, Any]) -> bool:
+        return analysis.get("evidence") == [_FALLBACK_EVIDENCE]
+
+    # ------------------------------------------------------------------
+    # Verdict cache
+    # ------------------------------------------------------------------
+
+    def _verdict_key(
+        self,
+        capability_id: int,
+        capability_name: str,
+        capability_description: str,
+        code_context: Dict[str, str],
+    ) -> str:
+        """Hash of everything the LLM would see: capability fields, provider and file contents."""
+        digest = hashlib.sha256()
+        provider = self._forced_provider.value if self._forced_provider else ""
+        digest.update(f"{capability_id}\0{capability_name}\0{capability_description}\0{provider}\0".encode("utf-8"))
+        for path in sorted(code_context):
+            content_hash = hashlib.sha1(code_context[path].encode("utf-8", errors="replace")).hexdigest()
+            digest.update(f"{path}\0{content_hash}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load_verdicts(self) -> "OrderedDict[str, Dict[str, Any]]":
+        if self._verdicts is None:
+            self._verdicts = OrderedDict()
+            if self._verdict_path.exists():
+                try:
+                    data = jrvs_read(self._verdict_path)
+                    if isinstance(data, dict):
+                        self._verdicts.update(data)
+                except (OSError, JrvsDecodeError) as e:
+                    logger.warning(f"Ignoring unreadable capability verdict cache: {e}")
+        return self._verdicts
+
+    def _get_verdict(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._verdict_lock:
+            verdict = self._load_verdicts().get(key)
+            return dict(verdict) if verdict is not None else None
+
+    def _put_verdict(self, key: str, analysis: Dict[str, Any]) -> None:
+        """Store a verdict in memory; the file is written later by ``flush_verdicts``."""
+        with self._verdict_lock:
+            verdicts = self._load_verdicts()
+            verdicts[key] = dict(analysis)
+            verdicts.move_to_end(key)
+            while len(verdicts) > _VERDICT_CACHE_MAX:
+                verdicts.popitem(last=False)
+            self._verdict_seq += 1
+            if self._verdict_timer is None:
+                # Verdicts arriving during a scan share one write, off the event loop
+                self._verdict_timer = threading.Timer(_VERDICT_FLUSH_DELAY, self.flush_verdicts)
+                self._verdict_timer.daemon = True
+                self._verdict_timer.start()
+
+    def flush_verdicts(self) -> None:
+        """Persist the verdict cache if it changed since the last write (blocking I/O)."""
+        with self._verdict_lock:
+            timer, self._verdict_timer = self._verdict_timer, None
+            if timer is not None:
+                timer.cancel()
+            if self._verdicts is None:
+                return
+            seq = self._verdict_seq
+            snapshot = dict(self._verdicts)
+        with self._verdict_write_lock:
+            # A newer snapshot may already be on disk
+            if seq <= self._verdict_written:
+                return
+            try:
+                jrvs_write(self._verdict_path, snapshot)
+                self._verdict_written = seq
+            except OSError as e:
+                logger.debug(f"Could not persist capability verdict cache: {e}")
+
     def find_capability_by_command(self, command: str) -> Optional[Dict[str, Any]]:
         """Busca uma capability por similaridade semântica usando CapabilityIndexService.
 
@@ -513,46 +612,60 @@ class EnhancedCapabilityManager(NexusComponent):
         
         updated_capabilities = []
         max_scan = LLMConfig.max_capabilities_per_scan()
+        semaphore = asyncio.Semaphore(max(1, LLMConfig.capability_scan_concurrency()))
         
-        with Session(self.base_manager.engine) as session:
-            capabilities = session.exec(select(JarvisCapability)).all()
-            
-            # Limit to configured maximum to manage costs
-            for capability in capabilities[:max_scan]:
+        async def _analyze(capability) -> Optional[Dict[str, Any]]:
+            async with semaphore:
                 try:
                     # Use LLM to detect capability status
-                    analysis = await self.llm_detector.detect_capability_async(
+                    return await self.llm_detector.detect_capability_async(
                         capability_id=capability.id,
                         capability_name=capability.capability_name,
                         capability_description=getattr(capability, 'description', '')
                     )
-                    
-                    new_status = analysis.get("status")
-                    confidence = analysis.get("confidence", 0.0)
-                    
-                    # Only update if LLM is confident
-                    if confidence >= LLMConfig.min_capability_confidence() and new_status and new_status != capability.status:
-                        logger.info(
-                            f"Updating capability {capability.id}: "
-                            f"{capability.status} -> {new_status} "
-                            f"(confidence: {confidence:.2f})"
-                        )
-                        
-                        old_status = capability.status
-                        capability.status = new_status
-                        
-                        updated_capabilities.append({
-                            "id": capability.id,
-                            "name": capability.capability_name,
-                            "old_status": old_status,
-                            "new_status": new_status,
-                            "confidence": confidence,
-                            "evidence": analysis.get("evidence", []),
-                            "recommendations": analysis.get("recommendations", [])
-                        })
-                    
                 except Exception as e:
                     logger.error(f"Error analyzing capability {capability.id}: {e}")
+                    return None
+        
+        with Session(self.base_manager.engine) as session:
+            capabilities = session.exec(select(JarvisCapability)).all()
+            
+            # Limit to configured maximum to manage costs. One source-index
+            # snapshot serves every capability in this scan.
+            batch = capabilities[:max_scan]
+            index = get_source_index(self.llm_detector.repository_root)
+            # Tree walk and sidecar save stay off the event loop
+            await asyncio.to_thread(index.refresh_snapshot)
+            with index.pinned(refresh=False):
+                analyses = await asyncio.gather(*(_analyze(c) for c in batch))
+            await asyncio.to_thread(self.llm_detector.flush_verdicts)
+            
+            for capability, analysis in zip(batch, analyses):
+                if analysis is None:
+                    continue
+                new_status = analysis.get("status")
+                confidence = analysis.get("confidence", 0.0)
+                
+                # Only update if LLM is confident
+                if confidence >= LLMConfig.min_capability_confidence() and new_status and new_status != capability.status:
+                    logger.info(
+                        f"Updating capability {capability.id}: "
+                        f"{capability.status} -> {new_status} "
+                        f"(confidence: {confidence:.2f})"
+                    )
+                    
+                    old_status = capability.status
+                    capability.status = new_status
+                    
+                    updated_capabilities.append({
+                        "id": capability.id,
+                        "name": capability.capability_name,
+                        "old_status": old_status,
+                        "new_status": new_status,
+                        "confidence": confidence,
+                        "evidence": analysis.get("evidence", []),
+                        "recommendations": analysis.get("recommendations", [])
+                    })
             
             # Commit changes
             session.commit()
@@ -580,3 +693,12 @@ class EnhancedCapabilityManager(NexusComponent):
 
 # Nexus Compatibility
 LlmCapabilityDetector = LLMCapabilityDetector
+
+
+_live_detectors: "weakref.WeakSet[LLMCapabilityDetector]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_verdicts() -> None:
+    for detector in list(_live_detectors):
+        detector.flush_verdicts()
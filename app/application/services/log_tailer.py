@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""LogTailer – leitura incremental de logs e fingerprint de erros.
+
+Usado pelo FieldVision para que cada varredura custe O(bytes novos):
+o tailer lembra o offset e o inode do arquivo (tratando rotação e truncamento)
+e as linhas de erro são normalizadas em fingerprints estáveis, com contagem e
+horários de primeira/última ocorrência.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Janela lida na primeira varredura (antes disso não há offset conhecido)
+_INITIAL_WINDOW_BYTES = 64 * 1024
+
+# Ordem importa: padrões mais específicos primeiro
+_NORMALIZERS: Tuple[Tuple["re.Pattern[str]", str], ...] = (
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b"), "<ts>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<id>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<addr>"),
+    (re.compile(r"\b[0-9a-fA-F]{12,}\b"), "<id>"),
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.\-]+)+[\\/]([\w.\-]+)"), r"<path>/\1"),
+    (re.compile(r"\b\d+\b"), "<n>"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def normalize_error_line(line: str) -> str:
+    """Remove partes voláteis (timestamps, ids, caminhos, números) de uma linha."""
+    for pattern, repl in _NORMALIZERS:
+        line = pattern.sub(repl, line)
+    return line.strip()
+
+
+def fingerprint_error_line(line: str) -> str:
+    """Fingerprint estável de uma linha de erro (12 hex)."""
+    return hashlib.sha1(normalize_error_line(line).encode("utf-8")).hexdigest()[:12]
+
+
+class LogTailer:
+    """Lê apenas os bytes acrescentados a um log desde a última chamada.
+
+    Na primeira leitura devolve as últimas ``initial_lines`` linhas. Só linhas
+    completas (terminadas em quebra de linha) são devolvidas. Se o inode mudar
+    (rotação) ou o arquivo encolher (truncamento), recomeça do início do
+    arquivo novo.
+    """
+
+    def __init__(self, path: Path, initial_lines: int = 50) -> None:
+        self.path = Path(path)
+        self.initial_lines = initial_lines
+        self._offset: Optional[int] = None
+        self._file_id: Optional[Tuple[int, int]] = None
+
+    def read_new_lines(self) -> List[str]:
+        """Linhas novas desde a última leitura (lança OSError se a leitura falhar)."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        file_id = (st.st_dev, st.st_ino)
+        first_read = self._offset is None
+        if not first_read and (file_id != self._file_id or st.st_size < self._offset):
+            self._offset = 0
+        self._file_id = file_id
+
+        with open(self.path, "rb") as f:
+            if first_read:
+                start = max(0, st.st_size - _INITIAL_WINDOW_BYTES)
+                f.seek(start)
+                data = f.read()
+                if start > 0:
+                    # Descarta a linha parcial no começo da janela
+                    head, sep, data = data.partition(b"\n")
+                    start += len(head) + len(sep)
+            else:
+                start = self._offset
+                f.seek(start)
+                data = f.read()
+
+        # Só avança até o último "\n": uma linha ainda sendo escrita fica para
+        # a próxima leitura em vez de virar dois fragmentos
+        complete = data.rfind(b"\n") + 1
+        self._offset = start + complete
+        data = data[:complete]
+
+        lines = data.decode("utf-8", errors="replace").splitlines()
+        return lines[-self.initial_lines:] if first_read else lines
+
+    def reset(self) -> None:
+        """Esquece o offset; a próxima leitura volta a ser uma leitura inicial."""
+        self._offset = None
+        self._file_id = None
+
+
+class ErrorFingerprintRegistry:
+    """Contagem e primeira/última ocorrência por fingerprint de erro."""
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, lines: List[str]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Registra ``lines`` e separa fingerprints inéditos dos já conhecidos.
+
+        Returns:
+            ``(novos, conhecidos)`` — cada um mapeando fingerprint → linhas.
+        """
+        now = time.time()
+        new: Dict[str, List[str]] = {}
+        known: Dict[str, List[str]] = {}
+        with self._lock:
+            for line in lines:
+                fp = fingerprint_error_line(line)
+                entry = self._entries.get(fp)
+                if entry is None:
+                    self._entries[fp] = {
+                        "count": 1,
+                        "first_seen": now,
+                        "last_seen": now,
+                        "sample": line[:500],
+                    }
+                    new.setdefault(fp, []).append(line)
+                    continue
+                entry["count"] += 1
+                entry["last_seen"] = now
+                (new if fp in new else known).setdefault(fp, []).append(line)
+            self._evict()
+        return new, known
+
+    def _evict(self) -> None:
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(self._entries, key=lambda k: self._entries[k]["last_seen"])[:overflow]
+            for fp in oldest:
+                del self._entries[fp]
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(fingerprint)
+        return dict(entry) if entry else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {fp: dict(e) for fp, e in self._entries.items()}
@@ -5,9 +5,10 @@ import os
 import signal
 from typing import Any
 from app.core.nexus import Nexus
+from app.utils.log_pipeline import configure_logging
 
 # Configuração de Logging
-logging.basicConfig(
+configure_logging(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 )
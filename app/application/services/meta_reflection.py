@@ -23,6 +23,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from app.core.nexus import NexusComponent
+from app.utils.journal_store import get_journal_store
 
 logger = logging.getLogger(__name__)
 
@@ -262,24 +263,14 @@ class MetaReflection(NexusComponent):
     def _load_rejections(self) -> List[Dict[str, Any]]:
         """Lê as últimas _REJECTIONS_WINDOW_LINES linhas do JSONL de rejeições.
 
+        Usa o índice de offsets do JournalStore: só as linhas pedidas são lidas.
+
         Returns:
             Lista de entradas de rejeição; lista vazia se o arquivo não existir.
         """
-        if not _REJECTIONS_FILE.exists():
-            return []
         try:
-            lines = _REJECTIONS_FILE.read_text(encoding="utf-8").splitlines()
-            recent = lines[-_REJECTIONS_WINDOW_LINES:]
-            result: List[Dict[str, Any]] = []
-            for line in recent:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    result.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
-            return result
+            store = get_journal_store(_REJECTIONS_FILE, ts_field="timestamp")
+            return store.tail(_REJECTIONS_WINDOW_LINES)
         except Exception as exc:
             logger.warning("[MetaReflection] Falha ao ler rejeições: %s", exc)
             return []
@@ -14,9 +14,10 @@ from typing import Optional
 from app.adapters.infrastructure import create_api_server
 from app.core.config import settings
 from app.core.nexus import nexus, CloudMock
+from app.utils.log_pipeline import configure_logging
 
 # Configure logging
-logging.basicConfig(
+configure_logging(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[
@@ -108,9 +109,104 @@ def _wait_for_server_ready(host: str, port: int, timeout: float = 5.0) -> bool:
     return False
 
 
+# Componentes resolvidos no mestre antes do fork (compartilhados via copy-on-write)
+_DEFAULT_PRELOAD_COMPONENTS = (
+    "assistant_service",
+    "extension_manager",
+    "database_adapter",
+    "capability_index_service",
+    "vector_memory_adapter",
+)
+
+
+def _api_workers() -> int:
+    """Número de processos da API (``API_WORKERS``; 1 = modo de processo único)."""
+    try:
+        return max(1, int(os.getenv("API_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+def _warm_components() -> None:
+    """Resolve e aquece o grafo de componentes uma vez, no mestre."""
+    raw = os.getenv("API_PRELOAD_COMPONENTS")
+    names = [n.strip() for n in raw.split(",") if n.strip()] if raw else _DEFAULT_PRELOAD_COMPONENTS
+    for name in names:
+        component = nexus.resolve(name)
+        if component is None or isinstance(component, CloudMock):
+            logger.info("Pré-carga: '%s' indisponível", name)
+
+
+def _reset_worker_state(index: int) -> None:
+    """No worker recém-forkado: conexões de banco herdadas não podem ser reusadas."""
+    for component in list(nexus._instances.values()):
+        for attr in ("engine", "_engine"):
+            engine = getattr(component, attr, None)
+            dispose = getattr(engine, "dispose", None)
+            if not callable(dispose):
+                continue
+            try:
+                # Descarta o pool sem fechar os sockets que o pai ainda usa
+                dispose(close=False)
+            except TypeError:
+                dispose()
+            except Exception as exc:
+                logger.debug("Worker %d: falha ao descartar engine: %s", index, exc)
+
+
+def _serve_worker(app, sock, index: int) -> None:
+    """Roda o uvicorn do worker sobre o socket herdado do mestre."""
+    config = uvicorn.Config(app, log_level="info", access_log=True)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _run_prefork(app, host: str, port: int, workers: int) -> None:
+    """Modo multi-worker: um mestre supervisionando ``workers`` processos uvicorn.
+
+    Os workers não compartilham memória gravável. Índices gravados por mais de
+    um processo reconciliam na leitura o que os irmãos gravaram: o lateral do
+    ``JournalStore`` ignora entradas repetidas, os rollups do
+    ``RewardAdapter`` são refeitos quando ``max(id)`` avança e o
+    ``SegmentLog`` relê segmentos criados, reduzidos ou apagados por outros.
+
+    Continua valendo por worker, e não para a API inteira:
+
+    - caches em memória (respostas, vereditos de LLM, amostragem de log),
+      aquecidos separadamente em cada processo;
+    - o pacing por chat da fila do Telegram, que com N workers pode chegar a
+      N vezes o limite; o spill ``data/telegram_outbox.jrvs`` guarda só as
+      pendências do último worker que gravou;
+    - conexões WebSocket, que só recebem broadcasts do worker que as aceitou.
+    """
+    import tempfile
+    from app.adapters.infrastructure.prefork_server import PreforkServer
+    from app.utils.daemon_lease import LEASE_DIR_ENV
+
+    # Loops de fundo (Overwatch, KeepAlive) rodam em um único processo
+    os.environ.setdefault(LEASE_DIR_ENV, tempfile.mkdtemp(prefix="jarvis-leases-"))
+    server = PreforkServer(
+        serve=lambda sock, index: _serve_worker(app, sock, index),
+        host=host,
+        port=port,
+        workers=workers,
+        before_fork=_warm_components,
+        after_fork=_reset_worker_state,
+    )
+    server.start()
+    if _wait_for_server_ready(host, port, timeout=10.0):
+        logger.info("🔗 Workers prontos. Configurando Telegram Webhook...")
+        setup_telegram_webhook()
+    else:
+        logger.warning("⚠️ Timeout aguardando workers. Webhook pode falhar na primeira requisição.")
+    server.run()
+
+
 def main() -> None:
     """
     Main entry point. Inicializa o Nexus, sobe o servidor Uvicorn e configura o Webhook.
+
+    Com ``API_WORKERS`` > 1 (POSIX) o grafo do Nexus é aquecido uma vez e a API
+    é servida por vários processos forkados do mestre.
     """
     logger.info("Starting Jarvis Assistant API Server (Headless Mode)")
 
@@ -129,6 +225,12 @@ def main() -> None:
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("PORT", os.getenv("API_PORT", "10000")))
 
+    workers = _api_workers()
+    if workers > 1 and hasattr(os, "fork"):
+        logger.info(f"🚀 Jarvis online em {host}:{port} ({workers} workers)")
+        _run_prefork(app, host, port, workers)
+        return
+
     logger.info(f"🚀 Jarvis online em {host}:{port}")
 
     # Inicia o servidor em thread separada para configurar webhook após startup
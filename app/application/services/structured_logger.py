@@ -1,7 +1,7 @@
 from app.core.nexus import NexusComponent
 # -*- coding: utf-8 -*-
-import json
 import logging
+from app.utils.log_pipeline import LazyJson
 logger = logging.getLogger(__name__)
 
 class StructuredLogger(NexusComponent):
@@ -15,8 +15,11 @@ class StructuredLogger(NexusComponent):
         self.context = context
 
     def _log(self, level, msg, **extra):
-        log_data = {**self.context, **extra, "message": msg}
-        self.logger.log(level, json.dumps(log_data))
+        # Nível desligado: nada é montado nem serializado
+        if not self.logger.isEnabledFor(level):
+            return
+        # json.dumps só acontece quando (e onde) o registro for escrito
+        self.logger.log(level, LazyJson({**self.context, **extra, "message": msg}))
 
     def info(self, msg, **extra): self._log(logging.INFO, msg, **extra)
     def error(self, msg, **extra): self._log(logging.ERROR, msg, **extra)
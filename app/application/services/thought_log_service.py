@@ -2,9 +2,12 @@
 """ThoughtLogService — Gerencia logs de raciocínio e Thought Stream."""
 import json
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from app.core.nexus import NexusComponent, nexus
+from app.domain.models.thought_log import InteractionStatus, ThoughtLog
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +21,12 @@ class ThoughtLogService(NexusComponent):
     - Track retry counts for auto-correction cycles
     - Escalate to human after 3 failed attempts
     - Real-time visual feedback (Thought Stream with ANSI HUD)
+    - Batched persistence (ThoughtLogWriter) and keyset-paginated reads
     """
     
     MAX_RETRIES = 3
+    # Missões cuja sequência de falhas fica em memória (LRU)
+    _STREAK_CACHE_SIZE = 1024
     
     def __init__(self, engine=None):
         super().__init__()
@@ -37,6 +43,12 @@ class ThoughtLogService(NexusComponent):
         self._stream_to_console = True
         self._thought_history: List[Dict[str, Any]] = []
         self._mission_id: Optional[str] = None
+        self._failure_streaks: "OrderedDict[str, int]" = OrderedDict()
+        self._streak_lock = threading.Lock()
+        self._writer = None
+        if self.engine is not None:
+            from app.application.services.thought_log_writer import ThoughtLogWriter
+            self._writer = ThoughtLogWriter.from_env(self.engine)
     
     def can_execute(self, context: dict = None) -> bool:
         """NexusComponent contract."""
@@ -47,7 +59,8 @@ class ThoughtLogService(NexusComponent):
         if config:
             self._enabled = config.get("enabled", self._enabled)
             self._max_obs_length = config.get("max_observation_length", self._max_obs_length)
-            self._stream_to_console = config.get("stream_to_console", self._stream_to_console)            mission_id = config.get("mission_id")
+            self._stream_to_console = config.get("stream_to_console", self._stream_to_console)
+            mission_id = config.get("mission_id")
             if mission_id:
                 self._mission_id = mission_id
     
@@ -56,7 +69,9 @@ class ThoughtLogService(NexusComponent):
         action = context.get("action", "stream")
         
         if action == "create_thought":
-            return {"success": True, "thought": self.create_thought(**context)}
+            params = {k: v for k, v in context.items() if k != "action"}
+            thought = self.create_thought(**params)
+            return {"success": True, "thought": thought.model_dump(mode="json")}
         elif action == "stream":
             return self.stream_thought(
                 context.get("thought_type", "info"),
@@ -66,45 +81,60 @@ class ThoughtLogService(NexusComponent):
         elif action == "get_history":
             return {"success": True, "history": self.get_history(context.get("limit", 10))}
         elif action == "check_requires_human":
-            return {"success": True, "requires_human": self.check_requires_human(context.get("mission_id"))}
+            return {"success": True, "requires_human": self.check_requires_human(
+                context.get("mission_id"), context.get("agent_id"))}
         
         return {"success": False, "not_implemented": True}
     
-    def create_thought(self, mission_id: str, session_id: str,
-                       thought_process: str, **kwargs) -> Optional[Dict]:
-        """Create a new thought log entry."""
-        thought = {
-            "thought_id": f"thought_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}",
+    def create_thought(self, mission_id: str, session_id: str, thought_process: str,
+                       status: Any = InteractionStatus.INTERNAL_MONOLOGUE,
+                       success: bool = False, wait: bool = False, **kwargs) -> Optional[ThoughtLog]:
+        """Create a new thought log entry.
+
+        ``retry_count`` is the number of consecutive failures that preceded this
+        attempt in the mission (0 on success); from ``MAX_RETRIES`` on the entry
+        is flagged ``requires_human``. Persistence is batched by the writer —
+        pass ``wait=True`` to block until the row (and its ``id``) is committed.
+        """
+        retry_count = 0 if success else self._previous_failures(mission_id)
+        requires_human = retry_count >= self.MAX_RETRIES
+        thought = ThoughtLog(
+            mission_id=mission_id,
+            session_id=session_id,
+            agent_id=kwargs.get("agent_id") or "",
+            status=InteractionStatus(status),
+            thought_process=thought_process,
+            problem_description=kwargs.get("problem_description") or "",
+            solution_attempt=kwargs.get("solution_attempt") or "",
+            success=bool(success),
+            error_message=kwargs.get("error_message") or "",
+            retry_count=retry_count,
+            requires_human=requires_human,
+            escalation_reason=f"Auto-correction failed {retry_count} times" if requires_human else "",
+            context_data=self._as_json(kwargs.get("context_data"), "{}"),
+            system_state=self._as_json(kwargs.get("system_state"), "{}"),
+            expected_result=kwargs.get("expected_result") or "",
+            actual_result=kwargs.get("actual_result") or "",
+        )
+        with self._streak_lock:
+            self._remember_streak(mission_id, 0 if success else retry_count + 1)
+        if requires_human:
+            logger.warning(f"[ThoughtLog] Missão {mission_id} escalada para humano após {retry_count} falhas")
+        
+        self._thought_history.append({
             "mission_id": mission_id,
             "session_id": session_id,
             "thought_process": thought_process,
-            "problem_description": kwargs.get("problem_description", ""),
-            "success": kwargs.get("success", False),
-            "error_message": kwargs.get("error_message", ""),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        
-        self._thought_history.append(thought)
+            "success": thought.success,
+            "retry_count": retry_count,
+            "timestamp": thought.created_at.isoformat(),
+        })
         
         if len(self._thought_history) > 100:
             self._thought_history = self._thought_history[-100:]
         
-        # Tenta persistir em DB se engine disponível
-        if self.engine:
-            try:
-                from sqlmodel import Session, select
-                from app.domain.models.thought_log import ThoughtLog
-                
-                with Session(self.engine) as session:
-                    db_thought = ThoughtLog(                        mission_id=mission_id,
-                        session_id=session_id,
-                        thought_process=thought_process,
-                        success=kwargs.get("success", False),
-                    )
-                    session.add(db_thought)
-                    session.commit()
-            except Exception as e:
-                logger.debug(f"[ThoughtLog] Falha ao persistir: {e}")
+        if self._writer is not None:
+            self._writer.add(thought, wait=wait)
         
         return thought
     
@@ -112,26 +142,200 @@ class ThoughtLogService(NexusComponent):
         """Obtém histórico de pensamentos."""
         return self._thought_history[-limit:]
     
-    def check_requires_human(self, mission_id: str) -> bool:
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Grava os pensamentos ainda na fila do writer."""
+        return self._writer.flush(timeout) if self._writer is not None else True
+    
+    def check_requires_human(self, mission_id: str, agent_id: Optional[str] = None) -> bool:
         """Verifica se missão requer intervenção humana."""
         if not self.engine:
             return False
         
         try:
             from sqlmodel import Session, select
-            from app.domain.models.thought_log import ThoughtLog
             
+            self.flush()
+            statement = select(ThoughtLog.id).where(
+                ThoughtLog.mission_id == mission_id,
+                ThoughtLog.requires_human == True  # noqa: E712
+            )
+            if agent_id is not None:
+                statement = statement.where(ThoughtLog.agent_id == agent_id)
             with Session(self.engine) as session:
-                statement = select(ThoughtLog).where(
-                    ThoughtLog.mission_id == mission_id,
-                    ThoughtLog.requires_human == True
-                ).limit(1)
-                result = session.exec(statement).first()
-                return result is not None
+                return session.exec(statement.limit(1)).first() is not None
         except Exception as e:
             logger.error(f"Error checking human requirement: {e}")
             return False
     
+    def iter_thoughts(self, mission_id: Optional[str] = None, agent_id: Optional[str] = None,
+                      session_id: Optional[str] = None, since: Optional[datetime] = None,
+                      page_size: int = 200) -> Iterator[ThoughtLog]:
+        """Percorre os pensamentos em ordem cronológica, página a página.
+
+        Paginação por chave (``created_at``, ``id``): cada página é uma consulta
+        curta ``WHERE (created_at, id) > último ORDER BY created_at, id LIMIT n``
+        servida pelos índices compostos missão/agente + tempo — sem OFFSET e
+        sem manter uma sessão aberta enquanto o chamador consome.
+        """
+        if not self.engine:
+            return
+        from sqlalchemy import and_, or_
+        from sqlmodel import Session, select
+        
+        self.flush()
+        cursor = None
+        while True:
+            statement = select(ThoughtLog)
+            if mission_id is not None:
+                statement = statement.where(ThoughtLog.mission_id == mission_id)
+            if agent_id is not None:
+                statement = statement.where(ThoughtLog.agent_id == agent_id)
+            if session_id is not None:
+                statement = statement.where(ThoughtLog.session_id == session_id)
+            if since is not None:
+                statement = statement.where(ThoughtLog.created_at >= since)
+            if cursor is not None:
+                created_at, last_id = cursor
+                statement = statement.where(or_(
+                    ThoughtLog.created_at > created_at,
+                    and_(ThoughtLog.created_at == created_at, ThoughtLog.id > last_id),
+                ))
+            statement = statement.order_by(ThoughtLog.created_at, ThoughtLog.id).limit(page_size)
+            with Session(self.engine) as session:
+                page = session.exec(statement).all()
+            yield from page
+            if len(page) < page_size:
+                return
+            cursor = (page[-1].created_at, page[-1].id)
+    
+    def get_mission_thoughts(self, mission_id: str) -> List[ThoughtLog]:
+        """Todos os pensamentos da missão, em ordem cronológica."""
+        return self._collect(mission_id=mission_id)
+    
+    def get_session_thoughts(self, session_id: str) -> List[ThoughtLog]:
+        """Todos os pensamentos da sessão, em ordem cronológica."""
+        return self._collect(session_id=session_id)
+    
+    def get_recent_thoughts(self, status: Any = None, limit: int = 10,
+                            agent_id: Optional[str] = None,
+                            mission_id: Optional[str] = None) -> List[ThoughtLog]:
+        """Pensamentos mais recentes primeiro, opcionalmente filtrados."""
+        statement = self._select_thoughts()
+        if statement is None:
+            return []
+        if status is not None:
+            statement = statement.where(ThoughtLog.status == InteractionStatus(status))
+        if agent_id is not None:
+            statement = statement.where(ThoughtLog.agent_id == agent_id)
+        if mission_id is not None:
+            statement = statement.where(ThoughtLog.mission_id == mission_id)
+        return self._fetch(statement.order_by(ThoughtLog.created_at.desc(), ThoughtLog.id.desc()).limit(limit))
+    
+    def get_pending_escalations(self, limit: int = 100) -> List[ThoughtLog]:
+        """Pensamentos que escalaram para humano, mais recentes primeiro."""
+        statement = self._select_thoughts()
+        if statement is None:
+            return []
+        statement = statement.where(ThoughtLog.requires_human == True)  # noqa: E712
+        return self._fetch(statement.order_by(ThoughtLog.created_at.desc(), ThoughtLog.id.desc()).limit(limit))
+    
+    def generate_consolidated_log(self, mission_id: str) -> str:
+        """Relatório textual de todas as tentativas da missão (para revisão humana)."""
+        thoughts = self.get_mission_thoughts(mission_id)
+        lines = [
+            f"=== Consolidated Log: Mission {mission_id} ===",
+            f"Total Attempts: {len(thoughts)}",
+            f"Requires Human: {'YES' if any(t.requires_human for t in thoughts) else 'NO'}",
+        ]
+        for index, thought in enumerate(thoughts, 1):
+            lines.append("")
+            lines.append(f"--- Attempt {index} [{'SUCCESS' if thought.success else 'FAILED'}] "
+                         f"{thought.created_at.isoformat()} (retry {thought.retry_count})")
+            lines.append(f"Thought: {thought.thought_process}")
+            if thought.problem_description:
+                lines.append(f"Problem: {thought.problem_description}")
+            if thought.solution_attempt:
+                lines.append(f"Solution: {thought.solution_attempt}")
+            if thought.error_message:
+                lines.append(f"Error: {thought.error_message}")
+            if thought.escalation_reason:
+                lines.append(f"Escalation: {thought.escalation_reason}")
+        return "\n".join(lines)
+    
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    
+    def _previous_failures(self, mission_id: str) -> int:
+        """Falhas consecutivas já registradas na missão (cache LRU + banco)."""
+        with self._streak_lock:
+            if mission_id in self._failure_streaks:
+                self._failure_streaks.move_to_end(mission_id)
+                return self._failure_streaks[mission_id]
+        streak = self._load_failure_streak(mission_id)
+        with self._streak_lock:
+            return self._failure_streaks.setdefault(mission_id, streak)
+    
+    def _load_failure_streak(self, mission_id: str) -> int:
+        # Missão fora do cache: o último registro dela diz a sequência atual
+        if not self.engine:
+            return 0
+        try:
+            from sqlmodel import Session, select
+            
+            self.flush()
+            statement = (
+                select(ThoughtLog.success, ThoughtLog.retry_count)
+                .where(ThoughtLog.mission_id == mission_id)
+                .order_by(ThoughtLog.created_at.desc(), ThoughtLog.id.desc())
+                .limit(1)
+            )
+            with Session(self.engine) as session:
+                last = session.exec(statement).first()
+        except Exception as e:
+            logger.debug(f"[ThoughtLog] Falha ao ler histórico da missão {mission_id}: {e}")
+            return 0
+        if last is None or last[0]:
+            return 0
+        return last[1] + 1
+    
+    def _remember_streak(self, mission_id: str, streak: int) -> None:
+        self._failure_streaks[mission_id] = streak
+        self._failure_streaks.move_to_end(mission_id)
+        while len(self._failure_streaks) > self._STREAK_CACHE_SIZE:
+            self._failure_streaks.popitem(last=False)
+    
+    def _collect(self, **filters: Any) -> List[ThoughtLog]:
+        try:
+            return list(self.iter_thoughts(**filters))
+        except Exception as e:
+            logger.error(f"Error reading thought logs: {e}")
+            return []
+    
+    def _select_thoughts(self):
+        if not self.engine:
+            return None
+        from sqlmodel import select
+        
+        self.flush()
+        return select(ThoughtLog)
+    
+    def _fetch(self, statement) -> List[ThoughtLog]:
+        try:
+            from sqlmodel import Session
+            
+            with Session(self.engine) as session:
+                return list(session.exec(statement).all())
+        except Exception as e:
+            logger.error(f"Error reading thought logs: {e}")
+            return []
+    
+    @staticmethod
+    def _as_json(value: Any, default: str) -> str:
+        if value is None:
+            return default
+        return value if isinstance(value, str) else json.dumps(value, default=str)
+    
     def stream_thought(self, thought_type: str, message: str,
                        data: Optional[Dict] = None) -> Dict[str, Any]:
         """Transmite pensamento em tempo real com formatação ANSI."""
@@ -145,7 +349,8 @@ class ThoughtLogService(NexusComponent):
         thought = {
             "thought_id": f"thought_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}",
             "mission_id": self._mission_id,
-            "thought_type": thought_type,            "message": message,
+            "thought_type": thought_type,
+            "message": message,
             "data": data or {},
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
@@ -194,7 +399,7 @@ class ThoughtLogService(NexusComponent):
         
         color = colors.get(thought_type, "")
         icon = icons.get(thought_type, "•")
-                formatted = f"{dim}[{time_str}]{reset} {color}{icon} [{thought_type.upper()}]{reset} {message}"
+        formatted = f"{dim}[{time_str}]{reset} {color}{icon} [{thought_type.upper()}]{reset} {message}"
         print(formatted, file=sys.stdout, flush=True)
     
     def stream_planning(self, message: str, data: Optional[Dict] = None):
@@ -23,56 +23,52 @@ class ThoughtLogStorage:
             self._db = self.nexus.resolve("database_adapter")
         return self._db
 
+    # Colunas persistidas (espelham o modelo ThoughtLog, exceto o id gerado)
+    _COLUMNS = (
+        "mission_id", "session_id", "agent_id", "status", "thought_process",
+        "problem_description", "solution_attempt", "success", "error_message",
+        "retry_count", "requires_human", "escalation_reason", "context_data",
+        "created_at",
+    )
+
     async def save_thought(self, log: ThoughtLog) -> bool:
         """Persiste um log de pensamento no banco de dados."""
-        query = """
-            INSERT INTO thought_logs (
-                id, agent_id, context_data, thought_process, 
-                action_taken, observation, metadata, timestamp
-            )
-            VALUES (
-                :id, :agent_id, :context_data, :thought_process, 
-                :action_taken, :observation, :metadata, :timestamp
-            )
-        """
-        params = {
-            "id": log.id,
-            "agent_id": log.agent_id,
-            "context_data": log.context_data,
-            "thought_process": log.thought_process,
-            "action_taken": log.action_taken,
-            "observation": log.observation,
-            "metadata": json.dumps(log.metadata) if isinstance(log.metadata, dict) else str(log.metadata),
-            "timestamp": log.timestamp
-        }
-        
+        return await self.save_thoughts([log])
+
+    async def save_thoughts(self, logs: List[ThoughtLog]) -> bool:
+        """Persiste vários logs num único INSERT multi-linha."""
+        if not logs:
+            return True
+        rows = []
+        params: Dict[str, Any] = {}
+        for i, log in enumerate(logs):
+            rows.append("(" + ", ".join(f":{column}_{i}" for column in self._COLUMNS) + ")")
+            for column in self._COLUMNS:
+                value = getattr(log, column)
+                if column == "context_data" and isinstance(value, dict):
+                    value = json.dumps(value)
+                elif column == "status":
+                    value = getattr(value, "name", value)
+                params[f"{column}_{i}"] = value
+        query = f"INSERT INTO thought_logs ({', '.join(self._COLUMNS)}) VALUES {', '.join(rows)}"
+
         try:
             return await self.db.execute(query, params)
         except Exception as e:
-            logger.error(f"[Storage] Erro ao salvar ThoughtLog: {e}")
+            logger.error(f"[Storage] Erro ao salvar {len(logs)} ThoughtLogs: {e}")
             return False
 
     async def get_recent_thoughts(self, agent_id: str, limit: int = 10) -> List[ThoughtLog]:
         """Recupera os últimos pensamentos de um agente específico."""
-        query = "SELECT * FROM thought_logs WHERE agent_id = :agent_id ORDER BY timestamp DESC LIMIT :limit"
+        # Servida pelo índice composto (agent_id, created_at)
+        query = (
+            "SELECT * FROM thought_logs WHERE agent_id = :agent_id "
+            "ORDER BY created_at DESC, id DESC LIMIT :limit"
+        )
         
         try:
             results = await self.db.fetch_all(query, {"agent_id": agent_id, "limit": limit})
-            
-            # CORREÇÃO: Sintaxe de mapeamento corrigida na linha 105
-            thought_logs = []
-            for row in results:
-                data = dict(row)
-                # Garante que o metadata seja convertido de volta para dicionário se for string
-                if isinstance(data.get("metadata"), str):
-                    try:
-                        data["metadata"] = json.loads(data["metadata"])
-                    except:
-                        data["metadata"] = {}
-                
-                thought_logs.append(ThoughtLog(**data))
-                
-            return thought_logs
+            return [ThoughtLog(**dict(row)) for row in results]
         except Exception as e:
             logger.error(f"[Storage] Erro ao recuperar pensamentos: {e}")
             return []
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Escrita em lote dos ThoughtLogs.
+
+Agentes emitem dezenas de pensamentos por missão; abrir uma ``Session`` e
+fazer um commit por pensamento transformava cada linha numa transação.
+``ThoughtLogWriter.add`` apenas enfileira o ``ThoughtLog``; uma thread
+dedicada grava lotes inteiros numa única transação:
+
+- um lote é gravado quando junta ``max_batch`` pensamentos ou quando o mais
+  antigo espera ``max_latency`` segundos (latência de gravação limitada);
+- o lote vai num único ``session.add_all`` + ``commit`` — o SQLAlchemy
+  agrupa os INSERTs (``insertmanyvalues``) e preenche os ``id`` gerados;
+- ``flush`` grava imediatamente o que está na fila: as leituras do
+  ``ThoughtLogService`` chamam ``flush`` antes de consultar o banco;
+- um lote que falha volta para a fila; após ``max_attempts`` falhas
+  seguidas ele é bisseccionado (metades, depois quartos...) para isolar a
+  linha problemática, e só uma linha que falha sozinha ``max_attempts``
+  vezes é descartada e contada em ``dropped``;
+- engines cujas conexões são por thread (SQLite ``:memory:``, que usa
+  ``SingletonThreadPool``) não podem ser gravados por outra thread: nesse
+  caso o lote é gravado por quem enfileira, ao encher ou vencer o prazo, e
+  em ``flush``.
+
+A fila e a thread vêm de :class:`app.utils.batch_queue.BatchQueue`, a mesma
+base do ``AuditWriter``.
+
+Configuração por ambiente: ``THOUGHT_LOG_MAX_BATCH`` e
+``THOUGHT_LOG_MAX_LATENCY_MS``.
+
+Uso::
+
+    from app.application.services.thought_log_writer import ThoughtLogWriter
+
+    writer = ThoughtLogWriter.from_env(engine)
+    writer.add(ThoughtLog(mission_id="m1", session_id="s1", thought_process="..."))
+    writer.flush()  # antes de ler
+"""
+
+import logging
+import os
+from typing import Any, Dict, List
+
+from sqlalchemy.pool import SingletonThreadPool
+
+from app.domain.models.thought_log import ThoughtLog
+from app.utils.batch_queue import Batch, BatchQueue
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_BATCH = 64
+_DEFAULT_MAX_LATENCY = 0.2
+_DEFAULT_MAX_ATTEMPTS = 3
+
+
+class ThoughtLogWriter(BatchQueue):
+    """Fila de ThoughtLogs gravados em lotes por uma thread dedicada.
+
+    Args:
+        engine: Engine SQLAlchemy/SQLModel onde a tabela ``thought_logs`` existe.
+        max_batch: Pensamentos por lote antes de gravar imediatamente.
+        max_latency: Espera máxima (s) de um pensamento antes do lote ser gravado.
+        max_attempts: Tentativas de um lote antes de bissecioná-lo (e de uma
+            linha isolada antes de descartá-la).
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        max_batch: int = _DEFAULT_MAX_BATCH,
+        max_latency: float = _DEFAULT_MAX_LATENCY,
+        max_attempts: int = _DEFAULT_MAX_ATTEMPTS,
+    ) -> None:
+        super().__init__(
+            max_batch,
+            max_latency,
+            thread_name="thought-log-writer",
+            inline=isinstance(getattr(engine, "pool", None), SingletonThreadPool),
+        )
+        self.engine = engine
+        self.max_attempts = max(1, int(max_attempts))
+        self._failures = 0
+        # Bissecção em curso: tamanho dos sublotes e último seq do lote original
+        self._split_size = 0
+        self._split_until = 0
+        self._counters = {"thoughts": 0, "batches": 0, "errors": 0, "dropped": 0, "splits": 0}
+
+    @classmethod
+    def from_env(cls, engine: Any) -> "ThoughtLogWriter":
+        return cls(
+            engine,
+            max_batch=int(os.getenv("THOUGHT_LOG_MAX_BATCH", _DEFAULT_MAX_BATCH)),
+            max_latency=float(os.getenv("THOUGHT_LOG_MAX_LATENCY_MS", _DEFAULT_MAX_LATENCY * 1000)) / 1000,
+        )
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def add(self, thought: ThoughtLog, wait: bool = False, timeout: float = 5.0) -> bool:
+        """Enfileira um pensamento.
+
+        Args:
+            wait: Aguarda o commit do lote (o ``id`` do pensamento fica preenchido).
+            timeout: Limite de espera quando ``wait``.
+
+        Returns:
+            True se enfileirado (e, com ``wait``, gravado dentro do prazo).
+        """
+        with self._cond:
+            if self._stopping:
+                return False
+            seq = self._put_locked(thought)
+            if not wait:
+                return True
+            committed = self._wait_committed_locked(seq, timeout)
+        return committed and thought.id is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            batches = self._counters["batches"]
+            return {
+                **self._counters,
+                "pending": len(self._pending),
+                "avg_batch_size": self._counters["thoughts"] / batches if batches else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _batch_limit_locked(self) -> int:
+        return self._split_size or self.max_batch
+
+    def _committed_locked(self, batch: Batch, now: float) -> None:
+        self._failures = 0
+        self._counters["thoughts"] += len(batch)
+        self._counters["batches"] += 1
+        if self._split_size:
+            # Sublote gravado: volta a crescer até sair do lote original
+            self._split_size *= 2
+            if batch[-1][0] >= self._split_until or self._split_size >= self.max_batch:
+                self._split_size = self._split_until = 0
+
+    def _failed_locked(self, batch: Batch) -> bool:
+        self._failures += 1
+        if len(batch) > 1 and (self._split_size or self._failures >= self.max_attempts):
+            # Uma linha inválida não derruba o lote inteiro: tenta as metades
+            self._failures = 0
+            self._split_size = len(batch) // 2
+            self._split_until = max(self._split_until, batch[-1][0])
+            self._counters["splits"] += 1
+            self._pending.extendleft(reversed(batch))
+            return True
+        if self._failures >= self.max_attempts:
+            logger.error("[ThoughtLogWriter] Pensamento descartado após %d falhas (missão %s)",
+                         self._failures, batch[0][1].mission_id)
+            self._failures = 0
+            self._committed_seq = batch[-1][0]
+            self._counters["dropped"] += len(batch)
+            if self._split_size and batch[-1][0] >= self._split_until:
+                self._split_size = self._split_until = 0
+            return True
+        # Mantém a ordem: o lote volta para a frente da fila
+        self._pending.extendleft(reversed(batch))
+        return False
+
+    def _write_batch(self, thoughts: List[ThoughtLog]) -> bool:
+        from sqlmodel import Session
+
+        try:
+            # expire_on_commit=False: os objetos seguem legíveis por quem os criou
+            with Session(self.engine, expire_on_commit=False) as session:
+                session.add_all(thoughts)
+                session.commit()
+            return True
+        except Exception as exc:
+            # O rollback devolve os objetos ao estado transitório; o id do INSERT
+            # desfeito não pode ser reaproveitado na próxima tentativa
+            for thought in thoughts:
+                thought.id = None
+            self._counters["errors"] += 1
+            logger.warning("[ThoughtLogWriter] Falha ao gravar lote de %d pensamentos: %s", len(thoughts), exc)
+            return False
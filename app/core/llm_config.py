@@ -55,6 +55,11 @@ class LLMConfig:
         """Returns the maximum number of capabilities per scan batch."""
         return int(os.getenv("JARVIS_MAX_CAPABILITIES_PER_SCAN", "10"))
 
+    @classmethod
+    def capability_scan_concurrency(cls) -> int:
+        """Returns how many capabilities are analyzed concurrently per scan."""
+        return int(os.getenv("JARVIS_CAPABILITY_SCAN_CONCURRENCY", "4"))
+
     # ---------------------------------------------------------------------------
     # Backward-compatible class-level aliases (read at import time)
     # ---------------------------------------------------------------------------
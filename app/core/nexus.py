@@ -5,6 +5,7 @@ Responsável por resolução de dependências, gerenciamento de instâncias e th
 """
 import concurrent.futures
 import logging
+import os
 import threading
 import time
 from typing import Any, Dict, Optional
@@ -142,5 +143,17 @@ class JarvisNexus(_NexusDiscoveryMixin):
         logger.warning("🔌 [NEXUS] Circuit Breaker aberto para '%s'. Razão: %s", target_id, reason)
         self._circuit_breakers[target_id] = time.time() + 30  # 30 segundos de cooldown
 
+    def _reset_after_fork(self):
+        """No processo filho: threads do executor e locks do pai não existem mais."""
+        JarvisNexus._lock = threading.Lock()
+        self._executor = None
+        # Construções em andamento no pai nunca serão concluídas aqui
+        for target_id, inst in list(self._instances.items()):
+            if isinstance(inst, concurrent.futures.Future):
+                del self._instances[target_id]
+
 # Singleton Global
 nexus = JarvisNexus()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=nexus._reset_after_fork)
@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
-"""ProspectiveMemory — Memória prospectiva para intenções futuras."""
+"""ProspectiveMemory — Memória prospectiva para intenções futuras.
+
+Os gatilhos das intenções pendentes ficam num ``TriggerMatcher``
+(Aho–Corasick): ``check_triggers`` faz uma única passada pelo contexto,
+independentemente de quantas intenções estão armazenadas.
+"""
 import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from app.core.nexus import NexusComponent, nexus
+from app.utils.trigger_matcher import TriggerMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +26,13 @@ class ProspectiveMemory(NexusComponent):
     - Gatilhos de execução
     """
     
-    def __init__(self):
+    def __init__(self, max_intentions: int = 100):
         super().__init__()
         self._intentions: List[Dict[str, Any]] = []
-        self._max_intentions = 100
+        self._max_intentions = max_intentions
         self._db_adapter = None
+        # Gatilhos das intenções pendentes → a própria intenção
+        self._trigger_matcher = TriggerMatcher()
     
     def _get_db_adapter(self):
         """Lazy loading do DBAdapter."""
@@ -73,10 +81,15 @@ class ProspectiveMemory(NexusComponent):
         }
         
         self._intentions.append(intention)
+        self._trigger_matcher.add(str(intention["trigger"]), intention)
         
         # Trunca se exceder limite
         if len(self._intentions) > self._max_intention_limit():
+            dropped = self._intentions[:-self._max_intentions]
             self._intentions = self._intentions[-self._max_intentions:]
+            for old in dropped:
+                if not old.get("completed"):
+                    self._trigger_matcher.remove(str(old.get("trigger", "")), old)
         
         # Persiste em DB se disponível
         self._persist_intention(intention)
@@ -109,14 +122,11 @@ class ProspectiveMemory(NexusComponent):
         """Verifica gatilhos de execução."""
         current_context = str(ctx.get("current_context", ""))
         
-        triggered = []
-        for intention in self._intentions:
-            if intention.get("completed"):
-                continue
-            
-            trigger = str(intention.get("trigger", ""))
-            if trigger and trigger.lower() in current_context.lower():
-                triggered.append(intention)
+        # Valores vêm na ordem de registro = ordem de armazenamento
+        triggered = [
+            intention for intention in self._trigger_matcher.values(current_context)
+            if not intention.get("completed")
+        ]
         
         return {
             "success": True,
@@ -130,6 +140,8 @@ class ProspectiveMemory(NexusComponent):
         
         for intention in self._intentions:
             if intention.get("id") == intention_id:
+                if not intention.get("completed"):
+                    self._trigger_matcher.remove(str(intention.get("trigger", "")), intention)
                 intention["completed"] = True
                 intention["completed_at"] = datetime.now(timezone.utc).isoformat()
                 
@@ -2,6 +2,7 @@
 """ThoughtLog SQLModel — Armazena raciocínios internos do JARVIS."""
 from datetime import datetime, timezone
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 from enum import Enum
 
@@ -19,6 +20,7 @@ class ThoughtLog(SQLModel, table=True):
     Campos:
     - mission_id: Identificador único da missão (UUID ou Hash)
     - session_id: Agrupamento por sessão de chat
+    - agent_id: Agente que emitiu o pensamento (vazio quando não informado)
     - status: Tipo de entrada (Interação ou Monólogo Interno)
     - thought_process: Raciocínio técnico/lógico da IA
     - problem_description: Descrição do erro ou desafio
@@ -26,11 +28,20 @@ class ThoughtLog(SQLModel, table=True):
     - reward_received: Sinal de feedback positivo/negativo para o agente
     """
     __tablename__ = "thought_logs"
-    __table_args__ = {'extend_existing': True}
+    # Índices compostos pelos caminhos de leitura: histórico da missão/agente
+    # em ordem de tempo, escalações pendentes e recentes por status
+    __table_args__ = (
+        Index("ix_thought_logs_mission_created", "mission_id", "created_at"),
+        Index("ix_thought_logs_agent_created", "agent_id", "created_at"),
+        Index("ix_thought_logs_human_created", "requires_human", "created_at"),
+        Index("ix_thought_logs_status_created", "status", "created_at"),
+        {'extend_existing': True},
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    mission_id: str = Field(nullable=False, index=True)
+    mission_id: str = Field(nullable=False)
     session_id: str = Field(nullable=False, index=True)
+    agent_id: str = Field(default="")
     
     # CORREÇÃO: Tipagem direta com Enum para validação rigorosa do SQLModel/Pydantic
     status: InteractionStatus = Field(
@@ -44,7 +55,7 @@ class ThoughtLog(SQLModel, table=True):
     success: bool = Field(default=False, index=True)
     error_message: str = Field(default="")
     retry_count: int = Field(default=0, index=True)
-    requires_human: bool = Field(default=False, index=True)
+    requires_human: bool = Field(default=False)
     escalation_reason: str = Field(default="")
     
     # Dados serializados (JSON strings para compatibilidade SQLite/Postgres)
@@ -7,10 +7,14 @@ Integrado ao ecossistema Nexus para resolução dinâmica.
 from app.core.nexus import NexusComponent
 from app.domain.models import CommandType, Intent
 from app.core.config import settings
+from app.utils.trigger_matcher import TriggerMatcher
 import logging
 
 logger = logging.getLogger(__name__)
 
+_EXIT_MATCHER = TriggerMatcher(["fechar", "sair", "encerrar", "tchau"])
+_CANCEL_MATCHER = TriggerMatcher(["cancelar", "parar", "stop"])
+
 class CommandInterpreter(NexusComponent):
     """
     Interpreta comandos de texto bruto em Intents estruturados.
@@ -54,6 +58,22 @@ class CommandInterpreter(NexusComponent):
             "reportar": CommandType.REPORT_ISSUE,
             "issue": CommandType.REPORT_ISSUE,
         }
+        # Autômato sobre os padrões: uma passada pelo comando; a prioridade
+        # continua sendo a ordem de declaração acima
+        self._pattern_matcher = TriggerMatcher(self._command_patterns.items())
+
+    def add_command_pattern(self, pattern: str, command_type: CommandType) -> None:
+        """Registra um padrão (menor prioridade que os já existentes).
+
+        Registrar de novo um padrão existente substitui o tipo anterior, que
+        deixa de casar, e o move para o fim da ordem de prioridade.
+        """
+        pattern = pattern.lower()
+        previous = self._command_patterns.pop(pattern, None)
+        if previous is not None:
+            self._pattern_matcher.remove(pattern, previous)
+        self._command_patterns[pattern] = command_type
+        self._pattern_matcher.add(pattern, command_type)
 
     def execute(self, context: dict) -> Intent:
         """
@@ -88,28 +108,29 @@ class CommandInterpreter(NexusComponent):
             if wake_pos != -1:
                 raw_input = raw_input[wake_pos + len(self.wake_word):].strip()
 
-        # Busca por padrões
-        for pattern, command_type in self._command_patterns.items():
-            if pattern in command:
-                # Extração de parâmetros
-                param = command.replace(pattern, "", 1).strip()
-
-                # Preservação de Case para Report de Issues
-                if command_type == CommandType.REPORT_ISSUE:
-                    raw_lower = raw_input.lower()
-                    pattern_pos = raw_lower.find(pattern)
-                    if pattern_pos != -1:
-                        param_start = pattern_pos + len(pattern)
-                        param = raw_input[param_start:].strip()
-
-                parameters = self._build_parameters(command_type, param, command)
-
-                return Intent(
-                    command_type=command_type,
-                    parameters=parameters,
-                    raw_input=raw_input,
-                    confidence=1.0,
-                )
+        # Busca por padrões (o primeiro declarado que ocorre no comando vence)
+        match = self._pattern_matcher.first(command)
+        if match is not None:
+            pattern, command_type = match.pattern, match.value
+            # Extração de parâmetros
+            param = command.replace(pattern, "", 1).strip()
+
+            # Preservação de Case para Report de Issues
+            if command_type == CommandType.REPORT_ISSUE:
+                raw_lower = raw_input.lower()
+                pattern_pos = raw_lower.find(pattern)
+                if pattern_pos != -1:
+                    param_start = pattern_pos + len(pattern)
+                    param = raw_input[param_start:].strip()
+
+            parameters = self._build_parameters(command_type, param, command)
+
+            return Intent(
+                command_type=command_type,
+                parameters=parameters,
+                raw_input=raw_input,
+                confidence=1.0,
+            )
 
         # Comando não reconhecido
         return Intent(
@@ -134,9 +155,7 @@ class CommandInterpreter(NexusComponent):
         return handlers.get(command_type, lambda: {"param": param})()
 
     def is_exit_command(self, raw_input: str) -> bool:
-        exit_keywords = ["fechar", "sair", "encerrar", "tchau"]
-        return any(k in raw_input.lower() for k in exit_keywords)
+        return _EXIT_MATCHER.contains_any(raw_input)
 
     def is_cancel_command(self, raw_input: str) -> bool:
-        cancel_keywords = ["cancelar", "parar", "stop"]
-        return any(k in raw_input.lower() for k in cancel_keywords)
+        return _CANCEL_MATCHER.contains_any(raw_input)
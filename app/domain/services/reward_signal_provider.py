@@ -7,9 +7,16 @@ import json
 import logging
 from typing import Any, Dict, List, Optional
 from app.core.nexus import NexusComponent, nexus
+from app.utils.trigger_matcher import TriggerMatcher
 
 logger = logging.getLogger(__name__)
 
+# Palavras de feedback → polaridade (uma passada pelo texto)
+_FEEDBACK_MATCHER = TriggerMatcher(
+    [(p, "positive") for p in ("👍", "bom", "ótimo", "great", "good", "perfeito")]
+    + [(p, "negative") for p in ("👎", "ruim", "lento", "bad", "wrong", "erro")]
+)
+
 class RewardSignalProvider(NexusComponent):
     """Calcula rewards (recompensas) para evolução de código e interações de usuário."""
 
@@ -91,12 +98,12 @@ class RewardSignalProvider(NexusComponent):
         reward = base_map.get(outcome, 0.3)
 
         if feedback:
-            f_lower = feedback.lower()
+            polarity = _FEEDBACK_MATCHER.values(feedback)
             # Positivos
-            if any(p in f_lower for p in ["👍", "bom", "ótimo", "great", "good", "perfeito"]):
+            if "positive" in polarity:
                 reward += 0.15
             # Negativos
-            elif any(p in f_lower for p in ["👎", "ruim", "lento", "bad", "wrong", "erro"]):
+            elif "negative" in polarity:
                 reward -= 0.2
 
         return max(0.0, min(1.0, round(float(reward), 4)))
@@ -7,7 +7,8 @@ de execução. Implementa:
 - Validação contra políticas de segurança configuráveis.
 - Verificação de quotas de recursos (API, compute, armazenamento).
 - Protocolo de parada de emergência com autenticação multi-fator.
-- Audit log imutável (append-only) de todas as decisões.
+- Audit log imutável (append-only) de todas as decisões, gravado em group
+  commit pelo ``AuditWriter`` compartilhado (sem abrir o arquivo por decisão).
 
 Método principal::
 
@@ -15,7 +16,6 @@ Método principal::
 """
 
 import hashlib
-import json
 import logging
 import os
 import time
@@ -24,6 +24,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.nexus import NexusComponent, nexus
+from app.utils.audit_writer import get_audit_writer
 
 logger = logging.getLogger(__name__)
 
@@ -244,7 +245,7 @@ class SafetyGuardian(NexusComponent):
             valid_hashes.append(hashlib.sha256(env_token.encode("utf-8")).hexdigest())
 
         if token_hash not in valid_hashes:
-            self._audit("emergency_stop_attempt", allowed=False, reason="invalid_token")
+            self._audit("emergency_stop_attempt", allowed=False, reason="invalid_token", durable=True)
             return {"activated": False, "reason": "token_inválido"}
 
         self._emergency_stop_active = not self._emergency_stop_active
@@ -259,9 +260,14 @@ class SafetyGuardian(NexusComponent):
                 "timestamp": datetime.now(timezone.utc).isoformat(),
                 "token_prefix": token[:4] + "***" if len(token) >= 4 else "***",
             },
+            durable=True,
         )
         return {"activated": self._emergency_stop_active, "state": state}
 
+    def audit_stats(self) -> Dict[str, Any]:
+        """Vazão e latências do audit log (ver ``AuditWriter.stats``)."""
+        return get_audit_writer(_AUDIT_LOG_FILE).stats()
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
@@ -287,10 +293,15 @@ class SafetyGuardian(NexusComponent):
         allowed: bool,
         reason: str,
         context: Optional[Dict[str, Any]] = None,
+        durable: bool = False,
     ) -> None:
         """Registra decisão no audit log imutável (append-only).
 
-        O arquivo nunca é truncado — cada entrada é uma linha JSON.
+        Cada entrada é uma linha JSON e linhas gravadas nunca são reescritas;
+        só uma linha final incompleta, deixada por um crash, é descartada
+        quando o writer abre o arquivo. A entrada é enfileirada no writer
+        compartilhado; ``durable=True`` (parada de emergência) aguarda o
+        commit do grupo antes de retornar.
         """
         entry = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -301,8 +312,9 @@ class SafetyGuardian(NexusComponent):
             "emergency_stop_active": self._emergency_stop_active,
         }
         try:
-            with open(_AUDIT_LOG_FILE, "a", encoding="utf-8") as fh:
-                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            writer = get_audit_writer(_AUDIT_LOG_FILE)
+            if not writer.append(entry, wait=True if durable else None):
+                logger.warning("[SafetyGuardian] Audit log não confirmado no prazo: %s", action_type)
         except Exception as exc:
             logger.warning("[SafetyGuardian] Falha ao escrever audit log: %s", exc)
 
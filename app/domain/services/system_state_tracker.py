@@ -2,8 +2,14 @@
 """SystemStateTracker — Consciência de estado do sistema para tomada de decisões.
 
 Captura snapshots de CPU, RAM, filas e capabilities ativas antes de cada
-decisão. Persiste snapshots em formato .jrvs com hash de integridade e
-integra com ThoughtLogService para correlação de estados com pensamentos.
+decisão. Persiste snapshots com hash de integridade num ``SegmentLog``
+(segmentos .jrvs comprimidos com índice de tempo e de ``decision_id``,
+retenção e downsampling) e integra com ThoughtLogService para correlação
+de estados com pensamentos.
+
+Configuração por ambiente: ``SNAPSHOT_SEGMENT_MAX_BYTES``,
+``SNAPSHOT_RETENTION_DAYS``, ``SNAPSHOT_DOWNSAMPLE_AFTER_HOURS`` e
+``SNAPSHOT_DOWNSAMPLE_INTERVAL_S``.
 """
 
 import hashlib
@@ -16,6 +22,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from app.core.nexus import NexusComponent
+from app.utils.segment_log import SegmentLog, average_records, get_segment_log
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +30,27 @@ _SNAPSHOTS_DIR = Path("data/system_snapshots")
 _MAX_HISTORY = 100  # máximo de snapshots retidos na memória
 
 
+def _downsample_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Funde snapshots antigos num único snapshot médio (hash recalculado)."""
+    merged = average_records(snapshots, ts_field="epoch", key_field="decision_id")
+    merged["integrity_hash"] = SystemStateTracker._compute_hash(merged)
+    return merged
+
+
+def _snapshot_log() -> SegmentLog:
+    """Log de snapshots do diretório configurado (resolvido a cada chamada)."""
+    return get_segment_log(
+        _SNAPSHOTS_DIR,
+        ts_field="epoch",
+        key_field="decision_id",
+        segment_max_bytes=int(os.getenv("SNAPSHOT_SEGMENT_MAX_BYTES", 1 << 20)),
+        retention_days=float(os.getenv("SNAPSHOT_RETENTION_DAYS", 7)),
+        downsample_after_hours=float(os.getenv("SNAPSHOT_DOWNSAMPLE_AFTER_HOURS", 24)),
+        downsample_interval=float(os.getenv("SNAPSHOT_DOWNSAMPLE_INTERVAL_S", 300)),
+        downsample=_downsample_snapshots,
+    )
+
+
 class SystemStateTracker(NexusComponent):
     """Rastreia e persiste o estado do sistema para cada decisão tomada.
 
@@ -30,11 +58,13 @@ class SystemStateTracker(NexusComponent):
         capture_snapshot()    — captura CPU, RAM, filas e capabilities ativas.
         get_health_metrics()  — calcula metabolic_rate e score geral de saúde.
         get_recent_snapshots() — retorna os últimos N snapshots capturados.
+        query_snapshots()     — snapshots persistidos por intervalo de tempo e/ou decision_id.
     """
 
     def __init__(self) -> None:
         self._history: List[Dict[str, Any]] = []
         _SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+        self._migrate_legacy_snapshots()
 
     # ------------------------------------------------------------------
     # NexusComponent interface
@@ -44,9 +74,10 @@ class SystemStateTracker(NexusComponent):
         """Interface NexusComponent.
 
         Campos aceitos em *context*:
-            action (str) — "snapshot" | "health" | "history". Padrão: "snapshot".
-            decision_id (str) — identificador opcional da decisão em curso.
-            limit (int) — número de snapshots a retornar quando action="history".
+            action (str) — "snapshot" | "health" | "history" | "range". Padrão: "snapshot".
+            decision_id (str) — identificador da decisão em curso (ou filtro em "range").
+            limit (int) — número de snapshots a retornar em "history"/"range".
+            since, until — intervalo de "range" (epoch ou ISO-8601; until exclusivo).
 
         Returns:
             Dicionário com o resultado da ação solicitada.
@@ -59,6 +90,14 @@ class SystemStateTracker(NexusComponent):
         if action == "history":
             limit = int(ctx.get("limit", 10))
             return {"success": True, "snapshots": self.get_recent_snapshots(limit)}
+        if action == "range":
+            snapshots = self.query_snapshots(
+                since=ctx.get("since"),
+                until=ctx.get("until"),
+                decision_id=ctx.get("decision_id"),
+                limit=ctx.get("limit"),
+            )
+            return {"success": True, "snapshots": snapshots}
 
         # default: snapshot
         snapshot = self.capture_snapshot(decision_id=ctx.get("decision_id"))
@@ -125,6 +164,32 @@ class SystemStateTracker(NexusComponent):
         """
         return list(reversed(self._history[-limit:]))
 
+    def query_snapshots(
+        self,
+        since: Any = None,
+        until: Any = None,
+        decision_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Consulta snapshots persistidos sem listar o diretório.
+
+        Args:
+            since: Início do intervalo (epoch, datetime ou ISO-8601).
+            until: Fim exclusivo do intervalo.
+            decision_id: Restringe aos snapshots dessa decisão (inclui
+                snapshots antigos já reduzidos que a contêm).
+            limit: Devolve apenas os N mais recentes.
+
+        Returns:
+            Lista de snapshots em ordem cronológica.
+        """
+        return _snapshot_log().query(
+            since=since,
+            until=until,
+            key=decision_id,
+            limit=int(limit) if limit is not None else None,
+        )
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
@@ -186,15 +251,33 @@ class SystemStateTracker(NexusComponent):
         return hashlib.sha256(serialized).hexdigest()[:32]
 
     def _store_snapshot(self, snapshot: Dict[str, Any]) -> None:
-        """Persiste o snapshot em memória e em arquivo .jrvs no disco."""
+        """Persiste o snapshot em memória e no log segmentado em disco."""
         self._history.append(snapshot)
         if len(self._history) > _MAX_HISTORY:
             self._history = self._history[-_MAX_HISTORY:]
 
         try:
-            ts = snapshot.get("epoch", time.time())
-            fname = _SNAPSHOTS_DIR / f"snapshot_{int(ts)}.jrvs"
-            with open(fname, "w", encoding="utf-8") as fh:
-                json.dump(snapshot, fh, ensure_ascii=False, indent=2)
+            _snapshot_log().append(snapshot)
         except Exception as exc:
             logger.debug("Falha ao persistir snapshot: %s", exc)
+
+    def _migrate_legacy_snapshots(self) -> None:
+        """Importa os antigos ``snapshot_<epoch>.jrvs`` (JSON puro) para o log e os remove."""
+        legacy = sorted(_SNAPSHOTS_DIR.glob("snapshot_*.jrvs"))
+        if not legacy:
+            return
+        log = _snapshot_log()
+        migrated = []
+        for path in legacy:
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+                snapshot.setdefault("epoch", path.stat().st_mtime)
+            except (OSError, ValueError, AttributeError) as exc:
+                logger.debug("Snapshot legado ignorado (%s): %s", path, exc)
+                continue
+            log.append(snapshot)
+            migrated.append(path)
+        log.flush()
+        for path in migrated:
+            path.unlink(missing_ok=True)
+        logger.info("[SystemStateTracker] %d snapshots legados migrados para o log segmentado", len(migrated))
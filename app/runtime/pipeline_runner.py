@@ -1,14 +1,46 @@
 # -*- coding: utf-8 -*-
 """Pipeline Runner — Orquestra execução de pipelines YAML.
 CORREÇÃO: Ajuste de caminhos, tratamento de erros em strict mode e correção de sintaxe no main.
+
+Execução em DAG (opcional): se algum passo declara ``depends_on``, ``inputs``
+ou ``outputs``, o runner monta um grafo e roda os passos prontos em paralelo
+num pool limitado (``max_workers`` no YAML ou ``PIPELINE_MAX_WORKERS``)::
+
+    components:
+      consolidator:
+        id: consolidator
+        outputs: [result]
+      drive_uploader:
+        id: drive_uploader
+        inputs: [result]          # depende de quem declara ``result`` antes
+      gist_backup:
+        id: gist_uploader
+        depends_on: [consolidator]
+
+- Passos sem nenhuma declaração funcionam como barreira (esperam todos os
+  anteriores e são esperados pelos seguintes), preservando a ordem legada.
+- Cada passo recebe uma cópia do contexto com as alterações dos seus
+  ancestrais aplicadas em ordem de declaração; o contexto final mescla as
+  alterações de todos os passos também em ordem de declaração, então o
+  resultado independe da ordem de término.
+- Em strict mode, a primeira falha impede novos despachos; passos já em
+  execução terminam e o pipeline retorna ``status = "failed"``.
+
+Pipelines sem declarações seguem o laço sequencial original. Em ambos os
+modos o contexto final traz ``step_timings`` (segundos por passo) e
+``critical_path`` (passos e duração do caminho mais longo do grafo).
 """
 import os
+import time
 import yaml
 import logging
 import sys
-from typing import Any, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Set, Tuple
 from pathlib import Path
 
+from app.utils.log_pipeline import configure_logging
+
 # Tentativa de importação do core Nexus
 try:
     from app.core.nexus import nexus, CloudMock
@@ -23,13 +55,18 @@ except ImportError:
 # CONFIGURAÇÃO DE LOGGING
 # ============================================================================
 
-logging.basicConfig(
+configure_logging(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     datefmt="%H:%M:%S"
 )
 logger = logging.getLogger("PipelineRunner")
 
+# Chaves estruturais do runner que os componentes não podem sobrescrever
+_RESERVED_KEYS = ("results", "pipeline", "status", "step_timings", "critical_path", "wall_time")
+_DAG_KEYS = ("depends_on", "inputs", "outputs")
+_DEFAULT_MAX_WORKERS = 4
+
 # ============================================================================
 # FUNÇÕES PRINCIPAIS
 # ============================================================================
@@ -68,24 +105,251 @@ def run_pipeline(
         "artifacts": {},
     }
     
+    if any(isinstance(cfg, dict) and any(k in cfg for k in _DAG_KEYS) for cfg in pipeline_config.values()):
+        max_workers = int(config.get("max_workers") or os.getenv("PIPELINE_MAX_WORKERS", _DEFAULT_MAX_WORKERS))
+        return _run_dag(pipeline_name, pipeline_config, context, pipeline_strict, max_workers)
+    
+    timings: Dict[str, float] = {}
+    context["step_timings"] = timings
+    
     # Executar cada componente em ordem
     for step_name, step_config in pipeline_config.items():
+        started = time.perf_counter()
         success = _execute_step(
             step_name=step_name,
             step_config=step_config,
             context=context,
             is_strict=pipeline_strict,
         )
+        timings[step_name] = time.perf_counter() - started
         
         if not success and pipeline_strict:
             logger.error(f"💀 [STRICT] Falha crítica em '{step_name}'. Abortando.")
+            context["critical_path"] = {"steps": list(timings), "seconds": sum(timings.values())}
             context["status"] = "failed"
             return context
     
+    context["critical_path"] = {"steps": list(timings), "seconds": sum(timings.values())}
     logger.info(f"🏁 PIPELINE '{pipeline_name}' FINALIZADO.")
     context["status"] = "success"
     return context
 
+
+def build_step_graph(pipeline_config: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """Monta ``passo → dependências diretas`` a partir das declarações do YAML.
+
+    Raises:
+        ValueError: ``depends_on`` aponta para passo inexistente ou há ciclo.
+    """
+    order = list(pipeline_config)
+    graph: Dict[str, Set[str]] = {}
+    producers: Dict[str, List[str]] = {}
+    last_barrier: Optional[str] = None
+    since_barrier: List[str] = []
+    for step_name in order:
+        cfg = pipeline_config[step_name] or {}
+        deps: Set[str] = set()
+        if not any(k in cfg for k in _DAG_KEYS):
+            # Passo legado: barreira — espera tudo o que veio antes
+            deps.update(since_barrier)
+            if last_barrier:
+                deps.add(last_barrier)
+            last_barrier, since_barrier = step_name, []
+        else:
+            if last_barrier:
+                deps.add(last_barrier)
+            for dep in _as_list(cfg.get("depends_on")):
+                if dep not in pipeline_config:
+                    raise ValueError(f"Passo '{step_name}' depende de '{dep}', que não existe")
+                deps.add(dep)
+            for key in _as_list(cfg.get("inputs")):
+                deps.update(producers.get(key, []))
+            since_barrier.append(step_name)
+        for key in _as_list(cfg.get("outputs")):
+            producers.setdefault(key, []).append(step_name)
+        deps.discard(step_name)
+        graph[step_name] = deps
+    _topological_order(graph, order)  # valida ausência de ciclos
+    return graph
+
+
+def critical_path(
+    graph: Dict[str, Set[str]], durations: Dict[str, float], order: List[str]
+) -> Tuple[List[str], float]:
+    """Caminho mais longo (soma das durações) entre os passos executados."""
+    finish: Dict[str, float] = {}
+    prev: Dict[str, Optional[str]] = {}
+    for step in _topological_order(graph, order):
+        if step not in durations:
+            continue
+        best, best_dep = 0.0, None
+        for dep in graph[step]:
+            if dep in finish and finish[dep] > best:
+                best, best_dep = finish[dep], dep
+        finish[step] = best + durations[step]
+        prev[step] = best_dep
+    if not finish:
+        return [], 0.0
+    end = max(finish, key=lambda s: (finish[s], -order.index(s)))
+    path: List[str] = []
+    node: Optional[str] = end
+    while node is not None:
+        path.append(node)
+        node = prev[node]
+    return list(reversed(path)), finish[end]
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value]
+
+
+def _topological_order(graph: Dict[str, Set[str]], order: List[str]) -> List[str]:
+    """Ordem topológica estável (empates resolvidos pela ordem de declaração)."""
+    remaining = {step: set(deps) for step, deps in graph.items()}
+    result: List[str] = []
+    while remaining:
+        ready = [step for step in order if step in remaining and not remaining[step]]
+        if not ready:
+            raise ValueError(f"Ciclo de dependências entre: {', '.join(s for s in order if s in remaining)}")
+        for step in ready:
+            del remaining[step]
+            for deps in remaining.values():
+                deps.discard(step)
+        result.extend(ready)
+    return result
+
+
+def _ancestors(graph: Dict[str, Set[str]], step: str) -> Set[str]:
+    seen: Set[str] = set()
+    stack = list(graph[step])
+    while stack:
+        node = stack.pop()
+        if node not in seen:
+            seen.add(node)
+            stack.extend(graph[node])
+    return seen
+
+
+def _apply_updates(context: Dict[str, Any], updates: Dict[str, Any]) -> None:
+    """Aplica as alterações de um passo; ``artifacts`` é mesclado chave a chave."""
+    for key, value in updates.items():
+        if key == "artifacts" and isinstance(value, dict):
+            context["artifacts"] = {**context.get("artifacts", {}), **value}
+        else:
+            context[key] = value
+
+
+def _step_context(
+    base: Dict[str, Any], updates: Dict[str, Dict[str, Any]], ancestors: Set[str], order: List[str]
+) -> Dict[str, Any]:
+    """Contexto isolado de um passo: base + alterações dos ancestrais em ordem de declaração."""
+    ctx = {k: v for k, v in base.items() if k not in ("results", "artifacts")}
+    ctx["results"] = []
+    ctx["artifacts"] = dict(base.get("artifacts", {}))
+    for step in order:
+        if step in ancestors and step in updates:
+            _apply_updates(ctx, updates[step])
+    ctx["artifacts"] = dict(ctx["artifacts"])  # cópia própria para mutações in-place
+    return ctx
+
+
+def _diff_context(before: Dict[str, Any], before_artifacts: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Chaves criadas/substituídas pelo passo (por identidade), exceto as estruturais."""
+    updates: Dict[str, Any] = {}
+    for key, value in after.items():
+        if key in _RESERVED_KEYS:
+            continue
+        if key == "artifacts":
+            if isinstance(value, dict):
+                changed = {k: v for k, v in value.items() if k not in before_artifacts or before_artifacts[k] is not v}
+                if changed:
+                    updates["artifacts"] = changed
+            continue
+        if key not in before or before[key] is not value:
+            updates[key] = value
+    return updates
+
+
+def _run_dag(
+    pipeline_name: str,
+    pipeline_config: Dict[str, Any],
+    context: Dict[str, Any],
+    pipeline_strict: bool,
+    max_workers: int,
+) -> Dict[str, Any]:
+    """Executa os passos como DAG, despachando os prontos num pool limitado."""
+    order = list(pipeline_config)
+    try:
+        graph = build_step_graph(pipeline_config)
+    except ValueError as e:
+        logger.error(f"❌ Grafo do pipeline inválido: {e}")
+        context.update({"status": "failed", "error": str(e), "step_timings": {}, "critical_path": {"steps": [], "seconds": 0.0}})
+        return context
+    ancestors = {step: _ancestors(graph, step) for step in order}
+    base = dict(context)
+    updates: Dict[str, Dict[str, Any]] = {}
+    step_results: Dict[str, List[Dict[str, Any]]] = {}
+    timings: Dict[str, float] = {}
+    done: Set[str] = set()
+    failed_strict: Optional[str] = None
+    wall_start = time.perf_counter()
+
+    def _run(step_name: str, step_ctx: Dict[str, Any]) -> Tuple[bool, Dict[str, Any], List[Dict[str, Any]], float]:
+        before = dict(step_ctx)
+        before_artifacts = dict(step_ctx["artifacts"])
+        started = time.perf_counter()
+        ok = _execute_step(step_name, pipeline_config[step_name] or {}, step_ctx, is_strict=pipeline_strict)
+        elapsed = time.perf_counter() - started
+        return ok, _diff_context(before, before_artifacts, step_ctx), step_ctx["results"], elapsed
+
+    logger.info(f"🕸️ Pipeline '{pipeline_name}' em modo DAG ({len(order)} passos, {max_workers} workers)")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pipeline-step") as pool:
+        running: Dict[Future, str] = {}
+        while True:
+            if failed_strict is None:
+                scheduled = set(running.values())
+                for step in order:
+                    if step not in done and step not in scheduled and graph[step] <= done:
+                        step_ctx = _step_context(base, updates, ancestors[step], order)
+                        running[pool.submit(_run, step, step_ctx)] = step
+            if not running:
+                break
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                step = running.pop(future)
+                ok, step_updates, results, elapsed = future.result()
+                updates[step] = step_updates
+                step_results[step] = results
+                timings[step] = elapsed
+                done.add(step)
+                if not ok and pipeline_strict and failed_strict is None:
+                    failed_strict = step
+                    logger.error(f"💀 [STRICT] Falha crítica em '{step}'. Abortando.")
+
+    # Mescla determinística: ordem de declaração, independente da ordem de término
+    for step in order:
+        if step in updates:
+            _apply_updates(context, updates[step])
+            context["results"].extend(step_results[step])
+    context["step_timings"] = {step: timings[step] for step in order if step in timings}
+    path, path_seconds = critical_path(graph, timings, order)
+    context["critical_path"] = {"steps": path, "seconds": path_seconds}
+    context["wall_time"] = time.perf_counter() - wall_start
+    if failed_strict is not None:
+        context["status"] = "failed"
+        return context
+
+    logger.info(
+        f"🏁 PIPELINE '{pipeline_name}' FINALIZADO em {context['wall_time']:.2f}s "
+        f"(caminho crítico {path_seconds:.2f}s: {' → '.join(path)})."
+    )
+    context["status"] = "success"
+    return context
+
 def _execute_step(
     step_name: str,
     step_config: Dict[str, Any],
@@ -98,7 +362,7 @@ def _execute_step(
     component_id = step_config.get("id", step_name)
     hint_path = step_config.get("hint_path")
     
-    logger.info(f"🔍 Resolvendo: {step_name} (ID: {component_id})")
+    logger.info("🔍 Resolvendo: %s (ID: %s)", step_name, component_id)
     
     # Resolver componente via Nexus
     try:
@@ -120,7 +384,7 @@ def _execute_step(
         return True
     
     # Executar componente
-    logger.info(f"⚙️ Executando: {step_name}...")
+    logger.info("⚙️ Executando: %s...", step_name)
     try:
         if hasattr(component, "execute"):
             result = component.execute(context)
@@ -133,11 +397,11 @@ def _execute_step(
         if isinstance(result, dict):
             # Evita sobrepor chaves estruturais do runner
             for k, v in result.items():
-                if k not in ["results", "pipeline", "status"]:
+                if k not in _RESERVED_KEYS:
                     context[k] = v
         
         context["results"].append({"step": step_name, "status": "success", "result": "OK"})
-        logger.info(f"✅ {step_name} finalizado.")
+        logger.info("✅ %s finalizado.", step_name)
         return True
         
     except Exception as e:
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+Escritor append-only de trilhas de auditoria com group commit.
+
+Os audit logs do JARVIS (``data/safety_guardian_audit.jsonl``,
+``data/audit_log.json``) recebem uma linha por decisão. Em vez de abrir,
+escrever e fechar o arquivo no caminho de quem decide, ``append`` apenas
+enfileira a linha; uma thread por arquivo grava grupos inteiros:
+
+- um grupo é gravado quando junta ``max_batch`` entradas ou quando a mais
+  antiga espera ``max_latency`` segundos;
+- cada grupo é um único ``os.write`` num descritor ``O_APPEND`` mantido
+  aberto, sob ``flock`` compartilhado — um crash deixa no máximo o último
+  grupo incompleto;
+- ``durability="fsync"`` faz ``fsync`` após cada grupo e ``append`` só
+  retorna quando o grupo da entrada está em disco (um ``fsync`` cobre todas
+  as decisões concorrentes daquele grupo);
+- ao abrir, uma linha final sem ``\\n`` (grupo interrompido por crash) é
+  descartada sob ``flock`` exclusivo, que espera o grupo de outro processo
+  em andamento terminar — só a cauda de um crash é cortada;
+- um grupo que falha ``max_attempts`` vezes seguidas é descartado e contado
+  em ``dropped``; com ``max_pending`` entradas na fila, novas entradas são
+  recusadas (também contadas), em vez de a fila crescer sem limite.
+
+A fila e a thread vêm de :class:`app.utils.batch_queue.BatchQueue`.
+
+Configuração por ambiente: ``AUDIT_DURABILITY`` (``group`` | ``fsync``),
+``AUDIT_GROUP_MAX_ENTRIES``, ``AUDIT_GROUP_MAX_LATENCY_MS`` e
+``AUDIT_MAX_PENDING``.
+
+Uso::
+
+    from app.utils.audit_writer import get_audit_writer
+
+    audit = get_audit_writer("data/safety_guardian_audit.jsonl")
+    audit.append({"action_type": "read_file", "allowed": True})
+    audit.stats()  # entries_per_sec, append_p99_ms, commit_p99_ms, ...
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from app.utils.batch_queue import Batch, BatchQueue
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("group", "fsync")
+_DEFAULT_MAX_BATCH = 256
+_DEFAULT_MAX_LATENCY = 0.05
+_DEFAULT_MAX_ATTEMPTS = 5
+_DEFAULT_MAX_PENDING = 65536
+_LATENCY_SAMPLES = 4096
+# Faixas de seq descartadas lembradas para responder a quem aguarda o commit
+_DROPPED_RANGES = 64
+
+
+def _flock(fd: int, operation: int) -> None:
+    """``flock`` de melhor esforço: sem suporte (Windows, alguns FS de rede) segue sem trava."""
+    if fcntl is None:
+        return
+    try:
+        fcntl.flock(fd, operation)
+    except OSError as exc:
+        logger.debug("[AuditWriter] flock indisponível: %s", exc)
+
+
+def _percentile(samples: Deque[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AuditWriter(BatchQueue):
+    """Fila de linhas JSON gravadas em grupos por uma thread dedicada.
+
+    Args:
+        path: Arquivo de auditoria (criado se não existir).
+        max_batch: Entradas por grupo antes de gravar imediatamente.
+        max_latency: Espera máxima (s) de uma entrada antes do grupo ser gravado.
+        durability: ``group`` (padrão) ou ``fsync`` (fsync por grupo e
+            ``append`` aguarda o commit).
+        max_attempts: Falhas seguidas de um grupo antes de descartá-lo.
+        max_pending: Entradas na fila a partir das quais ``append`` recusa.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_batch: int = _DEFAULT_MAX_BATCH,
+        max_latency: float = _DEFAULT_MAX_LATENCY,
+        durability: str = "group",
+        max_attempts: int = _DEFAULT_MAX_ATTEMPTS,
+        max_pending: int = _DEFAULT_MAX_PENDING,
+    ) -> None:
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability deve ser um de {DURABILITY_MODES}")
+        self.path = Path(path)
+        super().__init__(max_batch, max_latency, thread_name=f"audit-writer:{self.path.name}")
+        self.durability = durability
+        self.max_attempts = max(1, int(max_attempts))
+        self.max_pending = max(1, int(max_pending))
+        self._failures = 0
+        self._dropped_ranges: Deque[Tuple[int, int]] = deque(maxlen=_DROPPED_RANGES)
+        self._fd: Optional[int] = None
+        self._started = time.monotonic()
+        self._append_latency: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._commit_latency: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._counters = {
+            "entries": 0, "groups": 0, "bytes": 0, "fsyncs": 0, "errors": 0,
+            "dropped": 0, "rejected": 0, "torn_tail_bytes": 0,
+        }
+
+    @classmethod
+    def from_env(cls, path: Union[str, Path]) -> "AuditWriter":
+        return cls(
+            path,
+            max_batch=int(os.getenv("AUDIT_GROUP_MAX_ENTRIES", _DEFAULT_MAX_BATCH)),
+            max_latency=float(os.getenv("AUDIT_GROUP_MAX_LATENCY_MS", _DEFAULT_MAX_LATENCY * 1000)) / 1000,
+            durability=os.getenv("AUDIT_DURABILITY", "group").lower(),
+            max_pending=int(os.getenv("AUDIT_MAX_PENDING", _DEFAULT_MAX_PENDING)),
+        )
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def append(self, entry: Union[Dict[str, Any], str], wait: Optional[bool] = None, timeout: float = 5.0) -> bool:
+        """Enfileira uma entrada (dict → JSON).
+
+        Args:
+            wait: Aguarda o commit do grupo da entrada. Padrão: True apenas
+                em ``durability="fsync"``.
+            timeout: Limite de espera quando ``wait``.
+
+        Returns:
+            True se enfileirada (e, com ``wait``, gravada dentro do prazo);
+            False com a fila cheia ou se o grupo da entrada foi descartado.
+        """
+        start = time.perf_counter()
+        line = entry if isinstance(entry, str) else json.dumps(entry, ensure_ascii=False)
+        data = (line.rstrip("\n") + "\n").encode("utf-8")
+        with self._cond:
+            if self._stopping:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self._counters["rejected"] += 1
+                if self._counters["rejected"] == 1 or self._counters["rejected"] % 1000 == 0:
+                    logger.error("[AuditWriter] Fila de %s cheia: %d entradas recusadas",
+                                 self.path, self._counters["rejected"])
+                return False
+            seq = self._put_locked(data)
+            if wait is None:
+                wait = self.durability == "fsync"
+            ok = self._wait_committed_locked(seq, timeout) if wait else True
+            if ok and wait:
+                ok = not any(first <= seq <= last for first, last in self._dropped_ranges)
+            self._append_latency.append(time.perf_counter() - start)
+        return ok
+
+    def stats(self) -> Dict[str, Any]:
+        """Vazão e latências (ms) do writer desde a criação."""
+        with self._cond:
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            groups = self._counters["groups"]
+            return {
+                **self._counters,
+                "pending": len(self._pending),
+                "durability": self.durability,
+                "entries_per_sec": self._counters["entries"] / elapsed,
+                "avg_group_size": self._counters["entries"] / groups if groups else 0.0,
+                "append_p50_ms": _percentile(self._append_latency, 0.50) * 1000,
+                "append_p99_ms": _percentile(self._append_latency, 0.99) * 1000,
+                "commit_p99_ms": _percentile(self._commit_latency, 0.99) * 1000,
+            }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _committed_locked(self, batch: Batch, now: float) -> None:
+        self._failures = 0
+        self._counters["entries"] += len(batch)
+        self._counters["groups"] += 1
+        self._commit_latency.extend(now - enqueued for _, _, enqueued in batch)
+
+    def _failed_locked(self, batch: Batch) -> bool:
+        self._failures += 1
+        if self._failures < self.max_attempts:
+            # Mantém a ordem: o grupo volta para a frente da fila
+            self._pending.extendleft(reversed(batch))
+            return False
+        logger.error("[AuditWriter] %d entradas de %s descartadas após %d falhas",
+                     len(batch), self.path, self._failures)
+        self._failures = 0
+        self._committed_seq = batch[-1][0]
+        self._dropped_ranges.append((batch[0][0], batch[-1][0]))
+        self._counters["dropped"] += len(batch)
+        return False
+
+    def _closed_locked(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _write_batch(self, group: List[bytes]) -> bool:
+        payload = b"".join(group)
+        try:
+            fd = self._open()
+            # Impede que outro processo corte este grupo como cauda de crash
+            _flock(fd, fcntl.LOCK_SH if fcntl else 0)
+            try:
+                view = memoryview(payload)
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+            finally:
+                _flock(fd, fcntl.LOCK_UN if fcntl else 0)
+            if self.durability == "fsync":
+                os.fsync(fd)
+                self._counters["fsyncs"] += 1
+            self._counters["bytes"] += len(payload)
+            return True
+        except OSError as exc:
+            self._counters["errors"] += 1
+            logger.warning("[AuditWriter] Falha ao gravar %d entradas em %s: %s", len(group), self.path, exc)
+            if self._fd is not None:
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+                self._fd = None
+            return False
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._repair_tail()
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _repair_tail(self) -> None:
+        """Descarta uma linha final incompleta deixada por um crash.
+
+        Outros processos gravam sob ``LOCK_SH``; com ``LOCK_EX`` nenhum grupo
+        está em andamento e uma linha sem ``\\n`` só pode ser de um crash.
+        Sem ``fcntl`` (Windows) não há workers forkados disputando o arquivo.
+        """
+        if not self.path.exists():
+            return
+        with self.path.open("r+b") as fh:
+            _flock(fh.fileno(), fcntl.LOCK_EX if fcntl else 0)
+            size = fh.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            fh.seek(size - 1)
+            if fh.read(1) == b"\n":
+                return
+            pos = size
+            chunk = 4096
+            while pos > 0:
+                start = max(0, pos - chunk)
+                fh.seek(start)
+                block = fh.read(pos - start)
+                idx = block.rfind(b"\n")
+                if idx != -1:
+                    pos = start + idx + 1
+                    break
+                pos = start
+            fh.truncate(pos)
+            self._counters["torn_tail_bytes"] += size - pos
+            logger.warning("[AuditWriter] %s: %d bytes de linha incompleta descartados", self.path, size - pos)
+
+    # No fork, BatchQueue descarta a thread e a fila do pai. O descritor
+    # O_APPEND herdado é mantido: reabrir repararia a cauda enquanto o pai
+    # ainda pode estar gravando um grupo.
+
+
+_writers: Dict[Path, AuditWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_audit_writer(path: Union[str, Path]) -> AuditWriter:
+    """Instância compartilhada por caminho (configurada via ambiente)."""
+    resolved = Path(path).resolve()
+    with _writers_lock:
+        writer = _writers.get(resolved)
+        if writer is None:
+            writer = _writers[resolved] = AuditWriter.from_env(resolved)
+        return writer
+
+
+def flush_all(timeout: float = 5.0) -> bool:
+    """Força a gravação de todos os writers compartilhados."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    return all(writer.flush(timeout) for writer in writers)
+
+
+@atexit.register
+def _close_all() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close(timeout=2.0)
+
+
+def _after_fork_in_child() -> None:
+    global _writers_lock
+    _writers_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
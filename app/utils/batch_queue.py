@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Fila de group commit compartilhada pelos writers em lote.
+
+``AuditWriter`` (linhas JSONL) e ``ThoughtLogWriter`` (linhas no banco)
+seguem o mesmo protocolo; esta classe base concentra a parte comum:
+
+- cada item recebe um número de sequência; ``_committed_seq`` avança quando
+  o lote que o contém é gravado (ou descartado), o que permite a quem
+  enfileira aguardar o próprio commit;
+- uma thread por fila retira um lote quando junta ``max_batch`` itens, quando
+  o mais antigo espera ``max_latency`` segundos, num ``flush`` ou no
+  ``close``;
+- um lote que falha volta para a frente da fila, mantendo a ordem;
+- com ``inline=True`` (recursos que não podem ser usados por outra thread) o
+  lote é gravado por quem enfileira ou chama ``flush``;
+- após um ``fork`` a thread e a fila do pai são descartadas no filho.
+
+Subclasses implementam ``_write_batch`` e podem sobrescrever
+``_committed_locked``/``_failed_locked`` para contadores e política de falha.
+"""
+
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+Batch = List[Tuple[int, Any, float]]
+
+_live_queues: "weakref.WeakSet[BatchQueue]" = weakref.WeakSet()
+
+
+class BatchQueue:
+    """Base de filas gravadas em lotes por uma thread dedicada.
+
+    Args:
+        max_batch: Itens por lote antes de gravar imediatamente.
+        max_latency: Espera máxima (s) de um item antes do lote ser gravado.
+        thread_name: Nome da thread de gravação.
+        inline: Grava no chamador em vez de usar a thread.
+    """
+
+    def __init__(self, max_batch: int, max_latency: float, thread_name: str, inline: bool = False) -> None:
+        self.max_batch = max(1, int(max_batch))
+        self.max_latency = max(0.0, float(max_latency))
+        self._thread_name = thread_name
+        self._inline = inline
+        self._pending: Deque[Tuple[int, Any, float]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._enqueued_seq = 0
+        self._committed_seq = 0
+        self._flush_target = 0
+        self._stopping = False
+        _live_queues.add(self)
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Grava imediatamente tudo o que foi enfileirado até agora."""
+        with self._cond:
+            if self._inline:
+                self._drain_inline_locked()
+                return not self._pending
+            return self._wait_committed_locked(self._enqueued_seq, timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Drena a fila e para a thread."""
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            self._thread = None
+            self._stopping = False
+            self._closed_locked()
+
+    # ------------------------------------------------------------------
+    # Pontos de extensão
+    # ------------------------------------------------------------------
+
+    def _write_batch(self, items: List[Any]) -> bool:
+        """Grava ``items`` (fora do lock). Retorna False para tentar de novo."""
+        raise NotImplementedError
+
+    def _committed_locked(self, batch: Batch, now: float) -> None:
+        """Chamado após gravar ``batch`` (contadores, latências)."""
+
+    def _failed_locked(self, batch: Batch) -> bool:
+        """Decide o destino de um lote que falhou.
+
+        O padrão devolve o lote à frente da fila. Retorna True quando a
+        próxima tentativa deve ser imediata (sem o intervalo de espera).
+        """
+        self._pending.extendleft(reversed(batch))
+        return False
+
+    def _batch_limit_locked(self) -> int:
+        """Tamanho máximo do próximo lote retirado da fila."""
+        return self.max_batch
+
+    def _closed_locked(self) -> None:
+        """Libera recursos após a thread parar."""
+
+    # ------------------------------------------------------------------
+    # Fila
+    # ------------------------------------------------------------------
+
+    def _put_locked(self, item: Any) -> int:
+        """Enfileira ``item`` e acorda a thread quando o lote encheu."""
+        self._enqueued_seq += 1
+        self._pending.append((self._enqueued_seq, item, time.monotonic()))
+        if self._inline:
+            if len(self._pending) >= self.max_batch or \
+                    time.monotonic() - self._pending[0][2] >= self.max_latency:
+                self._drain_inline_locked()
+        else:
+            self._ensure_worker()
+            if len(self._pending) >= self.max_batch or self.max_latency == 0:
+                self._cond.notify_all()
+        return self._enqueued_seq
+
+    def _wait_committed_locked(self, seq: int, timeout: float) -> bool:
+        """Pede a gravação imediata até ``seq`` e aguarda o commit."""
+        if self._committed_seq >= seq:
+            return True
+        if self._inline:
+            self._drain_inline_locked()
+            return self._committed_seq >= seq
+        self._flush_target = max(self._flush_target, seq)
+        self._ensure_worker()
+        self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        while self._committed_seq < seq:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._cond.wait(remaining)
+        return True
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self._thread_name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                batch = self._next_batch_locked()
+                if batch is None:
+                    return
+            ok = self._write_batch([item for _, item, _ in batch])
+            with self._cond:
+                retry_now = self._finish_locked(batch, ok)
+            if not ok and not retry_now:
+                time.sleep(max(self.max_latency, 0.1))
+
+    def _drain_inline_locked(self) -> None:
+        while self._pending:
+            batch = self._take_locked()
+            ok = self._write_batch([item for _, item, _ in batch])
+            if not self._finish_locked(batch, ok) and not ok:
+                return
+
+    def _finish_locked(self, batch: Batch, ok: bool) -> bool:
+        retry_now = False
+        if ok:
+            self._committed_seq = batch[-1][0]
+            self._committed_locked(batch, time.monotonic())
+        else:
+            retry_now = self._failed_locked(batch)
+        self._cond.notify_all()
+        return retry_now
+
+    def _take_locked(self) -> Batch:
+        take = min(len(self._pending), self._batch_limit_locked())
+        return [self._pending.popleft() for _ in range(take)]
+
+    def _next_batch_locked(self) -> Optional[Batch]:
+        """Aguarda o gatilho (tamanho, prazo ou flush) e retira um lote."""
+        while True:
+            if self._pending:
+                oldest_age = time.monotonic() - self._pending[0][2]
+                if (
+                    len(self._pending) >= self.max_batch
+                    or oldest_age >= self.max_latency
+                    or self._flush_target > self._committed_seq
+                    or self._stopping
+                ):
+                    return self._take_locked()
+                self._cond.wait(self.max_latency - oldest_age)
+            elif self._stopping:
+                return None
+            else:
+                self._cond.wait()
+
+    def _reset_in_child(self) -> None:
+        # A thread não sobrevive ao fork e a fila pertence ao processo pai
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._pending.clear()
+        self._committed_seq = self._flush_target = self._enqueued_seq
+
+
+def _after_fork_in_child() -> None:
+    for queue in list(_live_queues):
+        queue._reset_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Lease de daemons entre processos do mesmo servidor.
+
+No modo multi-worker da API (``API_WORKERS`` > 1) cada worker é um fork do
+processo mestre e carrega o mesmo grafo de componentes. Loops de fundo como
+o Overwatch ou o KeepAlive do C2 devem rodar em um único processo: antes de
+iniciar sua thread, o componente chama ``claim_daemon(nome)``.
+
+- o lease é um ``flock`` exclusivo em ``<JARVIS_LEASE_DIR>/<nome>.lock``,
+  mantido enquanto o processo vive; se o dono morre, o kernel libera o lock
+  e o worker que o substituir pode assumir o daemon;
+- sem ``JARVIS_LEASE_DIR`` (processo único, testes) todo pedido é aceito;
+- leases herdados via ``fork`` continuam pertencendo ao pai: o filho
+  esquece os seus e precisa pedir de novo.
+
+Uso::
+
+    from app.utils.daemon_lease import claim_daemon
+
+    if claim_daemon("overwatch"):
+        self._thread.start()
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LEASE_DIR_ENV = "JARVIS_LEASE_DIR"
+
+_held: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def _lease_dir() -> Optional[str]:
+    return os.getenv(LEASE_DIR_ENV) or None
+
+
+def claim_daemon(name: str) -> bool:
+    """Tenta assumir o daemon ``name`` para este processo (idempotente).
+
+    Returns:
+        True se este processo deve rodar o daemon.
+    """
+    directory = _lease_dir()
+    if directory is None or fcntl is None:
+        return True
+    with _lock:
+        if name in _held:
+            return True
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(os.path.join(directory, f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            logger.info("[DaemonLease] '%s' já roda em outro processo", name)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        _held[name] = fd
+        logger.info("[DaemonLease] '%s' assumido pelo pid %d", name, os.getpid())
+        return True
+
+
+def release_daemon(name: str) -> None:
+    """Libera o lease de ``name`` se este processo o detém."""
+    with _lock:
+        fd = _held.pop(name, None)
+    if fd is not None:
+        os.close(fd)
+
+
+def held_daemons() -> Dict[str, int]:
+    """Leases detidos por este processo (nome → fd)."""
+    with _lock:
+        return dict(_held)
+
+
+def _forget_inherited() -> None:
+    # O descritor herdado aponta para o mesmo lock do pai: fechar a cópia do
+    # filho não libera o lease, que continua com o pai
+    global _lock
+    _lock = threading.Lock()
+    for fd in _held.values():
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    _held.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_inherited)
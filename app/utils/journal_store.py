@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Journal JSONL append-only com índice lateral de offsets.
+
+Os journals do JARVIS (``data/dev_agent_jobs.jsonl``,
+``data/gatekeeper_rejections.jsonl``) são apenas anexados. Este módulo mantém, para cada arquivo:
+
+- a lista de offsets de cada linha (consulta ``latest(n)`` lê só ``n`` linhas);
+- offsets por chave (``get(key)`` e ``latest_keys(n)`` para dedup por id);
+- pares ``(timestamp, offset)`` ordenados (``since(ts)`` por bisect);
+- um cursor de cauda: cada consulta só faz parse dos bytes novos.
+
+O índice é espelhado num arquivo lateral ``<journal>.idx`` para que um
+processo novo não precise reler o journal inteiro. O lateral também é
+append-only: um cabeçalho JSON seguido de uma linha por gravação com as
+entradas novas (``[offset, chave, ts]``) e o cursor; como vários processos
+podem anexar as mesmas linhas, a carga ignora offsets abaixo do cursor já
+aplicado. Rotação/truncamento
+(inode diferente ou tamanho menor) reconstrói o índice e reescreve o lateral.
+
+Uso::
+
+    from app.utils.journal_store import get_journal_store
+
+    jobs = get_journal_store("data/dev_agent_jobs.jsonl", key_field="job_id", ts_field="started_at")
+    jobs.append({"job_id": "abc", "started_at": "2026-01-01T00:00:00+00:00"})
+    recent = jobs.latest(10)
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VERSION = 2
+_INDEX_SUFFIX = ".idx"
+# Intervalo mínimo entre gravações no índice lateral; um índice defasado
+# é seguro (o cursor apenas recomeça um pouco antes)
+_INDEX_SAVE_INTERVAL = 5.0
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """Converte epoch numérico ou ISO-8601 em float; None se inválido."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+class JournalStore:
+    """Journal JSONL com índice incremental de offsets, chaves e timestamps.
+
+    Args:
+        path: Caminho do arquivo ``.jsonl``.
+        key_field: Campo usado como chave (ex.: ``job_id``). Opcional.
+        ts_field: Campo de timestamp (epoch ou ISO-8601). Opcional.
+        persist_index: Se True, mantém o índice lateral ``<path>.idx``.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        key_field: Optional[str] = None,
+        ts_field: Optional[str] = None,
+        persist_index: bool = True,
+    ) -> None:
+        self.path = Path(path)
+        self.key_field = key_field
+        self.ts_field = ts_field
+        self.index_path = self.path.with_name(self.path.name + _INDEX_SUFFIX) if persist_index else None
+        self._lock = threading.RLock()
+        self._reset()
+        self._load_index()
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Anexa ``entry`` como uma linha JSON e atualiza o índice."""
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(line)
+            self._catch_up()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        """Número de entradas válidas no journal."""
+        with self._lock:
+            self._catch_up()
+            return len(self._offsets)
+
+    def latest(self, n: int) -> List[Dict[str, Any]]:
+        """As ``n`` entradas mais recentes, da mais nova para a mais antiga."""
+        with self._lock:
+            self._catch_up()
+            offsets = self._offsets[-n:] if n > 0 else []
+        return list(reversed(self._read_many(offsets)))
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """As ``n`` entradas mais recentes em ordem cronológica."""
+        with self._lock:
+            self._catch_up()
+            offsets = self._offsets[-n:] if n > 0 else []
+        return self._read_many(offsets)
+
+    def get(self, key: str) -> List[Dict[str, Any]]:
+        """Todas as entradas de ``key`` em ordem cronológica."""
+        with self._lock:
+            self._catch_up()
+            offsets = list(self._keys.get(key, ()))
+        return self._read_many(offsets)
+
+    def latest_keys(self, n: int) -> List[str]:
+        """As ``n`` chaves vistas mais recentemente pela primeira vez (mais nova primeiro)."""
+        with self._lock:
+            self._catch_up()
+            return list(reversed(self._key_order[-n:])) if n > 0 else []
+
+    def since(self, ts: float) -> List[Dict[str, Any]]:
+        """Entradas com timestamp >= ``ts`` (ordenadas por timestamp)."""
+        with self._lock:
+            self._catch_up()
+            start = bisect.bisect_left(self._ts, (ts, -1))
+            offsets = [off for _, off in self._ts[start:]]
+        return self._read_many(offsets)
+
+    def count_since(self, ts: float) -> int:
+        """Quantidade de entradas com timestamp >= ``ts`` (sem ler o journal)."""
+        with self._lock:
+            self._catch_up()
+            return len(self._ts) - bisect.bisect_left(self._ts, (ts, -1))
+
+    # ------------------------------------------------------------------
+    # Índice
+    # ------------------------------------------------------------------
+
+    def flush_index(self) -> None:
+        """Grava o índice lateral imediatamente."""
+        with self._lock:
+            self._catch_up()
+            self._save_index(force=True)
+
+    def _reset(self) -> None:
+        self._last_save = 0.0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._cursor = 0
+        self._offsets: List[int] = []
+        self._keys: Dict[str, List[int]] = {}
+        self._key_order: List[str] = []
+        self._ts: List[Tuple[float, int]] = []
+        # Entradas ainda não anexadas ao lateral; após reset ele é reescrito
+        self._unsaved: List[list] = []
+        self._saved_cursor = 0
+        self._rewrite_index = True
+
+    def _catch_up(self) -> None:
+        """Indexa apenas os bytes acrescentados desde o último cursor."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self._offsets or self._cursor:
+                self._reset()
+            return
+        file_id = (st.st_dev, st.st_ino)
+        if self._file_id is not None and (file_id != self._file_id or st.st_size < self._cursor):
+            logger.info("[JournalStore] %s rotacionado/truncado — reconstruindo índice", self.path)
+            self._reset()
+        self._file_id = file_id
+        if st.st_size == self._cursor:
+            return
+
+        with self.path.open("rb") as fh:
+            fh.seek(self._cursor)
+            data = fh.read(st.st_size - self._cursor)
+
+        pos = 0
+        size = len(data)
+        while pos < size:
+            nl = data.find(b"\n", pos)
+            end = nl if nl >= 0 else size
+            raw = data[pos:end].strip()
+            offset = self._cursor + pos
+            if raw:
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    if nl < 0:
+                        # Linha parcial (escrita em andamento): tenta de novo depois
+                        break
+                    entry = None
+                if isinstance(entry, dict):
+                    self._index_entry(entry, offset)
+            pos = end + 1 if nl >= 0 else size
+        self._cursor += min(pos, size)
+        self._save_index()
+
+    def _index_entry(self, entry: Dict[str, Any], offset: int) -> None:
+        key = None
+        if self.key_field is not None and self.key_field in entry:
+            key = str(entry.get(self.key_field) or "")
+        ts = _to_epoch(entry.get(self.ts_field)) if self.ts_field is not None else None
+        self._add(offset, key, ts)
+        if self.index_path is not None:
+            self._unsaved.append([offset, key, ts])
+
+    def _add(self, offset: int, key: Optional[str], ts: Optional[float]) -> None:
+        self._offsets.append(offset)
+        if key is not None:
+            bucket = self._keys.get(key)
+            if bucket is None:
+                self._keys[key] = [offset]
+                self._key_order.append(key)
+            else:
+                bucket.append(offset)
+        if ts is not None:
+            item = (ts, offset)
+            if not self._ts or self._ts[-1] <= item:
+                self._ts.append(item)
+            else:
+                bisect.insort(self._ts, item)
+
+    def _read_many(self, offsets: List[int]) -> List[Dict[str, Any]]:
+        if not offsets:
+            return []
+        result: List[Dict[str, Any]] = []
+        try:
+            with self.path.open("rb") as fh:
+                for offset in offsets:
+                    fh.seek(offset)
+                    try:
+                        result.append(json.loads(fh.readline()))
+                    except json.JSONDecodeError:
+                        continue
+        except OSError as exc:
+            logger.warning("[JournalStore] Falha ao ler %s: %s", self.path, exc)
+        return result
+
+    def _save_index(self, force: bool = False) -> None:
+        """Anexa ao lateral só as entradas indexadas desde a última gravação."""
+        if self.index_path is None or self._file_id is None:
+            return
+        if not self._rewrite_index and not self._unsaved and self._cursor == self._saved_cursor:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_save < _INDEX_SAVE_INTERVAL:
+            return
+        self._last_save = now
+        chunk = json.dumps({"cursor": self._cursor, "entries": self._unsaved}, separators=(",", ":")) + "\n"
+        try:
+            if self._rewrite_index:
+                header = {
+                    "version": _INDEX_VERSION,
+                    "key_field": self.key_field,
+                    "ts_field": self.ts_field,
+                    "file_id": list(self._file_id),
+                }
+                tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+                tmp.write_text(json.dumps(header, separators=(",", ":")) + "\n" + chunk, encoding="utf-8")
+                os.replace(tmp, self.index_path)
+            else:
+                with self.index_path.open("a", encoding="utf-8") as fh:
+                    fh.write(chunk)
+        except OSError as exc:
+            logger.debug("[JournalStore] Índice lateral não gravado (%s): %s", self.index_path, exc)
+            return
+        self._unsaved = []
+        self._saved_cursor = self._cursor
+        self._rewrite_index = False
+
+    def _load_index(self) -> None:
+        if self.index_path is None or not self.index_path.exists():
+            return
+        try:
+            with self.index_path.open("r+b") as fh:
+                header = json.loads(fh.readline())
+                if (
+                    header.get("version") != _INDEX_VERSION
+                    or header.get("key_field") != self.key_field
+                    or header.get("ts_field") != self.ts_field
+                    or not header.get("file_id")
+                ):
+                    return
+                self._file_id = tuple(header["file_id"])
+                while True:
+                    good = fh.tell()
+                    line = fh.readline()
+                    if not line:
+                        break
+                    if not line.endswith(b"\n"):
+                        # Gravação interrompida: descarta; o cursor recomeça antes dela
+                        fh.truncate(good)
+                        break
+                    chunk = json.loads(line)
+                    for offset, key, ts in chunk["entries"]:
+                        # Outro processo pode ter anexado as mesmas linhas
+                        if int(offset) >= self._cursor:
+                            self._add(int(offset), key, ts)
+                    self._cursor = max(self._cursor, int(chunk["cursor"]))
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("[JournalStore] Índice lateral inválido (%s): %s", self.index_path, exc)
+            self._reset()
+            return
+        self._saved_cursor = self._cursor
+        self._rewrite_index = False
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            self._catch_up()
+            offsets = list(self._offsets)
+        return iter(self._read_many(offsets))
+
+
+_stores: Dict[Path, JournalStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_journal_store(
+    path: Union[str, Path],
+    key_field: Optional[str] = None,
+    ts_field: Optional[str] = None,
+) -> JournalStore:
+    """Instância compartilhada por caminho (o índice em memória é reaproveitado)."""
+    resolved = Path(path).resolve()
+    with _stores_lock:
+        store = _stores.get(resolved)
+        if store is None or store.key_field != key_field or store.ts_field != ts_field:
+            store = JournalStore(resolved, key_field=key_field, ts_field=ts_field)
+            _stores[resolved] = store
+        return store
@@ -27,7 +27,7 @@ import json
 import struct
 import zlib
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Tuple, Union
 
 _MAGIC = b"JRVS"
 _VERSION = 1
@@ -71,17 +71,33 @@ def decode(raw: bytes) -> Any:
     Raises:
         JrvsDecodeError: Se o cabeçalho for inválido, versão desconhecida ou CRC falhar.
     """
-    if len(raw) < _HEADER_SIZE:
-        raise JrvsDecodeError(f"Arquivo muito pequeno: {len(raw)} bytes (mínimo {_HEADER_SIZE})")
+    return decode_frame(raw)[0]
 
-    magic, version, flags, crc_stored, length = struct.unpack_from(_HEADER_FMT, raw)
+
+def decode_frame(raw: bytes, offset: int = 0) -> Tuple[Any, int]:
+    """Decodifica o contêiner .jrvs que começa em *offset*.
+
+    Permite ler arquivos formados por vários contêineres concatenados
+    (ex.: segmentos de log), um após o outro.
+
+    Returns:
+        Tupla ``(objeto, offset_do_próximo_contêiner)``.
+
+    Raises:
+        JrvsDecodeError: Se o contêiner estiver truncado ou corrompido.
+    """
+    if len(raw) - offset < _HEADER_SIZE:
+        raise JrvsDecodeError(f"Arquivo muito pequeno: {len(raw) - offset} bytes (mínimo {_HEADER_SIZE})")
+
+    magic, version, flags, crc_stored, length = struct.unpack_from(_HEADER_FMT, raw, offset)
 
     if magic != _MAGIC:
         raise JrvsDecodeError(f"Magic inválido: {magic!r} (esperado {_MAGIC!r})")
     if version != _VERSION:
         raise JrvsDecodeError(f"Versão desconhecida: {version} (suportado: {_VERSION})")
 
-    payload = raw[_HEADER_SIZE : _HEADER_SIZE + length]
+    start = offset + _HEADER_SIZE
+    payload = raw[start : start + length]
     if len(payload) != length:
         raise JrvsDecodeError(f"Dados truncados: esperado {length} bytes, obtido {len(payload)}")
 
@@ -97,7 +113,7 @@ def decode(raw: bytes) -> Any:
         except zlib.error as exc:
             raise JrvsDecodeError(f"Erro ao descomprimir: {exc}") from exc
 
-    return json.loads(payload.decode("utf-8"))
+    return json.loads(payload.decode("utf-8")), start + length
 
 
 def write_file(path: Union[str, Path], data: Any, compress: bool = True) -> None:
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline de logging não bloqueante, com amostragem por logger.
+
+Os pontos de entrada (``serve.py``, ``main.py``, ``pipeline_runner.py``,
+workers de borda) configuravam ``logging.basicConfig`` com handlers
+síncronos: cada ``logger.info`` formatava e escrevia no arquivo/console na
+thread de quem atendia a requisição. ``configure_logging`` é o substituto
+direto:
+
+- a raiz recebe um único ``QueueHandler``; os handlers reais (stream,
+  arquivo) rodam numa thread ``QueueListener`` em segundo plano;
+- a fila é limitada (``LOG_QUEUE_SIZE``): cheia, o registro é descartado e
+  contado — o chamador nunca espera por I/O de log;
+- a formatação da mensagem é adiada para a thread de escrita só quando a
+  mensagem é ``str`` e os argumentos são imutáveis (str, números, None);
+  payloads estruturados (ver ``LazyJson``) são serializados no chamador,
+  mas apenas se o registro passar pelo nível e pela amostragem;
+- ``RateSampler`` limita mensagens frequentes por logger (balde de tokens
+  por logger + modelo ``%`` da mensagem, ou um balde por logger quando a
+  mensagem já vem formatada, ex.: f-strings); os baldes ficam num LRU
+  limitado; WARNING ou acima nunca é amostrado e o próximo registro aceito
+  informa quantos foram suprimidos;
+- processos forkados (workers da API, pool de interpretadores) recriam a
+  fila e a thread de escrita automaticamente.
+
+Configuração por ambiente: ``LOG_ASYNC`` (0 volta ao ``basicConfig``
+síncrono), ``LOG_QUEUE_SIZE`` e ``LOG_SAMPLING`` (``logger=msgs/s`` separados
+por vírgula, ex.: ``app.core.nexus=5,PipelineRunner=20``).
+
+Uso::
+
+    from app.utils.log_pipeline import configure_logging
+
+    configure_logging(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout), logging.FileHandler("jarvis.log")],
+    )
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+_DEFAULT_QUEUE_SIZE = 10000
+_IMMUTABLE = (str, int, float, bool, type(None))
+# Loggers de caminho quente amostrados por padrão (msgs/s por modelo de mensagem)
+_DEFAULT_SAMPLING = {"app.core.nexus": 20.0}
+_MAX_BUCKETS = 1024
+
+
+class LazyJson:
+    """Payload serializado com ``json.dumps`` apenas quando formatado.
+
+    O handler da fila formata a mensagem antes de enfileirar (o chamador pode
+    alterar ``data`` depois); registros filtrados nunca chegam a serializar.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.data = data
+
+    def __str__(self) -> str:
+        return json.dumps(self.data, default=str)
+
+
+class RateSampler(logging.Filter):
+    """Balde de tokens por (logger, modelo da mensagem) para níveis abaixo de WARNING.
+
+    O modelo só distingue baldes quando a mensagem é um template ``%`` com
+    argumentos; mensagens já formatadas (f-strings, ``str.format``) dividem um
+    balde por logger, senão cada texto distinto criaria um balde novo.
+
+    Args:
+        rates: Prefixo do nome do logger → mensagens por segundo permitidas.
+        burst: Multiplicador da capacidade do balde sobre a taxa.
+        max_buckets: Baldes mantidos (LRU); os menos usados são descartados.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        burst: float = 2.0,
+        clock=time.monotonic,
+        max_buckets: int = _MAX_BUCKETS,
+    ) -> None:
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.burst = burst
+        self.max_buckets = max(1, int(max_buckets))
+        self._clock = clock
+        # chave -> [tokens, último, suprimidos]
+        self._buckets: "OrderedDict[Tuple[str, Optional[str]], list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._rate_cache: Dict[str, Optional[float]] = {}
+        self.suppressed = 0
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        if name in self._rate_cache:
+            return self._rate_cache[name]
+        best, best_len = None, -1
+        for prefix, rate in self.rates.items():
+            if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > best_len:
+                best, best_len = rate, len(prefix)
+        self._rate_cache[name] = best
+        return best
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate_for(record.name)
+        if rate is None:
+            return True
+        template = record.msg if isinstance(record.msg, str) and record.args else None
+        key = (record.name, template)
+        now = self._clock()
+        capacity = max(1.0, rate * self.burst)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now, 0]
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1.0
+            dropped, bucket[2] = bucket[2], 0
+        if dropped:
+            record.sampled_out = dropped
+        return True
+
+
+class _SampledFormatter(logging.Formatter):
+    """Acrescenta a contagem de registros suprimidos pela amostragem."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        dropped = getattr(record, "sampled_out", 0)
+        return f"{text} (+{dropped} suprimidas)" if dropped else text
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` que descarta (e conta) em vez de bloquear com a fila cheia."""
+
+    def __init__(self, log_queue: "queue.Queue") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Msg str e args imutáveis: a formatação fica para a thread de escrita.
+        # Outras mensagens (ex.: LazyJson sobre o ``extra`` do chamador) podem
+        # mudar depois e são formatadas aqui.
+        args = record.args
+        if isinstance(record.msg, _IMMUTABLE):
+            if isinstance(args, tuple) and all(isinstance(a, _IMMUTABLE) for a in args):
+                return record
+            if isinstance(args, dict) and all(isinstance(v, _IMMUTABLE) for v in args.values()):
+                # O próprio dict do chamador pode mudar depois: cópia rasa basta
+                record.args = dict(args)
+                return record
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Com a fila cheia o sentinela espera a thread drenar
+        try:
+            self.queue.put(self._sentinel, timeout=5)
+        except queue.Full:
+            pass
+
+
+class LogPipeline:
+    """Fila + thread de escrita instaladas na raiz do logging."""
+
+    def __init__(self, handlers: Iterable[logging.Handler], queue_size: int, sampler: Optional[RateSampler]) -> None:
+        self.handlers = list(handlers)
+        self.queue_size = queue_size
+        self.sampler = sampler
+        self.queue_handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+        if sampler is not None:
+            self.queue_handler.addFilter(sampler)
+        self.listener = _Listener(self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+
+    def start(self) -> None:
+        self.listener.start()
+
+    def stop(self) -> None:
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Aguarda a fila esvaziar (útil em testes e no encerramento)."""
+        deadline = time.monotonic() + timeout
+        while self.queue_handler.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        for handler in self.handlers:
+            handler.flush()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue_handler.queue.qsize(),
+            "dropped": self.queue_handler.dropped,
+            "sampled_out": self.sampler.suppressed if self.sampler else 0,
+        }
+
+    def _restart_in_child(self) -> None:
+        # A thread de escrita não sobrevive ao fork: fila e listener novos
+        self.queue_handler.queue = queue.Queue(self.queue_size)
+        if self.sampler is not None:
+            self.sampler._lock = threading.Lock()
+        self.listener = _Listener(self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+
+_pipeline: Optional[LogPipeline] = None
+
+
+def _sampling_from_env() -> Dict[str, float]:
+    raw = os.getenv("LOG_SAMPLING")
+    if raw is None:
+        return dict(_DEFAULT_SAMPLING)
+    rates = {}
+    for item in raw.split(","):
+        name, _, rate = item.partition("=")
+        try:
+            if name.strip() and float(rate) > 0:
+                rates[name.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    format: str = logging.BASIC_FORMAT,
+    datefmt: Optional[str] = None,
+    handlers: Optional[Iterable[logging.Handler]] = None,
+    sampling: Optional[Dict[str, float]] = None,
+    force: bool = False,
+) -> Optional[LogPipeline]:
+    """Substituto de ``logging.basicConfig`` com escrita em segundo plano.
+
+    Como ``basicConfig``, não faz nada se a raiz já tem handlers (a menos
+    que ``force``).
+
+    Returns:
+        O pipeline instalado, ou None (raiz já configurada ou ``LOG_ASYNC=0``).
+    """
+    global _pipeline
+    root = logging.getLogger()
+    handlers = list(handlers) if handlers else [logging.StreamHandler()]
+    if os.getenv("LOG_ASYNC", "1") == "0":
+        logging.basicConfig(level=level, format=format, datefmt=datefmt, handlers=handlers, force=force)
+        return None
+
+    if root.handlers and not force:
+        return None
+    if force:
+        shutdown()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+    formatter = _SampledFormatter(format, datefmt)
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(formatter)
+    rates = _sampling_from_env() if sampling is None else sampling
+    pipeline = LogPipeline(
+        handlers,
+        int(os.getenv("LOG_QUEUE_SIZE", str(_DEFAULT_QUEUE_SIZE))),
+        RateSampler(rates) if rates else None,
+    )
+    root.addHandler(pipeline.queue_handler)
+    root.setLevel(level)
+    pipeline.start()
+    _pipeline = pipeline
+    return pipeline
+
+
+def get_log_pipeline() -> Optional[LogPipeline]:
+    """Pipeline ativo neste processo (None se o logging é síncrono)."""
+    return _pipeline
+
+
+@atexit.register
+def shutdown() -> None:
+    """Drena a fila e para a thread de escrita."""
+    global _pipeline
+    pipeline, _pipeline = _pipeline, None
+    if pipeline is not None:
+        pipeline.stop()
+
+
+def _after_fork_in_child() -> None:
+    if _pipeline is not None:
+        _pipeline._restart_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
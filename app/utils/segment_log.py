@@ -0,0 +1,701 @@
+# -*- coding: utf-8 -*-
+"""
+Log segmentado de registros com índice temporal e retenção.
+
+Séries de registros pequenos e frequentes (ex.: snapshots do
+SystemStateTracker) são gravadas em poucos arquivos grandes em vez de um
+arquivo por registro:
+
+- registros são agrupados em blocos (``block_records`` registros ou
+  ``block_max_age`` segundos); cada bloco é um contêiner ``.jrvs``
+  (JSON + zlib + CRC32) anexado ao segmento ativo ``seg_<ms>_<pid>.log``;
+- cada processo (ex.: workers prefork) anexa apenas ao seu próprio segmento
+  ativo, e o offset de cada bloco é lido do arquivo (``tell()``), não do
+  tamanho em memória;
+- o segmento ativo é selado ao atingir ``segment_max_bytes`` ou
+  ``segment_max_age``; um segmento selado ganha um índice lateral
+  ``seg_<ms>.idx`` com o intervalo de tempo e as chaves de cada bloco;
+- consultas por intervalo de tempo ou por chave (ex.: ``decision_id``)
+  usam só o índice em memória e descomprimem apenas os blocos candidatos;
+- segmentos selados mais antigos que ``downsample_after_hours`` são
+  reescritos com um registro por ``downsample_interval`` segundos
+  (média dos campos numéricos); os mais antigos que ``retention_days``
+  são apagados.
+
+Ao abrir, os segmentos existentes são relidos e selados; uma cauda incompleta
+(crash durante a escrita) é truncada. Segmentos de outro processo ainda vivo
+são só lidos: nem truncados, nem selados, nem reduzidos; quando o dono
+morre, ``maintain`` os repara e passa a aplicar retenção a eles. ``query`` e
+``maintain`` acompanham o diretório: segmentos criados, crescidos,
+reescritos ou apagados por outros processos são relidos antes de consultar.
+
+Uso::
+
+    from app.utils.segment_log import get_segment_log
+
+    log = get_segment_log("data/system_snapshots", ts_field="epoch", key_field="decision_id")
+    log.append({"epoch": 1760000000.0, "cpu_percent": 12.5, "decision_id": "d-1"})
+    log.query(since=1759990000.0, until=1760003600.0)
+    log.query(key="d-1")
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from app.utils import jrvs_codec
+from app.utils.jrvs_codec import JrvsDecodeError
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_PREFIX = "seg_"
+_LOG_SUFFIX = ".log"
+_IDX_SUFFIX = ".idx"
+_INDEX_VERSION = 1
+
+Record = Dict[str, Any]
+
+_live_logs: "weakref.WeakSet[SegmentLog]" = weakref.WeakSet()
+
+
+def _epoch(value: Any) -> Optional[float]:
+    """Converte epoch, ``datetime`` ou ISO-8601 em float; None se inválido."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _segment_pid(name: str) -> Optional[int]:
+    """PID do dono de ``seg_<ms>_<pid>``; None para nomes antigos ``seg_<ms>``."""
+    _, _, suffix = name[len(_SEGMENT_PREFIX):].partition("_")
+    return int(suffix) if suffix.isdigit() else None
+
+
+def _owner_alive(pid: Optional[int]) -> bool:
+    """True se ``pid`` é outro processo ainda vivo (que pode estar anexando)."""
+    if pid is None or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:  # existe, mas pertence a outro usuário
+        return True
+    return True
+
+
+def average_records(records: List[Record], ts_field: str, key_field: Optional[str] = None) -> Record:
+    """Funde ``records`` num único registro (downsampling padrão).
+
+    Campos numéricos viram a média; os demais vêm do registro mais recente.
+    ``samples`` guarda quantos registros originais foram fundidos e
+    ``merged_keys`` as chaves distintas, para que consultas por chave
+    continuem encontrando o registro resultante.
+    """
+    merged = dict(records[-1])
+    for field, value in merged.items():
+        if field == ts_field or isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        values = [r[field] for r in records if isinstance(r.get(field), (int, float)) and not isinstance(r.get(field), bool)]
+        merged[field] = round(sum(values) / len(values), 4)
+    merged["samples"] = sum(int(r.get("samples", 1)) for r in records)
+    if key_field is not None:
+        keys: List[str] = []
+        for record in records:
+            for key in _record_keys(record, key_field):
+                if key not in keys:
+                    keys.append(key)
+        merged["merged_keys"] = keys
+    return merged
+
+
+def _record_keys(record: Record, key_field: Optional[str]) -> List[str]:
+    if key_field is None:
+        return []
+    keys = [str(k) for k in record.get("merged_keys", ())]
+    key = record.get(key_field)
+    if key is not None and str(key) not in keys:
+        keys.append(str(key))
+    return keys
+
+
+class SegmentLog:
+    """Registros em segmentos comprimidos com índice de tempo e de chave.
+
+    Args:
+        directory: Diretório dos segmentos (criado se não existir).
+        ts_field: Campo de timestamp dos registros (epoch ou ISO-8601).
+        key_field: Campo indexado para ``query(key=...)``. Opcional.
+        segment_max_bytes: Tamanho a partir do qual o segmento ativo é selado.
+        segment_max_age: Idade (s) a partir da qual o segmento ativo é selado.
+        block_records: Registros por bloco comprimido.
+        block_max_age: Espera máxima (s) de um registro antes de ir para disco.
+        retention_days: Segmentos selados mais antigos são apagados (0 = nunca).
+        downsample_after_hours: Segmentos selados mais antigos são reduzidos (0 = nunca).
+        downsample_interval: Largura (s) do intervalo reduzido a um registro.
+        downsample: ``f(records) -> record``; padrão: ``average_records``.
+        clock: Fonte de tempo (epoch), substituível em testes.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        ts_field: str = "epoch",
+        key_field: Optional[str] = None,
+        segment_max_bytes: int = 1 << 20,
+        segment_max_age: float = 6 * 3600.0,
+        block_records: int = 32,
+        block_max_age: float = 60.0,
+        retention_days: float = 7.0,
+        downsample_after_hours: float = 24.0,
+        downsample_interval: float = 300.0,
+        downsample: Optional[Callable[[List[Record]], Record]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ts_field = ts_field
+        self.key_field = key_field
+        self.segment_max_bytes = max(1, int(segment_max_bytes))
+        self.segment_max_age = float(segment_max_age)
+        self.block_records = max(1, int(block_records))
+        self.block_max_age = float(block_max_age)
+        self.retention_days = float(retention_days)
+        self.downsample_after_hours = float(downsample_after_hours)
+        self.downsample_interval = float(downsample_interval)
+        self._downsample = downsample or (lambda records: average_records(records, ts_field, key_field))
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._segments: List[Dict[str, Any]] = []
+        self._keys: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending: List[Record] = []
+        self._pending_since: Optional[float] = None
+        self._dir_mtime: Optional[int] = None
+        with self._lock:
+            self._load()
+            self.maintain()
+        _live_logs.add(self)
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def append(self, record: Record) -> None:
+        """Enfileira ``record``; o bloco vai para disco quando enche ou envelhece."""
+        with self._lock:
+            now = self._clock()
+            self._pending.append(record)
+            if self._pending_since is None:
+                self._pending_since = now
+            if len(self._pending) >= self.block_records or now - self._pending_since >= self.block_max_age:
+                self._write_block_locked()
+
+    def flush(self) -> None:
+        """Grava imediatamente os registros pendentes."""
+        with self._lock:
+            if self._pending:
+                self._write_block_locked()
+
+    def maintain(self) -> Dict[str, int]:
+        """Sela o segmento ativo expirado e aplica retenção e downsampling."""
+        removed = downsampled = 0
+        with self._lock:
+            self._refresh_locked()
+            self._adopt_orphans_locked()
+            now = self._clock()
+            delete_before = now - self.retention_days * 86400 if self.retention_days > 0 else None
+            reduce_before = now - self.downsample_after_hours * 3600 if self.downsample_after_hours > 0 else None
+            active = self._own_active()
+            if active is not None and active["blocks"] and now - active["first"] >= self.segment_max_age:
+                self._seal(active)
+            for seg in list(self._segments):
+                if not seg["sealed"] or seg["foreign"]:
+                    continue
+                if delete_before is not None and seg["last"] < delete_before:
+                    self._delete_segment(seg)
+                    removed += 1
+                elif (
+                    reduce_before is not None
+                    and self.downsample_interval > 0
+                    and not seg["downsampled"]
+                    and seg["last"] < reduce_before
+                ):
+                    if self._downsample_segment(seg):
+                        downsampled += 1
+            if removed or downsampled:
+                self._rebuild_keys()
+        return {"removed": removed, "downsampled": downsampled}
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        since: Any = None,
+        until: Any = None,
+        key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Record]:
+        """Registros com timestamp em ``[since, until)`` e, opcionalmente, ``key``.
+
+        Args:
+            since: Início (epoch, ``datetime`` ou ISO-8601). None = sem limite.
+            until: Fim exclusivo. None = sem limite.
+            key: Valor de ``key_field`` (inclui registros reduzidos que o contêm).
+            limit: Devolve apenas os ``limit`` registros mais recentes.
+
+        Returns:
+            Registros em ordem cronológica.
+        """
+        start, end = _epoch(since), _epoch(until)
+        with self._lock:
+            self._refresh_locked()
+            if key is not None:
+                blocks = [(b["segment"], b) for b in self._keys.get(str(key), ())]
+            else:
+                blocks = [(seg, b) for seg in self._segments for b in seg["blocks"]]
+            blocks = [
+                (seg, b) for seg, b in blocks
+                if (start is None or b["last"] >= start) and (end is None or b["first"] < end)
+            ]
+
+            def _wanted(record: Record) -> bool:
+                ts = _epoch(record.get(self.ts_field))
+                if ts is None or (start is not None and ts < start) or (end is not None and ts >= end):
+                    return False
+                return key is None or str(key) in _record_keys(record, self.key_field)
+
+            # Do mais novo para o mais antigo, para parar cedo com ``limit``
+            newest_first = [r for r in reversed(self._pending) if _wanted(r)]
+            for seg, block in reversed(blocks):
+                if limit is not None and len(newest_first) >= limit:
+                    break
+                newest_first.extend(r for r in reversed(self._read_block(seg, block)) if _wanted(r))
+
+        if limit is not None:
+            newest_first = newest_first[:limit]
+        result = list(reversed(newest_first))
+        result.sort(key=lambda r: _epoch(r.get(self.ts_field)) or 0.0)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "bytes": sum(seg["size"] for seg in self._segments),
+                "records": sum(seg["count"] for seg in self._segments) + len(self._pending),
+                "pending": len(self._pending),
+                "downsampled_segments": sum(1 for seg in self._segments if seg["downsampled"]),
+                "oldest": self._segments[0]["first"] if self._segments else None,
+                "newest": self._segments[-1]["last"] if self._segments else None,
+            }
+
+    # ------------------------------------------------------------------
+    # Segmentos
+    # ------------------------------------------------------------------
+
+    def _write_block_locked(self) -> None:
+        records, self._pending, self._pending_since = self._pending, [], None
+        frame = jrvs_codec.encode(records)
+        stamps = [ts for ts in (_epoch(r.get(self.ts_field)) for r in records) if ts is not None]
+        first = min(stamps) if stamps else self._clock()
+        last = max(stamps) if stamps else first
+        seg = self._active_segment(first)
+        try:
+            with open(self._log_path(seg), "ab") as fh:
+                offset = fh.seek(0, os.SEEK_END)
+                fh.write(frame)
+        except OSError as exc:
+            logger.warning("[SegmentLog] Falha ao gravar bloco em %s: %s", self.directory, exc)
+            self._pending = records + self._pending
+            self._pending_since = self._clock()
+            return
+        block = self._block_meta(seg, offset, len(frame), records, first, last)
+        self._add_block(seg, block)
+        for key in block["keys"]:
+            self._keys.setdefault(key, []).append(block)
+        if seg["size"] >= self.segment_max_bytes:
+            self._seal(seg)
+            self.maintain()
+
+    def _own_active(self) -> Optional[Dict[str, Any]]:
+        pid = os.getpid()
+        for seg in reversed(self._segments):
+            if not seg["sealed"] and seg["pid"] == pid:
+                return seg
+        return None
+
+    def _active_segment(self, first_ts: float) -> Dict[str, Any]:
+        seg = self._own_active()
+        if seg is not None:
+            if seg["first"] is None or self._clock() - seg["first"] < self.segment_max_age:
+                return seg
+            self.maintain()
+        pid = os.getpid()
+        stamp = int(first_ts * 1000)
+        while (self.directory / f"{_SEGMENT_PREFIX}{stamp:015d}_{pid}{_LOG_SUFFIX}").exists():
+            stamp += 1
+        seg = self._new_segment(f"{_SEGMENT_PREFIX}{stamp:015d}_{pid}")
+        self._segments.append(seg)
+        return seg
+
+    @staticmethod
+    def _new_segment(name: str) -> Dict[str, Any]:
+        return {
+            "name": name, "pid": _segment_pid(name), "first": None, "last": None, "count": 0, "size": 0,
+            "blocks": [], "sealed": False, "downsampled": False, "foreign": False,
+        }
+
+    def _block_meta(self, seg, offset, size, records, first, last) -> Dict[str, Any]:
+        keys: List[str] = []
+        for record in records:
+            for key in _record_keys(record, self.key_field):
+                if key not in keys:
+                    keys.append(key)
+        return {
+            "segment": seg, "offset": offset, "size": size,
+            "first": first, "last": last, "count": len(records), "keys": keys,
+        }
+
+    @staticmethod
+    def _add_block(seg: Dict[str, Any], block: Dict[str, Any]) -> None:
+        seg["blocks"].append(block)
+        seg["size"] = block["offset"] + block["size"]
+        seg["count"] += block["count"]
+        seg["first"] = block["first"] if seg["first"] is None else min(seg["first"], block["first"])
+        seg["last"] = block["last"] if seg["last"] is None else max(seg["last"], block["last"])
+
+    def _seal(self, seg: Dict[str, Any]) -> None:
+        seg["sealed"] = True
+        self._write_index(seg)
+
+    def _read_block(self, seg: Dict[str, Any], block: Dict[str, Any]) -> List[Record]:
+        try:
+            with open(self._log_path(seg), "rb") as fh:
+                fh.seek(block["offset"])
+                raw = fh.read(block["size"])
+            records, _ = jrvs_codec.decode_frame(raw)
+            return records
+        except (OSError, JrvsDecodeError) as exc:
+            logger.warning("[SegmentLog] Bloco ilegível em %s@%d: %s", seg["name"], block["offset"], exc)
+            return []
+
+    def _delete_segment(self, seg: Dict[str, Any]) -> None:
+        for path in (self._log_path(seg), self._idx_path(seg)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.warning("[SegmentLog] Falha ao remover %s: %s", path, exc)
+        self._segments.remove(seg)
+
+    def _downsample_segment(self, seg: Dict[str, Any]) -> bool:
+        """Reescreve ``seg`` com um registro por ``downsample_interval``."""
+        records: List[Record] = []
+        for block in seg["blocks"]:
+            records.extend(self._read_block(seg, block))
+        groups: Dict[int, List[Record]] = {}
+        for record in records:
+            ts = _epoch(record.get(self.ts_field))
+            if ts is not None:
+                groups.setdefault(int(ts // self.downsample_interval), []).append(record)
+        reduced = [
+            group[0] if len(group) == 1 else self._downsample(group)
+            for _, group in sorted(groups.items())
+        ]
+
+        fresh = self._new_segment(seg["name"])
+        fresh["sealed"] = fresh["downsampled"] = True
+        # Outro processo pode reduzir o mesmo segmento ao mesmo tempo
+        tmp = self._log_path(seg).with_suffix(f"{_LOG_SUFFIX}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as fh:
+                for i in range(0, len(reduced), self.block_records):
+                    chunk = reduced[i:i + self.block_records]
+                    frame = jrvs_codec.encode(chunk)
+                    stamps = [_epoch(r.get(self.ts_field)) for r in chunk]
+                    self._add_block(fresh, self._block_meta(fresh, fresh["size"], len(frame), chunk, min(stamps), max(stamps)))
+                    fh.write(frame)
+            os.replace(tmp, self._log_path(seg))
+            fresh["signature"] = self._signature(self._log_path(seg))
+        except OSError as exc:
+            logger.warning("[SegmentLog] Downsampling de %s falhou: %s", seg["name"], exc)
+            return False
+        if not fresh["blocks"]:
+            self._delete_segment(seg)
+            return True
+        self._segments[self._segments.index(seg)] = fresh
+        self._write_index(fresh)
+        return True
+
+    def _rebuild_keys(self) -> None:
+        self._keys = {}
+        for seg in self._segments:
+            for block in seg["blocks"]:
+                for key in block["keys"]:
+                    self._keys.setdefault(key, []).append(block)
+
+    # ------------------------------------------------------------------
+    # Índices laterais e recuperação
+    # ------------------------------------------------------------------
+
+    def _log_path(self, seg: Dict[str, Any]) -> Path:
+        return self.directory / (seg["name"] + _LOG_SUFFIX)
+
+    def _idx_path(self, seg: Dict[str, Any]) -> Path:
+        return self.directory / (seg["name"] + _IDX_SUFFIX)
+
+    def _write_index(self, seg: Dict[str, Any]) -> None:
+        payload = {
+            "version": _INDEX_VERSION,
+            "key_field": self.key_field,
+            "size": seg["size"],
+            "downsampled": seg["downsampled"],
+            "blocks": [
+                [b["offset"], b["size"], b["first"], b["last"], b["count"], b["keys"]] for b in seg["blocks"]
+            ],
+        }
+        path = self._idx_path(seg)
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.debug("[SegmentLog] Índice lateral não gravado (%s): %s", path, exc)
+
+    def _load(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._dir_mtime = self._directory_mtime()
+        for path in sorted(self.directory.glob(f"{_SEGMENT_PREFIX}*{_LOG_SUFFIX}")):
+            name = path.name[: -len(_LOG_SUFFIX)]
+            seg = self._open_segment(name, path, _owner_alive(_segment_pid(name)))
+            if seg is not None:
+                self._segments.append(seg)
+        self._rebuild_keys()
+
+    def _open_segment(self, name: str, path: Path, foreign: bool) -> Optional[Dict[str, Any]]:
+        try:
+            signature = self._signature(path)
+        except OSError:
+            return None
+        seg = self._load_index(name, path)
+        if seg is None:
+            seg = self._scan_segment(name, path, sealed=not foreign, repair=not foreign)
+        if seg is not None:
+            # Segmento ativo de outro processo: só leitura, nunca anexado aqui
+            seg["sealed"] = True
+            seg["foreign"] = foreign
+            seg["signature"] = signature
+        return seg
+
+    @staticmethod
+    def _signature(path: Path) -> tuple:
+        st = path.stat()
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _directory_mtime(self) -> Optional[int]:
+        try:
+            return self.directory.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh_locked(self) -> None:
+        """Relê segmentos criados, crescidos, reescritos ou apagados por outros processos.
+
+        Sem mudança no diretório (criação, ``os.replace`` ou remoção) só os
+        segmentos de processos vivos, que podem ter crescido, são conferidos.
+        """
+        mtime = self._directory_mtime()
+        full = mtime is None or mtime != self._dir_mtime
+        # Mudanças no mesmo tick do relógio não alteram o mtime: confere de novo
+        recent = mtime is not None and time.time_ns() - mtime < 1_000_000_000
+        self._dir_mtime = None if recent else mtime
+        pid = os.getpid()
+        on_disk: Dict[str, Path] = {}
+        if full:
+            on_disk = {
+                path.name[: -len(_LOG_SUFFIX)]: path
+                for path in self.directory.glob(f"{_SEGMENT_PREFIX}*{_LOG_SUFFIX}")
+            }
+        changed = False
+        for seg in list(self._segments):
+            if not seg["sealed"] or (seg["pid"] == pid and not seg["foreign"]):
+                continue  # os nossos só mudam por este objeto
+            if not full and not seg["foreign"]:
+                continue
+            path = on_disk.pop(seg["name"], None) if full else self._log_path(seg)
+            try:
+                if path is None:
+                    raise FileNotFoundError(seg["name"])
+                if self._signature(path) == seg.get("signature"):
+                    continue
+            except OSError:
+                self._segments.remove(seg)  # apagado pela retenção de outro processo
+                changed = True
+                continue
+            fresh = self._open_segment(seg["name"], path, seg["foreign"])
+            if fresh is None:
+                self._segments.remove(seg)
+            else:
+                self._segments[self._segments.index(seg)] = fresh
+            changed = True
+        known = {seg["name"] for seg in self._segments}
+        for name, path in sorted(on_disk.items()):
+            if name in known:
+                continue
+            owner = _segment_pid(name)
+            # Mesmo PID: outra instância deste processo ainda pode anexar a ele
+            seg = self._open_segment(name, path, owner == pid or _owner_alive(owner))
+            if seg is not None:
+                self._segments.append(seg)
+                changed = True
+        if changed:
+            self._segments.sort(key=lambda seg: seg["name"])
+            self._rebuild_keys()
+
+    def _adopt_orphans_locked(self) -> None:
+        """Repara e sela segmentos alheios cujo dono morreu, liberando-os para a retenção."""
+        pid = os.getpid()
+        adopted = False
+        for seg in list(self._segments):
+            if not seg["foreign"] or seg["pid"] == pid or _owner_alive(seg["pid"]):
+                continue
+            adopted = True
+            path = self._log_path(seg)
+            fresh = self._load_index(seg["name"], path) if path.exists() else None
+            if fresh is None and path.exists():
+                fresh = self._scan_segment(seg["name"], path, sealed=True)
+            if fresh is None:
+                self._segments.remove(seg)
+            else:
+                try:
+                    fresh["signature"] = self._signature(path)
+                except OSError:
+                    pass
+                self._segments[self._segments.index(seg)] = fresh
+        if adopted:
+            self._rebuild_keys()
+
+    def _load_index(self, name: str, path: Path) -> Optional[Dict[str, Any]]:
+        seg = self._new_segment(name)
+        idx = self._idx_path(seg)
+        if not idx.exists():
+            return None
+        try:
+            payload = json.loads(idx.read_text(encoding="utf-8"))
+            if (
+                payload.get("version") != _INDEX_VERSION
+                or payload.get("key_field") != self.key_field
+                or payload.get("size") != path.stat().st_size
+            ):
+                return None
+            for offset, size, first, last, count, keys in payload["blocks"]:
+                self._add_block(seg, {
+                    "segment": seg, "offset": offset, "size": size,
+                    "first": first, "last": last, "count": count, "keys": keys,
+                })
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("[SegmentLog] Índice lateral inválido (%s): %s", idx, exc)
+            return None
+        if not seg["blocks"]:
+            return None
+        seg["sealed"] = True
+        seg["downsampled"] = bool(payload.get("downsampled"))
+        return seg
+
+    def _scan_segment(self, name: str, path: Path, sealed: bool, repair: bool = True) -> Optional[Dict[str, Any]]:
+        """Reconstrói o índice de um segmento lendo seus blocos.
+
+        Com ``repair`` a cauda inválida é truncada e um segmento vazio é
+        apagado; sem ele (segmento de outro processo vivo, que pode estar no
+        meio de uma escrita) o arquivo não é tocado.
+        """
+        seg = self._new_segment(name)
+        try:
+            raw = path.read_bytes()
+        except OSError as exc:
+            logger.warning("[SegmentLog] Segmento ilegível %s: %s", path, exc)
+            return None
+        pos = 0
+        while pos < len(raw):
+            try:
+                records, nxt = jrvs_codec.decode_frame(raw, pos)
+            except JrvsDecodeError:
+                break
+            stamps = [ts for ts in (_epoch(r.get(self.ts_field)) for r in records) if ts is not None]
+            if stamps:
+                self._add_block(seg, self._block_meta(seg, pos, nxt - pos, records, min(stamps), max(stamps)))
+            pos = nxt
+        if pos < len(raw) and repair:
+            logger.warning("[SegmentLog] %s: %d bytes de bloco incompleto descartados", path, len(raw) - pos)
+            with path.open("r+b") as fh:
+                fh.truncate(pos)
+        if not seg["blocks"]:
+            if repair:
+                path.unlink(missing_ok=True)
+            return None
+        seg["size"] = pos
+        if sealed:
+            self._seal(seg)
+        return seg
+
+    def _reset_in_child(self) -> None:
+        # Os pendentes são gravados pelo pai; o segmento ativo dele deixa de ser nosso
+        self._lock = threading.RLock()
+        self._pending, self._pending_since = [], None
+        for seg in self._segments:
+            if not seg["sealed"]:
+                seg["sealed"] = seg["foreign"] = True
+
+
+_logs: Dict[Path, SegmentLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_segment_log(directory: Union[str, Path], **options: Any) -> SegmentLog:
+    """Instância compartilhada por diretório (``options`` valem na criação)."""
+    resolved = Path(directory).resolve()
+    with _logs_lock:
+        log = _logs.get(resolved)
+        if log is None:
+            log = _logs[resolved] = SegmentLog(resolved, **options)
+        return log
+
+
+@atexit.register
+def _flush_all() -> None:
+    with _logs_lock:
+        logs = list(_logs.values())
+    for log in logs:
+        try:
+            log.flush()
+        except Exception as exc:  # pragma: no cover - melhor esforço no encerramento
+            logger.debug("[SegmentLog] Flush final falhou (%s): %s", log.directory, exc)
+
+
+def _after_fork_in_child() -> None:
+    global _logs_lock
+    _logs_lock = threading.Lock()
+    for log in list(_live_logs):
+        log._reset_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Agregados incrementais de memória constante.
+
+- ``RunningStats``: contagem, soma, soma dos quadrados, mínimo, máximo e
+  quantos valores foram positivos. Instâncias podem ser mescladas, então
+  janelas maiores são a soma de buckets menores.
+- ``P2Quantile``: estimador P² (Jain & Chlamtac, 1985) de um quantil em
+  fluxo, com cinco marcadores. Exato até 5 observações; depois, aproximação
+  sem guardar o histórico.
+
+Uso::
+
+    from app.utils.streaming_stats import P2Quantile, RunningStats
+
+    stats = RunningStats()
+    median = P2Quantile(0.5)
+    for cost in costs:
+        stats.add(cost)
+        median.add(cost)
+    stats.mean, stats.std_dev, median.value
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+
+class RunningStats:
+    """Contagem/soma/soma dos quadrados/min/max mantidos a cada ``add``."""
+
+    __slots__ = ("count", "total", "sum_sq", "min", "max", "positive")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.sum_sq = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.positive = 0
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self.count += 1
+        self.total += value
+        self.sum_sq += value * value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value > 0:
+            self.positive += 1
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Acumula ``other`` nesta instância (retorna ``self``)."""
+        if not other.count:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.sum_sq += other.sum_sq
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.positive += other.positive
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Variância populacional (0 com menos de 2 amostras)."""
+        if self.count < 2:
+            return 0.0
+        return max(0.0, self.sum_sq / self.count - self.mean ** 2)
+
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "std_dev": self.std_dev,
+            "min": self.min if self.min is not None else 0.0,
+            "max": self.max if self.max is not None else 0.0,
+            "positive": self.positive,
+        }
+
+
+class P2Quantile:
+    """Estimador P² de um único quantil ``p`` (0 < p < 1) em O(1) de memória."""
+
+    __slots__ = ("p", "count", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, p: float = 0.5) -> None:
+        if not 0.0 < p < 1.0:
+            raise ValueError("p deve estar entre 0 e 1")
+        self.p = p
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            q.append(value)
+            q.sort()
+            return
+
+        n = self._positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    q[i] = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                n[i] += step
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float:
+        """Quantil estimado (0.0 sem observações)."""
+        if not self.count:
+            return 0.0
+        if self.count <= 5:
+            # Poucas amostras: quantil exato com interpolação linear
+            rank = self.p * (self.count - 1)
+            lo = int(rank)
+            hi = min(lo + 1, self.count - 1)
+            return self._heights[lo] + (self._heights[hi] - self._heights[lo]) * (rank - lo)
+        return self._heights[2]
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+Casamento de múltiplos gatilhos por autômato Aho–Corasick.
+
+Componentes que testam "algum destes termos aparece no texto?" (padrões do
+CommandInterpreter, gatilhos da ProspectiveMemory, palavras de feedback do
+RewardSignalProvider) compartilham este matcher em vez de fazer um ``in``
+por padrão. Uma única passada pelo texto devolve todas as ocorrências, com
+posição, independentemente de quantos padrões estão registrados.
+
+- ``add`` insere o padrão na trie e liga só os nós novos: calcula o link de
+  falha de cada um e redireciona para ele os nós existentes cujo maior
+  sufixo presente na trie passou a ser o novo nó. Um filho novo da raiz
+  usa o índice de nós por caractere de entrada (todos eles mudam); nos
+  demais casos a árvore reversa de falhas do pai é percorrida só até o
+  primeiro nó de cada ramo que já tem a transição. Os links de saída são
+  refeitos apenas nas subárvores afetadas. Não há reconstrução completa por BFS.
+- ``remove`` desregistra o valor e poda a cadeia de folhas que ficou sem
+  registros; os nós que falhavam para um nó podado passam a falhar para o
+  link dele, e os índices liberados são reaproveitados.
+- Cada registro guarda a ordem de inserção: ``first`` devolve o registro
+  mais antigo que casou, preservando a prioridade por ordem de declaração.
+- Por padrão o casamento ignora maiúsculas (``str.lower``); as posições se
+  referem ao texto normalizado.
+
+Uso::
+
+    from app.utils.trigger_matcher import TriggerMatcher
+
+    matcher = TriggerMatcher()
+    matcher.add("rodar workflow", "run_workflow")
+    matcher.add("workflow", "run_workflow")
+    matcher.find_all("Xerife, rodar workflow deploy")
+    # [TriggerMatch(start=8, end=22, pattern='rodar workflow', ...), ...]
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class TriggerMatch(NamedTuple):
+    """Ocorrência de um padrão: ``text[start:end] == pattern``."""
+
+    start: int
+    end: int
+    pattern: str
+    value: Any
+    order: int
+
+
+class TriggerMatcher:
+    """Autômato Aho–Corasick com inserção incremental.
+
+    Args:
+        patterns: Padrões iniciais (``str`` ou pares ``(padrão, valor)``).
+        case_sensitive: Se False (padrão), padrões e texto passam por ``lower()``.
+    """
+
+    def __init__(self, patterns: Iterable[Any] = (), case_sensitive: bool = False) -> None:
+        self.case_sensitive = case_sensitive
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._depth: List[int] = [0]
+        # Registros terminando em cada nó: [ordem, padrão, valor]
+        self._out: List[List[Tuple[int, str, Any]]] = [[]]
+        # Próximo nó (via falha) que possui registros — evita percorrer a cadeia toda
+        self._out_link: List[int] = [0]
+        # Árvore reversa de falhas: nós cujo link de falha aponta para cada nó
+        self._fail_children: List[Set[int]] = [set()]
+        # Pai e caractere de entrada de cada nó; nós ligados por caractere
+        self._parent: List[int] = [0]
+        self._char: List[str] = [""]
+        self._by_char: Dict[str, Set[int]] = {}
+        # Índices de nós podados, reaproveitados por ``add``
+        self._free: List[int] = []
+        self._next_order = 0
+        self._size = 0
+        self._lock = threading.RLock()
+        for item in patterns:
+            if isinstance(item, tuple):
+                self.add(*item)
+            else:
+                self.add(item)
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def add(self, pattern: str, value: Any = None) -> bool:
+        """Registra ``pattern`` (com ``value``; padrão: o próprio padrão)."""
+        key = self._normalize(pattern)
+        if not key:
+            return False
+        with self._lock:
+            node = 0
+            created: List[Tuple[int, str, int]] = []
+            for ch in key:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = self._new_node(node, ch)
+                    created.append((node, ch, nxt))
+                node = nxt
+            gained_output = not self._out[node]
+            self._out[node].append((self._next_order, key, pattern if value is None else value))
+            self._next_order += 1
+            self._size += 1
+            # Em ordem de profundidade: o link de um nó novo pode apontar para
+            # um nó novo mais raso, já ligado
+            for parent, ch, child in created:
+                self._link(parent, ch, child)
+            affected = [child for _, _, child in created]
+            if gained_output and not created:
+                # Nó passa a ter saída: os links de saída dos descendentes mudam
+                affected.append(node)
+            for root in affected:
+                self._refresh_out_links(root)
+        return True
+
+    def remove(self, pattern: str, value: Any = None) -> bool:
+        """Remove um registro de ``pattern`` (``value`` comparado por identidade, depois igualdade)."""
+        key = self._normalize(pattern)
+        with self._lock:
+            node = 0
+            for ch in key:
+                node = self._goto[node].get(ch, -1)
+                if node == -1:
+                    return False
+            entries = self._out[node]
+            target = pattern if value is None else value
+            for i, (_, _, v) in enumerate(entries):
+                if v is target:
+                    break
+            else:
+                for i, (_, _, v) in enumerate(entries):
+                    if v == target:
+                        break
+                else:
+                    return False
+            del entries[i]
+            self._size -= 1
+            if not entries:
+                # Quem apontava para este nó como saída segue para a próxima
+                self._refresh_out_links(node)
+                self._prune(node)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self.__init__(case_sensitive=self.case_sensitive)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def find_all(self, text: str) -> List[TriggerMatch]:
+        """Todas as ocorrências, ordenadas por posição final e depois inicial."""
+        return self._scan(text, stop_at_first=False)
+
+    def first(self, text: str) -> Optional[TriggerMatch]:
+        """Ocorrência do registro mais antigo que casou (prioridade por declaração)."""
+        best: Optional[TriggerMatch] = None
+        for match in self._scan(text, stop_at_first=False):
+            if best is None or match.order < best.order or (match.order == best.order and match.start < best.start):
+                best = match
+        return best
+
+    def values(self, text: str) -> List[Any]:
+        """Valores distintos que casaram, na ordem de registro."""
+        seen = set()
+        result = []
+        for match in sorted(self._scan(text, stop_at_first=False), key=lambda m: m.order):
+            if id(match.value) not in seen:
+                seen.add(id(match.value))
+                result.append(match.value)
+        return result
+
+    def contains_any(self, text: str) -> bool:
+        return bool(self._scan(text, stop_at_first=True))
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _normalize(self, text: Any) -> str:
+        text = "" if text is None else str(text)
+        return text if self.case_sensitive else text.lower()
+
+    def _scan(self, text: str, stop_at_first: bool) -> List[TriggerMatch]:
+        haystack = self._normalize(text)
+        with self._lock:
+            goto, fail, out, out_link, depth = self._goto, self._fail, self._out, self._out_link, self._depth
+            matches: List[TriggerMatch] = []
+            node = 0
+            for pos, ch in enumerate(haystack):
+                while node and ch not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(ch, 0)
+                hit = node if out[node] else out_link[node]
+                while hit:
+                    start = pos + 1 - depth[hit]
+                    for order, pattern, value in out[hit]:
+                        matches.append(TriggerMatch(start, pos + 1, pattern, value, order))
+                        if stop_at_first:
+                            return matches
+                    hit = out_link[hit]
+        return matches
+
+    def _new_node(self, parent: int, ch: str) -> int:
+        depth = self._depth[parent] + 1
+        if self._free:
+            node = self._free.pop()
+            self._goto[node] = {}
+            self._fail[node] = 0
+            self._depth[node] = depth
+            self._out[node] = []
+            self._out_link[node] = 0
+            self._fail_children[node] = set()
+            self._parent[node] = parent
+            self._char[node] = ch
+        else:
+            node = len(self._goto)
+            self._goto.append({})
+            self._fail.append(0)
+            self._depth.append(depth)
+            self._out.append([])
+            self._out_link.append(0)
+            self._fail_children.append(set())
+            self._parent.append(parent)
+            self._char.append(ch)
+        self._goto[parent][ch] = node
+        self._fail_children[0].add(node)
+        return node
+
+    def _prune(self, node: int) -> None:
+        """Remove ``node`` e os ancestrais que ficaram sem registros e sem filhos."""
+        while node and not self._out[node] and not self._goto[node]:
+            parent, ch = self._parent[node], self._char[node]
+            del self._goto[parent][ch]
+            bucket = self._by_char.get(ch)
+            if bucket is not None:
+                bucket.discard(node)
+                if not bucket:
+                    del self._by_char[ch]
+            # O maior sufixo restante de quem falhava para ``node`` é o link
+            # dele; sem registros em ``node``, os links de saída não mudam
+            target = self._fail[node]
+            for w in list(self._fail_children[node]):
+                self._set_fail(w, target)
+            self._fail_children[target].discard(node)
+            self._goto[node] = {}
+            self._out_link[node] = 0
+            self._free.append(node)
+            node = parent
+
+    def _set_fail(self, node: int, target: int) -> None:
+        self._fail_children[self._fail[node]].discard(node)
+        self._fail[node] = target
+        self._fail_children[target].add(node)
+
+    def _link(self, parent: int, ch: str, node: int) -> None:
+        """Liga o nó recém-criado ``node`` (filho de ``parent`` por ``ch``)."""
+        goto, fail, depth = self._goto, self._fail, self._depth
+        target = 0
+        if parent:
+            f = fail[parent]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            target = goto[f].get(ch, 0)
+        self._set_fail(node, target)
+        # Um nó existente ``w + ch`` em que ``parent`` é sufixo de ``w`` passa a
+        # ter ``node`` como sufixo; vira o link de falha se nenhum sufixo mais
+        # longo já tiver a transição por ``ch``
+        bucket = self._by_char.setdefault(ch, set())
+        if parent == 0:
+            # Sem filho ``ch`` na raiz, todo nó que entra por ``ch`` falhava para ela
+            redirect = [u for u in bucket if fail[u] == 0 and depth[u] > 1]
+        else:
+            # Subárvore de falhas de ``parent``: quem já tem ``ch`` recebe o
+            # novo link e encerra o ramo (os sufixos abaixo dele não mudam)
+            redirect = []
+            stack = list(self._fail_children[parent])
+            while stack:
+                w = stack.pop()
+                u = goto[w].get(ch)
+                if u is None:
+                    stack.extend(self._fail_children[w])
+                elif u != node:
+                    redirect.append(u)
+        for u in redirect:
+            self._set_fail(u, node)
+        bucket.add(node)
+
+    def _refresh_out_links(self, root: int) -> None:
+        """Recalcula os links de saída de ``root`` e de sua subárvore de falhas."""
+        fail, out, out_link = self._fail, self._out, self._out_link
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node:
+                f = fail[node]
+                out_link[node] = f if out[f] else out_link[f]
+            stack.extend(self._fail_children[node])
@@ -11,8 +11,9 @@ sys.path.insert(0, os.getcwd())
 
 from app.core.nexus import nexus
 from app.adapters.infrastructure import create_api_server
+from app.utils.log_pipeline import configure_logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+configure_logging(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 async def notify_online():
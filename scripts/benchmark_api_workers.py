@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JARVIS API Workers Benchmark
+
+Gera carga local contra a API servida por um único processo e pelo modo
+multi-worker (PreforkServer), com um endpoint síncrono que imita o trabalho
+de ``process_command`` (CPU em Python puro, segurando o GIL). Reporta
+requisições por segundo e latências p50/p99.
+
+Usage:
+    python scripts/benchmark_api_workers.py [--workers N] [--clients C] [--duration S] [--work-ms MS]
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import uvicorn
+from fastapi import FastAPI
+
+from app.adapters.infrastructure.prefork_server import PreforkServer
+
+
+def _build_app(work_ms: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/chat")
+    def chat():
+        # Trabalho síncrono (roda no threadpool do uvicorn, mas disputa o GIL)
+        deadline = time.perf_counter() + work_ms / 1000
+        total = 0
+        while time.perf_counter() < deadline:
+            total += sum(i * i for i in range(200))
+        return {"ok": True, "pid": os.getpid()}
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(workers: int, port: int, work_ms: float) -> int:
+    """Sobe o servidor num processo mestre separado; retorna o pid do mestre."""
+    pid = os.fork()
+    if pid == 0:
+        app = _build_app(work_ms)
+        server = PreforkServer(
+            serve=lambda sock, index: uvicorn.Server(
+                uvicorn.Config(app, log_level="warning", access_log=False)
+            ).run(sockets=[sock]),
+            host="127.0.0.1",
+            port=port,
+            workers=workers,
+        )
+        server.run()
+        os._exit(0)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("POST", "/chat")
+            conn.getresponse().read()
+            conn.close()
+            return pid
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit("Servidor não respondeu")
+
+
+def _load(port: int, clients: int, duration: float):
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local = []
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            conn.request("POST", "/chat")
+            conn.getresponse().read()
+            local.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]  # noqa: E731
+    return len(latencies) / elapsed, pick(0.50), pick(0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do modo multi-worker da API")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Workers no modo multi-processo")
+    parser.add_argument("--clients", type=int, default=16, help="Clientes simultâneos")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de carga por modo")
+    parser.add_argument("--work-ms", type=float, default=5.0, help="CPU por requisição (ms)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"  API workers benchmark (CPUs: {os.cpu_count()}, clientes: {args.clients})")
+    print("=" * 70)
+
+    for workers in (1, max(2, args.workers)):
+        port = _free_port()
+        master = _start(workers, port, args.work_ms)
+        try:
+            rps, p50, p99 = _load(port, args.clients, args.duration)
+        finally:
+            os.kill(master, signal.SIGTERM)
+            os.waitpid(master, 0)
+        print(f"  {workers:>2} worker(s): {rps:8.1f} req/s | p50 {p50:7.1f} ms | p99 {p99:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JARVIS AuditWriter Benchmark
+
+Mede a vazão do audit log (entradas/s) e a latência p99 de decisão do
+SafetyGuardian com N threads decidindo ao mesmo tempo, comparando a escrita
+antiga (open/write/close por decisão) com o AuditWriter em group commit,
+nos modos ``group`` e ``fsync``.
+
+Usage:
+    python scripts/benchmark_audit_writer.py [--threads N] [--decisions D]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.domain.services import safety_guardian
+from app.domain.services.safety_guardian import SafetyGuardian
+from app.utils.audit_writer import AuditWriter
+
+
+class _LegacyWriter:
+    """Comportamento anterior: abre, escreve e fecha o arquivo por decisão."""
+
+    def __init__(self, path: Path, fsync: bool) -> None:
+        self.path, self.fsync = path, fsync
+
+    def append(self, entry, wait=None):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if self.fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        return True
+
+    def flush(self, timeout=5.0):
+        return True
+
+
+def run(label: str, writer, threads: int, decisions: int) -> None:
+    guardian = SafetyGuardian(quotas={"max_api_calls_per_minute": 10 ** 9})
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def _worker(idx: int) -> None:
+        barrier.wait()
+        for i in range(decisions):
+            start = time.perf_counter()
+            guardian.execute({"action_type": "read_file", "action_context": {"i": i}, "resource_usage": {"api_calls": 1}})
+            latencies[idx].append(time.perf_counter() - start)
+
+    with patch.object(safety_guardian, "get_audit_writer", lambda _path: writer), \
+            patch.object(safety_guardian.logger, "info"):
+        workers = [threading.Thread(target=_worker, args=(i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        writer.flush()
+        elapsed = time.perf_counter() - start
+
+    ordered = sorted(x for per in latencies for x in per)
+    total = len(ordered)
+    p99 = ordered[min(total - 1, int(0.99 * total))] * 1000
+    print(f"  {label:<28} {total / elapsed:>12,.0f} entradas/s   p99 decisão {p99:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do AuditWriter")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--decisions", type=int, default=2000, help="decisões por thread")
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"  Audit log: {args.threads} threads x {args.decisions} decisões")
+    print("=" * 78)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        run("open/write/close", _LegacyWriter(tmp / "legacy.jsonl", fsync=False), args.threads, args.decisions)
+        run("AuditWriter (group)", AuditWriter(tmp / "group.jsonl"), args.threads, args.decisions)
+        fsync_decisions = max(1, args.decisions // 10)
+        run("open/write/fsync/close", _LegacyWriter(tmp / "legacy_fsync.jsonl", fsync=True), args.threads, fsync_decisions)
+        writer = AuditWriter(tmp / "fsync.jsonl", durability="fsync")
+        run("AuditWriter (fsync)", writer, args.threads, fsync_decisions)
+        print(f"  grupos fsync: {writer.stats()['groups']} (média {writer.stats()['avg_group_size']:.1f} entradas)")
+
+
+if __name__ == "__main__":
+    main()
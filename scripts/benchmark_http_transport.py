@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JARVIS HTTP Transport Benchmark
+
+Sobe um servidor HTTPS local (certificado autoassinado) que conta as
+conexões TCP aceitas e envia N requisições de três formas: ``requests.post``
+avulso (o que o GistUploader fazia), um ``httpx.Client`` por chamada (o que
+o GitHubIssueMixin fazia) e as sessões/clientes do ``HttpTransport``
+compartilhado. Reporta conexões novas por 1.000 requisições e o tempo por
+requisição.
+
+Requer o pacote ``cryptography`` para gerar o certificado.
+
+Usage:
+    python scripts/benchmark_http_transport.py [--requests N]
+"""
+
+import argparse
+import datetime
+import ipaddress
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+import requests
+
+from app.adapters.infrastructure.http_transport import HttpTransport
+
+
+def _self_signed(directory: str):
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_file = os.path.join(directory, "cert.pem")
+    key_file = os.path.join(directory, "key.pem")
+    with open(cert_file, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_file, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return cert_file, key_file
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 1 << 16  # headers + corpo num único envio (sem atraso de ACK)
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _serve(cert_file: str, key_file: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_file, key_file)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _requests_post(url: str, cert_file: str, n: int, transport: HttpTransport) -> None:
+    for i in range(n):
+        requests.post(url, json={"i": i}, verify=cert_file, timeout=30)
+
+
+def _httpx_per_call(url: str, cert_file: str, n: int, transport: HttpTransport) -> None:
+    for i in range(n):
+        with httpx.Client(verify=ssl.create_default_context(cafile=cert_file)) as client:
+            client.post(url, json={"i": i})
+
+
+def _transport_session(url: str, cert_file: str, n: int, transport: HttpTransport) -> None:
+    for i in range(n):
+        # Como os adapters: cada chamada pode vir de uma sessão diferente
+        session = transport.session()
+        session.post(url, json={"i": i}, verify=cert_file)
+
+
+def _transport_client(url: str, cert_file: str, n: int, transport: HttpTransport) -> None:
+    for i in range(n):
+        with transport.client(pool="bench") as client:
+            client.post(url, json={"i": i})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reuso de conexões HTTPS")
+    parser.add_argument("--requests", type=int, default=1000, help="Requisições por cenário")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"  HTTP transport benchmark ({args.requests} requisições HTTPS por cenário)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_file, key_file = _self_signed(tmp)
+        transport = HttpTransport(verify=ssl.create_default_context(cafile=cert_file))
+        for label, run in (
+            ("requests.post avulso", _requests_post),
+            ("httpx.Client por chamada", _httpx_per_call),
+            ("HttpTransport.session()", _transport_session),
+            ("HttpTransport.client()", _transport_client),
+        ):
+            server = _serve(cert_file, key_file)
+            url = f"https://127.0.0.1:{server.server_address[1]}/bench"
+            start = time.perf_counter()
+            run(url, cert_file, args.requests, transport)
+            elapsed = time.perf_counter() - start
+            per_1000 = server.connections * 1000 / args.requests
+            print(f"  {label:<26}: {per_1000:7.1f} conexões/1.000 req | "
+                  f"{elapsed / args.requests * 1e3:6.2f} ms/req")
+            server.shutdown()
+            server.server_close()
+
+        pools = transport.stats()["pools"]
+        print("-" * 70)
+        for name, gauge in sorted(pools.items()):
+            print(f"  pool {name:<20}: {gauge['idle']} ociosas / {gauge['max_size']} máx")
+        transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JARVIS Logging Pipeline Benchmark
+
+Mede quanto o logging custa a cada requisição na thread que a atende:
+``basicConfig`` síncrono (stream + arquivo, como em ``serve.py``) contra o
+``configure_logging`` com fila, escrita em segundo plano e amostragem.
+
+Cada "requisição" emite as linhas típicas do caminho quente: resolve do
+Nexus, passos do PipelineRunner, uma linha do assistente e um log
+estruturado em DEBUG (desligado); entre requisições há ``--gap-ms`` de
+trabalho fora do logging.
+
+Usage:
+    python scripts/benchmark_logging.py [--requests N] [--gap-ms MS]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.log_pipeline import LazyJson, configure_logging, get_log_pipeline, shutdown
+
+_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+nexus_log = logging.getLogger("app.core.nexus")
+runner_log = logging.getLogger("PipelineRunner")
+assistant_log = logging.getLogger("app.application.services.assistant_service")
+structured_log = logging.getLogger("app.structured")
+
+
+def _request(i: int, lazy: bool) -> None:
+    for component in ("assistant_service", "memory_manager", "llm_router"):
+        nexus_log.info("⚡ [NEXUS] resolve('%s') → %s (%dms)", component, "ok", i % 7)
+    for step in ("context", "llm", "persist"):
+        runner_log.info("🔍 Resolvendo: %s (ID: %s)", step, step)
+    assistant_log.info("Comando processado: canal=%s user=%s", "api", "u1")
+    payload = {"request_id": i, "channel": "api", "tokens": [1, 2, 3], "message": "detalhe"}
+    if lazy:
+        if structured_log.isEnabledFor(logging.DEBUG):
+            structured_log.debug(LazyJson(payload))
+    else:
+        # Comportamento anterior do StructuredLogger: serializa sempre
+        structured_log.log(logging.DEBUG, json.dumps(payload))
+
+
+def _measure(requests: int, lazy: bool, gap: float):
+    samples = []
+    for i in range(requests):
+        start = time.perf_counter()
+        _request(i, lazy)
+        samples.append((time.perf_counter() - start) * 1e6)
+        # Resto da requisição (I/O de LLM, banco): a thread de escrita drena aqui
+        time.sleep(gap)
+    samples.sort()
+    return statistics.mean(samples), samples[int(0.99 * len(samples))]
+
+
+def _handlers(directory: str):
+    # stdout redirecionado para arquivo, como num container/serviço
+    stream = open(os.path.join(directory, "stdout.log"), "a", encoding="utf-8")
+    return [logging.StreamHandler(stream), logging.FileHandler(os.path.join(directory, "jarvis_api.log"))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de logging")
+    parser.add_argument("--requests", type=int, default=3000, help="Requisições simuladas por modo")
+    parser.add_argument("--gap-ms", type=float, default=1.0, help="Tempo fora do logging por requisição")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  Logging pipeline benchmark (µs de logging por requisição)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logging.basicConfig(level=logging.INFO, format=_FORMAT, handlers=_handlers(tmp), force=True)
+        before = _measure(args.requests, lazy=False, gap=args.gap_ms / 1000)
+
+        configure_logging(level=logging.INFO, format=_FORMAT, handlers=_handlers(tmp), sampling={}, force=True)
+        queued = _measure(args.requests, lazy=True, gap=args.gap_ms / 1000)
+        get_log_pipeline().flush(timeout=30)
+
+        configure_logging(level=logging.INFO, format=_FORMAT, handlers=_handlers(tmp),
+                          sampling={"app.core.nexus": 20.0}, force=True)
+        sampled = _measure(args.requests, lazy=True, gap=args.gap_ms / 1000)
+        stats = get_log_pipeline().stats()
+        shutdown()
+        logging.getLogger().handlers.clear()
+
+    for label, (mean, p99) in (
+        ("basicConfig síncrono", before),
+        ("fila + escrita em 2º plano", queued),
+        ("fila + amostragem do Nexus", sampled),
+    ):
+        print(f"  {label:<28}: média {mean:8.1f} µs | p99 {p99:8.1f} µs")
+    print(f"  Descartados por fila cheia: {stats['dropped']} | suprimidos por amostragem: {stats['sampled_out']}")
+
+
+if __name__ == "__main__":
+    main()
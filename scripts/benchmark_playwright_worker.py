@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JARVIS PlaywrightWorker Benchmark
+
+Compara jobs/minuto entre o fluxo antigo (um Chromium por URL + sleep fixo)
+e o PlaywrightWorker com browser quente e um context novo por job, usando fixtures
+HTML estáticas servidas localmente.
+
+Usage:
+    python scripts/benchmark_playwright_worker.py [--jobs N] [--concurrency C] [--legacy-sleep S]
+"""
+
+import argparse
+import functools
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.adapters.infrastructure.playwright_worker import PlaywrightWorker
+
+FIXTURE_TEMPLATE = """<!doctype html>
+<html><head><title>Fixture {n}</title></head>
+<body><main id="content"><h1>Fixture {n}</h1>{paragraphs}</main></body></html>
+"""
+
+
+def write_fixtures(directory: str, count: int) -> None:
+    """Gera ``count`` páginas HTML estáticas em ``directory``."""
+    for n in range(count):
+        paragraphs = "".join(f"<p>Parágrafo {i} da fixture {n}.</p>" for i in range(50))
+        with open(os.path.join(directory, f"page_{n}.html"), "w", encoding="utf-8") as f:
+            f.write(FIXTURE_TEMPLATE.format(n=n, paragraphs=paragraphs))
+
+
+def serve(directory: str):
+    """Sobe um http.server local em porta livre; retorna (server, base_url)."""
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=directory)
+    handler.log_message = lambda *args, **kwargs: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run_legacy(urls, sleep_s: float) -> float:
+    """Fluxo antigo: um Chromium por URL e espera fixa. Retorna segundos."""
+    from playwright.sync_api import sync_playwright
+
+    start = time.perf_counter()
+    with sync_playwright() as p:
+        for url in urls:
+            browser = p.chromium.launch(headless=True)
+            context = browser.new_context()
+            page = context.new_page()
+            page.goto(url)
+            time.sleep(sleep_s)
+            browser.close()
+    return time.perf_counter() - start
+
+
+def run_pooled(urls, concurrency: int) -> float:
+    """Browser quente + context por job. Retorna segundos (sem o boot do browser)."""
+    worker = PlaywrightWorker(max_concurrency=concurrency)
+    worker.start()
+    try:
+        start = time.perf_counter()
+        results = worker.fetch_many(urls, wait_until="load", wait_for_selector="#content")
+        elapsed = time.perf_counter() - start
+    finally:
+        worker.stop()
+    failed = [r for r in results if not r["success"]]
+    if failed:
+        print(f"  ⚠️  {len(failed)} jobs falharam: {failed[0].get('error')}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do PlaywrightWorker")
+    parser.add_argument("--jobs", type=int, default=20, help="Número de URLs a visitar")
+    parser.add_argument("--concurrency", type=int, default=4, help="Páginas simultâneas no pool")
+    parser.add_argument("--legacy-sleep", type=float, default=5.0,
+                        help="Sleep fixo do fluxo antigo (o original usava 5s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_fixtures(tmp, args.jobs)
+        server, base_url = serve(tmp)
+        urls = [f"{base_url}/page_{n}.html" for n in range(args.jobs)]
+        try:
+            print("=" * 70)
+            print(f"  PlaywrightWorker benchmark — {args.jobs} jobs")
+            print("=" * 70)
+            legacy = run_legacy(urls, args.legacy_sleep)
+            print(f"  Antes  (browser por URL, sleep {args.legacy_sleep}s): "
+                  f"{legacy:8.2f}s  → {args.jobs / legacy * 60:8.1f} jobs/min")
+            pooled = run_pooled(urls, args.concurrency)
+            print(f"  Depois (pool, concorrência {args.concurrency}):        "
+                  f"{pooled:8.2f}s  → {args.jobs / pooled * 60:8.1f} jobs/min")
+            print(f"  Speedup: {legacy / pooled:.1f}x")
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
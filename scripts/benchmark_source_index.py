@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JARVIS SourceIndex Benchmark
+
+Mede o custo de consultas por palavra-chave/substring com o SourceIndex
+contra a varredura antiga (rglob + leitura de cada arquivo), no repositório
+atual e numa árvore sintética grande.
+
+Usage:
+    python scripts/benchmark_source_index.py [--synthetic-files N] [--queries Q]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.adapters.infrastructure.source_index import SourceIndex
+
+_WORDS = (
+    "voice telegram memory vision shell pipeline nexus reward capability sandbox "
+    "gateway router browser sync journal thought mission device audit snapshot"
+).split()
+# Termos comuns (presentes em ~10% dos arquivos) e raros (poucos arquivos)
+_QUERIES = ["telegram", "capability", "snapshot", "homeostase", "metabolism_core", "overwatch"]
+
+
+def naive_search(root: Path, keywords, max_files: int = 5):
+    """Varredura antiga do LLMCapabilityDetector."""
+    found = []
+    for search_dir in (root / "app", root / "scripts"):
+        if not search_dir.exists():
+            continue
+        for py_file in search_dir.rglob("*.py"):
+            if len(found) >= max_files:
+                return found
+            try:
+                content = py_file.read_text(encoding="utf-8").lower()
+            except OSError:
+                continue
+            if any(k in content for k in keywords):
+                found.append(py_file)
+    return found
+
+
+def build_synthetic_tree(root: Path, n_files: int) -> None:
+    """Gera ``n_files`` módulos Python pequenos distribuídos em pacotes."""
+    rng = random.Random(42)
+    for i in range(n_files):
+        pkg = root / "app" / f"pkg_{i // 500:03d}"
+        pkg.mkdir(parents=True, exist_ok=True)
+        a, b = rng.sample(_WORDS, 2)
+        body = "\n".join(
+            f"def {rng.choice(_WORDS)}_{j}(x):\n    return '{rng.choice(_WORDS)} {j}'" for j in range(8)
+        )
+        if i % 10_000 == 0:
+            body += "\n\n# homeostase: overwatch hook for metabolism_core\n"
+        (pkg / f"{a}_{b}_{i}.py").write_text(f'"""{a} {b}"""\n\nclass {a.title()}{b.title()}:\n    pass\n\n{body}\n')
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench(label: str, root: Path, queries: int) -> None:
+    print("-" * 70)
+    print(f"  {label}: {root}")
+    index = SourceIndex(root=root, index_path=None, refresh_interval=3600)
+    _, build_s = timed(index.ensure_fresh)
+    print(f"  Build inicial: {index.stats()['files']} arquivos em {build_s:.2f}s")
+    _, refresh_s = timed(index.refresh)
+    print(f"  Refresh sem mudanças: {refresh_s * 1000:.1f} ms")
+
+    naive_total = indexed_kw = indexed_sub = 0.0
+    for q in (_QUERIES * queries)[:queries]:
+        _, t = timed(naive_search, root, [q])
+        naive_total += t
+        _, t = timed(index.search_any, [q], limit=5, path_prefixes=("app/", "scripts/"), suffix=".py")
+        indexed_sub += t
+        _, t = timed(index.search, q, limit=5, snippets=0)
+        indexed_kw += t
+    print(f"  Varredura antiga  : {naive_total / queries * 1000:10.2f} ms/consulta")
+    print(f"  Índice (substring): {indexed_sub / queries * 1000:10.2f} ms/consulta")
+    print(f"  Índice (keyword)  : {indexed_kw / queries * 1000:10.2f} ms/consulta")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do SourceIndex")
+    parser.add_argument("--synthetic-files", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=12)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  SourceIndex benchmark")
+    print("=" * 70)
+    bench("Repositório atual", Path(__file__).resolve().parent.parent, args.queries)
+    with tempfile.TemporaryDirectory() as tmp:
+        build_synthetic_tree(Path(tmp), args.synthetic_files)
+        bench(f"Árvore sintética ({args.synthetic_files} arquivos)", Path(tmp), args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JARVIS ThoughtLog Persistence Benchmark
+
+Mede o custo de registrar os pensamentos de uma missão num SQLite em
+arquivo: uma ``Session`` + commit por pensamento (comportamento anterior do
+``ThoughtLogService``) contra o ``ThoughtLogWriter`` em lotes. Reporta o
+tempo na thread do agente por pensamento e o total até tudo estar gravado.
+
+Usage:
+    python scripts/benchmark_thought_log.py [--missions N] [--thoughts T]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.application.services.thought_log_service import ThoughtLogService
+from app.domain.models.thought_log import ThoughtLog
+
+
+def _engine(directory: str, name: str):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _per_thought_commit(engine, missions: int, thoughts: int):
+    start = time.perf_counter()
+    for m in range(missions):
+        for t in range(thoughts):
+            with Session(engine) as session:
+                session.add(ThoughtLog(mission_id=f"m{m}", session_id="bench", thought_process=f"passo {t}"))
+                session.commit()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def _batched(engine, missions: int, thoughts: int):
+    service = ThoughtLogService(engine=engine)
+    start = time.perf_counter()
+    for m in range(missions):
+        for t in range(thoughts):
+            service.create_thought(mission_id=f"m{m}", session_id="bench", thought_process=f"passo {t}",
+                                   success=True)
+    caller = time.perf_counter() - start
+    service.flush(timeout=60)
+    return caller, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da persistência de ThoughtLogs")
+    parser.add_argument("--missions", type=int, default=20, help="Missões simuladas")
+    parser.add_argument("--thoughts", type=int, default=50, help="Pensamentos por missão")
+    args = parser.parse_args()
+    total = args.missions * args.thoughts
+
+    print("=" * 70)
+    print(f"  ThoughtLog benchmark ({args.missions} missões × {args.thoughts} pensamentos)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, run, name in (
+            ("commit por pensamento", _per_thought_commit, "per_thought.db"),
+            ("ThoughtLogWriter (lotes)", _batched, "batched.db"),
+        ):
+            caller, done = run(_engine(tmp, name), args.missions, args.thoughts)
+            print(f"  {label:<26}: {caller / total * 1e6:8.1f} µs/pensamento no agente | "
+                  f"total gravado {done:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JARVIS WarmInterpreterPool Benchmark
+
+Mede o custo de rodar repetidamente um único arquivo de teste, como o
+JarvisDevAgent faz a cada RUN_TESTS: subprocesso ``python -m pytest`` novo
+contra um filho forkado de um zygote pré-aquecido.
+
+Usage:
+    python scripts/benchmark_warm_pool.py [--runs N] [--size S]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.adapters.infrastructure.warm_interpreter_pool import WarmInterpreterPool
+
+_TEST_FILE = "def test_soma():\n    assert 1 + 1 == 2\n"
+_ARGS = ["-q", "-p", "no:cacheprovider", "-o", "addopts="]
+
+
+def _report(label: str, samples):
+    print(
+        f"  {label:<22}: média {statistics.mean(samples):7.1f} ms | "
+        f"mediana {statistics.median(samples):7.1f} ms | max {max(samples):7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do WarmInterpreterPool")
+    parser.add_argument("--runs", type=int, default=20, help="Execuções por modo")
+    parser.add_argument("--size", type=int, default=1, help="Zygotes no pool")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  WarmInterpreterPool benchmark")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_path = os.path.join(tmp, "test_bench.py")
+        with open(test_path, "w", encoding="utf-8") as fh:
+            fh.write(_TEST_FILE)
+
+        cold = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "pytest", test_path, *_ARGS],
+                cwd=tmp, capture_output=True, text=True, timeout=120,
+            )
+            cold.append((time.perf_counter() - start) * 1000)
+
+        pool = WarmInterpreterPool(size=args.size, cwd=tmp)
+        start = time.perf_counter()
+        pool.warm()
+        warm_up_ms = (time.perf_counter() - start) * 1000
+
+        warm = []
+        try:
+            for _ in range(args.runs):
+                result = pool.run_pytest([test_path, *_ARGS], timeout=120)
+                if result.exit_code != 0:
+                    print(result.output)
+                    raise SystemExit("Execução no pool falhou")
+                warm.append(result.elapsed_ms)
+        finally:
+            pool.close()
+
+    print(f"  Aquecimento do pool   : {warm_up_ms:.0f} ms (uma vez)")
+    _report("Subprocesso novo", cold)
+    _report("Pool pré-aquecido", warm)
+    print(f"  Ganho                 : {statistics.mean(cold) / statistics.mean(warm):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -74,6 +74,18 @@ class TestCostTrackerMedian:
         median = tracker.get_median_cost("code_generation")
         assert median >= 0.0
 
+    def test_median_is_maintained_incrementally(self, tracker):
+        pytest.importorskip("sqlalchemy")
+        for tokens in (100, 300, 200):
+            tracker.log("unknown-model", "reasoning", tokens, 0, True)
+        assert tracker.get_median_cost("reasoning") == pytest.approx(tracker._estimate_cost("unknown-model", 200, 0))
+        # Após o seed, novos logs atualizam o sketch sem reler a tabela
+        with patch.object(tracker, "_seed_median_sketch") as seed:
+            tracker.log("unknown-model", "reasoning", 400, 0, True)
+            tracker.log("unknown-model", "reasoning", 500, 0, True)
+            assert tracker.get_median_cost("reasoning") == pytest.approx(tracker._estimate_cost("unknown-model", 300, 0))
+        seed.assert_not_called()
+
 
 class TestCostTrackerEstimate:
     def test_estimate_uses_default_prices(self, tracker):
@@ -84,3 +96,4 @@ class TestCostTrackerEstimate:
     def test_estimate_zero_tokens(self, tracker):
         cost = tracker._estimate_cost("unknown-model", 0, 0)
         assert cost == 0.0
+
@@ -17,6 +17,13 @@ def _make_context(file_path: str = None) -> dict:
     return ctx
 
 
+def _patch_session(**methods):
+    """Patch the shared transport so ``session()`` returns a mock with ``methods``."""
+    transport = Mock()
+    transport.session.return_value = Mock(**methods)
+    return patch("app.adapters.infrastructure.gist_uploader.get_http_transport", return_value=transport)
+
+
 def _mock_response(status_code: int, json_data: dict = None):
     resp = Mock()
     resp.status_code = status_code
@@ -69,79 +76,79 @@ class TestGistUploaderExecute:
         result = uploader.execute(ctx)
         assert result is ctx
 
-    def test_successful_patch_updates_artifact(self, tmp_path):
+    def test_successful_patch_returns_success(self, tmp_path):
         backup_file = tmp_path / "backup.txt"
         backup_file.write_text("DNA content", encoding="utf-8")
 
-        mock_resp = _mock_response(200, {"html_url": "https://gist.github.com/test"})
+        session_patch = Mock(return_value=_mock_response(200, {"html_url": "https://gist.github.com/test"}))
 
-        with patch("app.adapters.infrastructure.gist_uploader.requests.patch", return_value=mock_resp):
+        with _patch_session(patch=session_patch):
             uploader = GistUploader()
             uploader.token = "ghp_test"
             ctx = _make_context(file_path=str(backup_file))
             result = uploader.execute(ctx)
 
-        assert result["artifacts"]["gist_backup"]["status"] == "updated"
-        assert result["artifacts"]["gist_backup"]["url"] == "https://gist.github.com/test"
+        assert result == {"success": True, "gist_id": uploader.gist_id}
+        url = session_patch.call_args.args[0]
+        payload = session_patch.call_args.kwargs["json"]
+        assert url == f"https://api.github.com/gists/{uploader.gist_id}"
+        assert session_patch.call_args.kwargs["headers"]["Authorization"] == "token ghp_test"
+        assert payload["files"]["CORE_LOGIC_CONSOLIDATED.txt"]["content"] == "DNA content"
 
-    def test_gist_not_found_falls_back_to_post(self, tmp_path):
-        """A 404 on PATCH should trigger a fallback POST to create a new Gist."""
+    def test_gist_not_found_reports_error_without_creating(self, tmp_path):
+        """A 404 on PATCH is reported as a failure; no new Gist is created."""
         backup_file = tmp_path / "backup.txt"
         backup_file.write_text("DNA content", encoding="utf-8")
 
-        mock_404 = _mock_response(404, {})
-        mock_201 = _mock_response(201, {"html_url": "https://gist.github.com/new"})
+        session_post = Mock(return_value=_mock_response(201, {"html_url": "https://gist.github.com/new"}))
 
-        with patch("app.adapters.infrastructure.gist_uploader.requests.patch", return_value=mock_404):
-            with patch("app.adapters.infrastructure.gist_uploader.requests.post", return_value=mock_201):
-                uploader = GistUploader()
-                uploader.token = "ghp_test"
-                ctx = _make_context(file_path=str(backup_file))
-                result = uploader.execute(ctx)
+        with _patch_session(patch=Mock(return_value=_mock_response(404, {})), post=session_post):
+            uploader = GistUploader()
+            uploader.token = "ghp_test"
+            ctx = _make_context(file_path=str(backup_file))
+            result = uploader.execute(ctx)
 
-        assert result["artifacts"]["gist_backup"]["status"] == "created"
-        assert result["artifacts"]["gist_backup"]["url"] == "https://gist.github.com/new"
+        assert result == {"success": False, "error": "404"}
+        session_post.assert_not_called()
+        assert "gist_backup" not in ctx["artifacts"]
 
-    def test_api_error_logs_but_returns_context(self, tmp_path):
-        """A non-200/404 API response should be logged but not raise."""
+    def test_api_error_is_reported_without_raising(self, tmp_path):
+        """A non-200/201 API response is logged and returned as a failure."""
         backup_file = tmp_path / "backup.txt"
         backup_file.write_text("DNA content", encoding="utf-8")
 
         mock_resp = _mock_response(500, {"error": "Internal Server Error"})
 
-        with patch("app.adapters.infrastructure.gist_uploader.requests.patch", return_value=mock_resp):
+        with _patch_session(patch=Mock(return_value=mock_resp)):
             uploader = GistUploader()
             uploader.token = "ghp_test"
             ctx = _make_context(file_path=str(backup_file))
             result = uploader.execute(ctx)
 
-        assert result is ctx
-        assert "gist_backup" not in result["artifacts"]
+        assert result == {"success": False, "error": "500"}
+        assert "gist_backup" not in ctx["artifacts"]
 
-    def test_network_exception_returns_context(self, tmp_path):
-        """Network errors should be caught and context returned unchanged."""
+    def test_network_exception_is_reported_without_raising(self, tmp_path):
+        """Network errors are caught and returned as a failure."""
         backup_file = tmp_path / "backup.txt"
         backup_file.write_text("DNA content", encoding="utf-8")
 
-        with patch(
-            "app.adapters.infrastructure.gist_uploader.requests.patch",
-            side_effect=ConnectionError("Network unreachable"),
-        ):
+        with _patch_session(patch=Mock(side_effect=ConnectionError("Network unreachable"))):
             uploader = GistUploader()
             uploader.token = "ghp_test"
             ctx = _make_context(file_path=str(backup_file))
             result = uploader.execute(ctx)
 
-        assert result is ctx
+        assert result == {"success": False, "error": "Network unreachable"}
 
     def test_file_path_from_consolidator_artifact_fallback(self, tmp_path):
         """When result has no file_path, falls back to consolidator artifact."""
         backup_file = tmp_path / "backup.txt"
         backup_file.write_text("DNA content", encoding="utf-8")
 
-        mock_resp = _mock_response(200, {"html_url": "https://gist.github.com/test"})
+        session_patch = Mock(return_value=_mock_response(200, {"html_url": "https://gist.github.com/test"}))
 
-        with patch("app.adapters.infrastructure.gist_uploader.requests.patch", return_value=mock_resp):
+        with _patch_session(patch=session_patch):
             uploader = GistUploader()
             uploader.token = "ghp_test"
             ctx = {
@@ -151,4 +158,5 @@ class TestGistUploaderExecute:
             }
             result = uploader.execute(ctx)
 
-        assert result["artifacts"]["gist_backup"]["status"] == "updated"
+        assert result["success"] is True
+        assert session_patch.call_args.kwargs["json"]["files"]["CORE_LOGIC_CONSOLIDATED.txt"]["content"] == "DNA content"
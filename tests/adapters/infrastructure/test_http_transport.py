@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Tests para HttpTransport contra um servidor HTTPS local que conta conexões."""
+
+import asyncio
+import datetime
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.adapters.infrastructure.http_transport import HttpTransport
+
+
+def _self_signed(tmp_path):
+    x509 = pytest.importorskip("cryptography.x509")
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+    import ipaddress
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_file, key_file = tmp_path / "cert.pem", tmp_path / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    return str(cert_file), str(key_file)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 1 << 16  # headers + corpo num único envio (sem atraso de ACK)
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(self.server.slow)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _HttpsStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, cert_file, key_file):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        self.socket = context.wrap_socket(self.socket, server_side=True)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.slow = 0.0
+
+    @property
+    def url(self):
+        return f"https://127.0.0.1:{self.server_address[1]}"
+
+
+@pytest.fixture
+def https(tmp_path, monkeypatch):
+    # Com estas variáveis o requests ignora ``session.verify``
+    monkeypatch.delenv("REQUESTS_CA_BUNDLE", raising=False)
+    monkeypatch.delenv("CURL_CA_BUNDLE", raising=False)
+    cert_file, key_file = _self_signed(tmp_path)
+    server = _HttpsStub(cert_file, key_file)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.cert_file = cert_file
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport(https):
+    transport = HttpTransport(verify=ssl.create_default_context(cafile=https.cert_file))
+    yield transport
+    transport.close()
+
+
+def _origin(server):
+    return f"https://127.0.0.1:{server.server_address[1]}"
+
+
+class TestHttpTransport:
+    def test_requests_sessions_share_one_keepalive_connection(self, https, transport):
+        for _ in range(2):  # dois adapters, cada um com sua sessão
+            session = transport.session(headers={"X-Adapter": "a"})
+            session.verify = https.cert_file
+            for _ in range(100):
+                assert session.get(f"{https.url}/ping").json() == {"ok": True}
+            session.close()  # não fecha o pool compartilhado
+
+        host = transport.stats()["hosts"][_origin(https)]
+        assert https.connections == 1
+        assert host["requests"] == 200
+        assert host["connections_opened"] == 1 and host["tls_handshakes"] == 1
+        assert host["reuse_ratio"] == pytest.approx(199 / 200)
+
+    def test_httpx_clients_share_pool_and_count_handshakes(self, https, transport):
+        for _ in range(2):
+            with transport.client(base_url=https.url) as client:
+                for _ in range(50):
+                    assert client.get("/ping").status_code == 200
+
+        host = transport.stats()["hosts"][_origin(https)]
+        assert https.connections == 1
+        assert host == {**host, "requests": 100, "connections_opened": 1, "tls_handshakes": 1}
+        assert transport.stats()["pools"]["httpx:default"]["idle"] == 1
+
+    def test_async_client_pool_per_event_loop(self, https, transport):
+        async def burst():
+            async with transport.async_client(pool="github", base_url=https.url) as client:
+                for _ in range(20):
+                    assert (await client.get("/ping")).status_code == 200
+
+        asyncio.run(burst())
+        (_, first, _), = transport._async_transports.values()
+        assert first._pool.connections == []  # fechado no shutdown do loop
+        asyncio.run(burst())  # novo loop: novo pool, o antigo é descartado
+
+        assert [t for _, t, _ in transport._async_transports.values()] != [first]
+        assert transport.stats()["hosts"][_origin(https)]["connections_opened"] == 2
+        assert https.connections == 2
+
+    def test_default_read_timeout_applies(self, https):
+        transport = HttpTransport(read_timeout=0.2, verify=ssl.create_default_context(cafile=https.cert_file))
+        https.slow = 1.0
+        session = transport.session()
+        session.verify = https.cert_file
+
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            session.get(f"{https.url}/slow")
+        with transport.client() as client:
+            with pytest.raises(Exception, match="(?i)timed out"):
+                client.get(f"{https.url}/slow")
+        transport.close()
+
+    def test_pool_utilization_reports_checked_out_connection(self, https, transport):
+        session = transport.session()
+        session.verify = https.cert_file
+        response = session.get(f"{https.url}/ping", stream=True)
+        busy = transport.stats()["pools"]["requests:default"]
+        response.close()
+        idle = transport.stats()["pools"]["requests:default"]
+
+        assert busy["in_use"] == 1 and busy["utilization"] == pytest.approx(1 / transport.pool_size)
+        assert idle["in_use"] == 0
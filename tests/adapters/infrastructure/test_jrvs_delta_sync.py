@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Tests for JrvsDeltaSync against a local Supabase Storage stand-in."""
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from app.adapters.infrastructure.jrvs_cloud_storage import JrvsCloudStorage
+from app.adapters.infrastructure.jrvs_delta_sync import MANIFEST_NAME, JrvsDeltaSync
+from app.utils.jrvs_codec import write_file as jrvs_write
+
+_BUCKET = "jrvs-snapshots"
+
+
+class _StorageStandIn(ThreadingHTTPServer):
+    """Subset of the Supabase Storage REST API; counts requests and bytes."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.objects = {}
+        self.requests = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.lock = threading.Lock()
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests.clear()
+            self.bytes_in = self.bytes_out = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path))
+            self.server.bytes_in += len(body)
+        return body
+
+    def _reply(self, status, body=b"", etag=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", f'"{etag}"')
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.bytes_out += len(body)
+
+    def do_POST(self):
+        body = self._body()
+        list_prefix = f"/storage/v1/object/list/{_BUCKET}"
+        if self.path == list_prefix:
+            prefix = json.loads(body)["prefix"]
+            start = prefix + "/" if prefix else ""
+            items, folders = [], set()
+            for name, data in sorted(self.server.objects.items()):
+                if not name.startswith(start):
+                    continue
+                rest = name[len(start):]
+                if "/" in rest:  # one level per call, like Supabase
+                    folders.add(rest.split("/", 1)[0])
+                    continue
+                items.append({"name": rest, "id": name,
+                              "metadata": {"eTag": f'"{hashlib.md5(data).hexdigest()}"', "size": len(data)}})
+            items += [{"name": folder, "id": None, "metadata": None} for folder in sorted(folders)]
+            return self._reply(200, json.dumps(items).encode())
+        name = self.path.split(f"/storage/v1/object/{_BUCKET}/", 1)[1]
+        self.server.objects[name] = body
+        self._reply(200, b'{"Key": "ok"}', etag=hashlib.md5(body).hexdigest())
+
+    def do_DELETE(self):
+        self._body()
+        name = self.path.split(f"/storage/v1/object/{_BUCKET}/", 1)[1]
+        self._reply(200 if self.server.objects.pop(name, None) is not None else 404)
+
+    def do_GET(self):
+        self._body()
+        name = self.path.split(f"/storage/v1/object/{_BUCKET}/", 1)[1]
+        data = self.server.objects.get(name)
+        if data is None:
+            return self._reply(404)
+        self._reply(200, data, etag=hashlib.md5(data).hexdigest())
+
+
+@pytest.fixture
+def server():
+    srv = _StorageStandIn()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def cloud(server):
+    storage = JrvsCloudStorage(max_workers=4)
+    storage.configure({
+        "supabase_url": f"http://127.0.0.1:{server.server_address[1]}",
+        "supabase_key": "test-key",
+    })
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def jrvs_dir(tmp_path: Path) -> Path:
+    d = tmp_path / "jrvs"
+    d.mkdir()
+    for i in range(6):
+        jrvs_write(d / f"snap_{i}.jrvs", {"snapshot": i, "payload": "x" * 200})
+    return d
+
+
+def _uploads(server):
+    return [r for r in server.requests if r[0] == "POST" and "/object/list/" not in r[1]]
+
+
+class TestJrvsDeltaSync:
+    def test_first_sync_uploads_everything(self, server, cloud, jrvs_dir):
+        report = JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        assert sorted(report.uploaded) == [f"jrvs/snap_{i}.jrvs" for i in range(6)]
+        assert report.errors == []
+        assert len(server.objects) == 6
+        assert (jrvs_dir / MANIFEST_NAME).exists()
+
+    def test_unchanged_sync_only_lists(self, server, cloud, jrvs_dir):
+        JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        server.reset_counters()
+
+        report = JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        assert report.uploaded == [] and report.downloaded == []
+        assert report.unchanged == 6
+        assert server.requests == [("POST", f"/storage/v1/object/list/{_BUCKET}")]
+
+    def test_only_changed_file_is_uploaded(self, server, cloud, jrvs_dir):
+        JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        server.reset_counters()
+        jrvs_write(jrvs_dir / "snap_3.jrvs", {"snapshot": 3, "payload": "changed"})
+
+        report = JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        assert report.uploaded == ["jrvs/snap_3.jrvs"]
+        assert len(_uploads(server)) == 1
+        assert report.bytes_uploaded == (jrvs_dir / "snap_3.jrvs").stat().st_size
+        # Only the changed snapshot plus the small listing body went over the wire
+        assert server.bytes_in < report.bytes_uploaded + 200
+
+    def test_touched_but_identical_file_is_not_uploaded(self, server, cloud, jrvs_dir):
+        JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        server.reset_counters()
+        target = jrvs_dir / "snap_0.jrvs"
+        target.write_bytes(target.read_bytes())
+
+        report = JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        assert report.uploaded == []
+        assert _uploads(server) == []
+
+    def test_missing_and_remotely_changed_files_are_downloaded(self, server, cloud, jrvs_dir):
+        JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        (jrvs_dir / "snap_1.jrvs").unlink()
+        server.objects["jrvs/snap_2.jrvs"] = b"remote edit"
+
+        report = JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        assert sorted(report.downloaded) == ["jrvs/snap_1.jrvs", "jrvs/snap_2.jrvs"]
+        assert (jrvs_dir / "snap_2.jrvs").read_bytes() == b"remote edit"
+        assert report.uploaded == []
+
+    def test_translator_sync_all_uses_delta_sync(self, server, cloud, jrvs_dir):
+        from app.application.services.jrvs_translator import JrvsTranslator
+
+        translator = JrvsTranslator()
+        synced, errors = translator.sync_all(jrvs_dir, cloud=cloud)
+        assert errors == [] and len(synced) == 6
+        assert translator.sync_all(jrvs_dir, cloud=cloud) == ([], [])
+
+    def test_legacy_flattened_objects_are_migrated_once(self, server, cloud, jrvs_dir):
+        (jrvs_dir / "sub").mkdir()
+        server.objects["jrvs-old-snap.jrvs"] = b"legacy root"
+        server.objects["jrvs-sub-x.jrvs"] = b"legacy nested"
+
+        report = JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+
+        assert "jrvs-old-snap.jrvs" not in server.objects and "jrvs-sub-x.jrvs" not in server.objects
+        assert sorted(report.downloaded) == ["jrvs/old-snap.jrvs", "jrvs/sub/x.jrvs"]
+        assert (jrvs_dir / "sub" / "x.jrvs").read_bytes() == b"legacy nested"
+        server.reset_counters()
+        JrvsDeltaSync(cloud, _BUCKET).sync(jrvs_dir)
+        # Only the prefix listing (jrvs/ and jrvs/sub/); the root is not listed again
+        assert {r for r in server.requests} == {("POST", f"/storage/v1/object/list/{_BUCKET}")}
+        assert len(server.requests) == 2
+
+    def test_upload_and_download_actions_share_sync_layout(self, server, cloud, jrvs_dir, monkeypatch):
+        monkeypatch.chdir(jrvs_dir.parent)
+        result = cloud.execute({"action": "upload", "path": "jrvs/snap_0.jrvs", "data_dir": "jrvs"})
+        assert result == {"success": True, "uploaded": ["jrvs/snap_0.jrvs"]}
+        assert list(server.objects) == ["jrvs/snap_0.jrvs"]
+
+        (jrvs_dir / "snap_0.jrvs").unlink()
+        result = cloud.execute({"action": "download", "path": "jrvs/snap_0.jrvs", "data_dir": "jrvs"})
+        assert result["downloaded"] == ["jrvs/snap_0.jrvs"]
+        assert (jrvs_dir / "snap_0.jrvs").exists()
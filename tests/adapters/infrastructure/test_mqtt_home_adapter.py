@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Tests for MqttHomeAdapter pipelined publishing against a fake broker client."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from app.adapters.infrastructure.mqtt_home_adapter import MqttHomeAdapter
+
+
+class FakeBrokerClient:
+    """paho-compatible client that acknowledges each message after ``latency`` seconds."""
+
+    def __init__(self, latency: float = 0.05, drop_topics=(), rc: int = 0, sync_ack: bool = False) -> None:
+        self.latency = latency
+        self.drop_topics = set(drop_topics)
+        self.rc = rc
+        self.sync_ack = sync_ack
+        self.on_publish = None
+        self.on_connect = None
+        self.on_disconnect = None
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._mid = 0
+        self._lock = threading.Lock()
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        with self._lock:
+            self._mid += 1
+            mid = self._mid
+            if self.rc:
+                return SimpleNamespace(rc=self.rc, mid=mid)
+            self.sent.append((topic, payload))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if topic in self.drop_topics:
+            return SimpleNamespace(rc=0, mid=mid)
+        if self.sync_ack:
+            self._ack(mid)
+        else:
+            threading.Timer(self.latency, self._ack, args=(mid,)).start()
+        return SimpleNamespace(rc=0, mid=mid)
+
+    def _ack(self, mid):
+        with self._lock:
+            self.in_flight -= 1
+        self.on_publish(self, None, mid)
+
+
+class MutexBrokerClient(FakeBrokerClient):
+    """Models paho's locking: ``publish`` and the ack path share one mutex.
+
+    Acks are fired from another thread *while holding* the mutex, as paho's
+    ``_handle_pubackcomp`` does with ``_out_message_mutex``.
+    """
+
+    def __init__(self, hold: float = 0.02) -> None:
+        super().__init__()
+        self.hold = hold
+        self.mutex = threading.Lock()
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        with self.mutex:
+            self._mid += 1
+            mid = self._mid
+            self.sent.append((topic, payload))
+        threading.Thread(target=self._ack_holding_mutex, args=(mid,), daemon=True).start()
+        return SimpleNamespace(rc=0, mid=mid)
+
+    def _ack_holding_mutex(self, mid):
+        with self.mutex:
+            time.sleep(self.hold)  # the next publish() blocks on the mutex meanwhile
+            self.on_publish(self, None, mid)
+
+
+class TestMqttHomeAdapterPipelining:
+    def test_scene_is_pipelined_within_window(self):
+        broker = FakeBrokerClient(latency=0.05)
+        adapter = MqttHomeAdapter(client=broker, max_in_flight=8)
+        commands = [("light", f"lamp_{i}", "ON") for i in range(16)]
+
+        start = time.monotonic()
+        scene = adapter.ha_scene(commands)
+        elapsed = time.monotonic() - start
+
+        assert scene["success"] is True and scene["failed"] == []
+        assert [r["topic"] for r in scene["results"]] == [f"homeassistant/light/lamp_{i}/set" for i in range(16)]
+        assert broker.max_in_flight == 8
+        # 16 × 50 ms serially would be 0.8 s; a window of 8 needs ~2 round-trips
+        assert elapsed < 0.4
+        assert adapter.stats()["in_flight"] == 0
+
+    def test_publish_async_returns_future_and_blocking_publish_still_works(self):
+        broker = FakeBrokerClient(latency=0.02)
+        adapter = MqttHomeAdapter(client=broker)
+
+        future = adapter.publish_async("home/a", {"state": "ON"})
+        result = adapter.publish("home/b", "OFF")
+
+        assert future.result(timeout=1)["payload"] == '{"state": "ON"}'
+        assert result["success"] is True and result["topic"] == "home/b"
+        assert adapter.stats()["published"] == 2
+
+    def test_synchronous_ack_inside_publish(self):
+        adapter = MqttHomeAdapter(client=FakeBrokerClient(sync_ack=True), max_in_flight=1)
+        results = adapter.ha_switch_many({"switch.a": "on", "switch.b": "off"})
+        assert [r["payload"] for r in results] == ["ON", "OFF"]
+        assert all(r["success"] for r in results)
+
+    def test_unacknowledged_message_expires_and_frees_slot(self):
+        broker = FakeBrokerClient(latency=0.01, drop_topics={"home/lost"})
+        adapter = MqttHomeAdapter(client=broker, max_in_flight=1, publish_timeout=0.2)
+
+        lost = adapter.publish("home/lost", "X")
+        ok = adapter.publish("home/ok", "Y")
+
+        assert lost["success"] is False and "acknowledged" in lost["error"]
+        assert ok["success"] is True
+        assert adapter.stats()["expired"] == 1
+
+    def test_client_error_fails_future(self):
+        adapter = MqttHomeAdapter(client=FakeBrokerClient(rc=4))
+        result = adapter.publish("home/x", "ON")
+        assert result["success"] is False and result["rc"] == 4
+        assert adapter.stats()["in_flight"] == 0
+
+    def test_audit_history_is_bounded(self):
+        adapter = MqttHomeAdapter(dry_run=True, audit_size=5)
+        adapter.publish_many((f"home/{i}", "ON") for i in range(12))
+        assert [m["topic"] for m in adapter.published_messages] == [f"home/{i}" for i in range(7, 12)]
+
+    def test_late_ack_for_expired_mid_does_not_complete_recycled_mid(self):
+        broker = FakeBrokerClient(latency=0.01, drop_topics={"home/lost"})
+        adapter = MqttHomeAdapter(client=broker, max_in_flight=1, publish_timeout=0.1)
+
+        lost = adapter.publish("home/lost", "X")
+        lost_mid = broker._mid
+        adapter._on_publish(broker, None, lost_mid)  # broker acks after expiry
+
+        # paho wraps mids: the next message reuses the expired one and is never acked
+        broker._mid = lost_mid - 1
+        broker.drop_topics.add("home/recycled")
+        recycled = adapter.publish("home/recycled", "Y")
+
+        assert lost["success"] is False
+        assert recycled["success"] is False and "acknowledged" in recycled["error"]
+        assert adapter.stats()["late_acks"] == 1
+        assert adapter._early_acks == set()
+
+    def test_unknown_acks_are_not_retained(self):
+        adapter = MqttHomeAdapter(client=FakeBrokerClient(latency=0.01))
+        for mid in range(100, 200):
+            adapter._on_publish(None, None, mid)
+        assert adapter._early_acks == set()
+        assert adapter.publish("home/a", "ON")["success"] is True
+
+    def test_ack_under_client_mutex_does_not_deadlock_pipelined_publish(self):
+        adapter = MqttHomeAdapter(client=MutexBrokerClient(), max_in_flight=4, publish_timeout=5.0)
+        results = []
+        worker = threading.Thread(
+            target=lambda: results.extend(adapter.publish_many(((f"home/{i}", "ON") for i in range(12)), qos=1)),
+            daemon=True,
+        )
+        worker.start()
+        worker.join(timeout=3.0)
+
+        assert not worker.is_alive(), "publish() and on_publish() deadlocked"
+        assert len(results) == 12 and all(r["success"] for r in results)
+        assert adapter.stats()["in_flight"] == 0
+        assert adapter._early_acks == set()
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 """Tests for OllamaAdapter — LLMs locais via Ollama."""
 import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -96,10 +99,10 @@ class TestOllamaAdapterIsAvailable:
     def test_is_available_usa_cache_apos_primeira_chamada(self):
         adapter = OllamaAdapter()
         adapter._available = False
-        with patch("urllib.request.urlopen") as mock_urlopen:
+        with patch.object(adapter, "_get_client") as mock_client:
             result = adapter.is_available()
 
-        mock_urlopen.assert_not_called()
+        mock_client.assert_not_called()
         assert result is False
 
 
@@ -108,21 +111,183 @@ class TestOllamaAdapterListLocalModels:
 
     def test_list_local_models_retorna_lista_vazia_quando_inacessivel(self):
         adapter = OllamaAdapter()
-        with patch("urllib.request.urlopen", side_effect=Exception("offline")):
+        with patch.object(adapter, "_get_client", side_effect=Exception("offline")):
             result = adapter.list_local_models()
 
         assert result == []
 
     def test_list_local_models_retorna_nomes_dos_modelos(self):
         adapter = OllamaAdapter()
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = json.dumps(
-            {"models": [{"name": "qwen2.5-coder:7b"}, {"name": "deepseek-r1:8b"}]}
-        ).encode("utf-8")
-        mock_resp.__enter__ = lambda s: s
-        mock_resp.__exit__ = MagicMock(return_value=False)
-        with patch("urllib.request.urlopen", return_value=mock_resp):
+        client = MagicMock()
+        client.get.return_value.json.return_value = {
+            "models": [{"name": "qwen2.5-coder:7b"}, {"name": "deepseek-r1:8b"}]
+        }
+        with patch.object(adapter, "_get_client", return_value=client):
             result = adapter.list_local_models()
 
         assert "qwen2.5-coder:7b" in result
         assert "deepseek-r1:8b" in result
+
+
+# ---------------------------------------------------------------------------
+# Streaming / pool — contra um servidor NDJSON local
+# ---------------------------------------------------------------------------
+
+
+class _OllamaStub(ThreadingHTTPServer):
+    """Simula /api/generate (stream e não-stream); conta conexões TCP."""
+
+    daemon_threads = True
+
+    def __init__(self, tokens, delay=0.0):
+        super().__init__(("127.0.0.1", 0), _OllamaHandler)
+        self.tokens = tokens
+        self.delay = delay
+        self.connections = 0
+        self.chunks_sent = 0
+        self.client_gone = threading.Event()
+        self.payloads = []
+
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.payloads.append(payload)
+        tokens = self.server.tokens
+        final = {"done": True, "eval_count": len(tokens), "eval_duration": 500_000_000, "prompt_eval_count": 7}
+        if not payload.get("stream"):
+            body = json.dumps({"response": "".join(tokens), **final}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in tokens:
+                self._chunk(json.dumps({"response": token, "done": False}).encode() + b"\n")
+                self.server.chunks_sent += 1
+                time.sleep(self.server.delay)
+            self._chunk(json.dumps({"response": "", **final}).encode() + b"\n")
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.client_gone.set()
+            self.close_connection = True
+
+
+def _start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stub():
+    pytest.importorskip("httpx")
+    servers = []
+
+    def _make(tokens, delay=0.0):
+        servers.append(_start(_OllamaStub(tokens, delay)))
+        return servers[-1]
+
+    yield _make
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+def _adapter(server):
+    return OllamaAdapter(model="stub:1b", base_url=f"http://127.0.0.1:{server.server_address[1]}")
+
+
+class TestOllamaAdapterStreaming:
+    def test_stream_yields_tokens_and_measures(self, stub):
+        server = stub(["Olá", ",", " Jarvis", "!"], delay=0.02)
+        adapter = _adapter(server)
+
+        tokens = list(adapter.stream_generate("oi", system="seja breve", max_tokens=16))
+
+        assert tokens == ["Olá", ",", " Jarvis", "!"]
+        stats = adapter.last_stats
+        assert stats.done and not stats.cancelled
+        assert stats.tokens == 4 and stats.prompt_tokens == 7
+        assert stats.tokens_per_second == pytest.approx(8.0)  # eval_count / eval_duration
+        assert 0 < stats.time_to_first_token < stats.total_time
+        assert server.payloads[0]["stream"] is True
+        assert server.payloads[0]["system"] == "seja breve"
+        assert server.payloads[0]["options"]["num_predict"] == 16
+        adapter.close()
+
+    def test_connection_is_reused_across_calls(self, stub):
+        server = stub(["a", "b"])
+        adapter = _adapter(server)
+
+        assert adapter._generate("x", model="stub:1b") == "ab"
+        assert "".join(adapter.stream_generate("y")) == "ab"
+        result = adapter.execute({"prompt": "z"})
+
+        assert result["success"] is True and result["response"] == "ab"
+        assert result["stats"]["tokens"] == 2
+        assert len(server.payloads) == 3
+        assert server.connections == 1
+        adapter.close()
+
+    def test_stopping_early_cancels_request(self, stub):
+        server = stub([f"t{i} " for i in range(200)], delay=0.01)
+        adapter = _adapter(server)
+
+        stream = adapter.stream_generate("conte até 200")
+        received = [next(stream) for _ in range(3)]
+        stream.close()
+
+        assert received == ["t0 ", "t1 ", "t2 "]
+        assert adapter.last_stats.cancelled and not adapter.last_stats.done
+        assert adapter.last_stats.tokens == 3
+        assert server.client_gone.wait(timeout=5)
+        assert server.chunks_sent < 200
+
+        # O pool continua utilizável depois do cancelamento
+        server.tokens, server.delay = ["ok"], 0.0
+        assert list(adapter.stream_generate("de novo")) == ["ok"]
+        adapter.close()
+
+    def test_stream_error_chunk_raises(self, stub):
+        server = stub([])
+        adapter = _adapter(server)
+
+        def _error_post(handler_self):
+            handler_self.rfile.read(int(handler_self.headers["Content-Length"]))
+            body = json.dumps({"error": "model not found"}).encode() + b"\n"
+            handler_self.send_response(200)
+            handler_self.send_header("Content-Length", str(len(body)))
+            handler_self.end_headers()
+            handler_self.wfile.write(body)
+
+        with patch.object(_OllamaHandler, "do_POST", _error_post):
+            with pytest.raises(RuntimeError, match="model not found"):
+                list(adapter.stream_generate("x"))
+        adapter.close()
+
+    def test_configure_base_url_resets_pool(self, stub):
+        adapter = _adapter(stub(["a"]))
+        adapter._generate("x", model="stub:1b")
+        old_client = adapter._client
+
+        adapter.configure({"base_url": "http://127.0.0.1:1/"})
+        assert adapter._client is None and old_client.is_closed
+        assert adapter.base_url == "http://127.0.0.1:1"
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Tests for PersistentShellAdapter — pool de PTYs e output em streaming."""
+import os
+import threading
+
+import pytest
+
+from app.adapters.infrastructure.persistent_shell_adapter import PersistentShellAdapter
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="PTY indisponível no Windows")
+
+
+@pytest.fixture
+def adapter():
+    shell = PersistentShellAdapter()
+    shell.configure({"timeout": 10, "pool_size": 2})
+    yield shell
+    shell.shutdown()
+
+
+class TestPersistentShellExecute:
+
+    def test_execute_sem_comando(self, adapter):
+        result = adapter.execute({})
+        assert result["success"] is False
+
+    def test_execute_retorna_output_limpo(self, adapter):
+        result = adapter.execute({"command": "echo ola"})
+        assert result["success"] is True
+        assert result["output"] == "ola"
+        assert result["returncode"] == 0
+        assert "__JARVIS_" not in result["output"]
+
+    def test_execute_reporta_returncode_e_tempos(self, adapter):
+        result = adapter.execute({"command": "false"})
+        assert result["success"] is False
+        assert result["returncode"] == 1
+        assert result["wall_time"] >= 0
+
+    def test_estado_persiste_na_sessao(self, adapter):
+        adapter.execute({"command": "export JARVIS_TEST_VAR=42"})
+        result = adapter.execute({"command": "echo $JARVIS_TEST_VAR"})
+        assert result["output"] == "42"
+
+    def test_output_grande(self, adapter):
+        result = adapter.execute({"command": "seq 1 20000"})
+        lines = result["output"].split("\n")
+        assert len(lines) == 20000
+        assert lines[-1] == "20000"
+
+    def test_timeout_descarta_sessao(self, adapter):
+        result = adapter.execute({"command": "sleep 5", "config": {"command": "sleep 5", "timeout": 0.5}})
+        assert result["success"] is False
+        assert result["timeout"] is True
+        assert adapter.pool_stats()["created"] == 0
+        assert adapter.execute({"command": "echo ok"})["output"] == "ok"
+
+
+class TestPersistentShellStreaming:
+
+    def test_stream_emite_chunks_e_retorna_resultado(self, adapter):
+        chunks = []
+
+        def consume():
+            result = yield from adapter.stream("echo a; sleep 0.3; echo b")
+            return result
+
+        gen = consume()
+        try:
+            while True:
+                chunks.append(next(gen))
+        except StopIteration as stop:
+            result = stop.value
+
+        assert "a" in "".join(chunks) and "b" in "".join(chunks)
+        assert result["returncode"] == 0
+
+    def test_on_chunk_callback(self, adapter):
+        received = []
+        adapter.execute({"command": "echo x", "on_chunk": received.append})
+        assert "x" in "".join(received)
+
+    def test_chunks_nao_partem_caracteres_multibyte(self, adapter):
+        received = []
+        # Ímpar em bytes por linha: as fronteiras de leitura caem no meio de "ç"
+        command = "for i in $(seq 3000); do printf 'çãé%s\\n' $i; done"
+        result = adapter.execute({"command": command, "on_chunk": received.append})
+
+        streamed = "".join(received).replace("\r\n", "\n").strip()
+        assert "\ufffd" not in streamed
+        assert streamed == result["output"]
+        assert result["output"].splitlines()[-1] == "çãé3000"
+
+
+class TestPersistentShellPool:
+
+    def test_chamadas_concorrentes_usam_sessoes_distintas(self, adapter):
+        results = []
+
+        def run():
+            results.append(adapter.execute({"command": "sleep 0.5; echo $$"}))
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        pids = {r["output"] for r in results}
+        assert len(pids) == 2
+        assert adapter.pool_stats()["created"] == 2
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Tests para PlaywrightWorker com um Playwright assíncrono falso."""
+import asyncio
+import sys
+import types
+
+import pytest
+
+from app.adapters.infrastructure.playwright_worker import PlaywrightWorker
+
+
+class _FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+
+    async def goto(self, url, wait_until="load", timeout=None):
+        browser = self.context.browser
+        browser.active += 1
+        browser.peak = max(browser.peak, browser.active)
+        try:
+            await asyncio.sleep(0.01)
+            if "fail" in url:
+                raise RuntimeError("net::ERR_CONNECTION_REFUSED")
+            if "login" in url:  # a página grava estado no context
+                self.context.storage["session"] = "secret"
+            self.url = url
+            return types.SimpleNamespace(status=200)
+        finally:
+            browser.active -= 1
+
+    async def wait_for_selector(self, selector, timeout=None):
+        return None
+
+    async def title(self):
+        return self.context.storage.get("session", "anon")
+
+
+class _FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.storage = {}
+        self.closed = False
+
+    async def new_page(self):
+        return _FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+        self.active = self.peak = 0
+
+    async def new_context(self):
+        context = _FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.browsers = []
+        self.stopped = False
+        self.chromium = types.SimpleNamespace(launch=self._launch)
+
+    async def _launch(self, headless=True):
+        browser = _FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    instance = _FakePlaywright()
+
+    class _Starter:
+        async def start(self):
+            return instance
+
+    async_api = types.ModuleType("playwright.async_api")
+    async_api.async_playwright = _Starter
+    package = types.ModuleType("playwright")
+    package.async_api = async_api
+    monkeypatch.setitem(sys.modules, "playwright", package)
+    monkeypatch.setitem(sys.modules, "playwright.async_api", async_api)
+    return instance
+
+
+@pytest.fixture
+def worker(fake_playwright):
+    worker = PlaywrightWorker(max_concurrency=2)
+    yield worker
+    worker.stop()
+
+
+class TestPlaywrightWorker:
+    def test_warm_browser_reused_across_batches(self, worker, fake_playwright):
+        first = worker.fetch_many(["https://a.test/1", "https://a.test/2"])
+        second = worker.fetch_many(["https://a.test/3"])
+
+        assert all(r["success"] and r["status"] == 200 for r in first + second)
+        assert len(fake_playwright.browsers) == 1
+        browser = fake_playwright.browsers[0]
+        assert len(browser.contexts) == 3
+        assert all(context.closed for context in browser.contexts)
+
+    def test_pool_bounds_concurrency(self, worker, fake_playwright):
+        results = worker.fetch_many([f"https://a.test/{i}" for i in range(6)])
+
+        assert len(results) == 6
+        assert fake_playwright.browsers[0].peak == 2
+        assert all(r["timings"]["total_ms"] >= r["timings"]["navigate_ms"] for r in results)
+
+    def test_state_does_not_leak_between_jobs(self, worker):
+        logged_in = worker.fetch_many(["https://a.test/login"])[0]
+        next_job = worker.fetch_many(["https://a.test/home"])[0]
+
+        assert logged_in["title"] == "secret"
+        assert next_job["title"] == "anon"
+
+    def test_failed_job_recycles_its_context(self, worker, fake_playwright):
+        results = worker.fetch_many(["https://a.test/fail", "https://a.test/ok"])
+
+        assert [r["success"] for r in results] == [False, True]
+        assert "ERR_CONNECTION_REFUSED" in results[0]["error"]
+        assert all(context.closed for context in fake_playwright.browsers[0].contexts)
+        assert worker.fetch_many(["https://a.test/again"])[0]["success"] is True
+
+    def test_stop_closes_browser_and_playwright(self, worker, fake_playwright):
+        assert worker.execute({"url": "https://a.test/"})["success"] is True
+        worker.stop()
+
+        assert fake_playwright.browsers[0].closed and fake_playwright.stopped
+        assert worker._loop is None
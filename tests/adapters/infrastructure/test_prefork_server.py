@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Tests para PreforkServer (workers forkados sobre um socket compartilhado)."""
+import os
+import signal
+import socket
+import time
+
+import pytest
+
+from app.adapters.infrastructure.prefork_server import WORKER_INDEX_ENV, PreforkServer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requer os.fork")
+
+_WARM = {}
+
+
+def _echo_worker(sock, index):
+    """Responde cada conexão com ``pid índice valor-aquecido``."""
+    while True:
+        conn, _ = sock.accept()
+        with conn:
+            conn.sendall(f"{os.getpid()} {os.environ[WORKER_INDEX_ENV]} {_WARM.get('value')}".encode())
+
+
+def _ask(server):
+    with socket.create_connection(("127.0.0.1", server.address[1]), timeout=5) as conn:
+        pid, index, value = conn.recv(256).decode().split()
+    return int(pid), int(index), value
+
+
+@pytest.fixture
+def server():
+    _WARM.clear()
+    srv = PreforkServer(
+        _echo_worker, host="127.0.0.1", port=0, workers=2,
+        before_fork=lambda: _WARM.update(value="aquecido"),
+    )
+    srv.start()
+    yield srv
+    srv.stop(timeout=5)
+
+
+class TestPreforkServer:
+    def test_workers_share_socket_and_warm_state(self, server):
+        answers = [_ask(server) for _ in range(20)]
+
+        assert {pid for pid, _, _ in answers} <= set(server.worker_pids)
+        assert {value for _, _, value in answers} == {"aquecido"}
+        assert os.getpid() not in server.worker_pids
+        assert len(server.worker_pids) == 2
+
+    def test_dead_worker_is_replaced(self, server):
+        victim = server.worker_pids[0]
+        os.kill(victim, signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        spawned = []
+        while not spawned and time.monotonic() < deadline:
+            spawned = server.reap()
+            time.sleep(0.05)
+
+        assert victim not in server.worker_pids
+        assert len(server.worker_pids) == 2 and server.restarts == 1
+        assert _ask(server)[2] == "aquecido"
+
+    def test_stop_terminates_all_workers(self, server):
+        pids = server.worker_pids
+        server.stop(timeout=5)
+
+        assert server.worker_pids == []
+        for pid in pids:
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Tests for RewardRollups — windowed reward aggregates kept on write."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.adapters.infrastructure.reward_rollups import RewardRollups
+
+NOW = datetime(2026, 5, 10, 12, 30)
+
+
+@pytest.fixture
+def rollups():
+    return RewardRollups(bucket_seconds=3600, retention_days=30, clock=NOW.timestamp)
+
+
+class TestRewardRollups:
+    def test_totals_cover_all_history(self, rollups):
+        rollups.add("pytest_pass", 10.0, NOW)
+        rollups.add("pytest_pass", 5.0, NOW - timedelta(days=90))
+        rollups.add("deploy_fail", -20.0, NOW)
+        totals = rollups.window()
+        assert totals["pytest_pass"].count == 2 and totals["pytest_pass"].total == 15.0
+        assert totals["deploy_fail"].min == -20.0
+
+    def test_adjacent_windows_are_disjoint(self, rollups):
+        for days_ago in (1, 3, 8, 10):
+            rollups.add("a", 1.0, NOW - timedelta(days=days_ago))
+        since = NOW - timedelta(days=7)
+        current = rollups.window(since)
+        previous = rollups.window(since - timedelta(days=7), since)
+        assert current["a"].count == 2
+        assert previous["a"].count == 2
+
+    def test_window_before_retention_is_not_served(self, rollups):
+        assert rollups.window(NOW - timedelta(days=60)) is None
+        # Old rows still count towards the totals but not the buckets
+        rollups.add("a", 1.0, NOW - timedelta(days=60))
+        assert rollups.window(NOW - timedelta(days=29)) == {}
+        assert rollups.window()["a"].count == 1
+
+    def test_buckets_expire_with_the_clock(self):
+        now = [NOW.timestamp()]
+        rollups = RewardRollups(bucket_seconds=3600, retention_days=1, clock=lambda: now[0])
+        rollups.add("a", 1.0, NOW)
+        now[0] += 2 * 86400
+        rollups.add("a", 2.0, datetime.fromtimestamp(now[0]))
+        since = datetime.fromtimestamp(now[0]) - timedelta(hours=20)
+        assert rollups.window(since)["a"].total == 2.0
+        assert len(rollups._buckets) == 1
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Tests for SourceIndex — índice invertido incremental sobre o código."""
+import asyncio
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.adapters.infrastructure.source_index import SourceIndex, tokenize
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "voice.py").write_text(
+        "class VoiceRecognizer:\n    def listen(self):\n        return 'voice command'\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "app" / "telegram.py").write_text(
+        "def send_telegram_message(text):\n    pass\n", encoding="utf-8"
+    )
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "architecture.md").write_text("# Architecture\n", encoding="utf-8")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "voice.py").write_text("voice", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def index(repo: Path) -> SourceIndex:
+    return SourceIndex(root=repo, index_path=None, refresh_interval=0)
+
+
+class TestTokenize:
+    def test_splits_snake_and_camel_case(self):
+        tokens = tokenize("VoiceRecognizer send_telegram_message")
+        for expected in ("voicerecognizer", "voice", "recognizer", "send", "telegram", "message"):
+            assert expected in tokens
+
+
+class TestSourceIndexQueries:
+    def test_keyword_search_ranks_and_snippets(self, index: SourceIndex):
+        hits = index.search("voice")
+        assert hits[0]["path"] == "app/voice.py"
+        assert hits[0]["snippets"][0]["line"] == 1
+
+    def test_substring_search(self, index: SourceIndex):
+        hits = index.search_substring("telegram_mess")
+        assert [h["path"] for h in hits] == ["app/telegram.py"]
+
+    def test_search_any_filters_by_prefix_and_suffix(self, index: SourceIndex):
+        hits = index.search_any(["voice", "architecture"], path_prefixes=("app/",), suffix=".py")
+        assert [h["path"] for h in hits] == ["app/voice.py"]
+
+    def test_excluded_dirs_are_not_indexed(self, index: SourceIndex):
+        paths = [h["path"] for h in index.search_substring("voice")]
+        assert "__pycache__/voice.py" not in paths
+
+    def test_files_glob(self, index: SourceIndex):
+        assert index.files("docs/*.md") == ["docs/architecture.md"]
+
+    def test_runtime_dirs_and_binary_files_are_skipped(self, repo: Path):
+        for name in ("data", "logs", "backups"):
+            (repo / name).mkdir(exist_ok=True)
+            (repo / name / "dump.json").write_text('{"voice": 1}', encoding="utf-8")
+        (repo / "app" / "data").mkdir()
+        (repo / "app" / "data" / "schema.py").write_text("voice_schema = 1\n", encoding="utf-8")
+        (repo / "app" / "logo.png").write_bytes(b"\x89PNG")
+        index = SourceIndex(root=repo, index_path=None, refresh_interval=0)
+
+        assert index.files("*/dump.json") == []
+        assert index.files("app/*") == ["app/data/schema.py", "app/telegram.py", "app/voice.py"]
+
+    def test_source_roots_limit_the_walk(self, repo: Path):
+        (repo / "setup.py").write_text("voice = 1\n", encoding="utf-8")
+        index = SourceIndex(root=repo, index_path=None, refresh_interval=0, source_roots=("app",))
+
+        assert index.files("*") == ["app/telegram.py", "app/voice.py", "setup.py"]
+
+    def test_execute_requires_query(self, index: SourceIndex):
+        assert index.execute({})["success"] is False
+        assert index.execute({"query": "voice"})["hits"]
+
+
+class TestSourceIndexIncremental:
+    def test_refresh_only_reindexes_changes(self, index: SourceIndex, repo: Path):
+        first = index.refresh()
+        assert first["added"] == 3
+
+        target = repo / "app" / "telegram.py"
+        target.write_text("def send_whatsapp_message(text):\n    pass\n", encoding="utf-8")
+        os.utime(target, ns=(target.stat().st_atime_ns, target.stat().st_mtime_ns + 1_000_000))
+        (repo / "app" / "voice.py").unlink()
+
+        second = index.refresh()
+        assert second == {"added": 0, "updated": 1, "removed": 1, "total": 2}
+        assert index.search_substring("telegram") == []
+        assert index.search("whatsapp")[0]["path"] == "app/telegram.py"
+
+    def test_persisted_index_is_reloaded(self, repo: Path):
+        built = SourceIndex(root=repo, index_path="data/source_index.jrvs")
+        built.refresh()
+        assert (repo / "data" / "source_index.jrvs").exists()
+
+        reloaded = SourceIndex(root=repo, index_path="data/source_index.jrvs")
+        reloaded._load()
+        assert reloaded.stats()["files"] == 3
+        assert reloaded.refresh()["added"] == 0
+
+    def test_save_appends_only_changed_files(self, repo: Path):
+        path = repo / "data" / "source_index.jrvs"
+        index = SourceIndex(root=repo, index_path="data/source_index.jrvs")
+        index.refresh()
+        before = path.read_bytes()
+
+        (repo / "app" / "extra.py").write_text("delta_marker = 1\n", encoding="utf-8")
+        (repo / "docs" / "architecture.md").unlink()
+        index.refresh()
+        after = path.read_bytes()
+        assert after.startswith(before) and len(before) < len(after) < 2 * len(before)
+
+        reloaded = SourceIndex(root=repo, index_path="data/source_index.jrvs")
+        reloaded._load()
+        assert sorted(reloaded._files) == ["app/extra.py", "app/telegram.py", "app/voice.py"]
+        assert reloaded.refresh() == {"added": 0, "updated": 0, "removed": 0, "total": 3}
+
+    def test_torn_delta_is_dropped_and_compacted(self, repo: Path):
+        path = repo / "data" / "source_index.jrvs"
+        SourceIndex(root=repo, index_path="data/source_index.jrvs").refresh()
+        snapshot = path.stat().st_size
+        with open(path, "ab") as fh:
+            fh.write(b"JRVS\x01\x00")
+
+        reloaded = SourceIndex(root=repo, index_path="data/source_index.jrvs")
+        reloaded.ensure_fresh()
+        assert reloaded.stats()["files"] == 3
+        assert path.stat().st_size == snapshot
+
+    def test_pinned_suspends_auto_refresh(self, repo: Path):
+        index = SourceIndex(root=repo, index_path=None, refresh_interval=0)
+        with index.pinned():
+            (repo / "app" / "new_module.py").write_text("pinned_marker = 1\n", encoding="utf-8")
+            assert index.search_substring("pinned_marker") == []
+        assert index.search_substring("pinned_marker")[0]["path"] == "app/new_module.py"
+
+    def test_pinned_without_refresh_uses_snapshot_from_thread(self, repo: Path):
+        index = SourceIndex(root=repo, index_path=None, refresh_interval=0)
+
+        async def scan():
+            await asyncio.to_thread(index.refresh_snapshot)
+            (repo / "app" / "late_module.py").write_text("late_marker = 1\n", encoding="utf-8")
+            with patch.object(index, "refresh", wraps=index.refresh) as refresh:
+                with index.pinned(refresh=False):
+                    hits = index.search_substring("late_marker")
+            return hits, refresh.call_count
+
+        hits, refreshes = asyncio.run(scan())
+        assert hits == [] and refreshes == 0
@@ -502,3 +502,45 @@ class TestHiveMindMemory:
         )
         history = adapter.get_recent_history(limit=1)
         assert history[0]["channel"] == "telegram"
+
+    def test_schema_migration_adds_thought_log_agent_id_and_indexes(self, tmp_path):
+        """_migrate_schema brings a legacy thought_logs table up to date."""
+        from sqlalchemy import create_engine, inspect, text
+
+        url = f"sqlite:///{tmp_path / 'legacy_thoughts.db'}"
+        engine = create_engine(url, echo=False)
+        with engine.begin() as conn:
+            conn.execute(text(
+                """CREATE TABLE thought_logs (
+                    id INTEGER PRIMARY KEY,
+                    mission_id VARCHAR NOT NULL,
+                    session_id VARCHAR NOT NULL,
+                    status VARCHAR(18) NOT NULL,
+                    thought_process VARCHAR NOT NULL,
+                    problem_description VARCHAR NOT NULL,
+                    solution_attempt VARCHAR NOT NULL,
+                    success BOOLEAN NOT NULL,
+                    error_message VARCHAR NOT NULL,
+                    retry_count INTEGER NOT NULL,
+                    requires_human BOOLEAN NOT NULL,
+                    escalation_reason VARCHAR NOT NULL,
+                    context_data VARCHAR NOT NULL,
+                    system_state VARCHAR NOT NULL,
+                    discarded_alternatives VARCHAR NOT NULL,
+                    expected_result VARCHAR NOT NULL,
+                    actual_result VARCHAR NOT NULL,
+                    reward_received FLOAT NOT NULL,
+                    reward_value FLOAT NOT NULL,
+                    created_at DATETIME NOT NULL,
+                    updated_at DATETIME
+                )"""
+            ))
+        engine.dispose()
+
+        adapter = SQLiteHistoryAdapter(database_url=url)
+        inspector = inspect(adapter.engine)
+        assert "agent_id" in {col["name"] for col in inspector.get_columns("thought_logs")}
+        assert {
+            "ix_thought_logs_mission_created",
+            "ix_thought_logs_agent_created",
+        } <= {idx["name"] for idx in inspector.get_indexes("thought_logs")}
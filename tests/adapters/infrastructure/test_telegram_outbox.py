@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""Tests for the TelegramAdapter outbound queue against a local Bot API stand-in."""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from app.adapters.infrastructure.telegram_adapter import TelegramAdapter
+from app.adapters.infrastructure import telegram_outbox
+from app.adapters.infrastructure.telegram_outbox import TelegramOutbox, TokenBucket, split_message
+
+
+class _BotApiStandIn(ThreadingHTTPServer):
+    """sendMessage/sendDocument subset; scripted status codes and latency."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _BotHandler)
+        self.messages = []
+        self.documents = 0
+        self.connections = 0
+        self.script = []  # status codes to return before falling back to 200
+        self.delay = 0.0
+        self.lock = threading.Lock()
+
+
+class _BotHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.delay)
+        if self.path.endswith("/sendDocument"):
+            self.server.documents += 1
+            return self._reply(200, {"ok": True})
+        with self.server.lock:
+            status = self.server.script.pop(0) if self.server.script else 200
+            if status == 200:
+                self.server.messages.append((time.monotonic(), json.loads(raw)))
+        if status == 429:
+            return self._reply(429, {"ok": False, "parameters": {"retry_after": 0.2}})
+        self._reply(status, {"ok": status == 200})
+
+
+@pytest.fixture
+def server():
+    srv = _BotApiStandIn()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def adapter(server, tmp_path):
+    with patch.dict(os.environ, {"TELEGRAM_TOKEN": "T0K", "TELEGRAM_CHAT_ID": "99"}):
+        a = TelegramAdapter(outbox_path=tmp_path / "outbox.jrvs")
+    a._base_url = f"http://127.0.0.1:{server.server_address[1]}/bot"
+    a._outbox = TelegramOutbox(a._deliver, spill_path=a._outbox_path, per_chat_rate=10.0)
+    yield a
+    a.close(timeout=1)
+
+
+def _texts(server):
+    return [m["text"] for _, m in server.messages]
+
+
+class TestTelegramOutbox:
+    def test_send_message_does_not_block_caller(self, adapter, server):
+        server.delay = 0.3
+        start = time.monotonic()
+        result = adapter.send_message("99", "alerta")
+        assert time.monotonic() - start < 0.1
+        assert result == {"success": True, "queued": True}
+        assert adapter.outbox.flush(timeout=5)
+        assert _texts(server) == ["alerta"]
+
+    def test_burst_is_coalesced_into_digest(self, adapter, server):
+        for i in range(6):
+            adapter.send_message("99", f"evento {i}")
+        assert adapter.outbox.flush(timeout=5)
+
+        # The first message may go out alone before the rest arrive; everything
+        # queued while the chat waits for a token becomes one digest
+        texts = _texts(server)
+        assert len(texts) <= 2
+        assert texts[-1].startswith(f"📬 {7 - len(texts)} notificações")
+        joined = "\n".join(texts)
+        assert all(f"evento {i}" in joined for i in range(6))
+        assert adapter.outbox.stats["digests"] == 1
+
+    def test_per_chat_pacing_and_pooled_connection(self, adapter, server):
+        for chat in ("1", "2", "3"):
+            adapter.send_message(chat, f"oi {chat}")
+        assert adapter.outbox.flush(timeout=5)
+        adapter.send_message("1", "de novo")
+        assert adapter.outbox.flush(timeout=5)
+
+        times = {m["text"]: t for t, m in server.messages}
+        # Chats distintos não esperam uns pelos outros...
+        assert max(times["oi 1"], times["oi 2"], times["oi 3"]) - min(times.values()) < 0.09
+        # ...e o mesmo chat respeita o intervalo (10 msg/s)
+        assert times["de novo"] - times["oi 1"] >= 0.09
+        assert server.connections == 1
+
+    def test_rate_limited_response_is_retried_after_retry_after(self, adapter, server):
+        server.script = [429]
+        start = time.monotonic()
+        adapter.send_message("99", "importante")
+        assert adapter.outbox.flush(timeout=5)
+
+        assert _texts(server) == ["importante"]
+        assert server.messages[0][0] - start >= 0.2
+        assert adapter.outbox.stats["retries"] == 1
+
+    def test_pending_messages_survive_restart(self, server, tmp_path):
+        spill = tmp_path / "outbox.jrvs"
+        server.script = [500] * 50
+        with patch.dict(os.environ, {"TELEGRAM_TOKEN": "T0K", "TELEGRAM_CHAT_ID": "99"}):
+            first = TelegramAdapter(outbox_path=spill)
+            first._base_url = f"http://127.0.0.1:{server.server_address[1]}/bot"
+            first.send_message("99", "não perca isto")
+            first.send_message("99", "nem isto")
+            first.close(timeout=0.3)
+            assert spill.exists()
+
+            server.script = []
+            second = TelegramAdapter(outbox_path=spill)
+            second._base_url = first._base_url
+            assert second.outbox.pending() == 2
+            assert second.outbox.flush(timeout=5)
+            second.close(timeout=1)
+
+        assert "não perca isto" in _texts(server)[0] and "nem isto" in _texts(server)[0]
+        assert not spill.exists()
+
+    def test_send_document_uses_shared_session(self, adapter, server, tmp_path):
+        doc = tmp_path / "backup.zip"
+        doc.write_bytes(b"PK")
+        assert adapter._action_send_document({"file_path": str(doc)}) == {"success": True}
+        assert adapter.send_message("99", "direto", queued=False) == {"success": True}
+        assert server.documents == 1 and server.connections == 1
+
+
+class TestSplitMessage:
+    def test_short_message_is_untouched(self):
+        assert split_message("<b>ok</b>") == ["<b>ok</b>"]
+
+    def test_long_html_is_split_on_lines_with_tags_balanced(self):
+        lines = [f"<b>linha {i}</b> &amp; <a href='https://x.test/{i}'>link</a>" for i in range(200)]
+        text = "<pre>\n" + "\n".join(lines) + "\n</pre>"
+
+        parts = split_message(text, "HTML", limit=1000)
+
+        assert len(parts) > 1 and all(len(p) <= 1000 for p in parts)
+        for part in parts:
+            assert part.startswith("<pre>") and part.endswith("</pre>")
+            assert part.count("<b>") == part.count("</b>")
+            assert part.count("<a ") == part.count("</a>")
+            assert "&amp;" in part and "& " not in part
+        assert "".join(p.removeprefix("<pre>").removesuffix("</pre>") for p in parts) == text[5:-6]
+
+    def test_single_long_line_is_not_cut_inside_a_tag(self):
+        text = "x" * 90 + "<i>itálico</i>" * 40
+
+        parts = split_message(text, "HTML", limit=200)
+
+        assert all(len(p) <= 200 for p in parts)
+        assert all(p.count("<i>") == p.count("</i>") for p in parts)
+        assert all("<" not in p.replace("<i>", "").replace("</i>", "") for p in parts)
+
+    def test_outbox_enqueues_oversized_message_in_parts(self):
+        sent = []
+        outbox = TelegramOutbox(lambda chat, text, mode: sent.append(text) or (True, None),
+                                spill_path=None, per_chat_rate=100.0, per_chat_burst=100.0)
+        outbox.enqueue("1", "<b>" + "\n".join("linha" * 50 for _ in range(40)) + "</b>")
+        assert outbox.flush(timeout=5)
+        outbox.close(timeout=1)
+
+        assert len(sent) >= 2
+        assert all(len(t) <= telegram_outbox.MAX_MESSAGE_CHARS for t in sent)
+        assert all(t.count("<b>") == t.count("</b>") for t in sent)
+
+
+class TestSpill:
+    def test_spill_is_written_outside_the_queue_lock(self, tmp_path, monkeypatch):
+        writing, release = threading.Event(), threading.Event()
+        real_write = telegram_outbox.jrvs_write
+
+        def slow_write(path, payload):
+            writing.set()
+            release.wait(5)
+            real_write(path, payload)
+
+        monkeypatch.setattr(telegram_outbox, "jrvs_write", slow_write)
+        outbox = TelegramOutbox(lambda *a: (False, 60.0), spill_path=tmp_path / "outbox.jrvs")
+        outbox.enqueue("1", "primeira")
+        assert writing.wait(5)
+
+        start = time.monotonic()
+        outbox.enqueue("1", "segunda")  # não espera a gravação em andamento
+        assert outbox.pending() >= 1
+        assert time.monotonic() - start < 0.5
+        release.set()
+        outbox.close(timeout=1)
+        assert (tmp_path / "outbox.jrvs").exists()
+
+
+class TestTokenBucket:
+    def test_wait_time_and_block(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2.0, burst=1.0, clock=lambda: now[0])
+        assert bucket.wait_time() == 0
+        bucket.take()
+        assert bucket.wait_time() == pytest.approx(0.5)
+        now[0] = 0.5
+        assert bucket.wait_time() == 0
+        bucket.block_for(3.0)
+        assert bucket.wait_time() == pytest.approx(3.5)
@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from app.adapters.infrastructure.vision_adapter import VisionAdapter
+from app.adapters.infrastructure.vision_adapter import ExternalVisionNotAllowedError, VisionAdapter
 
 
 class TestVisionAdapter:
@@ -13,7 +13,9 @@ class TestVisionAdapter:
 
     @pytest.fixture
     def adapter(self):
-        return VisionAdapter(api_key="test-api-key", use_webcam=False)
+        return VisionAdapter(
+            api_key="test-api-key", use_webcam=False, allow_external_vision=True, user_consent=True
+        )
 
     def test_initialization_defaults(self):
         adapter = VisionAdapter(api_key="key123")
@@ -60,3 +62,115 @@ class TestVisionAdapter:
             with patch("builtins.__import__", side_effect=ImportError("no module")):
                 result = adapter._capture_screenshot()
         assert result is None
+
+
+class TestVisionAnalysisCache:
+    """Tests for the perceptual-hash keyed analysis cache."""
+
+    @staticmethod
+    def _image(phash, digest="d0"):
+        from app.adapters.infrastructure.vision_preprocess import PreprocessedImage
+
+        return PreprocessedImage(b"x", "image/jpeg", phash, digest, 1)
+
+    def test_near_identical_frame_hits(self):
+        from app.adapters.infrastructure.vision_preprocess import VisionAnalysisCache
+
+        cache = VisionAnalysisCache(ttl=60, threshold=3)
+        cache.put("prompt", self._image(0b1111_0000), "Editor aberto.")
+        assert cache.get("prompt", self._image(0b1111_0001)) == "Editor aberto."
+
+    def test_different_frame_or_prompt_misses(self):
+        from app.adapters.infrastructure.vision_preprocess import VisionAnalysisCache
+
+        cache = VisionAnalysisCache(ttl=60, threshold=3)
+        cache.put("prompt", self._image(0), "Editor aberto.")
+        assert cache.get("prompt", self._image(0xFFFF)) is None
+        assert cache.get("outro prompt", self._image(0)) is None
+
+    def test_exact_digest_fallback_without_phash(self):
+        from app.adapters.infrastructure.vision_preprocess import VisionAnalysisCache
+
+        cache = VisionAnalysisCache(ttl=60)
+        cache.put("prompt", self._image(None, "abc"), "ok")
+        assert cache.get("prompt", self._image(None, "abc")) == "ok"
+        assert cache.get("prompt", self._image(None, "def")) is None
+
+    def test_expired_entries_are_dropped(self):
+        from app.adapters.infrastructure.vision_preprocess import VisionAnalysisCache
+
+        cache = VisionAnalysisCache(ttl=10)
+        with patch("app.adapters.infrastructure.vision_preprocess.time.monotonic", return_value=100.0):
+            cache.put("prompt", self._image(0), "ok")
+        with patch("app.adapters.infrastructure.vision_preprocess.time.monotonic", return_value=111.0):
+            assert cache.get("prompt", self._image(0)) is None
+        assert len(cache) == 0
+
+
+class TestVisionAdapterPreprocessing:
+    """Tests for preprocessing + cache integration in capture_and_analyze."""
+
+    def test_repeated_frame_skips_upload(self):
+        adapter = VisionAdapter(api_key="k", allow_external_vision=True, user_consent=True)
+        with patch.object(adapter, "_capture_image", return_value=b"same-frame"):
+            with patch.object(adapter, "_analyze_with_gemini", return_value="Terminal aberto.") as mock_gemini:
+                first = adapter.capture_and_analyze()
+                second = adapter.capture_and_analyze()
+        assert first == second == "Terminal aberto."
+        mock_gemini.assert_called_once()
+        stats = adapter.get_stats()
+        assert stats["calls"] == 2
+        assert stats["cache_hits"] == 1
+
+    def test_cache_disabled_with_zero_ttl(self):
+        adapter = VisionAdapter(api_key="k", cache_ttl=0, allow_external_vision=True, user_consent=True)
+        with patch.object(adapter, "_capture_image", return_value=b"same-frame"):
+            with patch.object(adapter, "_analyze_with_gemini", return_value="ok") as mock_gemini:
+                adapter.capture_and_analyze()
+                adapter.capture_and_analyze()
+        assert mock_gemini.call_count == 2
+
+    def test_revoked_consent_blocks_cached_answer(self):
+        adapter = VisionAdapter(api_key="k", allow_external_vision=True, user_consent=True)
+        with patch.object(adapter, "_capture_image", return_value=b"same-frame"):
+            with patch.object(adapter, "_analyze_with_gemini", return_value="Terminal aberto."):
+                adapter.capture_and_analyze()
+                adapter.user_consent = False
+                with pytest.raises(ExternalVisionNotAllowedError):
+                    adapter.capture_and_analyze()
+        assert len(adapter._cache) == 0
+        assert adapter._audit_log[-1]["allowed"] is False
+        assert adapter.get_stats()["cache_hits"] == 0
+
+    def test_blocked_upload_is_not_counted(self):
+        adapter = VisionAdapter(api_key="k")
+        with patch.object(adapter, "_capture_image", return_value=b"frame"):
+            with pytest.raises(ExternalVisionNotAllowedError):
+                adapter.capture_and_analyze()
+        assert adapter.get_stats()["bytes_uploaded"] == 0
+
+    def test_preprocess_downscales_and_reencodes(self):
+        pil_image = pytest.importorskip("PIL.Image")
+        import io
+
+        from app.adapters.infrastructure.vision_preprocess import preprocess_image
+
+        buf = io.BytesIO()
+        pil_image.new("RGB", (3840, 2160), (30, 120, 200)).save(buf, format="PNG")
+        result = preprocess_image(buf.getvalue(), max_dimension=640, image_format="JPEG")
+
+        decoded = pil_image.open(io.BytesIO(result.data))
+        assert max(decoded.size) == 640
+        assert result.mime_type == "image/jpeg"
+        assert result.phash is not None
+
+    def test_preprocess_roi_crop(self):
+        pil_image = pytest.importorskip("PIL.Image")
+        import io
+
+        from app.adapters.infrastructure.vision_preprocess import preprocess_image
+
+        buf = io.BytesIO()
+        pil_image.new("RGB", (800, 600)).save(buf, format="PNG")
+        result = preprocess_image(buf.getvalue(), max_dimension=None, roi=(0, 0, 200, 100))
+        assert pil_image.open(io.BytesIO(result.data)).size == (200, 100)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Tests para WarmInterpreterPool (filhos forkados de zygotes pré-aquecidos)."""
+import os
+import time
+
+import pytest
+
+from app.adapters.infrastructure.warm_interpreter_pool import WarmInterpreterPool
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requer os.fork")
+
+_PYTEST_ARGS = ["-q", "-p", "no:cacheprovider", "-o", "addopts="]
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Projeto temporário com um módulo próprio, pré-carregado pelo zygote."""
+    (tmp_path / "helper_mod.py").write_text(
+        "import time\n"
+        "VALUE = 1\n"
+        "def value():\n"
+        "    return VALUE\n"
+        "def nap(seconds):\n"
+        "    time.sleep(seconds)\n"
+        "def shout(n):\n"
+        "    print('x' * n)\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "test_ok.py").write_text("def test_ok():\n    assert True\n", encoding="utf-8")
+    (tmp_path / "test_bad.py").write_text("def test_bad():\n    assert 1 == 2\n", encoding="utf-8")
+    # O zygote precisa achar o pacote ``app`` e o módulo do projeto
+    paths = [str(tmp_path), os.getcwd(), os.environ.get("PYTHONPATH", "")]
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(p for p in paths if p))
+    pool = WarmInterpreterPool(size=1, preload=["pytest", "helper_mod"], cwd=str(tmp_path))
+    yield tmp_path, pool
+    pool.close()
+
+
+class TestWarmInterpreterPool:
+    def test_pytest_exit_codes_and_reuse(self, project):
+        root, pool = project
+        ok = pool.run_pytest(["test_ok.py", *_PYTEST_ARGS], timeout=60)
+        bad = pool.run_pytest(["test_bad.py", *_PYTEST_ARGS], timeout=60)
+
+        assert ok.exit_code == 0 and "1 passed" in ok.output
+        assert bad.exit_code == 1 and "1 failed" in bad.output
+        stats = pool.stats()
+        assert stats["spawned"] == 1 and stats["tasks"] == 2
+
+    def test_call_returns_printed_result(self, project):
+        _, pool = project
+        result = pool.call("helper_mod:value")
+        assert result.exit_code == 0
+        assert result.output.strip() == "1"
+
+    def test_timeout_kills_child_and_keeps_worker(self, project):
+        _, pool = project
+        start = time.monotonic()
+        result = pool.call("helper_mod:nap", {"seconds": 30}, timeout=0.5)
+
+        assert result.timed_out
+        assert time.monotonic() - start < 10
+        assert pool.call("helper_mod:value").exit_code == 0
+        assert pool.stats()["spawned"] == 1
+
+    def test_output_is_capped_head_and_tail(self, project):
+        _, pool = project
+        result = pool.call("helper_mod:shout", {"n": 50_000}, max_output=1000)
+
+        assert result.truncated
+        assert "bytes omitidos" in result.output
+        assert len(result.output) < 1100
+
+    def test_edited_module_restarts_zygote(self, project):
+        root, pool = project
+        assert pool.call("helper_mod:value").output.strip() == "1"
+
+        module = root / "helper_mod.py"
+        module.write_text(module.read_text(encoding="utf-8").replace("VALUE = 1", "VALUE = 2"), encoding="utf-8")
+        later = time.time() + 5
+        os.utime(module, (later, later))
+
+        assert pool.call("helper_mod:value").output.strip() == "2"
+        stats = pool.stats()
+        assert stats["stale_restarts"] == 1 and stats["spawned"] == 2
+
+    def test_unknown_target_reports_traceback(self, project):
+        _, pool = project
+        result = pool.call("helper_mod:missing")
+        assert result.exit_code == 1
+        assert "AttributeError" in result.output
+        # O pool continua utilizável
+        assert pool.call("helper_mod:value").exit_code == 0
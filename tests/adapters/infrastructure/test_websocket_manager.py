@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Tests for WebSocketManager per-connection send queues."""
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from app.adapters.infrastructure import websocket_manager as wsm
+from app.adapters.infrastructure.websocket_manager import WebSocketManager
+
+
+class _FakeSocket:
+    """Duck-typed fastapi.WebSocket that records messages; optionally slow or gated."""
+
+    def __init__(self, delay: float = 0.0, gate: asyncio.Event = None, fail: bool = False):
+        self.delay = delay
+        self.gate = gate
+        self.fail = fail
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append(message)
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    collector = Mock()
+    monkeypatch.setattr(wsm, "nexus", Mock(resolve=Mock(return_value=collector)))
+    return collector
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_others(collector):
+    manager = WebSocketManager()
+    slow, fast = _FakeSocket(delay=0.3), _FakeSocket()
+    await manager.connect("u1", slow)
+    await manager.connect("u1", fast)
+
+    start = time.perf_counter()
+    for i in range(3):
+        assert await manager.broadcast_to_user("u1", {"n": i}) == 2
+    assert time.perf_counter() - start < 0.05
+
+    await asyncio.sleep(0.05)
+    assert [m["n"] for m in fast.received] == [0, 1, 2]
+    assert slow.received == []
+    assert await manager.drain(timeout=3)
+    assert [m["n"] for m in slow.received] == [0, 1, 2]
+    manager.disconnect("u1")
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy_keeps_latest_messages(collector):
+    gate = asyncio.Event()
+    manager = WebSocketManager(max_queue=3, slow_consumer_policy="drop_oldest")
+    ws = _FakeSocket(gate=gate)
+    await manager.connect("u1", ws)
+
+    await manager.broadcast_to_user("u1", {"n": 0})
+    await asyncio.sleep(0)  # writer picks message 0 and blocks on the gate
+    for i in range(1, 10):
+        await manager.broadcast_to_user("u1", {"n": i})
+
+    metrics = manager.metrics()
+    assert metrics["queue_depth_max"] == 3 and metrics["dropped_total"] == 6
+    gate.set()
+    assert await manager.drain(timeout=2)
+    assert [m["n"] for m in ws.received] == [0, 7, 8, 9]
+    manager.disconnect("u1")
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_drops_slow_consumer(collector):
+    gate = asyncio.Event()
+    manager = WebSocketManager(max_queue=2, slow_consumer_policy="disconnect")
+    slow, fast = _FakeSocket(gate=gate), _FakeSocket()
+    await manager.connect("u1", slow)
+    await manager.connect("u1", fast)
+
+    for i in range(5):
+        await manager.broadcast_to_user("u1", {"n": i})
+        await asyncio.sleep(0.01)  # the fast client keeps up, the gated one does not
+
+    assert manager.connection_count("u1") == 1
+    assert manager.metrics()["slow_consumer_disconnects"] == 1
+    assert await manager.drain(timeout=2)
+    assert [m["n"] for m in fast.received] == [0, 1, 2, 3, 4]
+    manager.disconnect("u1")
+
+
+@pytest.mark.asyncio
+async def test_send_failure_disconnects(collector):
+    manager = WebSocketManager()
+    await manager.connect("u1", _FakeSocket(fail=True))
+    await manager.broadcast_to_user("u1", {"n": 1})
+    await asyncio.sleep(0.01)
+    assert not manager.is_connected("u1")
+
+
+@pytest.mark.asyncio
+async def test_dataset_capture_runs_off_the_broadcast_path(collector):
+    captured = threading.Event()
+    caller_thread = threading.get_ident()
+    capture_threads = []
+
+    def _collect(**kwargs):
+        capture_threads.append(threading.get_ident())
+        time.sleep(0.2)
+        captured.set()
+
+    collector.collect_from_interaction.side_effect = _collect
+    manager = WebSocketManager()
+    await manager.connect("u1", _FakeSocket())
+    await manager.connect("u1", _FakeSocket())
+
+    start = time.perf_counter()
+    message = {"type": "command_response", "original_prompt": "status", "response": "ok", "success": True}
+    await manager.broadcast_to_user("u1", message)
+    assert time.perf_counter() - start < 0.1
+
+    await asyncio.get_running_loop().run_in_executor(None, captured.wait, 2)
+    # One sample per broadcast, not one per connection
+    collector.collect_from_interaction.assert_called_once()
+    assert collector.collect_from_interaction.call_args.kwargs["outcome"] == "executed"
+    assert capture_threads and capture_threads[0] != caller_thread
+    manager.disconnect("u1")
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_latency_and_execute_broadcast_from_thread(collector):
+    manager = WebSocketManager()
+    ws = _FakeSocket(delay=0.02)
+    await manager.connect("u1", ws)
+
+    result = await asyncio.get_running_loop().run_in_executor(
+        None, manager.execute, {"action": "broadcast", "user_id": "u1", "message": {"n": 1}}
+    )
+    assert result["queued"] == 1
+    assert await manager.drain(timeout=2)
+
+    metrics = manager.execute({"action": "metrics"})
+    assert metrics["success"] and metrics["sent_total"] == 1
+    assert metrics["per_connection"][0]["send_latency_avg_ms"] >= 15
+    assert ws.received == [{"n": 1}]
+    manager.disconnect("u1")
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Tests for the AIGateway response cache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.adapters.infrastructure.ai_gateway import AIGateway, LLMProvider
+from app.adapters.infrastructure.ai_gateway_response_cache import ResponseCache
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _CountingGroq:
+    """Groq-compatible client that counts completions."""
+
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **params):
+        self.calls.append(params)
+        message = SimpleNamespace(content=f"answer #{len(self.calls)}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _gateway(cache):
+    gateway = AIGateway(groq_api_key=None, gemini_api_key=None, response_cache=cache)
+    gateway.groq_client = _CountingGroq()
+    return gateway
+
+
+def _text(result):
+    return result["response"].choices[0].message.content
+
+
+def _user(content, system="You are JARVIS."):
+    return [{"role": "system", "content": system}, {"role": "user", "content": content}]
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+class TestExactLayer:
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_hits_cache(self, clock):
+        cache = ResponseCache(ttl_seconds=60, clock=clock)
+        gateway = _gateway(cache)
+
+        first = await gateway.generate_completion(_user("status do sistema?"), use_cache=True)
+        second = await gateway.generate_completion(_user("  status   do sistema? "), use_cache=True)
+
+        assert len(gateway.groq_client.calls) == 1
+        assert _text(second) == _text(first)
+        assert second["cache"] == "exact" and "cache" not in first
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["stores"] == 1
+
+    @pytest.mark.asyncio
+    async def test_key_includes_temperature_and_gear(self, clock):
+        gateway = _gateway(ResponseCache(ttl_seconds=60, clock=clock))
+        messages = _user("classifique: abrir navegador")
+
+        await gateway.generate_completion(messages, temperature=0.0)
+        await gateway.generate_completion(messages, temperature=0.7)
+        gateway._shift_to_low_gear()
+        await gateway.generate_completion(messages, temperature=0.0)
+
+        calls = gateway.groq_client.calls
+        assert len(calls) == 3
+        assert [c.get("temperature") for c in calls] == [0.0, 0.7, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, clock):
+        cache = ResponseCache(ttl_seconds=30, clock=clock)
+        gateway = _gateway(cache)
+
+        await gateway.generate_completion(_user("ping"), use_cache=True)
+        clock.now += 31
+        await gateway.generate_completion(_user("ping"), use_cache=True)
+
+        assert len(gateway.groq_client.calls) == 2
+        assert cache.stats()["expirations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_size_bound_evicts_least_recently_used(self, clock):
+        cache = ResponseCache(ttl_seconds=60, max_entries=2, clock=clock)
+        gateway = _gateway(cache)
+
+        for prompt in ("a", "b", "a", "c"):
+            await gateway.generate_completion(_user(prompt), use_cache=True)
+        assert len(gateway.groq_client.calls) == 3
+        assert cache.stats()["size"] == 2 and cache.stats()["evictions"] == 1
+
+        await gateway.generate_completion(_user("a"), use_cache=True)
+        await gateway.generate_completion(_user("b"), use_cache=True)
+        assert len(gateway.groq_client.calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_cache_is_opt_in_and_function_calls_bypass(self, clock):
+        cache = ResponseCache(ttl_seconds=60, clock=clock)
+        gateway = _gateway(cache)
+        messages = _user("que horas são?")
+
+        await gateway.generate_completion(messages)  # sem opt-in, temperatura padrão
+        await gateway.generate_completion(messages, temperature=0.7)
+        await gateway.generate_completion(messages, use_cache=True)
+        await gateway.generate_completion(messages, use_cache=False)
+        tool = SimpleNamespace(name="get_time", description="Get time", parameters=None)
+        await gateway.generate_completion(messages, functions=[tool], use_cache=True)
+        await gateway.generate_completion(messages, functions=[tool], use_cache=True)
+
+        assert len(gateway.groq_client.calls) == 6
+        assert cache.stats()["bypassed"] == 5 and cache.stats()["hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_temperature_zero_is_cached_by_default(self, clock):
+        gateway = _gateway(ResponseCache(ttl_seconds=60, clock=clock))
+        messages = _user("classifique: abrir navegador")
+
+        await gateway.generate_completion(messages, temperature=0)
+        result = await gateway.generate_completion(messages, temperature=0)
+
+        assert result["cache"] == "exact"
+        assert len(gateway.groq_client.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_hits_are_deep_copies(self, clock):
+        gateway = _gateway(ResponseCache(ttl_seconds=60, clock=clock))
+        messages = _user("status?")
+
+        first = await gateway.generate_completion(messages, use_cache=True)
+        first["response"].choices[0].message.content = "editado pelo chamador"
+        hit = await gateway.generate_completion(messages, use_cache=True)
+        hit["response"].choices[0].message.content = "editado de novo"
+        again = await gateway.generate_completion(messages, use_cache=True)
+
+        assert _text(again) == "answer #1"
+        assert len(gateway.groq_client.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, clock):
+        cache = ResponseCache(ttl_seconds=60, clock=clock)
+        gateway = _gateway(cache)
+        gateway.enable_auto_repair = False
+        client = gateway.groq_client
+        original = client.chat.completions.create
+
+        def _fail_once(**params):
+            client.chat.completions.create = original
+            raise RuntimeError("upstream exploded")
+
+        client.chat.completions.create = _fail_once
+        with pytest.raises(RuntimeError):
+            await gateway.generate_completion(_user("retry me"), use_cache=True)
+        result = await gateway.generate_completion(_user("retry me"), use_cache=True)
+
+        assert "cache" not in result
+        assert cache.stats()["stores"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_always_dispatches(self):
+        gateway = _gateway(ResponseCache(ttl_seconds=0))
+        await gateway.generate_completion(_user("x"), use_cache=True)
+        await gateway.generate_completion(_user("x"), use_cache=True)
+        assert len(gateway.groq_client.calls) == 2
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("AI_GATEWAY_CACHE_TTL", "12")
+        monkeypatch.setenv("AI_GATEWAY_CACHE_MAX_ENTRIES", "7")
+        monkeypatch.setenv("AI_GATEWAY_SEMANTIC_CACHE_THRESHOLD", "0.9")
+        cache = ResponseCache.from_env()
+        assert cache.ttl_seconds == 12 and cache.max_entries == 7
+        assert cache.semantic_enabled and cache.semantic_threshold == 0.9
+
+
+class TestSemanticLayer:
+    @pytest.mark.asyncio
+    async def test_near_duplicate_prompt_hits(self, clock):
+        cache = ResponseCache(ttl_seconds=60, semantic_threshold=0.8, clock=clock)
+        gateway = _gateway(cache)
+
+        await gateway.generate_completion(_user("qual o status do sistema agora"), use_cache=True)
+        result = await gateway.generate_completion(_user("qual o status do sistema agora?!"), use_cache=True)
+        # Punctuation changes the exact key but not the bag-of-words embedding
+        assert result["cache"] == "semantic"
+        assert len(gateway.groq_client.calls) == 1
+
+        await gateway.generate_completion(_user("abrir o navegador no youtube"), use_cache=True)
+        assert len(gateway.groq_client.calls) == 2
+        assert cache.stats()["semantic_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_semantic_scope_respects_context(self, clock):
+        cache = ResponseCache(ttl_seconds=60, semantic_threshold=0.8, clock=clock)
+        gateway = _gateway(cache)
+
+        await gateway.generate_completion(_user("qual o status", system="persona A"), use_cache=True)
+        await gateway.generate_completion(_user("qual o status?", system="persona B"), use_cache=True)
+        await gateway.generate_completion(_user("qual o status?"), force_provider=LLMProvider.GROQ, temperature=1.0, use_cache=True)
+
+        assert len(gateway.groq_client.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_custom_embedder(self, clock):
+        calls = []
+
+        def embed(text):
+            calls.append(text)
+            return [1.0, 0.0] if "status" in text else [0.0, 1.0]
+
+        cache = ResponseCache(ttl_seconds=60, semantic_threshold=0.99, embedder=embed, clock=clock)
+        gateway = _gateway(cache)
+
+        await gateway.generate_completion(_user("status?"), use_cache=True)
+        result = await gateway.generate_completion(_user("me dá o status"), use_cache=True)
+        assert result["cache"] == "semantic"
+        # One embedding per miss/store pair, one per lookup
+        assert calls == ["status?", "me dá o status"]
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Tests para a compactação de AgentTrajectory e a contagem de tokens do JarvisDevAgent."""
+import json
+from unittest.mock import MagicMock
+
+from app.adapters.infrastructure.ai_gateway_token_utils import count_tokens
+from app.application.services.jarvis_dev_agent import trajectory as trajectory_mod
+from app.application.services.jarvis_dev_agent.agent import JarvisDevAgent
+from app.application.services.jarvis_dev_agent.trajectory import AgentTrajectory
+from app.domain.models.agent import (
+    ActionType,
+    AgentAction,
+    AgentObservation,
+    AgentTask,
+    TaskPriority,
+    TaskSource,
+)
+
+
+def _task():
+    return AgentTask(task_id="t1", source=TaskSource.USER_REQUEST, priority=TaskPriority.MEDIUM, description="x")
+
+
+def _step(trajectory, action_type, ok=True, output="saída " * 40, **params):
+    action = AgentAction(action_type=action_type, parameters=params, reasoning="porque sim " * 10)
+    trajectory.add_step(action, AgentObservation(action=action, output=output, success=ok, error=None if ok else "boom"))
+
+
+class TestAgentTrajectoryCompaction:
+    def test_short_trajectory_is_verbatim(self):
+        trajectory = AgentTrajectory(_task(), keep_last=3)
+        _step(trajectory, ActionType.RUN_SHELL, cmd="ls")
+        memory = trajectory.get_working_memory()
+        assert "Resumo" not in memory
+        assert "--- Passo 1 ---" in memory and "Saída: " in memory
+
+    def test_older_steps_are_folded_within_budget(self):
+        trajectory = AgentTrajectory(_task(), keep_last=2, token_budget=120)
+        _step(trajectory, ActionType.EDIT_FILE, path="app/a.py")
+        _step(trajectory, ActionType.RUN_TESTS, ok=False, output="AssertionError em test_a")
+        for _ in range(30):
+            _step(trajectory, ActionType.RUN_SHELL, cmd="ls")
+        _step(trajectory, ActionType.READ_FILE, path="app/b.py")
+
+        memory = trajectory.get_working_memory()
+        summary = memory.split("--- Passo 32 ---")[0]
+
+        assert "--- Resumo dos passos 1–31 ---" in summary
+        assert "Passo 2: run_tests ❌" in summary and "boom" in summary
+        assert "app/a.py" in summary
+        assert "run_shell×" in summary
+        assert count_tokens(summary) < 160
+        assert "--- Passo 33 ---" in memory
+
+    def test_digests_are_built_once_per_step(self):
+        trajectory = AgentTrajectory(_task(), keep_last=1)
+        for _ in range(5):
+            _step(trajectory, ActionType.RUN_SHELL)
+            trajectory.get_working_memory()
+        first_digest = trajectory._digests[0]
+        _step(trajectory, ActionType.RUN_SHELL)
+        trajectory.get_working_memory()
+        assert trajectory._digests[0] is first_digest
+        assert len(trajectory._digests) == 5
+
+
+class TestJarvisDevAgentPromptTokens:
+    def test_prompt_tokens_stay_flat_on_long_runs(self, monkeypatch):
+        monkeypatch.setattr(trajectory_mod, "_TOKEN_BUDGET", 100)
+        agent = JarvisDevAgent()
+        agent.max_iterations = 40
+        agent._shell = MagicMock()
+        agent._shell.execute.return_value = {"success": True, "output": "linha de saída\n" * 80}
+        agent._editor = MagicMock()
+        agent._llm = MagicMock()
+        agent._llm.execute.return_value = {
+            "result": json.dumps({"action": "RUN_SHELL", "params": {"cmd": "pytest -q"}, "reasoning": "rodar testes"})
+        }
+        agent._get_thought_log = lambda: None
+
+        result = agent._run_loop("t1", "tarefa longa", {})
+
+        tokens = result["prompt_tokens"]
+        assert len(tokens) == 40
+        assert tokens[-1] > tokens[0]
+        # O resumo nunca passa do orçamento e, ao atingi-lo, o prompt para de crescer
+        assert max(tokens) - tokens[3] <= 130
+        assert len(set(tokens[-10:])) == 1
+
+    def test_default_prompt_is_not_larger_than_legacy_history(self):
+        agent = JarvisDevAgent()
+        agent.max_iterations = 12
+        agent._shell = MagicMock()
+        agent._shell.execute.return_value = {"success": False, "output": "FAILED tests/test_a.py::test_x - AssertionError\n" * 30}
+        agent._editor = MagicMock()
+        agent._llm = MagicMock()
+        agent._llm.execute.return_value = {
+            "result": json.dumps({"action": "RUN_SHELL", "params": {"cmd": "pytest -q"}, "reasoning": "reproduzir a falha"})
+        }
+        agent._get_thought_log = lambda: None
+
+        result = agent._run_loop("t1", "corrigir test_x", {})
+
+        # Histórico antigo: últimos 5 passos, 100 caracteres de saída cada
+        structure = agent._shell.execute.return_value["output"]
+        legacy, history = [], []
+        for i in range(1, 13):
+            text = "\n".join(f"Iter {h}: RUN_SHELL → {structure[:1000][:100]}" for h in history[-5:]) or "(Nenhuma)"
+            legacy.append(count_tokens(
+                f"Tarefa: corrigir test_x\nEstrutura: {structure[:1000]}\nHistórico: {text}\n\n"
+                "Ações: RUN_SHELL, EDIT_FILE, READ_FILE, INSTALL_DEPS, FINISH\nRetorne JSON: {'action': '...', 'params': {}}"
+            ))
+            history.append(i)
+        assert max(result["prompt_tokens"]) <= max(legacy)
+        assert sum(result["prompt_tokens"]) <= sum(legacy)
@@ -118,7 +118,7 @@ class TestTriggerSelfHealing:
 class TestReadLogTail:
     def test_returns_last_50_lines(self, fv: FieldVision, log_file: Path) -> None:
         lines = [f"line {i}" for i in range(100)]
-        log_file.write_text("\n".join(lines), encoding="utf-8")
+        log_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
         tail = fv._read_log_tail()
         assert len(tail) == 50
         assert tail[0] == "line 50"
@@ -146,3 +146,61 @@ class TestExecute:
             result = fv.execute({})
         mock_sv.assert_called_once()
         assert result["success"] is True
+
+
+class TestIncrementalTail:
+    def test_second_scan_reads_only_new_lines(self, fv: FieldVision, log_file: Path) -> None:
+        log_file.write_text("line 1\nline 2\n", encoding="utf-8")
+        assert fv._read_log_tail() == ["line 1", "line 2"]
+        with log_file.open("a", encoding="utf-8") as f:
+            f.write("line 3\n")
+        assert fv._read_log_tail() == ["line 3"]
+        assert fv._read_log_tail() == []
+
+    def test_partial_line_waits_for_newline(self, fv: FieldVision, log_file: Path) -> None:
+        log_file.write_text("line 1\nERROR half of ", encoding="utf-8")
+        assert fv._read_log_tail() == ["line 1"]
+        with log_file.open("a", encoding="utf-8") as f:
+            f.write("a line\n")
+        assert fv._read_log_tail() == ["ERROR half of a line"]
+
+    def test_rotation_restarts_from_new_file(self, fv: FieldVision, log_file: Path) -> None:
+        log_file.write_text("old 1\nold 2\nold 3\n", encoding="utf-8")
+        fv._read_log_tail()
+        log_file.rename(log_file.with_suffix(".log.1"))
+        log_file.write_text("new 1\n", encoding="utf-8")
+        assert fv._read_log_tail() == ["new 1"]
+
+    def test_truncation_restarts_from_start(self, fv: FieldVision, log_file: Path) -> None:
+        log_file.write_text("a much longer first line\n", encoding="utf-8")
+        fv._read_log_tail()
+        log_file.write_text("short\n", encoding="utf-8")
+        assert fv._read_log_tail() == ["short"]
+
+
+class TestErrorFingerprints:
+    def test_volatile_parts_share_fingerprint(self) -> None:
+        from app.application.services.log_tailer import fingerprint_error_line
+
+        a = "2026-01-02 10:11:12,345 ERROR Job 1234 failed at /srv/app/worker.py id=deadbeefcafe1234"
+        b = "2026-03-04 22:00:01,999 ERROR Job 99 failed at /opt/jarvis/worker.py id=0123456789abcdef"
+        assert fingerprint_error_line(a) == fingerprint_error_line(b)
+        assert fingerprint_error_line(a) != fingerprint_error_line("ERROR disk full")
+
+    def test_repeated_incident_does_not_heal_again(self, fv: FieldVision, log_file: Path) -> None:
+        log_file.write_text("10:00:01 ERROR connection 17 refused\n", encoding="utf-8")
+        with (
+            patch.object(fv, "_query_memory", return_value=[]),
+            patch.object(fv, "_trigger_self_healing", return_value=True) as mock_heal,
+        ):
+            first = fv.scan_vitals()
+            with log_file.open("a", encoding="utf-8") as f:
+                f.write("10:05:42 ERROR connection 23 refused\n")
+            second = fv.scan_vitals()
+
+        assert first["action"] == "workflow_dispatched"
+        assert second["action"] == "known_incident"
+        mock_heal.assert_called_once()
+        (entry,) = fv.get_error_fingerprints().values()
+        assert entry["count"] == 2
+        assert entry["first_seen"] <= entry["last_seen"]
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Tests for the LLMCapabilityDetector verdict cache."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.adapters.infrastructure.source_index import get_source_index
+from app.application.services.llm_capability_detector import LLMCapabilityDetector
+
+
+def _groq_response(content: str):
+    return {
+        "provider": "groq",
+        "response": MagicMock(choices=[MagicMock(message=MagicMock(content=content))]),
+    }
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "telegram_bridge.py").write_text("def send_telegram(text):\n    pass\n")
+    return tmp_path
+
+
+@pytest.fixture
+def gateway():
+    gw = MagicMock()
+    gw.generate_completion = AsyncMock(
+        return_value=_groq_response('{"status": "complete", "confidence": 0.9, "evidence": ["ok"]}')
+    )
+    return gw
+
+
+async def _detect(detector):
+    return await detector.detect_capability_async(
+        capability_id=7,
+        capability_name="telegram notifications",
+        capability_description="Send telegram notifications",
+    )
+
+
+@pytest.mark.asyncio
+async def test_unchanged_capability_is_not_resent(repo, gateway):
+    detector = LLMCapabilityDetector(ai_gateway=gateway, repository_root=repo)
+    first = await _detect(detector)
+    second = await _detect(detector)
+
+    assert first["status"] == second["status"] == "complete"
+    assert gateway.generate_completion.await_count == 1
+    assert detector.verdict_cache_hits == 1
+
+    # A fresh detector reuses the persisted verdict
+    detector.flush_verdicts()
+    reloaded = LLMCapabilityDetector(ai_gateway=gateway, repository_root=repo)
+    await _detect(reloaded)
+    assert gateway.generate_completion.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_file_invalidates_verdict(repo, gateway):
+    detector = LLMCapabilityDetector(ai_gateway=gateway, repository_root=repo)
+    await _detect(detector)
+    (repo / "app" / "telegram_bridge.py").write_text("def send_telegram(text, chat):\n    return chat\n")
+    get_source_index(repo).refresh()
+    await _detect(detector)
+    assert gateway.generate_completion.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fallback_verdicts_are_not_cached(repo, gateway):
+    gateway.generate_completion.return_value = _groq_response("not json")
+    detector = LLMCapabilityDetector(ai_gateway=gateway, repository_root=repo)
+    await _detect(detector)
+    await _detect(detector)
+    assert gateway.generate_completion.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_verdicts_are_written_in_one_batch_off_the_detect_path(repo, gateway):
+    detector = LLMCapabilityDetector(ai_gateway=gateway, repository_root=repo)
+    with patch("app.application.services.llm_capability_detector.jrvs_write") as write:
+        for capability_id in range(5):
+            await detector.detect_capability_async(
+                capability_id=capability_id,
+                capability_name="telegram notifications",
+                capability_description="Send telegram notifications",
+            )
+        assert write.call_count == 0
+
+        detector.flush_verdicts()
+        detector.flush_verdicts()  # nothing new: no rewrite
+    assert write.call_count == 1
+    assert len(write.call_args.args[1]) == 5
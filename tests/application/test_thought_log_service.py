@@ -2,6 +2,8 @@
 """Tests for ThoughtLog model and ThoughtLogService"""
 
 import json
+import time
+
 import pytest
 from datetime import datetime
 
@@ -336,3 +338,129 @@ def test_successful_attempt_resets_retry_count(thought_log_service):
     
     assert thought_success.retry_count == 0
     assert thought_success.requires_human is False
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """File-backed SQLite: the writer thread gets its own connection."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'thoughts.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _count(engine):
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM thought_logs")).scalar()
+
+
+def test_thoughts_are_written_in_batches(file_engine, monkeypatch):
+    """Many thoughts share one transaction; the flush latency is bounded"""
+    from app.application.services.thought_log_writer import ThoughtLogWriter
+
+    monkeypatch.setenv("THOUGHT_LOG_MAX_BATCH", "1000")
+    monkeypatch.setenv("THOUGHT_LOG_MAX_LATENCY_MS", "100")
+    service = ThoughtLogService(engine=file_engine)
+    assert isinstance(service._writer, ThoughtLogWriter)
+
+    for i in range(40):
+        service.create_thought(
+            mission_id="batched",
+            session_id="s",
+            thought_process=f"Step {i}",
+            agent_id="agent_x",
+            success=True,
+        )
+    assert _count(file_engine) == 0  # still queued
+
+    deadline = time.monotonic() + 2
+    while _count(file_engine) < 40 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert _count(file_engine) == 40
+    assert service._writer.stats()["batches"] == 1
+
+
+def test_reads_see_queued_thoughts_and_wait_assigns_id(file_engine, monkeypatch):
+    monkeypatch.setenv("THOUGHT_LOG_MAX_LATENCY_MS", "60000")
+    service = ThoughtLogService(engine=file_engine)
+
+    service.create_thought(mission_id="m", session_id="s", thought_process="queued", success=False)
+    committed = service.create_thought(mission_id="m", session_id="s", thought_process="now",
+                                       success=False, wait=True)
+
+    assert committed.id is not None
+    assert [t.thought_process for t in service.get_mission_thoughts("m")] == ["queued", "now"]
+
+
+def test_retry_count_survives_service_restart(file_engine):
+    """The failure streak of an unseen mission is recovered from its last row"""
+    first = ThoughtLogService(engine=file_engine)
+    for i in range(2):
+        first.create_thought(mission_id="m", session_id="s", thought_process=f"fail {i}", success=False)
+    first.flush()
+
+    second = ThoughtLogService(engine=file_engine)
+    thought = second.create_thought(mission_id="m", session_id="s", thought_process="fail 2", success=False)
+    assert thought.retry_count == 2
+
+
+def test_iter_thoughts_pages_by_keyset(thought_log_service, engine):
+    for i in range(7):
+        thought_log_service.create_thought(
+            mission_id="paged", session_id="s", thought_process=f"T{i}",
+            agent_id="agent_a" if i % 2 else "agent_b", success=True,
+        )
+    thought_log_service.create_thought(mission_id="other", session_id="s", thought_process="X", success=True)
+
+    statements = []
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            statements.append(statement)
+
+    thoughts = list(thought_log_service.iter_thoughts(mission_id="paged", page_size=3))
+    assert [t.thought_process for t in thoughts] == [f"T{i}" for i in range(7)]
+    assert len(statements) == 3
+    # Later pages resume after the last (created_at, id) seen, not by offset
+    assert all("thought_logs.id >" in s for s in statements[1:])
+
+    by_agent = list(thought_log_service.iter_thoughts(agent_id="agent_a", page_size=2))
+    assert [t.thought_process for t in by_agent] == ["T1", "T3", "T5"]
+    assert [t.thought_process for t in thought_log_service.get_recent_thoughts(agent_id="agent_b", limit=2)] == [
+        "T6", "T4",
+    ]
+
+
+def test_mission_and_agent_reads_use_composite_indexes(engine):
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        plans = {
+            name: " ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql)))
+            for name, sql in {
+                "mission": "SELECT * FROM thought_logs WHERE mission_id = 'm' ORDER BY created_at, id",
+                "agent": "SELECT * FROM thought_logs WHERE agent_id = 'a' ORDER BY created_at DESC LIMIT 10",
+                "escalations": "SELECT * FROM thought_logs WHERE requires_human = 1 ORDER BY created_at DESC",
+            }.items()
+        }
+    assert "ix_thought_logs_mission_created" in plans["mission"]
+    assert "ix_thought_logs_agent_created" in plans["agent"]
+    assert "ix_thought_logs_human_created" in plans["escalations"]
+
+
+def test_failing_batch_is_bisected_and_only_the_bad_row_is_dropped(file_engine):
+    """A NOT NULL violation drops its own row, not the 15 good ones queued with it"""
+    from app.application.services.thought_log_writer import ThoughtLogWriter
+
+    writer = ThoughtLogWriter(file_engine, max_batch=16, max_latency=0.05, max_attempts=2)
+    for i in range(16):
+        writer.add(ThoughtLog(mission_id=None if i == 5 else "m", session_id="s", thought_process=f"T{i}"))
+
+    assert writer.flush()
+    stats = writer.stats()
+    assert _count(file_engine) == 15
+    assert stats["dropped"] == 1 and stats["splits"] >= 3 and stats["pending"] == 0
+    writer.close()
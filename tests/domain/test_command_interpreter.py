@@ -117,3 +117,12 @@ class TestCommandInterpreter(NexusComponent):
 
         assert intent.command_type == CommandType.REPORT_ISSUE
         assert intent.parameters["issue_description"] == "sobre a lentidão no Groq"
+
+    def test_add_command_pattern_replaces_existing_registration(self, interpreter):
+        """Re-registering a pattern drops the old type instead of shadowing the new one"""
+        interpreter.add_command_pattern("Digite", CommandType.PRESS_KEY)
+
+        intent = interpreter.interpret("digite enter")
+        assert intent.command_type == CommandType.PRESS_KEY
+        assert intent.parameters == {"key": "enter"}
+        assert len(interpreter._pattern_matcher) == len(interpreter._command_patterns)
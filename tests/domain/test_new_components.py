@@ -129,6 +129,40 @@ class TestSystemStateTracker:
         assert result["success"] is True
         assert isinstance(result["snapshots"], list)
 
+    def test_execute_range_action_queries_persisted_snapshots(self, tmp_path):
+        """execute() com action='range' deve filtrar por decision_id e intervalo de tempo."""
+        from app.domain.services.system_state_tracker import SystemStateTracker
+
+        tracker = SystemStateTracker.__new__(SystemStateTracker)
+        tracker._history = []
+
+        with patch("app.domain.services.system_state_tracker._SNAPSHOTS_DIR", tmp_path / "snaps"):
+            first = tracker.capture_snapshot(decision_id="d-1")
+            tracker.capture_snapshot(decision_id="d-2")
+            by_decision = tracker.execute({"action": "range", "decision_id": "d-1"})
+            by_time = tracker.query_snapshots(since=first["epoch"], until=first["epoch"] + 3600)
+
+        assert [s["integrity_hash"] for s in by_decision["snapshots"]] == [first["integrity_hash"]]
+        assert [s["decision_id"] for s in by_time] == ["d-1", "d-2"]
+        assert not list((tmp_path / "snaps").glob("snapshot_*.jrvs"))
+
+    def test_legacy_snapshot_files_are_migrated(self, tmp_path):
+        """Arquivos snapshot_<epoch>.jrvs antigos devem ir para o log segmentado."""
+        from app.domain.services.system_state_tracker import SystemStateTracker
+
+        snaps = tmp_path / "snaps"
+        snaps.mkdir()
+        legacy = {"epoch": 1700000000.0, "cpu_percent": 5.0, "ram_percent": 7.0, "decision_id": "old"}
+        (snaps / "snapshot_1700000000.jrvs").write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+
+        with patch("app.domain.services.system_state_tracker._SNAPSHOTS_DIR", snaps), \
+                patch.dict("os.environ", {"SNAPSHOT_RETENTION_DAYS": "0"}):
+            tracker = SystemStateTracker()
+            result = tracker.query_snapshots(decision_id="old")
+
+        assert result == [legacy]
+        assert not (snaps / "snapshot_1700000000.jrvs").exists()
+
 
 # ---------------------------------------------------------------------------
 # RewardSignalProvider
@@ -441,10 +475,13 @@ class TestSafetyGuardian:
 
     def test_audit_log_written(self, tmp_path):
         """Toda decisão via execute() deve ser registrada no audit log."""
+        from app.utils.audit_writer import get_audit_writer
         audit_file = tmp_path / "audit.jsonl"
         guardian = self._make_guardian(tmp_path)
         with patch("app.domain.services.safety_guardian._AUDIT_LOG_FILE", audit_file):
             guardian.execute({"action_type": "read_file", "action_context": {}})
+            # Entradas são gravadas em group commit; flush força o grupo atual
+            assert get_audit_writer(audit_file).flush()
         assert audit_file.exists()
         line = audit_file.read_text().strip().splitlines()[0]
         entry = json.loads(line)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Tests para o AuditWriter (app/utils/audit_writer.py)."""
+
+import json
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.audit_writer import AuditWriter
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "audit.jsonl"
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestAuditWriterGroupCommit:
+    def test_append_returns_before_write_and_groups_by_latency(self, path):
+        writer = AuditWriter(path, max_batch=1000, max_latency=0.1)
+        for i in range(50):
+            writer.append({"n": i})
+        assert not path.exists() or path.read_text() == ""
+        time.sleep(0.3)
+        assert [e["n"] for e in _lines(path)] == list(range(50))
+        stats = writer.stats()
+        assert stats["groups"] == 1 and stats["entries"] == 50
+        writer.close()
+
+    def test_group_written_when_batch_is_full(self, path):
+        writer = AuditWriter(path, max_batch=10, max_latency=60)
+        for i in range(25):
+            writer.append({"n": i})
+        deadline = time.monotonic() + 2
+        while writer.stats()["entries"] < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert writer.stats()["entries"] == 20  # dois grupos cheios; 5 aguardam o prazo
+        assert writer.flush()
+        assert len(_lines(path)) == 25
+        writer.close()
+
+    def test_file_is_opened_once(self, path):
+        writer = AuditWriter(path, max_batch=5, max_latency=0.01)
+        with patch("app.utils.audit_writer.os.open", wraps=os.open) as opened:
+            for i in range(40):
+                writer.append({"n": i})
+            assert writer.flush()
+        assert opened.call_count == 1
+        writer.close()
+
+    def test_fsync_mode_waits_and_shares_fsync_under_contention(self, path):
+        writer = AuditWriter(path, max_batch=256, max_latency=0.05, durability="fsync")
+        results = []
+
+        def _decide(worker):
+            for i in range(25):
+                results.append(writer.append({"w": worker, "n": i}))
+
+        with patch("app.utils.audit_writer.os.fsync", side_effect=lambda fd: time.sleep(0.005)) as fsync:
+            threads = [threading.Thread(target=_decide, args=(w,)) for w in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert all(results) and len(_lines(path)) == 200
+        stats = writer.stats()
+        assert stats["fsyncs"] == fsync.call_count < 200
+        assert stats["avg_group_size"] > 1
+        assert stats["commit_p99_ms"] > 0 and stats["entries_per_sec"] > 0
+        writer.close()
+
+    def test_torn_tail_is_discarded_on_open(self, path):
+        path.write_bytes(b'{"n": 1}\n{"n": 2}\n{"n": 3, "trunc')
+        writer = AuditWriter(path)
+        writer.append({"n": 4})
+        assert writer.flush()
+        assert [e["n"] for e in _lines(path)] == [1, 2, 4]
+        assert writer.stats()["torn_tail_bytes"] == len(b'{"n": 3, "trunc')
+        writer.close()
+
+    def test_failed_group_is_retried_in_order(self, path):
+        writer = AuditWriter(path, max_batch=100, max_latency=0.01)
+        real_write = os.write
+        calls = {"n": 0}
+
+        def _flaky(fd, data):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise OSError("disk full")
+            return real_write(fd, data)
+
+        with patch("app.utils.audit_writer.os.write", side_effect=_flaky):
+            for i in range(3):
+                writer.append({"n": i})
+            assert writer.flush(timeout=3)
+        assert [e["n"] for e in _lines(path)] == [0, 1, 2]
+        assert writer.stats()["errors"] == 1
+        writer.close()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requer flock")
+    def test_tail_repair_waits_for_group_in_progress(self, path):
+        import fcntl
+
+        path.write_bytes(b'{"n": 1}\n')
+        # Outro processo no meio de um grupo: linha parcial sob LOCK_SH
+        other = os.open(path, os.O_WRONLY | os.O_APPEND)
+        fcntl.flock(other, fcntl.LOCK_SH)
+        os.write(other, b'{"n": 2, "par')
+        writer = AuditWriter(path, max_latency=0.0)
+        writer.append({"n": 3})
+        time.sleep(0.1)
+        os.write(other, b'tial": true}\n')
+        fcntl.flock(other, fcntl.LOCK_UN)
+        os.close(other)
+
+        assert writer.flush(timeout=3)
+        assert [e["n"] for e in _lines(path)] == [1, 2, 3]
+        assert writer.stats()["torn_tail_bytes"] == 0
+        writer.close()
+
+    def test_group_failing_every_attempt_is_dropped(self, path):
+        writer = AuditWriter(path, max_latency=0.01, max_attempts=2)
+        with patch("app.utils.audit_writer.os.write", side_effect=OSError("disk full")):
+            assert writer.append({"n": 1}, wait=True, timeout=3) is False
+        assert writer.append({"n": 2}, wait=True, timeout=3) is True
+        assert [e["n"] for e in _lines(path)] == [2]
+        stats = writer.stats()
+        assert stats["dropped"] == 1 and stats["errors"] == 2 and stats["pending"] == 0
+        writer.close()
+
+    def test_pending_queue_is_bounded(self, path):
+        writer = AuditWriter(path, max_batch=100, max_latency=60, max_pending=3)
+        results = [writer.append({"n": i}) for i in range(5)]
+        assert results == [True, True, True, False, False]
+        assert writer.stats()["rejected"] == 2
+        writer.close()
+        assert [e["n"] for e in _lines(path)] == [0, 1, 2]
+
+    def test_invalid_durability(self, path):
+        with pytest.raises(ValueError):
+            AuditWriter(path, durability="never")
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requer fork")
+    def test_forked_child_does_not_replay_parent_queue(self, path):
+        writer = AuditWriter(path, max_batch=1000, max_latency=60)
+        writer.append({"who": "parent", "n": 0})
+        writer.append({"who": "parent", "n": 1})
+
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - roda no filho
+            code = 1
+            try:
+                assert writer.stats()["pending"] == 0
+                writer.append({"who": "child", "n": 0})
+                code = 0 if writer.flush(timeout=3) else 2
+            finally:
+                os._exit(code)
+        assert os.waitpid(pid, 0)[1] == 0
+        assert writer.flush()
+
+        entries = [(e["who"], e["n"]) for e in _lines(path)]
+        assert sorted(entries) == [("child", 0), ("parent", 0), ("parent", 1)]
+        writer.close()
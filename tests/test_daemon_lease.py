@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Tests para app/utils/daemon_lease.py."""
+import os
+
+import pytest
+
+from app.utils import daemon_lease
+from app.utils.daemon_lease import LEASE_DIR_ENV, claim_daemon, held_daemons, release_daemon
+
+pytestmark = pytest.mark.skipif(daemon_lease.fcntl is None, reason="requer fcntl")
+
+
+def _claim_in_child(name):
+    """Pede o lease num processo forkado; retorna o resultado visto pelo filho."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, b"1" if claim_daemon(name) else b"0")
+        os._exit(0)
+    os.close(write_fd)
+    result = os.read(read_fd, 1)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+    return result == b"1"
+
+
+@pytest.fixture(autouse=True)
+def _cleanup():
+    yield
+    for name in list(held_daemons()):
+        release_daemon(name)
+
+
+class TestDaemonLease:
+    def test_without_lease_dir_every_process_claims(self, monkeypatch):
+        monkeypatch.delenv(LEASE_DIR_ENV, raising=False)
+        assert claim_daemon("overwatch")
+        assert held_daemons() == {}
+
+    def test_only_one_process_holds_a_daemon(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(LEASE_DIR_ENV, str(tmp_path))
+        assert claim_daemon("overwatch")
+        assert claim_daemon("overwatch")  # idempotente no dono
+
+        # O filho herda o descritor, mas não o lease
+        assert not _claim_in_child("overwatch")
+        assert _claim_in_child("c2_keepalive")
+
+        release_daemon("overwatch")
+        assert _claim_in_child("overwatch")
@@ -50,6 +50,24 @@ class TestEvolutionGatekeeperTestCount:
             ok, reason = gk._check_test_count()
         assert ok is True
 
+    def test_collection_cached_while_tests_tree_unchanged(self):
+        """pytest --co só roda de novo quando a árvore tests/ muda."""
+        gk = EvolutionGatekeeper()
+        mock_result = MagicMock()
+        mock_result.stdout = "350 tests collected\n"
+        mock_result.stderr = ""
+
+        with patch("subprocess.run", return_value=mock_result) as mock_run, \
+             patch("app.application.services.evolution_test_impact.tests_tree_hash", return_value="h1"):
+            gk._check_test_count()
+            gk._check_test_count()
+        assert mock_run.call_count == 1
+
+        with patch("subprocess.run", return_value=mock_result) as mock_run, \
+             patch("app.application.services.evolution_test_impact.tests_tree_hash", return_value="h2"):
+            gk._check_test_count()
+        assert mock_run.call_count == 1
+
     def test_approves_on_timeout(self):
         """Deve permitir em caso de timeout."""
         gk = EvolutionGatekeeper()
@@ -4,6 +4,7 @@ from app.core.nexus import NexusComponent
 
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from sqlmodel import create_engine, Session, SQLModel
 
 from app.domain.models.evolution_reward import EvolutionReward
@@ -177,6 +178,47 @@ class TestRewardAdapter(NexusComponent):
         assert 'success_rate' in efficiency
         assert efficiency['efficiency_score'] == 60.0
 
+    def test_statistics_served_from_rollups(self, reward_adapter):
+        """Reads after logging come from the rollups and match the SQL aggregates."""
+        for value in (10.0, 20.0, -5.0):
+            reward_adapter.log_reward("pytest_pass" if value > 0 else "pytest_fail", value)
+        expected = reward_adapter._query_statistics(None)
+
+        with patch("app.adapters.infrastructure.reward_adapter.Session") as session:
+            stats = reward_adapter.get_reward_statistics()
+            efficiency = reward_adapter.get_efficiency_score()
+            total = reward_adapter.get_total_reward(action_type="pytest_pass")
+        session.assert_not_called()
+
+        for key in ('total_count', 'total_reward', 'average_reward', 'max_reward', 'min_reward'):
+            assert stats[key] == pytest.approx(expected[key])
+        assert stats['by_action_type']['pytest_pass']['std_dev'] == pytest.approx(5.0)
+        assert efficiency['efficiency_score'] == 25.0
+        assert total == 30.0
+
+    def test_rollups_seeded_from_existing_rows(self, test_engine, reward_adapter):
+        """A fresh adapter picks up rows written before it started."""
+        reward_adapter.log_reward("deploy_success", 50.0)
+        fresh = RewardAdapter(engine=test_engine)
+        assert fresh.get_total_reward() == 50.0
+        fresh.log_reward("deploy_success", 30.0)
+        assert fresh.get_reward_statistics()['by_action_type']['deploy_success']['count'] == 2
+
+    def test_rollups_pick_up_rows_from_other_writers(self, test_engine):
+        """Rows inserted by another process (here another adapter) reach the rollups."""
+        reader = RewardAdapter(engine=test_engine, freshness_interval=0.0)
+        reader.log_reward("deploy_success", 50.0)
+        other = RewardAdapter(engine=test_engine)
+        other.log_reward("deploy_success", 30.0)
+        other.log_reward("pytest_fail", -5.0)
+
+        assert reader.get_total_reward() == 75.0
+        reader.log_reward("deploy_success", 10.0)
+        stats = reader.get_reward_statistics()
+        assert stats['total_count'] == 4
+        assert stats['by_action_type']['deploy_success']['count'] == 3
+        assert reader.get_total_reward(action_type="deploy_success") == 90.0
+
 
 class TestEvolutionLoopService(NexusComponent):
 
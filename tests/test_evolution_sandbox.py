@@ -172,3 +172,96 @@ class TestSandboxGatekeeperIntegration:
 
         assert approved is False
         assert "sandbox_failed" in reason
+
+
+class TestImpactSelection:
+    @pytest.fixture
+    def repo(self, tmp_path):
+        (tmp_path / "app" / "core").mkdir(parents=True)
+        (tmp_path / "app" / "__init__.py").write_text("")
+        (tmp_path / "app" / "core" / "__init__.py").write_text("")
+        (tmp_path / "app" / "core" / "codec.py").write_text("def encode(x): return x\n")
+        (tmp_path / "app" / "core" / "store.py").write_text("from .codec import encode\n")
+        (tmp_path / "app" / "core" / "other.py").write_text("import json\n")
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "conftest.py").write_text("")
+        (tmp_path / "tests" / "test_store.py").write_text("from app.core.store import encode\n")
+        (tmp_path / "tests" / "test_other.py").write_text("def test_x():\n    from app.core import other\n")
+        return tmp_path
+
+    def test_selects_transitive_importers_only(self, repo):
+        from app.application.services.evolution_test_impact import ImportImpactMap
+
+        impact = ImportImpactMap(repo, cache_path=None)
+        assert impact.affected_tests(["app/core/codec.py"]) == ["tests/test_store.py"]
+        assert impact.affected_tests(["app/core/other.py"]) == ["tests/test_other.py"]
+
+    def test_unknown_or_conftest_change_runs_full_suite(self, repo):
+        from app.application.services.evolution_test_impact import ImportImpactMap
+
+        impact = ImportImpactMap(repo, cache_path=None)
+        assert impact.affected_tests(["tests/conftest.py"]) is None
+        assert impact.affected_tests(["README.md"]) is None
+
+    def test_refresh_is_incremental_and_persisted(self, repo):
+        from app.application.services.evolution_test_impact import ImportImpactMap
+
+        impact = ImportImpactMap(repo, cache_path="data/map.jrvs")
+        assert impact.refresh()["parsed"] == 8
+        assert impact.refresh()["parsed"] == 0
+        (repo / "app" / "core" / "other.py").write_text("from app.core.codec import encode\n")
+        assert impact.refresh()["parsed"] == 1
+        assert impact.affected_tests(["app/core/codec.py"]) == ["tests/test_other.py", "tests/test_store.py"]
+
+        reloaded = ImportImpactMap(repo, cache_path="data/map.jrvs")
+        assert reloaded.refresh()["parsed"] == 0
+
+    def test_plan_shards_balances_files(self, repo):
+        from app.application.services.evolution_test_impact import plan_shards
+
+        files = ["tests/test_store.py", "tests/test_other.py", "tests/conftest.py"]
+        shards = plan_shards(files, 2, root=repo)
+        assert len(shards) == 2
+        assert sorted(f for shard in shards for f in shard) == sorted(files)
+
+    def test_proposal_runs_only_selected_tests_in_shards(self, sandbox):
+        sandbox.configure({"enabled": True, "workers": 2})
+        sandbox._impact_map = MagicMock()
+        sandbox._impact_map.affected_tests.return_value = ["tests/test_a.py", "tests/test_b.py"]
+
+        with patch("app.application.services.evolution_test_impact.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stdout="1 passed", stderr="")
+            result = sandbox.test_proposal("x = 1", "app/x.py")
+
+        assert result["passed"] is True
+        assert result["selected_tests"] == ["tests/test_a.py", "tests/test_b.py"]
+        ran = sorted(arg for call in mock_run.call_args_list for arg in call.args[0] if arg.startswith("tests/"))
+        assert ran == ["tests/test_a.py", "tests/test_b.py"]
+        assert mock_run.call_count == 2
+
+    def test_no_affected_tests_falls_back_to_full_run(self, sandbox):
+        sandbox.configure({"enabled": True, "workers": 1})
+        sandbox._impact_map = MagicMock()
+        sandbox._impact_map.affected_tests.return_value = []
+
+        with patch.object(sandbox, "_all_test_files", return_value=["tests/test_a.py", "tests/test_b.py"]), \
+                patch("app.application.services.evolution_test_impact.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stdout="2 passed", stderr="")
+            result = sandbox.test_proposal("x = 1", "app/x.py")
+
+        assert result["passed"] is True
+        assert result["selected_tests"] is None
+        args = mock_run.call_args.args[0]
+        assert "tests/test_a.py" in args and "tests/test_b.py" in args
+
+    def test_shards_do_not_inherit_coverage_addopts(self, sandbox):
+        from app.application.services.evolution_test_impact import run_shards
+
+        with patch("app.application.services.evolution_test_impact.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stdout="1 passed", stderr="")
+            run_shards([["tests/test_a.py"], ["tests/test_b.py"]], timeout=5)
+
+        for call in mock_run.call_args_list:
+            args = call.args[0]
+            assert args[args.index("-o") + 1] == "addopts="
+            assert "no:cacheprovider" in args
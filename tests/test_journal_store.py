@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Tests para o JournalStore (app/utils/journal_store.py)."""
+
+import json
+import pytest
+
+from app.utils.journal_store import JournalStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "jobs.jsonl"
+
+
+def _write(path, entries, trailing_newline=True):
+    text = "\n".join(json.dumps(e) for e in entries)
+    path.write_text(text + ("\n" if trailing_newline else ""), encoding="utf-8")
+
+
+class TestJournalStoreQueries:
+    """Consultas latest/get/since sobre o índice."""
+
+    def test_latest_and_tail(self, path):
+        _write(path, [{"n": i} for i in range(5)])
+        store = JournalStore(path, persist_index=False)
+        assert [e["n"] for e in store.latest(2)] == [4, 3]
+        assert [e["n"] for e in store.tail(2)] == [3, 4]
+        assert store.count() == 5
+
+    def test_get_and_latest_keys(self, path):
+        _write(path, [
+            {"job_id": "a", "status": "running"},
+            {"job_id": "b", "status": "running"},
+            {"job_id": "a", "status": "success"},
+        ])
+        store = JournalStore(path, key_field="job_id", persist_index=False)
+        assert store.latest_keys(5) == ["b", "a"]
+        assert [e["status"] for e in store.get("a")] == ["running", "success"]
+        assert store.get("missing") == []
+
+    def test_since_accepts_epoch_and_iso(self, path):
+        _write(path, [
+            {"timestamp": 100.0},
+            {"timestamp": "1970-01-01T00:03:20Z"},  # 200
+            {"timestamp": 300},
+        ])
+        store = JournalStore(path, ts_field="timestamp", persist_index=False)
+        assert store.count_since(150) == 2
+        assert [e["timestamp"] for e in store.since(250)] == [300]
+
+    def test_invalid_lines_are_skipped(self, path):
+        path.write_text('{"n": 1}\nnot json\n\n{"n": 2}\n', encoding="utf-8")
+        store = JournalStore(path, persist_index=False)
+        assert [e["n"] for e in store.tail(10)] == [1, 2]
+
+
+class TestJournalStoreIncremental:
+    """Cursor de cauda, linhas parciais, rotação e índice lateral."""
+
+    def test_append_is_visible(self, path):
+        store = JournalStore(path, key_field="job_id", persist_index=False)
+        store.append({"job_id": "x"})
+        store.append({"job_id": "y"})
+        assert store.latest_keys(1) == ["y"]
+
+    def test_partial_line_is_indexed_once_complete(self, path):
+        path.write_text('{"n": 1}\n{"n": ', encoding="utf-8")
+        store = JournalStore(path, persist_index=False)
+        assert store.count() == 1
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write('2}\n')
+        assert [e["n"] for e in store.tail(5)] == [1, 2]
+
+    def test_final_line_without_newline(self, path):
+        _write(path, [{"n": 1}, {"n": 2}], trailing_newline=False)
+        store = JournalStore(path, persist_index=False)
+        assert store.count() == 2
+
+    def test_truncation_rebuilds_index(self, path):
+        _write(path, [{"n": i} for i in range(10)])
+        store = JournalStore(path, persist_index=False)
+        assert store.count() == 10
+        _write(path, [{"n": 99}])
+        assert [e["n"] for e in store.latest(5)] == [99]
+
+    def test_sidecar_index_is_reloaded(self, path):
+        _write(path, [{"job_id": "a", "timestamp": 1}, {"job_id": "b", "timestamp": 2}])
+        first = JournalStore(path, key_field="job_id", ts_field="timestamp")
+        first.flush_index()
+        assert path.with_name("jobs.jsonl.idx").exists()
+
+        reloaded = JournalStore(path, key_field="job_id", ts_field="timestamp")
+        assert reloaded._cursor == path.stat().st_size
+        assert reloaded.latest_keys(2) == ["b", "a"]
+
+    def test_sidecar_is_appended_not_rewritten(self, path):
+        store = JournalStore(path, key_field="job_id", ts_field="timestamp")
+        store.append({"job_id": "a", "timestamp": 1})
+        store.flush_index()
+        sidecar = path.with_name("jobs.jsonl.idx")
+        head = sidecar.read_bytes()
+
+        store.append({"job_id": "b", "timestamp": 2})
+        store.flush_index()
+        grown = sidecar.read_bytes()
+        assert grown.startswith(head) and len(grown.splitlines()) == len(head.splitlines()) + 1
+
+        with sidecar.open("ab") as fh:
+            fh.write(b'{"cursor":9')  # gravação interrompida
+        reloaded = JournalStore(path, key_field="job_id", ts_field="timestamp")
+        assert reloaded._cursor == path.stat().st_size
+        assert reloaded.latest_keys(2) == ["b", "a"]
+        assert [e["timestamp"] for e in reloaded.since(2)] == [2]
+        assert sidecar.read_bytes() == grown
+
+    def test_overlapping_sidecar_writers_are_deduplicated(self, path):
+        _write(path, [{"job_id": "0", "timestamp": 0}])
+        JournalStore(path, key_field="job_id", ts_field="timestamp").flush_index()
+
+        # Dois processos carregam o mesmo lateral e indexam as mesmas linhas novas
+        first = JournalStore(path, key_field="job_id", ts_field="timestamp")
+        second = JournalStore(path, key_field="job_id", ts_field="timestamp")
+        first.append({"job_id": "1", "timestamp": 1})
+        first.append({"job_id": "2", "timestamp": 2})
+        first.flush_index()
+        second.append({"job_id": "3", "timestamp": 3})
+        second.flush_index()
+
+        reloaded = JournalStore(path, key_field="job_id", ts_field="timestamp")
+        assert reloaded.count() == 4
+        assert reloaded.latest_keys(4) == ["3", "2", "1", "0"]
+        assert len(reloaded.get("0")) == 1
+        assert [e["timestamp"] for e in reloaded.since(0)] == [0, 1, 2, 3]
+
+    def test_rotation_rewrites_sidecar(self, path):
+        _write(path, [{"n": i} for i in range(5)])
+        store = JournalStore(path)
+        store.flush_index()
+        path.unlink()
+        _write(path, [{"n": 99}])
+        assert [e["n"] for e in store.latest(5)] == [99]
+        store.flush_index()
+
+        reloaded = JournalStore(path)
+        assert reloaded.count() == 1 and reloaded._offsets == [0]
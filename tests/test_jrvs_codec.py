@@ -3,7 +3,7 @@
 
 import pytest
 
-from app.utils.jrvs_codec import JrvsDecodeError, decode, encode, read_file, write_file
+from app.utils.jrvs_codec import JrvsDecodeError, decode, decode_frame, encode, read_file, write_file
 
 
 class TestJrvsEncodeDecode:
@@ -76,6 +76,16 @@ class TestJrvsDecodeErrors:
         with pytest.raises(JrvsDecodeError, match="CRC32 inválido"):
             decode(bytes(raw))
 
+    def test_decode_frame_walks_concatenated_frames(self):
+        first, second = encode({"n": 1}), encode([2, 3])
+        raw = first + second + second[:5]
+        data, offset = decode_frame(raw)
+        assert (data, offset) == ({"n": 1}, len(first))
+        data, offset = decode_frame(raw, offset)
+        assert (data, offset) == ([2, 3], len(first) + len(second))
+        with pytest.raises(JrvsDecodeError):
+            decode_frame(raw, offset)
+
 
 class TestJrvsFileIO:
     """Testes de leitura/gravação em arquivo."""
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""Tests para app/utils/log_pipeline.py."""
+import io
+import logging
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from app.application.services.structured_logger import StructuredLogger
+from app.utils.log_pipeline import LogPipeline, RateSampler, _SampledFormatter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _SlowHandler(logging.StreamHandler):
+    def emit(self, record):
+        time.sleep(0.02)
+        super().emit(record)
+
+
+def _pipeline(handler, queue_size=1000, sampler=None, name="test.log_pipeline"):
+    handler.setFormatter(_SampledFormatter("%(levelname)s %(name)s %(message)s"))
+    pipeline = LogPipeline([handler], queue_size, sampler)
+    logger = logging.getLogger(name)
+    logger.handlers = [pipeline.queue_handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    pipeline.start()
+    return pipeline, logger
+
+
+@pytest.fixture
+def stream():
+    return io.StringIO()
+
+
+class TestLogPipeline:
+    def test_slow_handler_does_not_block_caller(self, stream):
+        pipeline, logger = _pipeline(_SlowHandler(stream))
+        try:
+            start = time.perf_counter()
+            for i in range(20):
+                logger.info("passo %d de %s", i, "pipeline")
+            elapsed = time.perf_counter() - start
+            assert pipeline.flush(timeout=5)
+        finally:
+            pipeline.stop()
+
+        assert elapsed < 0.2  # 20 × 20 ms seriam 400 ms síncronos
+        lines = stream.getvalue().splitlines()
+        assert lines[0] == "INFO test.log_pipeline passo 0 de pipeline"
+        assert len(lines) == 20
+
+    def test_full_queue_drops_instead_of_blocking(self, stream):
+        pipeline, logger = _pipeline(logging.StreamHandler(stream), queue_size=5)
+        # Sem thread de escrita: a fila enche
+        pipeline.stop()
+        for i in range(50):
+            logger.info("m%d", i)
+        assert pipeline.stats()["dropped"] == 45
+
+    def test_mutable_args_are_formatted_at_call_time(self, stream):
+        pipeline, logger = _pipeline(logging.StreamHandler(stream))
+        try:
+            state = {"step": 1}
+            logger.info("estado %s", state)
+            state["step"] = 2
+            pipeline.flush()
+        finally:
+            pipeline.stop()
+        assert "estado {'step': 1}" in stream.getvalue()
+
+
+class TestRateSampler:
+    def test_samples_info_but_never_warnings(self, stream):
+        clock = _Clock()
+        sampler = RateSampler({"test.sampled": 1.0}, burst=2.0, clock=clock)
+        pipeline, logger = _pipeline(logging.StreamHandler(stream), sampler=sampler, name="test.sampled.nexus")
+        try:
+            for _ in range(10):
+                logger.info("resolve('%s') → ok", "x")
+            logger.warning("falha")
+            clock.now = 1.0
+            logger.info("resolve('%s') → ok", "y")
+            logging.getLogger("test.other").info("não amostrado")
+            pipeline.flush()
+        finally:
+            pipeline.stop()
+
+        lines = stream.getvalue().splitlines()
+        assert [line for line in lines if "resolve" in line] == [
+            "INFO test.sampled.nexus resolve('x') → ok",
+            "INFO test.sampled.nexus resolve('x') → ok",
+            "INFO test.sampled.nexus resolve('y') → ok (+8 suprimidas)",
+        ]
+        assert "WARNING test.sampled.nexus falha" in lines
+        assert pipeline.stats()["sampled_out"] == 8
+
+    def test_preformatted_messages_share_a_per_logger_bucket(self):
+        clock = _Clock()
+        sampler = RateSampler({"test.sampled": 1.0}, burst=2.0, clock=clock)
+        logger = logging.getLogger("test.sampled.fstrings")
+        accepted = [
+            sampler.filter(logger.makeRecord(logger.name, logging.INFO, __file__, 1, f"job {i} ok", None, None))
+            for i in range(10)
+        ]
+
+        assert accepted.count(True) == 2
+        assert list(sampler._buckets) == [("test.sampled.fstrings", None)]
+
+    def test_bucket_map_is_bounded_lru(self):
+        sampler = RateSampler({"test.sampled": 1.0}, clock=_Clock(), max_buckets=3)
+        logger = logging.getLogger("test.sampled.lru")
+        for template in ("a %s", "b %s", "a %s", "c %s", "d %s"):
+            sampler.filter(logger.makeRecord(logger.name, logging.INFO, __file__, 1, template, ("x",), None))
+
+        assert [template for _, template in sampler._buckets] == ["a %s", "c %s", "d %s"]
+
+
+class TestStructuredLogger:
+    def test_payload_is_not_serialized_when_level_disabled(self, stream):
+        class _Counted:
+            calls = 0
+
+            def __str__(self):
+                _Counted.calls += 1
+                return "contado"
+
+        pipeline, logger = _pipeline(logging.StreamHandler(stream), name="test.structured")
+        logger.setLevel(logging.INFO)
+        structured = StructuredLogger(logger, request_id="r1")
+        try:
+            structured.debug("detalhe", payload=_Counted())
+            assert _Counted.calls == 0
+            structured.info("ok", payload=_Counted())
+            pipeline.flush()
+        finally:
+            pipeline.stop()
+
+        assert _Counted.calls == 1
+        assert stream.getvalue().strip() == (
+            'INFO test.structured {"request_id": "r1", "payload": "contado", "message": "ok"}'
+        )
+
+    def test_mutable_extra_is_serialized_at_call_time(self, stream):
+        pipeline, logger = _pipeline(logging.StreamHandler(stream), name="test.structured_mutable")
+        structured = StructuredLogger(logger, request_id="r1")
+        # Sem thread de escrita: o registro fica na fila enquanto o chamador muda o dict
+        pipeline.stop()
+        state = {"step": 1}
+        structured.info("estado", state=state)
+        state["step"] = 2
+        pipeline.start()
+        try:
+            pipeline.flush()
+        finally:
+            pipeline.stop()
+        assert '"state": {"step": 1}' in stream.getvalue()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requer os.fork")
+def test_forked_child_restarts_writer(tmp_path):
+    log_file = tmp_path / "out.log"
+    script = textwrap.dedent(
+        f"""
+        import logging, os
+        from app.utils.log_pipeline import configure_logging, get_log_pipeline
+        configure_logging(format="%(message)s", handlers=[logging.FileHandler({str(log_file)!r})], force=True)
+        logging.getLogger("pai").info("antes do fork")
+        pid = os.fork()
+        if pid == 0:
+            logging.getLogger("filho").info("no filho")
+            get_log_pipeline().flush()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        """
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.getcwd(), os.environ.get("PYTHONPATH", "")]))
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=60, env=env)
+    assert sorted(log_file.read_text().splitlines()) == ["antes do fork", "no filho"]
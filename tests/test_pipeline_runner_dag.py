@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Tests for pipeline_runner DAG mode – dependencies, concurrency and merge order."""
+
+import textwrap
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.runtime.pipeline_runner import build_step_graph, critical_path, run_pipeline
+
+
+class _Step:
+    """Fake component: sleeps, records the context it saw and returns updates."""
+
+    def __init__(self, log, name, delay=0.0, returns=None, fail=False, mutate=None):
+        self.log, self.name, self.delay = log, name, delay
+        self.returns, self.fail, self.mutate = returns or {}, fail, mutate or {}
+
+    def execute(self, context):
+        start = time.perf_counter()
+        seen = {k: v for k, v in context.items() if k not in ("results", "artifacts")}
+        time.sleep(self.delay)
+        self.log.append((self.name, start, time.perf_counter(), seen, dict(context["artifacts"])))
+        if self.fail:
+            raise RuntimeError(f"{self.name} falhou")
+        context["artifacts"].update(self.mutate)
+        return dict(self.returns)
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """Write a pipeline YAML and run it against a dict of fake components."""
+    monkeypatch.chdir(tmp_path)
+    cfg_dir = tmp_path / "config" / "pipelines"
+    cfg_dir.mkdir(parents=True)
+
+    def _run(yaml_text, components, **kwargs):
+        (cfg_dir / "p.yml").write_text(textwrap.dedent(yaml_text))
+        fake_nexus = MagicMock()
+        fake_nexus.resolve.side_effect = lambda cid, **_: components[cid]
+        with patch("app.runtime.pipeline_runner.nexus", fake_nexus):
+            return run_pipeline("p", **kwargs)
+
+    return _run
+
+
+_FAN_OUT = """\
+    max_workers: 4
+    components:
+      root:
+        outputs: [snapshot]
+      a:
+        inputs: [snapshot]
+      b:
+        depends_on: [root]
+      c:
+        depends_on: root
+      join:
+        depends_on: [a, b, c]
+    """
+
+
+def _by_name(log):
+    return {entry[0]: entry for entry in log}
+
+
+class TestDagExecution:
+    def test_independent_steps_run_concurrently_after_dependency(self, run):
+        log = []
+        components = {name: _Step(log, name, delay=0.2) for name in ("a", "b", "c")}
+        components["root"] = _Step(log, "root", delay=0.05, returns={"snapshot": "v1"})
+        components["join"] = _Step(log, "join")
+
+        start = time.perf_counter()
+        ctx = run(_FAN_OUT, components)
+        elapsed = time.perf_counter() - start
+
+        assert ctx["status"] == "success"
+        assert elapsed < 0.45  # sequencial seria ~0.65s
+        steps = _by_name(log)
+        for name in ("a", "b", "c"):
+            assert steps[name][1] >= steps["root"][2]
+            assert steps[name][3]["snapshot"] == "v1"
+            assert steps["join"][1] >= steps[name][2]
+        assert [r["step"] for r in ctx["results"]] == ["root", "a", "b", "c", "join"]
+
+    def test_pool_size_bounds_concurrency(self, run):
+        log = []
+        components = {name: _Step(log, name, delay=0.1) for name in ("root", "a", "b", "c", "join")}
+        ctx = run(_FAN_OUT.replace("max_workers: 4", "max_workers: 1"), components)
+
+        assert ctx["status"] == "success"
+        spans = sorted((s, e) for _, s, e, _, _ in log)
+        assert all(nxt[0] >= prev[1] for prev, nxt in zip(spans, spans[1:]))
+
+    def test_merge_is_deterministic_regardless_of_finish_order(self, run):
+        log = []
+        components = {
+            "root": _Step(log, "root"),
+            # "a" termina por último mas foi declarado antes: "b" e "c" vencem
+            "a": _Step(log, "a", delay=0.15, returns={"winner": "a", "only_a": 1}, mutate={"shared": "a"}),
+            "b": _Step(log, "b", delay=0.05, returns={"winner": "b"}, mutate={"shared": "b", "b_file": "x"}),
+            "c": _Step(log, "c", returns={"winner": "c"}),
+            "join": _Step(log, "join"),
+        }
+        ctx = run(_FAN_OUT, components)
+
+        assert ctx["winner"] == "c" and ctx["only_a"] == 1
+        assert ctx["artifacts"] == {"shared": "b", "b_file": "x"}
+        # Irmãos não enxergam as alterações uns dos outros; o join vê todas
+        steps = _by_name(log)
+        assert "winner" not in steps["b"][3]
+        assert steps["join"][3]["winner"] == "c" and steps["join"][4]["shared"] == "b"
+
+    def test_strict_failure_stops_scheduling_and_waits_in_flight(self, run):
+        log = []
+        components = {
+            "root": _Step(log, "root"),
+            "a": _Step(log, "a", fail=True),
+            "b": _Step(log, "b", delay=0.15, returns={"b_done": True}),
+            "c": _Step(log, "c", delay=0.15),
+            "join": _Step(log, "join"),
+        }
+        ctx = run(_FAN_OUT.replace("max_workers: 4", "strict: true"), components)
+
+        assert ctx["status"] == "failed"
+        assert "join" not in _by_name(log)
+        assert ctx["b_done"] is True  # em andamento termina e é mesclado
+        statuses = {r["step"]: r["status"] for r in ctx["results"]}
+        assert statuses == {"root": "success", "a": "error", "b": "success", "c": "success"}
+
+    def test_non_strict_failure_continues(self, run):
+        log = []
+        components = {name: _Step(log, name) for name in ("root", "b", "c", "join")}
+        components["a"] = _Step(log, "a", fail=True)
+        ctx = run(_FAN_OUT, components)
+
+        assert ctx["status"] == "success"
+        assert "join" in _by_name(log)
+
+    def test_reports_timings_and_critical_path(self, run):
+        log = []
+        components = {
+            "root": _Step(log, "root", delay=0.05),
+            "a": _Step(log, "a", delay=0.02),
+            "b": _Step(log, "b", delay=0.2),
+            "c": _Step(log, "c", delay=0.02),
+            "join": _Step(log, "join"),
+        }
+        ctx = run(_FAN_OUT, components)
+
+        assert list(ctx["step_timings"]) == ["root", "a", "b", "c", "join"]
+        assert ctx["step_timings"]["b"] >= 0.2
+        assert ctx["critical_path"]["steps"] == ["root", "b", "join"]
+        assert ctx["critical_path"]["seconds"] == pytest.approx(
+            sum(ctx["step_timings"][s] for s in ("root", "b", "join"))
+        )
+        assert ctx["wall_time"] >= ctx["critical_path"]["seconds"] * 0.9
+
+    def test_undeclared_steps_act_as_barriers(self):
+        graph = build_step_graph({
+            "a": {"outputs": ["x"]},
+            "legacy": {"id": "legacy"},
+            "b": {"inputs": ["x"]},
+            "c": {},
+        })
+        assert graph == {"a": set(), "legacy": {"a"}, "b": {"a", "legacy"}, "c": {"b", "legacy"}}
+
+    def test_cycle_and_unknown_dependency_fail_fast(self, run):
+        components = {"a": _Step([], "a"), "b": _Step([], "b")}
+        ctx = run(
+            """\
+            components:
+              a:
+                depends_on: [b]
+              b:
+                depends_on: [a]
+            """,
+            components,
+        )
+        assert ctx["status"] == "failed" and "Ciclo" in ctx["error"]
+        with pytest.raises(ValueError):
+            build_step_graph({"a": {"depends_on": ["ghost"]}})
+
+    def test_legacy_pipeline_stays_sequential_with_timings(self, run):
+        log = []
+        components = {"one": _Step(log, "one", delay=0.02), "two": _Step(log, "two")}
+        ctx = run("components:\n  one: {}\n  two: {}\n", components)
+
+        assert ctx["status"] == "success"
+        assert [e[0] for e in log] == ["one", "two"] and log[1][1] >= log[0][2]
+        assert ctx["critical_path"]["steps"] == ["one", "two"]
+        assert set(ctx["step_timings"]) == {"one", "two"}
+
+
+def test_critical_path_picks_longest_chain():
+    graph = {"a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"}}
+    path, seconds = critical_path(graph, {"a": 1.0, "b": 0.5, "c": 2.0, "d": 1.0}, ["a", "b", "c", "d"])
+    assert path == ["a", "c", "d"] and seconds == pytest.approx(4.0)
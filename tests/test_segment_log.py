@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""Tests para SegmentLog (app/utils/segment_log.py)."""
+
+import os
+
+import pytest
+
+from app.utils.segment_log import SegmentLog
+
+T0 = 1_759_999_980.0  # múltiplo de 60
+
+
+class _Clock:
+    def __init__(self, now: float = T0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _snap(ts, decision_id=None, cpu=10.0):
+    return {"epoch": ts, "cpu_percent": cpu, "decision_id": decision_id}
+
+
+def _log(tmp_path, clock, **options):
+    options.setdefault("block_records", 4)
+    return SegmentLog(tmp_path / "snaps", ts_field="epoch", key_field="decision_id", clock=clock, **options)
+
+
+class TestSegmentLog:
+    def test_query_by_time_range_and_key(self, tmp_path):
+        clock = _Clock()
+        log = _log(tmp_path, clock)
+        for i in range(10):
+            log.append(_snap(T0 + i, decision_id=f"d{i % 3}"))
+
+        assert [r["epoch"] for r in log.query(since=T0 + 2, until=T0 + 5)] == [T0 + 2, T0 + 3, T0 + 4]
+        assert [r["epoch"] for r in log.query(key="d1")] == [T0 + 1, T0 + 4, T0 + 7]
+        # Inclui registros ainda pendentes (9 não fechou bloco)
+        assert [r["epoch"] for r in log.query(limit=2)] == [T0 + 8, T0 + 9]
+
+    def test_many_records_use_few_compressed_files(self, tmp_path):
+        clock = _Clock()
+        log = _log(tmp_path, clock, block_records=50, segment_max_bytes=4096)
+        for i in range(2000):
+            log.append(_snap(T0 + i, decision_id=f"d{i}", cpu=float(i % 7)))
+        log.flush()
+
+        files = list((tmp_path / "snaps").iterdir())
+        assert 1 < len(files) < 40
+        assert log.stats()["records"] == 2000
+        assert log.query(key="d1234")[0]["epoch"] == T0 + 1234
+
+    def test_reopen_rebuilds_index_and_truncates_torn_tail(self, tmp_path):
+        clock = _Clock()
+        log = _log(tmp_path, clock, segment_max_bytes=300)
+        for i in range(12):
+            log.append(_snap(T0 + i, decision_id="x" if i == 5 else None))
+        log.flush()
+        active = sorted((tmp_path / "snaps").glob("seg_*.log"))[-1]
+        with active.open("ab") as fh:
+            fh.write(b"JRVS\x01\x00partial")
+
+        reopened = _log(tmp_path, clock)
+        assert [r["epoch"] for r in reopened.query()] == [T0 + i for i in range(12)]
+        assert [r["epoch"] for r in reopened.query(key="x")] == [T0 + 5]
+        assert not active.read_bytes().endswith(b"partial")
+
+    def test_retention_and_downsampling(self, tmp_path):
+        clock = _Clock()
+        log = _log(
+            tmp_path, clock, block_records=10, segment_max_age=600,
+            retention_days=1, downsample_after_hours=1, downsample_interval=60,
+        )
+        for i in range(120):  # dois minutos, um registro por segundo
+            log.append(_snap(T0 + i, decision_id=f"d{i}", cpu=float(i)))
+        log.flush()
+
+        clock.now = T0 + 2 * 3600
+        assert log.maintain() == {"removed": 0, "downsampled": 1}
+        old = log.query(until=T0 + 3600)
+        assert [r["samples"] for r in old] == [60, 60]
+        assert old[0]["cpu_percent"] == sum(range(60)) / 60
+        assert [r["epoch"] for r in log.query(key="d75")] == [T0 + 119]
+
+        clock.now = T0 + 2 * 86400
+        assert log.maintain()["removed"] == 1
+        assert log.query(until=T0 + 3600) == []
+
+    def test_offsets_come_from_file_when_another_writer_appends(self, tmp_path):
+        clock = _Clock()
+        first, second = _log(tmp_path, clock, block_records=2), _log(tmp_path, clock, block_records=2)
+        # Mesmo PID e mesmo instante: os dois escolhem o mesmo segmento ativo
+        for i in range(0, 8, 2):
+            first.append(_snap(T0 + i, decision_id="a"))
+            second.append(_snap(T0 + i + 1, decision_id="b"))
+            first.append(_snap(T0 + i + 0.5, decision_id="a"))
+            second.append(_snap(T0 + i + 1.5, decision_id="b"))
+
+        assert len(first.query(key="a")) == 8
+        assert len(second.query(key="b")) == 8
+        assert len(_log(tmp_path, clock).query()) == 16
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requer fork")
+    def test_forked_workers_append_to_their_own_segments(self, tmp_path):
+        clock = _Clock()
+        log = _log(tmp_path, clock)
+        log.append(_snap(T0, decision_id="parent"))  # pendente no pai
+
+        children = []
+        for worker in range(2):
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover - roda no filho
+                try:
+                    for i in range(10):
+                        log.append(_snap(T0 + 1 + i, decision_id=f"w{worker}"))
+                    log.flush()
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        for pid in children:
+            assert os.waitpid(pid, 0)[1] == 0
+        log.flush()
+
+        names = sorted(p.name for p in (tmp_path / "snaps").glob("seg_*.log"))
+        assert {name.rsplit("_", 1)[1] for name in names} == {f"{pid}.log" for pid in [os.getpid(), *children]}
+        reopened = _log(tmp_path, clock)
+        assert len(reopened.query(key="parent")) == 1
+        assert len(reopened.query(key="w0")) == len(reopened.query(key="w1")) == 10
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requer fork")
+    def test_query_follows_segments_changed_by_other_processes(self, tmp_path):
+        clock = _Clock()
+        options = dict(block_records=10, segment_max_age=600, retention_days=1,
+                       downsample_after_hours=1, downsample_interval=60)
+        reader = _log(tmp_path, clock, **options)
+
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - roda no filho
+            try:
+                worker = _log(tmp_path, clock, **options)
+                for i in range(120):
+                    worker.append(_snap(T0 + i, decision_id="w", cpu=float(i)))
+                worker.flush()
+            finally:
+                os._exit(0)
+        assert os.waitpid(pid, 0)[1] == 0
+
+        # Segmento criado depois da abertura
+        assert len(reader.query(key="w")) == 120
+
+        # Outro processo reduz o segmento (os.replace) ao abrir: os offsets antigos não valem mais
+        clock.now = T0 + 2 * 3600
+        assert _log(tmp_path, clock, **options).stats()["downsampled_segments"] == 1
+        assert [r["samples"] for r in reader.query(key="w")] == [60, 60]
+
+        # ... e depois o apaga pela retenção
+        clock.now = T0 + 2 * 86400
+        assert _log(tmp_path, clock, **options).stats()["segments"] == 0
+        assert reader.query() == []
+        assert reader.stats()["segments"] == 0
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requer fork")
+    def test_segment_of_dead_owner_is_repaired_and_expired(self, tmp_path):
+        clock = _Clock()
+        written, release = os.pipe(), os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - roda no filho
+            try:
+                worker = _log(tmp_path, clock)
+                for i in range(8):
+                    worker.append(_snap(T0 + i, decision_id="w"))
+                worker.flush()
+                os.write(written[1], b"1")
+                os.read(release[0], 1)
+            finally:
+                os._exit(0)
+        os.read(written[0], 1)
+        log = _log(tmp_path, clock, retention_days=1)
+        assert log._segments[0]["foreign"] is True
+
+        os.write(release[1], b"1")
+        assert os.waitpid(pid, 0)[1] == 0
+        clock.now = T0 + 2 * 86400
+        assert log.maintain()["removed"] == 1
+        assert list((tmp_path / "snaps").glob("seg_*")) == []
+        for fd in (*written, *release):
+            os.close(fd)
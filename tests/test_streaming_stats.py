@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Tests para RunningStats e P2Quantile (app/utils/streaming_stats.py)."""
+
+import random
+import statistics
+
+import pytest
+
+from app.utils.streaming_stats import P2Quantile, RunningStats
+
+
+class TestRunningStats:
+    def test_matches_batch_statistics(self):
+        values = [3.0, -1.5, 10.0, 0.0, 7.25]
+        stats = RunningStats()
+        for v in values:
+            stats.add(v)
+        assert stats.count == 5
+        assert stats.total == pytest.approx(sum(values))
+        assert stats.mean == pytest.approx(statistics.fmean(values))
+        assert stats.std_dev == pytest.approx(statistics.pstdev(values))
+        assert (stats.min, stats.max, stats.positive) == (-1.5, 10.0, 3)
+
+    def test_merge_equals_single_stream(self):
+        left, right, both = RunningStats(), RunningStats(), RunningStats()
+        for i, v in enumerate([1.0, 4.0, -2.0, 8.0, 5.0, 0.5]):
+            (left if i % 2 else right).add(v)
+            both.add(v)
+        merged = RunningStats().merge(left).merge(right)
+        assert merged.to_dict() == pytest.approx(both.to_dict())
+
+    def test_empty(self):
+        assert RunningStats().to_dict() == {
+            "count": 0, "total": 0.0, "mean": 0.0, "std_dev": 0.0, "min": 0.0, "max": 0.0, "positive": 0,
+        }
+
+
+class TestP2Quantile:
+    def test_exact_for_small_samples(self):
+        sketch = P2Quantile(0.5)
+        assert sketch.value == 0.0
+        for v in (5.0, 1.0, 3.0):
+            sketch.add(v)
+        assert sketch.value == 3.0
+        sketch.add(4.0)
+        assert sketch.value == pytest.approx(3.5)
+
+    @pytest.mark.parametrize("p", [0.5, 0.9])
+    def test_tracks_quantile_of_large_stream(self, p):
+        rng = random.Random(42)
+        values = [rng.lognormvariate(0, 0.5) for _ in range(5000)]
+        sketch = P2Quantile(p)
+        for v in values:
+            sketch.add(v)
+        exact = statistics.quantiles(values, n=100)[int(p * 100) - 1]
+        assert sketch.value == pytest.approx(exact, rel=0.03)
+
+    def test_rejects_invalid_quantile(self):
+        with pytest.raises(ValueError):
+            P2Quantile(1.0)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Tests para TriggerMatcher (app/utils/trigger_matcher.py) e seus consumidores."""
+
+import random
+import time
+
+import pytest
+
+from app.domain.memory.prospective_memory import ProspectiveMemory
+from app.domain.services.reward_signal_provider import RewardSignalProvider
+from app.utils.trigger_matcher import TriggerMatch, TriggerMatcher
+
+
+class TestTriggerMatcher:
+    def test_find_all_reports_overlapping_matches_with_positions(self):
+        matcher = TriggerMatcher(["he", "she", "his", "hers"])
+        matches = matcher.find_all("ushers")
+        assert [(m.start, m.end, m.pattern) for m in matches] == [
+            (1, 4, "she"),
+            (2, 4, "he"),
+            (2, 6, "hers"),
+        ]
+        assert all("ushers"[m.start:m.end] == m.pattern for m in matches)
+
+    def test_case_insensitive_by_default(self):
+        matcher = TriggerMatcher([("Obrigado", "positive")])
+        assert matcher.values("OBRIGADO pela ajuda") == ["positive"]
+        assert TriggerMatcher(["Obrigado"], case_sensitive=True).find_all("obrigado") == []
+
+    def test_first_prefers_earliest_registration(self):
+        matcher = TriggerMatcher([("pesquise", "search"), ("abra", "open")])
+        match = matcher.first("abra o site e pesquise python")
+        assert isinstance(match, TriggerMatch)
+        assert (match.value, match.start) == ("search", 14)
+        assert matcher.first("nada aqui") is None
+
+    def test_add_after_query_is_visible(self):
+        matcher = TriggerMatcher(["abc"])
+        assert matcher.values("xabcd") == ["abc"]
+        matcher.add("bcd")
+        matcher.add("b")
+        assert matcher.values("xabcd") == ["abc", "bcd", "b"]
+
+    def test_incremental_links_match_brute_force(self):
+        rng = random.Random(7)
+        matcher = TriggerMatcher()
+        patterns = []
+        # Padrões curtos inseridos depois dos longos forçam o redirecionamento
+        # de links de falha de nós já existentes ("xab" e depois "ab")
+        for _ in range(60):
+            pattern = "".join(rng.choice("abx") for _ in range(rng.randint(1, 4)))
+            matcher.add(pattern)
+            patterns.append(pattern)
+            text = "".join(rng.choice("abx") for _ in range(30))
+            expected = sorted(
+                (i, i + len(p), p) for p in set(patterns) for i in range(len(text)) if text.startswith(p, i)
+            )
+            found = sorted({(m.start, m.end, m.pattern) for m in matcher.find_all(text)})
+            assert found == expected
+
+    def test_removals_prune_trie_and_keep_links_correct(self):
+        rng = random.Random(11)
+        matcher = TriggerMatcher()
+        live = []
+        for step in range(400):
+            if live and rng.random() < 0.5:
+                matcher.remove(live.pop(rng.randrange(len(live))))
+            else:
+                pattern = "".join(rng.choice("abx") for _ in range(rng.randint(1, 5)))
+                matcher.add(pattern)
+                live.append(pattern)
+            text = "".join(rng.choice("abx") for _ in range(30))
+            expected = sorted(
+                (i, i + len(p), p) for p in set(live) for i in range(len(text)) if text.startswith(p, i)
+            )
+            assert sorted({(m.start, m.end, m.pattern) for m in matcher.find_all(text)}) == expected
+
+        for pattern in live:
+            matcher.remove(pattern)
+        assert len(matcher) == 0 and matcher._goto[0] == {}
+        # Intenções vêm e vão: os nós podados são reaproveitados
+        nodes = len(matcher._goto)
+        for i in range(50):
+            matcher.add("xab" * 2)
+            matcher.remove("xab" * 2)
+        assert len(matcher._goto) == nodes
+
+    def test_remove_unregisters_only_that_value(self):
+        first, second = {"id": 1}, {"id": 2}
+        matcher = TriggerMatcher([("reunião", first), ("reunião", second)])
+        assert matcher.remove("reunião", first)
+        assert matcher.values("antes da reunião") == [second]
+        assert not matcher.remove("reunião", first)
+        assert len(matcher) == 1
+
+    def test_values_are_distinct_and_in_registration_order(self):
+        matcher = TriggerMatcher([("ótimo", "positive"), ("ruim", "negative"), ("perfeito", "positive")])
+        assert matcher.values("ruim, mas perfeito e ótimo") == ["positive", "negative"]
+        assert matcher.contains_any("perfeito")
+        assert not matcher.contains_any("neutro")
+
+
+class TestProspectiveMemoryTriggers:
+    def test_completed_intention_no_longer_triggers(self):
+        memory = ProspectiveMemory()
+        intention_id = memory.store_intention({"description": "levar guarda-chuva", "trigger": "chuva"})["intention_id"]
+        assert memory.check_triggers({"current_context": "Previsão de CHUVA"})["total_triggered"] == 1
+
+        memory.complete_intention({"intention_id": intention_id})
+        assert memory.check_triggers({"current_context": "Previsão de chuva"})["total_triggered"] == 0
+
+    def test_truncated_intentions_are_unregistered(self):
+        memory = ProspectiveMemory(max_intentions=2)
+        for trigger in ("alpha", "beta", "gamma"):
+            memory.store_intention({"trigger": trigger})
+        result = memory.check_triggers({"current_context": "alpha beta gamma"})
+        assert [i["trigger"] for i in result["triggered"]] == ["beta", "gamma"]
+
+    def test_check_triggers_cost_is_flat_in_intention_count(self):
+        memory = ProspectiveMemory(max_intentions=5000)
+        for i in range(5000):
+            memory.store_intention({"trigger": f"gatilho-{i:05d}"})
+        context = {"current_context": "nada relevante " * 20 + "gatilho-04999"}
+        memory.check_triggers(context)  # constrói o autômato
+
+        start = time.perf_counter()
+        for _ in range(50):
+            result = memory.check_triggers(context)
+        per_call = (time.perf_counter() - start) / 50
+
+        assert [i["trigger"] for i in result["triggered"]] == ["gatilho-04999"]
+        assert per_call < 0.01
+
+
+def test_interaction_reward_uses_feedback_keywords():
+    provider = RewardSignalProvider()
+    neutral = provider.calculate_interaction_reward("clarified", "ok")
+    assert provider.calculate_interaction_reward("clarified", "Perfeito, valeu!") == pytest.approx(neutral + 0.15)
+    assert provider.calculate_interaction_reward("clarified", "Deu ERRO de novo") == pytest.approx(neutral - 0.2)